@@ -280,7 +280,7 @@ class N3(pyc.Cycle):
         # newton.linesearch.options['maxiter'] = 2
         newton.linesearch.options['iprint'] = -1
 
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
@@ -111,7 +111,7 @@ class ABTurbojet(pyc.Cycle):
         newton.linesearch.options['rho'] = .75
         newton.linesearch.options['iprint'] = -1
 
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
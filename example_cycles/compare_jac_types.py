@@ -0,0 +1,108 @@
+"""
+Compare the memory and run time of the high bypass turbofan multi-point model with
+dense vs. sparse (csc) assembled Jacobians for all the DirectSolvers.
+
+usage: python compare_jac_types.py [dense|csc]
+"""
+import sys
+import time
+import resource
+
+import numpy as np
+import scipy.sparse as sp
+
+import openmdao.api as om
+
+from high_bypass_turbofan import MPhbtf
+
+
+def assembled_jac_bytes(model):
+    """
+    Total memory used by the assembled Jacobians of all DirectSolvers in the model
+    """
+    total = 0
+    n_jacs = 0
+    for system in model.system_iter(include_self=True, recurse=True):
+        solver = system.linear_solver
+        if not isinstance(solver, om.DirectSolver) or solver._assembled_jac is None:
+            continue
+        mtx = solver._assembled_jac._int_mtx._matrix
+        if mtx is None:
+            continue
+        if sp.issparse(mtx):
+            total += mtx.data.nbytes + mtx.indices.nbytes + mtx.indptr.nbytes
+        else:
+            total += np.asarray(mtx).nbytes
+        n_jacs += 1
+
+    return total, n_jacs
+
+
+if __name__ == "__main__":
+
+    jac_type = sys.argv[1] if len(sys.argv) > 1 else 'csc'
+
+    prob = om.Problem()
+    prob.model = MPhbtf()
+
+    # the groups only get their solvers during setup, so the jac type has to be forced afterwards
+    orig_setup = om.Group._setup_procs
+
+    def _setup_procs(self, *args, **kwargs):
+        orig_setup(self, *args, **kwargs)
+        self.options['assembled_jac_type'] = jac_type
+
+    om.Group._setup_procs = _setup_procs
+
+    prob.setup()
+
+    prob.set_val('DESIGN.fan.PR', 1.685)
+    prob.set_val('DESIGN.fan.eff', 0.8948)
+    prob.set_val('DESIGN.lpc.PR', 1.935)
+    prob.set_val('DESIGN.lpc.eff', 0.9243)
+    prob.set_val('DESIGN.hpc.PR', 9.369)
+    prob.set_val('DESIGN.hpc.eff', 0.8707)
+    prob.set_val('DESIGN.hpt.eff', 0.8888)
+    prob.set_val('DESIGN.lpt.eff', 0.8996)
+    prob.set_val('DESIGN.fc.alt', 35000., units='ft')
+    prob.set_val('DESIGN.fc.MN', 0.8)
+    prob.set_val('DESIGN.T4_MAX', 2857, units='degR')
+    prob.set_val('DESIGN.Fn_DES', 5900.0, units='lbf')
+    prob.set_val('OD_full_pwr.T4_MAX', 2857, units='degR')
+    prob.set_val('OD_part_pwr.PC', 0.8)
+
+    prob['DESIGN.balance.FAR'] = 0.025
+    prob['DESIGN.balance.W'] = 100.
+    prob['DESIGN.balance.lpt_PR'] = 4.0
+    prob['DESIGN.balance.hpt_PR'] = 3.0
+    prob['DESIGN.fc.balance.Pt'] = 5.2
+    prob['DESIGN.fc.balance.Tt'] = 440.0
+
+    for pt in ['OD_full_pwr', 'OD_part_pwr']:
+        prob[pt+'.balance.FAR'] = 0.02467
+        prob[pt+'.balance.W'] = 300
+        prob[pt+'.balance.BPR'] = 5.105
+        prob[pt+'.balance.lp_Nmech'] = 5000
+        prob[pt+'.balance.hp_Nmech'] = 15000
+        prob[pt+'.hpt.PR'] = 3.
+        prob[pt+'.lpt.PR'] = 4.
+        prob[pt+'.fan.map.RlineMap'] = 2.0
+        prob[pt+'.lpc.map.RlineMap'] = 2.0
+        prob[pt+'.hpc.map.RlineMap'] = 2.0
+
+    prob.set_solver_print(level=-1)
+
+    st = time.time()
+    prob.run_model()
+    run_time = time.time() - st
+
+    nbytes, n_jacs = assembled_jac_bytes(prob.model)
+
+    print(f'assembled jac type: {jac_type}')
+    print(f'run time: {run_time:.1f} s')
+    print(f'assembled jacobians: {n_jacs}, memory: {nbytes/2**20:.1f} MB')
+    # ru_maxrss is in kB on linux
+    print(f'peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/2**10:.0f} MB')
+    for pt in ['DESIGN', 'OD_full_pwr', 'OD_part_pwr']:
+        print(f'{pt} Fn: {prob.get_val(pt + ".perf.Fn", units="lbf")[0]:.6f} lbf, '
+              f'TSFC: {prob.get_val(pt + ".perf.TSFC")[0]:.8f}')
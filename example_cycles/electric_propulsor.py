@@ -90,7 +90,7 @@ class Propulsor(pyc.Cycle):
         # newton.linesearch.options['print_bound_enforce'] = True
         # newton.linesearch.options['iprint'] = -1
         #
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         # base_class setup should be called as the last thing in your setup
         super().setup()
@@ -225,7 +225,7 @@ class HBTF(pyc.Cycle):
         ls.options['rho'] = 0.75
         # ls.options['print_bound_enforce'] = True
 
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
@@ -140,7 +140,7 @@ class MultiSpoolTurboshaft(pyc.Cycle):
         newton.linesearch.options['bound_enforcement'] = 'scalar'
         newton.linesearch.options['iprint'] = -1
 
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
@@ -96,7 +96,7 @@ class Turbojet(pyc.Cycle):
         newton.options['max_sub_solves'] = 100
         newton.options['reraise_child_analysiserror'] = False
         
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
@@ -111,7 +111,7 @@ class SingleSpoolTurboshaft(pyc.Cycle):
         newton.linesearch.options['maxiter'] = 3
         newton.linesearch.options['rho'] = 0.75
 
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         super().setup()
 
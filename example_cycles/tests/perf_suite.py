@@ -0,0 +1,153 @@
+"""
+Performance suite for the example cycles and the N+3 models.
+
+Runs the numerical benchmarks (each one in its own process), times their setup, final_setup, run_model,
+run_driver and compute_totals phases, counts the Newton iterations and component evaluations, and appends
+the results to a JSON-lines history file. `compare` checks the last run against an earlier one and exits
+with an error if anything regressed.
+
+usage:
+    python perf_suite.py run [case ...] [--history FILE]
+    python perf_suite.py compare [--history FILE] [--baseline INDEX] [--threshold FRAC] [--min-delta SEC]
+    python perf_suite.py list
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from pycycle.benchmarking import run_benchmark, environment, append_history, load_history, compare, PHASES
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+N3_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'N+3ref')
+
+HISTORY = os.path.join(TESTS_DIR, 'perf_history.jsonl')
+
+# name -> (benchmark spec, compute_totals arguments)
+CASES = {
+    'simple_turbojet': (f'{TESTS_DIR}/benchmark_simple_turbojet.py:SimpleTurbojetTestCase.benchmark_case1',
+                        {'of': ['DESIGN.perf.TSFC', 'OD0.perf.TSFC'], 'wrt': ['DESIGN.comp.PR']}),
+    'single_spool_turboshaft': (f'{TESTS_DIR}/benchmark_single_spool_turboshaft.py:'
+                                'SingleSpoolTestCase.benchmark_case1', None),
+    'multi_spool_turboshaft': (f'{TESTS_DIR}/benchmark_multi_spool_turboshaft.py:'
+                               'MultiSpoolTestCase.benchmark_case1', None),
+    'hbtf': (f'{TESTS_DIR}/benchmark_hbtf.py:HBTFTestCase.benchmark_case1',
+             {'of': ['DESIGN.perf.TSFC', 'OD_part_pwr.perf.TSFC'], 'wrt': ['DESIGN.fan.PR', 'DESIGN.hpc.PR']}),
+    'ab_turbojet': (f'{TESTS_DIR}/benchmark_ab_turbojet.py:DesignTestCase.benchmark_case1', None),
+    'mixedflow_turbofan': (f'{TESTS_DIR}/benchmark_mixedflow_turbofan.py:'
+                           'MixedFlowTurbofanTestCase.benchmark_case1', None),
+    'electric_propulsor': (f'{TESTS_DIR}/benchmark_electric_propulsor.py:'
+                           'ElectricPropulsorTestCase.benchmark_case1', None),
+    'wet_propulsor': (f'{TESTS_DIR}/benchmark_wet_propulsor.py:WetPropulsorTestCase.benchmark_case1', None),
+    'wet_simple_turbojet': (f'{TESTS_DIR}/benchmark_wet_simple_turbojet.py:'
+                            'WetSimpleTurbojetTestCase.benchmark_case1', None),
+    'N3ref': (f'{N3_DIR}/benchmark_N3ref.py:N3MDPVerifTestCase.benchmark_case1',
+              {'of': ['TOC.perf.TSFC'], 'wrt': ['TOC.fan.PR']}),
+    'N3_MDP': (f'{N3_DIR}/benchmark_N3_MDP.py:N3MDPTestCase.benchmark_case1',
+               {'of': ['TOC.perf.TSFC', 'CRZ.perf.TSFC'], 'wrt': ['fan:PRdes', 'lpc:PRdes']}),
+    'N3_MDP_verif': (f'{N3_DIR}/benchmark_N3_MDP_verif.py:N3MDPVerifTestCase.benchmark_case1', None),
+    'N3_MDP_Opt': (f'{N3_DIR}/benchmark_N3_MDP_Opt.py:N3MDPOptTestCase.benchmark_case1', None),
+    'N3_SPD': (f'{N3_DIR}/benchmark_N3_SPD.py:N3MDPOptTestCase.benchmark_case1', None),
+}
+
+
+def run_case(name):
+    """
+    Run one case in a separate process, so the timings and memory of the cases don't affect each other
+    """
+    proc = subprocess.run([sys.executable, __file__, '_case', name], capture_output=True, text=True,
+                          cwd=TESTS_DIR)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        return {'passed': False, 'errors': [proc.stderr.strip().splitlines()[-1] if proc.stderr.strip()
+                                            else f'exit code {proc.returncode}']}
+    return json.loads(lines[-1])
+
+
+def print_case(name, results, out_stream=sys.stdout):
+    if 'wall' not in results:
+        print(f'{name:<26} FAILED: {results["errors"]}', file=out_stream)
+        return
+
+    phases = ' '.join(f'{results[phase]:>8.2f}' for phase in PHASES)
+    counts = ' '.join(f'{results[counter]:>10}' for counter in ('newton_iters', 'comp_evals'))
+    status = '' if results['passed'] else ' (checks failed)'
+    print(f'{name:<26} {phases} {results["wall"]:>8.2f} {counts} {results["max_rss_mb"]:>8.0f}{status}',
+          file=out_stream)
+
+
+def print_header(out_stream=sys.stdout):
+    phases = ' '.join(f'{phase[:8]:>8}' for phase in PHASES)
+    print(f'{"case":<26} {phases} {"wall":>8} {"newton":>10} {"evals":>10} {"rss (MB)":>8}', file=out_stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pyCycle performance suite')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='run the suite and append the results to the history file')
+    run.add_argument('cases', nargs='*', help='cases to run (default: all)')
+    run.add_argument('--history', default=HISTORY)
+
+    comp = sub.add_parser('compare', help='compare the last run in the history file to an earlier one')
+    comp.add_argument('--history', default=HISTORY)
+    comp.add_argument('--baseline', type=int, default=-2,
+                      help='index of the baseline run in the history file (default: the one before the last)')
+    comp.add_argument('--threshold', type=float, default=0.15,
+                      help='relative increase of a time above which it is a regression (default: 0.15)')
+    comp.add_argument('--min-delta', type=float, default=0.25,
+                      help='smallest increase of a time (s) that is a regression (default: 0.25)')
+
+    sub.add_parser('list', help='list the cases')
+
+    one = sub.add_parser('_case')
+    one.add_argument('name')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, (spec, totals) in CASES.items():
+            print(f'{name:<26} {spec}')
+
+    elif args.command == '_case':
+        spec, totals = CASES[args.name]
+        print(json.dumps(run_benchmark(spec, totals)))
+
+    elif args.command == 'run':
+        names = args.cases or list(CASES)
+        unknown = set(names).difference(CASES)
+        if unknown:
+            parser.error(f'unknown cases: {sorted(unknown)}')
+
+        print_header()
+        cases = {}
+        for name in names:
+            cases[name] = run_case(name)
+            print_case(name, cases[name])
+
+        append_history(args.history, {'env': environment(), 'cases': cases})
+
+    elif args.command == 'compare':
+        history = load_history(args.history)
+        if len(history) < 2:
+            print(f'{args.history} needs at least two runs to compare.')
+            return 1
+
+        baseline, current = history[args.baseline], history[-1]
+        print(f'baseline: {baseline["env"]["time"]} ({baseline["env"]["commit"]}), '
+              f'current: {current["env"]["time"]} ({current["env"]["commit"]})')
+
+        regressions = compare(baseline, current, threshold=args.threshold, min_delta=args.min_delta)
+        for case, metric, old, new in regressions:
+            print(f'REGRESSION {case:<26} {metric:<16} {old:>12.4g} -> {new:>12.4g}')
+        if regressions:
+            return 1
+        print('no regressions')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
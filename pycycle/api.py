@@ -41,4 +41,8 @@ from pycycle.viewers import print_bleed, print_burner, print_compressor, print_f
                             plot_compressor_maps, plot_turbine_maps
 
 
-from pycycle.mp_cycle import MPCycle, Cycle
\ No newline at end of file
+from pycycle.mp_cycle import MPCycle, Cycle
+from pycycle.sweep import EnvelopeSweep, full_factorial
+from pycycle.solvers import LaggedNewtonSolver
+from pycycle.telemetry import SolverTelemetry
+from pycycle.profiling import ElementProfiler
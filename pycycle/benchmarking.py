@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import platform
+import importlib
+import subprocess
+import unittest
+
+import numpy as np
+import scipy
+
+import openmdao
+import openmdao.api as om
+
+from pycycle.telemetry import SolverTelemetry
+from pycycle.profiling import ElementProfiler
+
+
+# Problem methods that are timed, each one exclusive of the others it calls (e.g. run_model -> final_setup)
+PHASES = ('setup', 'final_setup', 'run_model', 'run_driver', 'compute_totals')
+
+COUNTERS = ('newton_iters', 'solver_iters', 'solves', 'comp_evals', 'linearizations')
+
+
+class PhaseTimer(object):
+    """
+    Times the setup, final_setup, run_model, run_driver and compute_totals phases of every Problem used
+    while it is active, and counts the Newton iterations, solver iterations and component evaluations
+    of their models.
+
+    The Problem methods are only wrapped inside the `with` block.
+
+    Usage::
+
+        with PhaseTimer() as timer:
+            prob.setup()
+            prob.run_model()
+        timer.results()
+    """
+
+    def __init__(self):
+        self.times = {phase: 0. for phase in PHASES}
+        self.problems = []
+        self._orig = {}
+        self._stack = []
+        self._monitors = {}
+        self._monitor_data = []
+
+    def __enter__(self):
+        for phase in PHASES:
+            self._orig[phase] = orig = getattr(om.Problem, phase)
+            setattr(om.Problem, phase, self._timed(phase, orig))
+        return self
+
+    def __exit__(self, *args):
+        for phase, orig in self._orig.items():
+            setattr(om.Problem, phase, orig)
+        self._orig = {}
+
+        for prob in list(self._monitors):
+            self._release(prob)
+
+    def _timed(self, phase, orig):
+        timer = self
+
+        def wrapper(prob, *args, **kwargs):
+            # the report hooks of openmdao can keep the wrapper on the instance after the timer is done
+            if not timer._orig:
+                return orig(prob, *args, **kwargs)
+
+            st = time.perf_counter()
+            timer._stack.append(0.)
+            try:
+                return orig(prob, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - st
+                nested = timer._stack.pop()
+                timer.times[phase] += elapsed - nested
+                if timer._stack:
+                    timer._stack[-1] += elapsed
+
+                if phase == 'setup':
+                    if prob not in timer.problems:
+                        timer.problems.append(prob)
+                    # a new setup means new solvers and components
+                    timer._release(prob)
+                elif phase == 'final_setup' and prob not in timer._monitors:
+                    telemetry = SolverTelemetry(prob.model, history=False)
+                    profiler = ElementProfiler(prob.model)
+                    telemetry.attach()
+                    profiler.attach()
+                    timer._monitors[prob] = (telemetry, profiler)
+
+        return wrapper
+
+    def _release(self, prob):
+        if prob in self._monitors:
+            telemetry, profiler = self._monitors.pop(prob)
+            telemetry.detach()
+            profiler.detach()
+            self._monitor_data.append((telemetry, profiler))
+
+    def counts(self):
+        """
+        Newton iterations, iterations of all the nonlinear solvers, number of solves, component
+        evaluations (compute and apply_nonlinear calls) and component linearizations
+        """
+        counts = dict.fromkeys(COUNTERS, 0)
+        for telemetry, profiler in self._monitor_data + list(self._monitors.values()):
+            for record in telemetry.data.values():
+                counts['solver_iters'] += record['iters']
+                counts['solves'] += record['n_solves']
+                if 'Newton' in record['solver']:
+                    counts['newton_iters'] += record['iters']
+            for record in profiler.data.values():
+                for name in ('compute', 'apply_nonlinear'):
+                    counts['comp_evals'] += record.get(name, (0, 0.))[0]
+                for name in ('compute_partials', 'linearize'):
+                    counts['linearizations'] += record.get(name, (0, 0.))[0]
+        return counts
+
+    def results(self):
+        """
+        Phase times and counts
+        """
+        results = dict(self.times)
+        results.update(self.counts())
+        return results
+
+
+def run_benchmark(spec, totals=None):
+    """
+    Run a unittest benchmark method under a PhaseTimer.
+
+    Parameters
+    ----------
+    spec : str
+        'path/to/file.py:TestCase.method'. The directory of the file is added to sys.path,
+        so the benchmarks can import their models.
+    totals : dict or None
+        If given, `compute_totals(**totals)` is called on the benchmark's last problem after the run.
+
+    Returns
+    -------
+    dict
+        Phase times, counts, wall time, peak memory and whether the benchmark's checks passed.
+    """
+    path, test_name = spec.split(':')
+    class_name, method_name = test_name.split('.')
+
+    path = os.path.abspath(path)
+    dirname = os.path.dirname(path)
+    if dirname not in sys.path:
+        sys.path.insert(0, dirname)
+    modname = os.path.splitext(os.path.basename(path))[0]
+    spec_obj = importlib.util.spec_from_file_location(modname, path)
+    module = importlib.util.module_from_spec(spec_obj)
+    spec_obj.loader.exec_module(module)
+
+    case = getattr(module, class_name)(method_name)
+    result = unittest.TestResult()
+
+    st = time.perf_counter()
+    with PhaseTimer() as timer:
+        case.run(result)
+        if totals is not None and timer.problems:
+            prob = timer.problems[-1]
+            prob.set_solver_print(level=-1)
+            prob.compute_totals(**totals)
+    wall = time.perf_counter() - st
+
+    results = timer.results()
+    results['wall'] = wall
+    results['passed'] = result.wasSuccessful()
+    results['errors'] = [str(err[1]).splitlines()[-1] for err in result.errors + result.failures]
+    results['max_rss_mb'] = _max_rss_mb()
+    return results
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+    # ru_maxrss is in kB on linux and in bytes on mac
+    scale = 1. if sys.platform == 'darwin' else 1024.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def environment():
+    """
+    Information about the machine, the library versions and the commit the benchmarks were run on
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:  # pragma: no cover
+        commit = ''
+
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'machine': platform.node(),
+            'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__,
+            'openmdao': openmdao.__version__}
+
+
+def append_history(filename, record):
+    """
+    Append one run (a dict with 'env' and 'cases') to a JSON-lines history file
+    """
+    with open(filename, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def load_history(filename):
+    """
+    Return the list of runs in a JSON-lines history file
+    """
+    with open(filename) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(baseline, current, threshold=0.15, min_delta=0.25):
+    """
+    Compare the cases of two runs of the suite.
+
+    Times and peak memory regress when they grow by more than `threshold` (relative). Short phases are noisy,
+    so a time must also grow by more than `min_delta` seconds. The counts are deterministic, so any increase
+    is a regression.
+
+    Returns
+    -------
+    list of tuple
+        (case, metric, baseline value, current value) of every regression.
+    """
+    regressions = []
+    for case, new in current['cases'].items():
+        old = baseline['cases'].get(case)
+        if old is None:
+            continue
+        for metric in PHASES + ('wall', 'max_rss_mb'):
+            if old.get(metric) is None or new.get(metric) is None:
+                continue
+            delta = new[metric] - old[metric]
+            if delta > threshold * old[metric] and (metric == 'max_rss_mb' or delta > min_delta):
+                regressions.append((case, metric, old[metric], new[metric]))
+        for metric in COUNTERS:
+            if metric in old and metric in new and new[metric] > old[metric]:
+                regressions.append((case, metric, old[metric], new[metric]))
+
+    return regressions
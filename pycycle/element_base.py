@@ -3,14 +3,32 @@ import openmdao.api as om
 
 from pycycle.flow_in import FlowIn
 from pycycle.thermo.thermo import Thermo, ThermoAdd
+from pycycle.thermo.unit_comps import FlowCopy
 from pycycle.constants import ALLOWED_THERMOS
 
 
+def _value_key(val):
+    """
+    Hashable key of a thermo_kwargs value that compares equal for equal values: dicts, lists and arrays
+    are compared item by item, anything else (e.g. the species data modules) with its own equality.
+    """
+    if isinstance(val, dict):
+        return ('dict', tuple(sorted((str(k), _value_key(v)) for k, v in val.items())))
+    if isinstance(val, (list, tuple)):
+        return (type(val).__name__, tuple(_value_key(v) for v in val))
+    if isinstance(val, np.ndarray):
+        return ('ndarray', val.dtype.str, val.shape, val.tobytes())
+    return val
+
+
 class Element(om.Group): 
     """
     Custom pyCycle group for anything that requires input or output ports
     """
 
+    # elements that can evaluate more than one operating point at a time (num_nodes > 1) set this to True
+    _vectorized = False
+
     def __init__(self, **kwargs):
 
         super().__init__(**kwargs)
@@ -18,6 +36,9 @@ class Element(om.Group):
         self.Fl_I_data = {}
         self.Fl_O_data = {}
 
+        # Thermo groups added with `add_thermo`, keyed by their options and promoted inputs
+        self._thermo_srcs = {}
+
     def initialize(self): 
 
         self.options.declare('design', default=True, 
@@ -26,6 +47,68 @@ class Element(om.Group):
                               desc='thermodynamic data specific to this element', recordable=False)
         self.options.declare('thermo_method', default='CEA', values=ALLOWED_THERMOS,
                               desc='Method for computing thermodynamic properties')
+        self.options.declare('num_nodes', default=1, types=int, lower=1, check_valid=self._check_num_nodes,
+                              desc='Number of operating points evaluated at once, with vectorized calculations')
+        self.options.declare('dedup_thermo', default=False, types=bool,
+                              desc='If True, a Thermo added with `add_thermo` that has the same options and inputs as '
+                                   'one added before in this element is not evaluated, its flow station is copied '
+                                   'from the first one. Off by default.')
+        self.options.declare('lean_flow_ports', default=False, types=bool,
+                              desc='If True, the FlowIn components of the input ports only declare the flow '
+                                   'variables that are not connected by `pyc_connect_flow`, see the option of Cycle.')
+
+    def _check_num_nodes(self, name, value): 
+        if value > 1 and not self._vectorized: 
+            raise ValueError(f'{type(self).__name__} does not support num_nodes > 1.')
+
+    def _setup_procs(self, pathname, comm, mode, prob_meta):
+        self._thermo_srcs = {}
+        super()._setup_procs(pathname, comm, mode, prob_meta)
+
+    def add_subsystem(self, name, subsys, **kwargs):
+        if isinstance(subsys, FlowIn): 
+            subsys.options['lean'] = self.options['lean_flow_ports']
+        return super().add_subsystem(name, subsys, **kwargs)
+
+    def add_thermo(self, name, thermo, promotes_inputs):
+        """
+        Add a Thermo group whose inputs are all promoted, and promote its flow station.
+
+        With the `dedup_thermo` option, a Thermo with the same mode, method, num_nodes, thermo_kwargs and
+        promoted inputs as one added before (e.g. the outlets of a Splitter) is replaced by a FlowCopy of the
+        first one's flow station, so the same state is only solved once. The thermo_kwargs are compared
+        by value. This only applies to the Thermo groups that an element adds with this method (currently
+        Splitter and BleedOut), and only within that element: identical states of different elements
+        are still solved separately.
+
+        name: str
+            name of the subsystem
+        thermo: <Thermo>
+            the Thermo group. All of its inputs must be in `promotes_inputs`.
+        promotes_inputs: list
+            promoted inputs of the Thermo
+        """
+        fl_name = thermo.options['fl_name']
+        if not self.options['dedup_thermo']:
+            return self.add_subsystem(name, thermo, promotes_inputs=promotes_inputs,
+                                      promotes_outputs=[f'{fl_name}:*'])
+
+        key = (thermo.options['mode'], thermo.options['method'], thermo.options['num_nodes'],
+               _value_key(thermo.options['thermo_kwargs']),
+               tuple(sorted(str(prom) for prom in promotes_inputs)))
+
+        src = self._thermo_srcs.get(key)
+        if src is None:
+            self._thermo_srcs[key] = thermo
+            return self.add_subsystem(name, thermo, promotes_inputs=promotes_inputs,
+                                      promotes_outputs=[f'{fl_name}:*'])
+
+        src_fl_name = src.options['fl_name']
+        flow_vars = ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R', 'composition')
+        copy = FlowCopy(fl_name=fl_name, thermo=src, num_nodes=thermo.options['num_nodes'])
+        return self.add_subsystem(name, copy,
+                                  promotes_inputs=[(var, f'{src_fl_name}:{var}') for var in flow_vars],
+                                  promotes_outputs=[f'{fl_name}:*'])
 
     def copy_flow(self, src_port, output_port): 
         """
@@ -4,6 +4,7 @@ import numpy as np
 from  scipy.interpolate import Akima1DInterpolator as Akima
 
 from openmdao.api import ExplicitComponent
+from openmdao.utils.units import unit_conversion
 
 """United States standard atmosphere 1976 tables, data obtained from http://www.digitaldutch.com/atmoscalc/index.htm"""
 USatm1976Data = namedtuple('USatm1976Data', ['alt', 'T', 'P', 'rho', 'a', 'viscosity'])
@@ -74,32 +75,189 @@ rho_interp_deriv = rho_interp.derivative(1)
 
 drho_dh_interp_deriv = rho_interp.derivative(2)
 
+# polynomial coefficients of the Akima splines of T, P and rho and of their first and second derivatives,
+# highest power first, with shape (27, n_intervals): rows 0-11 are the (T, P, rho) coefficients of the cubics,
+# rows 12-20 of their first derivatives and rows 21-26 of their second derivatives
+_TABLE_COEFS = np.array([T_interp.c, P_interp.c, rho_interp.c]).swapaxes(0, 1)
+_TABLE_COEFS = np.concatenate([_TABLE_COEFS,
+                               [3. * _TABLE_COEFS[0], 2. * _TABLE_COEFS[1], _TABLE_COEFS[2]],
+                               [6. * _TABLE_COEFS[0], 2. * _TABLE_COEFS[1]]]).reshape(27, -1)
+_N_TABLE_COEFS = (12, 21, 27)
+
+# all the breakpoints of the table are on a 1000 ft grid, so the interval of an altitude is looked up
+# from its grid cell instead of searched for
+_TABLE_STEP = 1000.
+_TABLE_CELLS = np.clip(np.searchsorted(USatm1976Data.alt, np.arange(USatm1976Data.alt[0], USatm1976Data.alt[-1],
+                                                                     _TABLE_STEP), side='right') - 1,
+                       0, USatm1976Data.alt.size - 2)
+
+# layers of the 1976 standard: base geopotential altitude (m) and lapse rate (K/m)
+_H_BASE = np.array([0., 11000., 20000., 32000., 47000., 51000., 71000.])
+_LAPSE = np.array([-6.5e-3, 0., 1e-3, 2.8e-3, 0., -2.8e-3, -2e-3])
+
+_G0 = 9.80665  # m/s**2
+_R_AIR = 8.31432 / 28.9644e-3  # J/(kg*K)
+_K = _G0 / _R_AIR  # K/m
+
+
+
+def _layer_bases():
+    T_base = np.empty(_H_BASE.size)
+    P_base = np.empty(_H_BASE.size)
+    T_base[0] = 288.15
+    P_base[0] = 101325.
+    for i in range(1, _H_BASE.size):
+        dH = _H_BASE[i] - _H_BASE[i-1]
+        T, L = T_base[i-1], _LAPSE[i-1]
+        T_base[i] = T + L * dH
+        P_base[i] = P_base[i-1] * (np.exp(-_K * dH / T) if L == 0. else (T_base[i] / T)**(-_K / L))
+    return T_base, P_base
+
+
+# temperature (K) and pressure (Pa) at the base of each layer
+_T_BASE, _P_BASE = _layer_bases()
+
+_FT = unit_conversion('ft', 'm')[0]
+
+# top of the last layer of the standard, ft
+_ALT_MAX_LAYERED = 84852. / _FT
+_T_CONV = unit_conversion('degK', 'degR')[0]
+_P_CONV = unit_conversion('Pa', 'psi')[0]
+_RHO_CONV = unit_conversion('kg/m**3', 'slug/ft**3')[0]
+
+
+def _table_props(alt, n_derivs):
+    x = USatm1976Data.alt
+    # beyond the ends of the table, the end intervals are used and the values are masked by usatm1976
+    cell = np.minimum(np.maximum((alt.real - x[0]) * (1. / _TABLE_STEP), 0.), _TABLE_CELLS.size - 1)
+    idx = _TABLE_CELLS[cell.astype(np.intp)]
+    dx = alt - x[idx]
+    c = _TABLE_COEFS[:_N_TABLE_COEFS[n_derivs]].take(idx, axis=1)
+
+    props = np.empty((3, n_derivs + 1) + alt.shape, dtype=dx.dtype)
+    props[:, 0] = ((c[0:3] * dx + c[3:6]) * dx + c[6:9]) * dx + c[9:12]
+    if n_derivs > 0:
+        props[:, 1] = (c[12:15] * dx + c[15:18]) * dx + c[18:21]
+    if n_derivs > 1:
+        props[:, 2] = c[21:24] * dx + c[24:27]
+
+    return props
+
+
+def _layered_props(alt, n_derivs):
+    # like the table, the altitude is geopotential
+    H = _FT * alt
+
+    # above the last layer, the last one is used and the values are masked by usatm1976
+    idx = np.clip(np.searchsorted(_H_BASE, H.real, side='right') - 1, 0, _H_BASE.size - 1)
+    L = _LAPSE[idx]
+    Tb = _T_BASE[idx]
+    T = Tb + L * (H - _H_BASE[idx])
+    isothermal = L == 0.
+    L_safe = np.where(isothermal, 1., L)
+    P = _P_BASE[idx] * np.where(isothermal, np.exp(-_K * (H - _H_BASE[idx]) / Tb), (T / Tb)**(-_K / L_safe))
+    rho = P / (_R_AIR * T)
+
+    # hydrostatic balance: dP/dH = -rho*g0
+    props = [(T, P, rho)]
+    if n_derivs > 0:
+        props.append((L + 0. * T, -_K * P / T, -(_K + L) * rho / T))
+    if n_derivs > 1:
+        props.append((0. * T, _K * (_K + L) * P / T**2, (_K + L) * (_K + 2. * L) * rho / T**2))
+
+    props = np.array(props).swapaxes(0, 1)
+    scale = np.array([_T_CONV, _P_CONV, _RHO_CONV])[:, np.newaxis] * _FT**np.arange(n_derivs + 1)
+    return props * scale.reshape(scale.shape + (1,) * np.ndim(alt))
+
+
+def usatm1976(alt, method='table', n_derivs=0):
+    """
+    Standard day static temperature (degR), pressure (psi) and density (slug/ft**3) at the given altitudes (ft),
+    and their derivatives with respect to the altitude.
+
+    Fully vectorized and complex step safe, so it can be used for single points or to pre-process a whole
+    flight envelope.
+
+    Parameters
+    ----------
+    alt : float or ndarray
+        Geopotential altitudes, ft. From -1000 ft to the top of the method's range, the values
+        are NaN outside of it.
+    method : str
+        'table' evaluates the Akima splines of USatm1976Data from their precomputed coefficients,
+        up to 150000 ft.
+        'layered' evaluates the exact formulation of the standard, with the temperature linear in the
+        altitude in each layer up to 84.852 km.
+    n_derivs : int
+        Number of derivatives with respect to the altitude to return (0, 1 or 2).
+
+    Returns
+    -------
+    ndarray
+        Shape (3, n_derivs + 1) + shape of alt. The first index is T, P, rho, the second the order of the derivative.
+    """
+    alt = np.asarray(alt)
+    if not np.iscomplexobj(alt):
+        alt = alt.astype(float)
+
+    if method == 'table':
+        props = _table_props(alt, n_derivs)
+        alt_max = USatm1976Data.alt[-1]
+    elif method == 'layered':
+        props = _layered_props(alt, n_derivs)
+        alt_max = _ALT_MAX_LAYERED
+    else:
+        raise ValueError(f"method must be 'table' or 'layered', not '{method}'")
+
+    # like the scipy interpolants, there are no values outside of the range of the data
+    out_of_range = (alt.real < USatm1976Data.alt[0]) | (alt.real > alt_max)
+    return np.where(out_of_range, np.nan, props)
+
 
 class USatm1976Comp(ExplicitComponent):
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+        self.options.declare('method', default='table', values=('table', 'layered'),
+                             desc='Interpolate the USatm1976Data table, or use the exact layered formulation '
+                                  'of the standard')
+
     def setup(self):
-        self.add_input('alt', val=1., units='ft')
+        nn = self.options['num_nodes']
+
+        self.add_input('alt', val=1., shape=nn, units='ft')
 
-        self.add_output('Ts', val=1., units='degR')
-        self.add_output('Ps', val=1., units='psi')
-        self.add_output('rhos', val=1., units='slug/ft**3')
-        self.add_output('drhos_dalt', val=1., units='slug/ft**4')
+        self.add_output('Ts', val=1., shape=nn, units='degR')
+        self.add_output('Ps', val=1., shape=nn, units='psi')
+        self.add_output('rhos', val=1., shape=nn, units='slug/ft**3')
+        self.add_output('drhos_dalt', val=1., shape=nn, units='slug/ft**4')
 
-        self.declare_partials(['Ts', 'Ps', 'rhos', 'drhos_dalt'], 'alt')
+        ar = np.arange(nn)
+        self.declare_partials(['Ts', 'Ps', 'rhos', 'drhos_dalt'], 'alt', rows=ar, cols=ar)
 
-        # Scipy akima doesn't support complex numbers.
-        self.set_check_partial_options(wrt='*', form='central', method='fd', step=1e-3)
+        self._props = None, None
 
     def compute(self, inputs, outputs):
+        alt = inputs['alt']
+        (T, P, rho) = props = usatm1976(alt, self.options['method'], n_derivs=2)
+
+        outputs['Ts'] = T[0]
+        outputs['Ps'] = P[0]
+        outputs['rhos'] = rho[0]
+        outputs['drhos_dalt'] = rho[1]
 
-        outputs['Ts'] = T_interp(inputs['alt'])
-        outputs['Ps'] = P_interp(inputs['alt'])
-        outputs['rhos'] = rho_interp(inputs['alt'])
-        outputs['drhos_dalt'] = rho_interp_deriv(inputs['alt'])
+        # the derivatives come almost for free, so keep them for compute_partials at the same altitude
+        if not np.iscomplexobj(alt):
+            self._props = alt.copy(), props
 
     def compute_partials(self, inputs, partials):
+        alt = inputs['alt']
+        last_alt, props = self._props
+        if not np.array_equal(alt, last_alt):
+            props = usatm1976(alt, self.options['method'], n_derivs=2)
+        (T, P, rho) = props
 
-        partials['Ts', 'alt'] = T_interp_deriv(inputs['alt']).reshape(1,)[0]
-        partials['Ps', 'alt'] = P_interp_deriv(inputs['alt']).reshape(1,)[0]
-        partials['rhos', 'alt'] = rho_interp_deriv(inputs['alt']).reshape(1,)[0]
-        partials['drhos_dalt', 'alt'] = drho_dh_interp_deriv(inputs['alt']).reshape(1,)[0]
+        partials['Ts', 'alt'] = T[1]
+        partials['Ps', 'alt'] = P[1]
+        partials['rhos', 'alt'] = rho[1]
+        partials['drhos_dalt', 'alt'] = rho[2]
@@ -1,3 +1,4 @@
+import numpy as np
 import openmdao.api as om
 
 from pycycle.elements.US1976 import USatm1976Comp
@@ -5,15 +6,20 @@ from pycycle.elements.US1976 import USatm1976Comp
 class DeltaTs(om.ExplicitComponent):
     """Computes temperature based on delta from atmospheric"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
 
         # inputs
-        self.add_input('Ts_in', val=500.0, units='degR', desc='Temperature from atmospheric model')
-        self.add_input('dTs', val=0.0, units='degR', desc='Delta from standard day temperature')
+        self.add_input('Ts_in', val=500.0, shape=nn, units='degR', desc='Temperature from atmospheric model')
+        self.add_input('dTs', val=0.0, shape=nn, units='degR', desc='Delta from standard day temperature')
 
-        self.add_output('Ts', shape=1, units='degR', desc='Temperature with delta')
+        self.add_output('Ts', shape=nn, units='degR', desc='Temperature with delta')
 
-        self.declare_partials('Ts', ['Ts_in', 'dTs'], val=1.0)
+        ar = np.arange(nn)
+        self.declare_partials('Ts', ['Ts_in', 'dTs'], val=1.0, rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Ts'] = inputs['Ts_in'] + inputs['dTs']
@@ -25,10 +31,18 @@ class DeltaTs(om.ExplicitComponent):
 class Ambient(om.Group):
     """Determines pressure, temperature and density base on altitude from an input standard atmosphere table"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+        self.options.declare('atm_method', default='table', values=('table', 'layered'),
+                             desc='Interpolate the US 1976 standard atmosphere table, or use its exact layered formulation')
+
     def setup(self):
-        readAtm = self.add_subsystem('readAtmTable', USatm1976Comp(), promotes=('alt', 'Ps', 'rhos'))
+        nn = self.options['num_nodes']
+
+        readAtm = self.add_subsystem('readAtmTable', USatm1976Comp(num_nodes=nn, method=self.options['atm_method']),
+                                     promotes=('alt', 'Ps', 'rhos'))
 
-        self.add_subsystem('dTs', DeltaTs(), promotes=('dTs', 'Ts'))
+        self.add_subsystem('dTs', DeltaTs(num_nodes=nn), promotes=('dTs', 'Ts'))
         self.connect('readAtmTable.Ts', 'dTs.Ts_in')
 
         # self.set_order(['readAtmTable','dTs'])
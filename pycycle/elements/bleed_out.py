@@ -119,26 +119,21 @@ class BleedOut(Element):
                            promotes_inputs=[('W_in', 'Fl_I:stat:W'), '*:frac_W'],
                            promotes_outputs=['W_out']+bld_port_globs)
 
-        bleed_names = []
-        for BN in bleeds:
+        # Total Calc. The bleeds have the same state as the outlet, so with the
+        # dedup_thermo option their flow stations are copies of Fl_O:tot
+        prom_in = [('composition', 'Fl_I:tot:composition'),('T','Fl_I:tot:T'),('P','Fl_I:tot:P')]
+        real_flow = Thermo(mode='total_TP', fl_name="Fl_O:tot", 
+                           method=thermo_method, 
+                           thermo_kwargs={'composition':composition, 
+                                          'spec':thermo_data})
+        self.add_thermo('real_flow', real_flow, promotes_inputs=prom_in)
 
-            bleed_names.append(BN+'_flow')
+        for BN in bleeds:
             bleed_flow = Thermo(mode='total_TP', fl_name=BN+":tot", 
                                 method=thermo_method, 
                                 thermo_kwargs={'composition':composition, 
                                                'spec':thermo_data})
-            self.add_subsystem(BN+'_flow', bleed_flow,
-                               promotes_inputs=[('composition', 'Fl_I:tot:composition'),('T','Fl_I:tot:T'),('P','Fl_I:tot:P')],
-                               promotes_outputs=['{}:tot:*'.format(BN)])
-
-        # Total Calc
-        real_flow = Thermo(mode='total_TP', fl_name="Fl_O:tot", 
-                           method=thermo_method, 
-                           thermo_kwargs={'composition':composition, 
-                                          'spec':thermo_data})
-        prom_in = [('composition', 'Fl_I:tot:composition'),('T','Fl_I:tot:T'),('P','Fl_I:tot:P')]
-        self.add_subsystem('real_flow', real_flow, promotes_inputs=prom_in,
-                           promotes_outputs=['Fl_O:*'])
+            self.add_thermo(BN+'_flow', bleed_flow, promotes_inputs=prom_in)
 
         if statics:
             if design:
@@ -16,6 +16,68 @@ from pycycle.element_base import Element
 
 
 
+class VitiatedFlow(Thermo):
+    """
+    total_hP Thermo for the combustor exit that seeds its temperature from the last converged states.
+
+    The temperature is predicted from the change in enthalpy and composition since the last solve:
+    dT = (dh - dh_compo)/Cp, where the effect of the composition (i.e. the fuel-air ratio) on the enthalpy
+    is estimated from the last two converged states, along the direction the composition moved between them.
+    The converged states are only known for sure when nothing but this Thermo moves its temperature between
+    solves, e.g. when a combustor is run on its own over a range of fuel-air ratios. Inside a cycle Newton,
+    the cycle solver already updates the temperature, so this is not the default.
+    """
+
+    def initialize(self):
+        super().initialize()
+        self._states = []
+        # inputs and temperature at the end of the last guess
+        self._last_guess = None
+
+    def _hP_inputs(self, inputs):
+        # h and composition are promoted from several inputs, so they're read from the ones of the balance and flow
+        nn = self.options['num_nodes']
+        return (inputs['balance.rhs:T'],
+                inputs['flow.composition'].reshape(nn, -1))
+
+    def guess_nonlinear(self, inputs, outputs, residuals):
+        if self.under_complex_step:
+            return
+
+        h_new, compo_new = self._hP_inputs(inputs)
+
+        # if the temperature moved since the last guess, it has been solved for the inputs of that guess
+        if self._last_guess is not None:
+            h, compo, T_guess = self._last_guess
+            T = outputs['T'].copy()
+            if np.all(np.isfinite(T)) and np.any(T != T_guess):
+                state = (h, T, self.get_val('Cp', units='cal/(g*degK)').copy(), compo)
+                self._states = [self._states[-1], state] if self._states else [state]
+
+        if self._states:
+            h, T, Cp, compo = self._states[-1]
+            dh = h_new - h
+            dcompo = compo_new - compo
+
+            if len(self._states) > 1:
+                h_old, T_old, _, compo_old = self._states[0]
+                dcompo_old = compo - compo_old
+                norm = np.sum(dcompo_old**2, axis=1)
+                # enthalpy change between the last two states that isn't explained by their temperatures
+                dh_compo_old = h - h_old - Cp*(T - T_old)
+                moved = norm > 1e-30
+                s = np.sum(dcompo*dcompo_old, axis=1)/np.where(moved, norm, 1.)
+                dh = dh - np.where(moved, s*dh_compo_old, 0.)
+                predict = moved | np.all(dcompo == 0., axis=1)
+            else:
+                # no estimate of the effect of the composition yet
+                predict = np.all(dcompo == 0., axis=1)
+
+            outputs['T'] = np.where(predict, np.clip(T + dh/Cp, *self._T_bounds), outputs['T'])
+
+        self._last_guess = (h_new.copy(), compo_new.copy(), outputs['T'].copy())
+
+
 class Combustor(Element):
     """
     A combustor that adds a fuel to an incoming flow mixture and burns it
@@ -55,12 +117,18 @@ class Combustor(Element):
 
     """
 
+    _vectorized = True
+
     def initialize(self):
 
         self.options.declare('statics', default=True,
                              desc='If True, calculate static properties.')
         self.options.declare('fuel_type', default="JP-7",
                              desc='Type of fuel.')
+        self.options.declare('vitiated_guess', default=False, types=bool,
+                             desc='If True, the exit temperature solve is seeded with a prediction from its '
+                                  'last converged states and the change in enthalpy and fuel-air ratio. '
+                                  'Only useful when the combustor is solved on its own, outside a cycle Newton.')
         
         self.default_des_od_conns = [
             #  (design src, off-design target)
@@ -74,9 +142,10 @@ class Combustor(Element):
         thermo_method = self.options['thermo_method']
         thermo_data = self.options['thermo_data']
         fuel_type = self.options['fuel_type']
+        nn = self.options['num_nodes']
 
 
-        self.thermo_add_comp = ThermoAdd(method=thermo_method, mix_mode='reactant',
+        self.thermo_add_comp = ThermoAdd(method=thermo_method, mix_mode='reactant', num_nodes=nn,
                                          thermo_kwargs={'spec':thermo_data,
                                                         'inflow_composition':self.Fl_I_data['Fl_I'], 
                                                         'mix_composition':fuel_type})
@@ -92,10 +161,11 @@ class Combustor(Element):
         air_fuel_composition = self.Fl_O_data['Fl_O']
         design = self.options['design']
         statics = self.options['statics']
+        nn = self.options['num_nodes']
 
 
         # Create combustor flow station
-        in_flow = FlowIn(fl_name='Fl_I')
+        in_flow = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('in_flow', in_flow, promotes=['Fl_I:tot:*', 'Fl_I:stat:*'])
 
         self.add_subsystem('mix_fuel', self.thermo_add_comp,
@@ -103,13 +173,14 @@ class Combustor(Element):
 
         # Pressure loss
         prom_in = [('Pt_in', 'Fl_I:tot:P'),'dPqP']
-        self.add_subsystem('p_loss', PressureLoss(), promotes_inputs=prom_in)
+        self.add_subsystem('p_loss', PressureLoss(num_nodes=nn), promotes_inputs=prom_in)
 
         # Calculate vitiated flow station properties
-        vit_flow = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
-                          method=thermo_method, 
-                          thermo_kwargs={'composition':air_fuel_composition, 
-                                         'spec':thermo_data})
+        vit_thermo = VitiatedFlow if self.options['vitiated_guess'] else Thermo
+        vit_flow = vit_thermo(mode='total_hP', fl_name='Fl_O:tot', 
+                              method=thermo_method, num_nodes=nn,
+                              thermo_kwargs={'composition':air_fuel_composition, 
+                                             'spec':thermo_data})
         self.add_subsystem('vitiated_flow', vit_flow, promotes_outputs=['Fl_O:*'])
         self.connect("mix_fuel.mass_avg_h", "vitiated_flow.h")
         self.connect("mix_fuel.composition_out", "vitiated_flow.composition")
@@ -120,7 +191,7 @@ class Combustor(Element):
                 # Calculate static properties.
 
                 out_stat = Thermo(mode='static_MN', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':air_fuel_composition, 
                                                  'spec':thermo_data})
                 prom_in = ['MN']
@@ -138,7 +209,7 @@ class Combustor(Element):
             else:
                 # Calculate static properties.
                 out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':air_fuel_composition, 
                                                  'spec':thermo_data})
                 prom_in = ['area']
@@ -154,7 +225,7 @@ class Combustor(Element):
                 self.connect('Wout','out_stat.W')
 
         else:
-            self.add_subsystem('W_passthru', PassThrough('Wout', 'Fl_O:stat:W', 1.0, units= "lbm/s"),
+            self.add_subsystem('W_passthru', PassThrough('Wout', 'Fl_O:stat:W', np.ones(nn), units= "lbm/s"),
                                promotes=['*'])
 
 
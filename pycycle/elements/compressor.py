@@ -18,21 +18,27 @@ from pycycle.element_base import Element
 class CorrectedInputsCalc(om.ExplicitComponent):
     """Compute design corrected flow (Wc) and design corrected speed (Nc)"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('Tt', val=500., units='degR',
+        self.add_input('Tt', val=500., shape=nn, units='degR',
                        desc='incoming temperature')
-        self.add_input('Pt', val=14., units='psi', desc='incoming pressure')
-        self.add_input('W_in', val=30.0, units='lbm/s', desc='mass flow')
-        self.add_input('Nmech', val=1000.0, units='rpm', desc='shaft speed')
+        self.add_input('Pt', val=14., shape=nn, units='psi', desc='incoming pressure')
+        self.add_input('W_in', val=30.0, shape=nn, units='lbm/s', desc='mass flow')
+        self.add_input('Nmech', val=1000.0, shape=nn, units='rpm', desc='shaft speed')
         # outputs
-        self.add_output('Wc', val=30.0, units='lbm/s',
+        self.add_output('Wc', val=30.0, shape=nn, units='lbm/s',
                         desc='corrected mass flow')
-        self.add_output('Nc', val=100., lower=1e-5,
+        self.add_output('Nc', val=100., shape=nn, lower=1e-5,
                         units='rpm', desc='corrected shaft speed')
 
-        self.declare_partials('Wc', ['Tt', 'Pt', 'W_in'])
-        self.declare_partials('Nc', ['Nmech', 'Tt'])
+        self.declare_partials('Wc', ['Tt', 'Pt', 'W_in'], rows=ar, cols=ar)
+        self.declare_partials('Nc', ['Nmech', 'Tt'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -57,15 +63,21 @@ class CorrectedInputsCalc(om.ExplicitComponent):
 class eff_poly_calc(om.ExplicitComponent):
     """ Calculate polytropic efficiency for compressor"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('PR', 1.0,units=None, desc='element pressure ratio Pt_out/Pt_in')
-        self.add_input('S_in', 1.0,units='Btu/(lbm*degR)', desc='element input entropy')
-        self.add_input('S_out', 1.0,units='Btu/(lbm*degR)', desc='element output entropy')
-        self.add_input('Rt', val=0.0686, units='Btu/(lbm*degR)', desc='specific gas constant')
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('PR', 1.0, shape=nn, units=None, desc='element pressure ratio Pt_out/Pt_in')
+        self.add_input('S_in', 1.0, shape=nn, units='Btu/(lbm*degR)', desc='element input entropy')
+        self.add_input('S_out', 1.0, shape=nn, units='Btu/(lbm*degR)', desc='element output entropy')
+        self.add_input('Rt', val=0.0686, shape=nn, units='Btu/(lbm*degR)', desc='specific gas constant')
         # list_outputs
-        self.add_output('eff_poly', val=1.0, units=None, desc='polytropic efficiency', lower=1e-6)
+        self.add_output('eff_poly', val=1.0, shape=nn, units=None, desc='polytropic efficiency', lower=1e-6)
         # define partials
-        self.declare_partials('eff_poly','*')
+        self.declare_partials('eff_poly','*', rows=ar, cols=ar)
     def compute(self, inputs, outputs):
         PR = inputs['PR']
         S_in = inputs['S_in']
@@ -91,21 +103,27 @@ class eff_poly_calc(om.ExplicitComponent):
 class Power(om.ExplicitComponent):
     """Power calculates shaft power for the compressor or turbine"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('W', val=30.0, units='lbm/s', desc='mass flow')
-        self.add_input('ht_out', val=20.0, units='Btu/lbm',
+        self.add_input('W', val=30.0, shape=nn, units='lbm/s', desc='mass flow')
+        self.add_input('ht_out', val=20.0, shape=nn, units='Btu/lbm',
                        desc='downstream enthalpy')
-        self.add_input('ht_in', val=10.0, units='Btu/lbm',
+        self.add_input('ht_in', val=10.0, shape=nn, units='Btu/lbm',
                        desc='incoming enthalpy')
-        self.add_input('Nmech', val=1000.0, units='rpm', desc='shaft speed')
+        self.add_input('Nmech', val=1000.0, shape=nn, units='rpm', desc='shaft speed')
         # self.add_input('Tt_in', val=500., units='degR', desc='incoming temperature')
         # outputs
-        self.add_output('power', shape=1, units='hp', desc='turbine power')
-        self.add_output('trq', shape=1, units='ft*lbf', desc='turbine torque')
+        self.add_output('power', shape=nn, units='hp', desc='turbine power')
+        self.add_output('trq', shape=nn, units='ft*lbf', desc='turbine torque')
 
-        self.declare_partials('power', ['W', 'ht_out', 'ht_in'])
-        self.declare_partials('trq', '*')
+        self.declare_partials('power', ['W', 'ht_out', 'ht_in'], rows=ar, cols=ar)
+        self.declare_partials('trq', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -136,51 +154,55 @@ class BleedsAndPower(om.ExplicitComponent):
     def initialize(self):
         self.options.declare('bleed_names', types=Iterable,
                               desc='list of names for the bleed ports')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
-        self.add_input('W_in', val=30.0, units='lbm/s',
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('W_in', val=30.0, shape=nn, units='lbm/s',
                        desc='entrance mass flow')
-        self.add_input('ht_out', val=20.0, units='Btu/lbm',
+        self.add_input('ht_out', val=20.0, shape=nn, units='Btu/lbm',
                        desc='exit total enthalpy')
-        self.add_input('ht_in', val=10.0, units='Btu/lbm',
+        self.add_input('ht_in', val=10.0, shape=nn, units='Btu/lbm',
                        desc='entrance total enthalpy')
-        self.add_input('Pt_out', val=20.0, units='psi',
+        self.add_input('Pt_out', val=20.0, shape=nn, units='psi',
                        desc='exit total pressure')
-        self.add_input('Pt_in', val=10.0, units='psi',
+        self.add_input('Pt_in', val=10.0, shape=nn, units='psi',
                        desc='entrance total pressure')
-        self.add_input('Nmech', val=1000.0, units='rpm', desc='shaft speed')
+        self.add_input('Nmech', val=1000.0, shape=nn, units='rpm', desc='shaft speed')
 
-        self.add_output('W_out', shape=1, units='lbm/s', desc='exit mass flow')
-        self.add_output('power', shape=1, units='hp', desc='shaft power')
-        self.add_output('trq', shape=1, units='ft*lbf', desc='shaft torque')
+        self.add_output('W_out', shape=nn, units='lbm/s', desc='exit mass flow')
+        self.add_output('power', shape=nn, units='hp', desc='shaft power')
+        self.add_output('trq', shape=nn, units='ft*lbf', desc='shaft torque')
 
-        self.declare_partials('W_out', 'W_in')
-        self.declare_partials('power', ['W_in', 'ht_in', 'ht_out'])
-        self.declare_partials('trq', ['W_in', 'ht_in', 'ht_out', 'Nmech'])
+        self.declare_partials('W_out', 'W_in', rows=ar, cols=ar)
+        self.declare_partials('power', ['W_in', 'ht_in', 'ht_out'], rows=ar, cols=ar)
+        self.declare_partials('trq', ['W_in', 'ht_in', 'ht_out', 'Nmech'], rows=ar, cols=ar)
 
         # bleed inputs and outputs
         for BN in self.options['bleed_names']:
-            self.add_input(BN + ':frac_W', val=0.0,
+            self.add_input(BN + ':frac_W', val=0.0, shape=nn,
                            desc='bleed mass flow fraction (W_bld/W_in)')
-            self.add_input(BN + ':frac_P', val=0.0,
+            self.add_input(BN + ':frac_P', val=0.0, shape=nn,
                            desc='bleed pressure fraction ((P_bld-P_in)/(P_out-P_in))')
-            self.add_input(BN + ':frac_work', val=0.0,
+            self.add_input(BN + ':frac_work', val=0.0, shape=nn,
                            desc='bleed work fraction ((h_bld-h_in)/(h_out-h_in))')
 
-            self.add_output(BN + ':stat:W', shape=1, lower=0.0,
+            self.add_output(BN + ':stat:W', shape=nn, lower=0.0,
                             units='lbm/s', desc='bleed mass flow')
-            self.add_output(BN + ':Pt', shape=1, lower=1e-6,
+            self.add_output(BN + ':Pt', shape=nn, lower=1e-6,
                             units='psi', desc='bleed total pressure')
-            self.add_output(BN + ':ht', shape=1, units='Btu/lbm',
+            self.add_output(BN + ':ht', shape=nn, units='Btu/lbm',
                             desc='bleed total enthalpy')
             # self.add_output(BN+':power', shape=1, desc='bleed power reduction')
 
-            self.declare_partials('W_out', BN+':frac_W')
-            self.declare_partials('power', [BN+':frac_W', BN+':frac_work'])
-            self.declare_partials(BN+':stat:W', ['W_in', BN+':frac_W'])
-            self.declare_partials(BN+':Pt', ['Pt_in', BN+':frac_P', 'Pt_out'])
-            self.declare_partials(BN+':ht', ['ht_in', BN+':frac_work', 'ht_out'])
-            self.declare_partials('trq', [BN+':frac_W', BN+':frac_work'])
+            self.declare_partials('W_out', BN+':frac_W', rows=ar, cols=ar)
+            self.declare_partials('power', [BN+':frac_W', BN+':frac_work'], rows=ar, cols=ar)
+            self.declare_partials(BN+':stat:W', ['W_in', BN+':frac_W'], rows=ar, cols=ar)
+            self.declare_partials(BN+':Pt', ['Pt_in', BN+':frac_P', 'Pt_out'], rows=ar, cols=ar)
+            self.declare_partials(BN+':ht', ['ht_in', BN+':frac_work', 'ht_out'], rows=ar, cols=ar)
+            self.declare_partials('trq', [BN+':frac_W', BN+':frac_work'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -289,18 +311,23 @@ class BleedsAndPower(om.ExplicitComponent):
 class EnthalpyRise(om.ExplicitComponent):
     """Calculates enthalpy rise across a compressor"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('ideal_ht', val=2.0, units='Btu/lbm',
+        self.add_input('ideal_ht', val=2.0, shape=nn, units='Btu/lbm',
                        desc='ideal exit total enthalpy')
-        self.add_input('inlet_ht', val=1.0, units='Btu/lbm',
+        self.add_input('inlet_ht', val=1.0, shape=nn, units='Btu/lbm',
                        desc='entrance total enthalpy')
-        self.add_input('eff', val=0.5, desc='design efficiency')
+        self.add_input('eff', val=0.5, shape=nn, desc='design efficiency')
 
-        self.add_output('ht_out', shape=1, units='Btu/lbm',
+        self.add_output('ht_out', shape=nn, units='Btu/lbm',
                         desc='exit total enthalpy')
 
-        self.declare_partials('ht_out', '*')
+        self.declare_partials('ht_out', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         inlet_ht = inputs['inlet_ht']
@@ -318,15 +345,21 @@ class EnthalpyRise(om.ExplicitComponent):
 class PressureRise(om.ExplicitComponent):
     """A Component that calculates ..."""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('PR', 3.0, desc="design pressure ratio")
-        self.add_input('Pt_in', 5.0, units='lbf/inch**2',
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('PR', 3.0, shape=nn, desc="design pressure ratio")
+        self.add_input('Pt_in', 5.0, shape=nn, units='lbf/inch**2',
                        desc="incomming total pressure")
 
-        self.add_output('Pt_out', shape=1, lower=1e-5,
+        self.add_output('Pt_out', shape=nn, lower=1e-5,
                         units='lbf/inch**2', desc="exit total pressure")
 
-        self.declare_partials('Pt_out', '*')
+        self.declare_partials('Pt_out', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Pt_out'] = inputs['PR'] * inputs['Pt_in']
@@ -387,6 +420,8 @@ class Compressor(Element):
         map.readmap.NcMap
     """
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('map_data', default=NCP01,
                               desc='data container for raw compressor map data')
@@ -436,32 +471,33 @@ class Compressor(Element):
         bleeds = self.options['bleed_names']
         thermo_data = self.options['thermo_data']
         statics = self.options['statics']
+        nn = self.options['num_nodes']
 
         composition = self.Fl_I_data['Fl_I']
 
         # Create inlet flow station
-        flow_in = FlowIn(fl_name='Fl_I')
+        flow_in = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('flow_in', flow_in, promotes_inputs=['Fl_I:*'])
 
-        self.add_subsystem('corrinputs', CorrectedInputsCalc(),
+        self.add_subsystem('corrinputs', CorrectedInputsCalc(num_nodes=nn),
                            promotes_inputs=(
                                'Nmech', ('W_in', 'Fl_I:stat:W'),
                                ('Pt', 'Fl_I:tot:P'), ('Tt', 'Fl_I:tot:T')),
                            promotes_outputs=('Nc', 'Wc'))
 
         map_calcs = CompressorMap(map_data=self.options['map_data'], design=design,
-                            interp_method=interp_method, extrap=map_extrap)
+                            interp_method=interp_method, extrap=map_extrap, num_nodes=nn)
         self.add_subsystem('map', map_calcs,
                             promotes=['s_Nc','s_eff','s_Wc','s_PR','Nc','Wc',
                                     'PR','eff','SMN','SMW'])
 
         # Calculate pressure rise across compressor
-        self.add_subsystem('press_rise', PressureRise(), promotes_inputs=[
+        self.add_subsystem('press_rise', PressureRise(num_nodes=nn), promotes_inputs=[
                            'PR', ('Pt_in', 'Fl_I:tot:P')])
 
         # Calculate ideal flow station properties
         ideal_flow = Thermo(mode='total_SP',
-                            method=thermo_method,
+                            method=thermo_method, num_nodes=nn,
                             thermo_kwargs={'composition':composition,
                                            'spec':thermo_data})
         self.add_subsystem('ideal_flow', ideal_flow,
@@ -470,13 +506,13 @@ class Compressor(Element):
         self.connect("press_rise.Pt_out", "ideal_flow.P")
 
         # Calculate enthalpy rise across compressor
-        self.add_subsystem("enth_rise", EnthalpyRise(),
+        self.add_subsystem("enth_rise", EnthalpyRise(num_nodes=nn),
                            promotes_inputs=['eff', ('inlet_ht', 'Fl_I:tot:h')])
         self.connect("ideal_flow.h", "enth_rise.ideal_ht")
 
         # Calculate real flow station properties
         real_flow = Thermo(mode='total_hP', fl_name='Fl_O:tot',
-                                  method=thermo_method,
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':composition,
                                                  'spec':thermo_data})
         self.add_subsystem('real_flow', real_flow,
@@ -486,7 +522,7 @@ class Compressor(Element):
         self.connect("enth_rise.ht_out", "real_flow.h")
         self.connect("press_rise.Pt_out", "real_flow.P")
         #clculate Polytropic Efficiency
-        self.add_subsystem('eff_poly_calc', eff_poly_calc(),
+        self.add_subsystem('eff_poly_calc', eff_poly_calc(num_nodes=nn),
                             promotes_inputs=[('PR','PR'),
                                              ('S_in','Fl_I:tot:S'),
                                              ('S_out','Fl_O:tot:S'),
@@ -496,7 +532,7 @@ class Compressor(Element):
                             promotes_outputs=['eff_poly'] )
 
         # Calculate shaft power consumption
-        blds_pwr = BleedsAndPower(bleed_names=bleeds)
+        blds_pwr = BleedsAndPower(bleed_names=bleeds, num_nodes=nn)
         bld_inputs = ['frac_W', 'frac_P', 'frac_work']
         bld_in_vars = ['{0}:{1}'.format(
             bn, in_name) for bn, in_name in itertools.product(bleeds, bld_inputs)]
@@ -515,7 +551,7 @@ class Compressor(Element):
 
             bleed_names.append(f'{BN}_flow')
             bleed_flow = Thermo(mode='total_hP', fl_name=BN + ":tot",
-                                  method=thermo_method,
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':composition,
                                                  'spec':thermo_data})
             self.add_subsystem(BN + '_flow', bleed_flow,
@@ -530,7 +566,7 @@ class Compressor(Element):
             if design:
                 #   Calculate static properties
                 out_stat = Thermo(mode='static_MN', fl_name='Fl_O:stat',
-                                  method=thermo_method,
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':composition,
                                                  'spec':thermo_data})
                 self.add_subsystem('out_stat', out_stat,
@@ -545,7 +581,7 @@ class Compressor(Element):
 
             else:  # Calculate static properties
                 out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat',
-                                  method=thermo_method,
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':composition,
                                                  'spec':thermo_data})
                 self.add_subsystem('out_stat', out_stat,
@@ -567,7 +603,7 @@ class Compressor(Element):
         else:
             self.add_subsystem('W_passthru', PassThrough('W_out',
                                                          'Fl_O:stat:W',
-                                                         1.0,
+                                                         np.ones(nn),
                                                          units="lbm/s"),
                                promotes=['*'])
             self.set_order(['flow_in', 'corrinputs', 'map',
@@ -577,9 +613,9 @@ class Compressor(Element):
 
 
         # define the group level defaults
-        self.set_input_defaults('Fl_I:FAR', val=0., units=None)
-        self.set_input_defaults('PR', val=2., units=None)
-        self.set_input_defaults('eff', val=0.99, units=None)
+        self.set_input_defaults('Fl_I:FAR', val=np.zeros(nn), units=None)
+        self.set_input_defaults('PR', val=2.*np.ones(nn), units=None)
+        self.set_input_defaults('eff', val=0.99*np.ones(nn), units=None)
 
         # if not design:
         #     self.set_input_defaults('area', val=1, units='inch**2')
@@ -8,20 +8,25 @@ import numpy as np
 class StallCalcs(om.ExplicitComponent):
     """Component to compute the stall margins at constant speed (SMN) and constant flow (SMW)"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('PR_SMN', val=1.0, units=None, desc='SMN pressure ratio')
-        self.add_input('PR_SMW', val=1.0, units=None, desc='SMW pressure ratio')
-        self.add_input('PR_actual', val=1.0, units=None, desc='Actual pressure ratio')
+        self.add_input('PR_SMN', val=1.0, shape=nn, units=None, desc='SMN pressure ratio')
+        self.add_input('PR_SMW', val=1.0, shape=nn, units=None, desc='SMW pressure ratio')
+        self.add_input('PR_actual', val=1.0, shape=nn, units=None, desc='Actual pressure ratio')
 
-        self.add_input('Wc_SMN', val=1.0, units='lbm/s', desc='SMN corrected flow')
-        self.add_input('Wc_actual', val=1.0, units='lbm/s', desc='Actual corrected flow')
+        self.add_input('Wc_SMN', val=1.0, shape=nn, units='lbm/s', desc='SMN corrected flow')
+        self.add_input('Wc_actual', val=1.0, shape=nn, units='lbm/s', desc='Actual corrected flow')
 
-        self.add_output('SMN', val=0.0, units=None, desc='Stall margin at constant speed')
-        self.add_output('SMW', val=0.0, units=None, desc='Stall margin at constant flow')
+        self.add_output('SMN', val=0.0, shape=nn, units=None, desc='Stall margin at constant speed')
+        self.add_output('SMW', val=0.0, shape=nn, units=None, desc='Stall margin at constant flow')
 
-        self.declare_partials('SMN', ['PR_SMN','PR_actual','Wc_SMN','Wc_actual'])
-        self.declare_partials('SMW', ['PR_SMW','PR_actual'])
+        self.declare_partials('SMN', ['PR_SMN','PR_actual','Wc_SMN','Wc_actual'], rows=ar, cols=ar)
+        self.declare_partials('SMW', ['PR_SMW','PR_actual'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -53,38 +58,43 @@ class StallCalcs(om.ExplicitComponent):
 class MapScalars(om.ExplicitComponent):
     """Compute map scalars in design mode"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('Nc', val=2.0, units='rpm',
+        self.add_input('Nc', val=2.0, shape=nn, units='rpm',
                        desc='Computed design corrected shaft speed')
-        self.add_input('NcMap', val=2.0, units='rpm',
+        self.add_input('NcMap', val=2.0, shape=nn, units='rpm',
                        desc='Design corrected shaft speed of map')
-        self.add_input('PR', val=2.0,
+        self.add_input('PR', val=2.0, shape=nn,
                        desc='User input design pressure ratio')
-        self.add_input('PRmap', val=2.0,
+        self.add_input('PRmap', val=2.0, shape=nn,
                        desc='Design pressure ratio of map')
-        self.add_input('eff', val=1.0,
+        self.add_input('eff', val=1.0, shape=nn,
                        desc='User input design adiabatic efficiency')
-        self.add_input('effMap', val=1.0,
+        self.add_input('effMap', val=1.0, shape=nn,
                        desc='Design adiabatic efficiency of map')
-        self.add_input('Wc', val=2.0, units='lbm/s',
+        self.add_input('Wc', val=2.0, shape=nn, units='lbm/s',
                        desc='Computed design corrected mass flow rate')
-        self.add_input('WcMap', val=2.0, units='lbm/s',
+        self.add_input('WcMap', val=2.0, shape=nn, units='lbm/s',
                        desc='Design corrected mass flow rate of map')
 
-        self.add_output('s_Nc', shape=1,
+        self.add_output('s_Nc', shape=nn,
                         desc='Scalar for design corrected shaft speed')
-        self.add_output('s_PR', shape=1,
+        self.add_output('s_PR', shape=nn,
                         desc='Scalar for design pressure ratio')
-        self.add_output('s_eff', shape=1,
+        self.add_output('s_eff', shape=nn,
                         desc='Scalar for design adiabatic efficiency')
-        self.add_output('s_Wc', shape=1,
+        self.add_output('s_Wc', shape=nn,
                         desc='Scalar for design corrected mass flow rate')
 
-        self.declare_partials('s_Nc', ['Nc', 'NcMap'])
-        self.declare_partials('s_PR', ['PR', 'PRmap'])
-        self.declare_partials('s_eff', ['eff', 'effMap'])
-        self.declare_partials('s_Wc', ['Wc', 'WcMap'])
+        self.declare_partials('s_Nc', ['Nc', 'NcMap'], rows=ar, cols=ar)
+        self.declare_partials('s_PR', ['PR', 'PRmap'], rows=ar, cols=ar)
+        self.declare_partials('s_eff', ['eff', 'effMap'], rows=ar, cols=ar)
+        self.declare_partials('s_Wc', ['Wc', 'WcMap'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['s_Nc'] = inputs['Nc'] / inputs['NcMap']
@@ -106,36 +116,40 @@ class MapScalars(om.ExplicitComponent):
 class ScaledMapValues(om.ExplicitComponent):
     """Computes scaled map values for off-design mode"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('effMap', val=2.0, desc='Efficiency from unscaled map')
-        self.add_input('PRmap', val=2.0,
+        self.add_input('effMap', val=2.0, shape=nn, desc='Efficiency from unscaled map')
+        self.add_input('PRmap', val=2.0, shape=nn,
                        desc='Pressure ratio from unscaled map')
-        self.add_input('WcMap', val=2.0, units='lbm/s',
+        self.add_input('WcMap', val=2.0, shape=nn, units='lbm/s',
                        desc='Corrected mass flow rate from unscaled map')
-        self.add_input('NcMap', val=2.0, units='rpm',
+        self.add_input('NcMap', val=2.0, shape=nn, units='rpm',
                        desc='Corrected shaft speed from unscaled map')
-        self.add_input('s_PR', val=2.0,
+        self.add_input('s_PR', val=2.0, shape=nn,
                        desc='Scalar for design corrected pressure ratio')
-        self.add_input('s_eff', val=2.0,
+        self.add_input('s_eff', val=2.0, shape=nn,
                        desc='Scalar for design corrected adiabatic efficiency')
-        self.add_input('s_Wc', val=2.0,
+        self.add_input('s_Wc', val=2.0, shape=nn,
                        desc='Scalar for design corrected mass flow rate')
-        self.add_input('s_Nc', val=2.0,
+        self.add_input('s_Nc', val=2.0, shape=nn,
                        desc='Scalar for design corrected speed')
 
-        self.add_output('PR', shape=1, desc='Pressure ratio', lower=1.00001)
-        self.add_output('eff', shape=1, desc='Adiabatic efficiency')
-        self.add_output('Wc', shape=1,
+        self.add_output('PR', shape=nn, desc='Pressure ratio', lower=1.00001)
+        self.add_output('eff', shape=nn, desc='Adiabatic efficiency')
+        self.add_output('Wc', shape=nn,
                         desc='Corrected mass flow rate', units='lbm/s')
-        self.add_output('Nc', shape=1,
+        self.add_output('Nc', shape=nn,
                         desc='Corrected shaft speed', units='rpm')
 
-        self.declare_partials('PR', ['PRmap', 's_PR'])
-        self.declare_partials('eff', ['effMap', 's_eff'])
-        self.declare_partials('Wc', ['WcMap', 's_Wc'])
-        self.declare_partials('Nc', ['NcMap', 's_Nc'])
+        self.declare_partials('PR', ['PRmap', 's_PR'], rows=ar, cols=ar)
+        self.declare_partials('eff', ['effMap', 's_eff'], rows=ar, cols=ar)
+        self.declare_partials('Wc', ['WcMap', 's_Wc'], rows=ar, cols=ar)
+        self.declare_partials('Nc', ['NcMap', 's_Nc'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['PR'] = (inputs['PRmap'] - 1.) * inputs['s_PR'] + 1.
@@ -162,6 +176,7 @@ class CompressorMap(om.Group):
         self.options.declare('design', default=True)
         self.options.declare('interp_method', default='slinear')
         self.options.declare('extrap', default=False)
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
 
@@ -169,12 +184,13 @@ class CompressorMap(om.Group):
         design = self.options['design']
         method = self.options['interp_method']
         extrap = self.options['extrap']
+        nn = self.options['num_nodes']
 
         params = map_data.param_data
         outputs = map_data.output_data
 
         # Define map which will be used
-        readmap = om.MetaModelStructuredComp(method=method, extrapolate=extrap)
+        readmap = om.MetaModelStructuredComp(method=method, extrapolate=extrap, vec_size=nn)
         for p in params:
             readmap.add_input(p['name'], val=p['default'], units=p['units'], training_data=p['values'])
         for o in outputs:
@@ -183,15 +199,15 @@ class CompressorMap(om.Group):
         # Create instance of map for evaluating actual operating point
         if design:
             # In design mode, operating point specified by default values for RlineMap, NcMap and alphaMap
-            self.set_input_defaults('RlineMap', val=map_data.defaults['RlineMap'], units=None)
-            self.set_input_defaults('NcMap', val=map_data.defaults['NcMap'], units='rpm')
+            self.set_input_defaults('RlineMap', val=map_data.defaults['RlineMap']*np.ones(nn), units=None)
+            self.set_input_defaults('NcMap', val=map_data.defaults['NcMap']*np.ones(nn), units='rpm')
 
             # Evaluate map using design point values
             self.add_subsystem('map', readmap, promotes_inputs=['RlineMap', 'NcMap', 'alphaMap'],
                                 promotes_outputs=['effMap', 'PRmap', 'WcMap'])
 
             # Compute map scalars based on input PR, eff, Nc and Wc as well as unscaled map values
-            self.add_subsystem('scalars', MapScalars(),
+            self.add_subsystem('scalars', MapScalars(num_nodes=nn),
                                 promotes_inputs=['PR', 'eff', 'Nc', 'Wc', 'NcMap', 'effMap', 'PRmap', 'WcMap'],
                                 promotes_outputs=['s_Nc', 's_PR', 's_eff', 's_Wc'])
 
@@ -201,14 +217,14 @@ class CompressorMap(om.Group):
                                 promotes_outputs=['effMap', 'PRmap', 'WcMap'])
 
             # Compute scaled map outputs base on input scalars and unscaled map values
-            self.add_subsystem('scaledOutput', ScaledMapValues(),
+            self.add_subsystem('scaledOutput', ScaledMapValues(num_nodes=nn),
                                 promotes_inputs=['s_PR', 's_eff', 's_Wc', 's_Nc', 'NcMap', 'effMap', 'PRmap', 'WcMap'],
                                 promotes_outputs=['PR', 'eff'])
 
             # Use balance component to vary NcMap and RlineMap to match incoming corrected flow and speed
             map_bal = om.BalanceComp()
-            map_bal.add_balance('NcMap', val=map_data.defaults['NcMap'], units='rpm', eq_units='rpm')
-            map_bal.add_balance('RlineMap', val=map_data.defaults['RlineMap'], units=None, 
+            map_bal.add_balance('NcMap', val=map_data.defaults['NcMap'], shape=nn, units='rpm', eq_units='rpm')
+            map_bal.add_balance('RlineMap', val=map_data.defaults['RlineMap'], shape=nn, units=None, 
                                 eq_units='lbm/s', lower=map_data.RlineStall)
             self.add_subsystem(name='map_bal', subsys=map_bal, 
                                 promotes_inputs=[('lhs:NcMap','Nc'),('lhs:RlineMap','Wc')],
@@ -218,11 +234,11 @@ class CompressorMap(om.Group):
 
         # Define the Rline corresponding to stall
         RlineStall = om.IndepVarComp()
-        RlineStall.add_output('RlineStall', val=map_data.RlineStall, units=None)
+        RlineStall.add_output('RlineStall', val=map_data.RlineStall*np.ones(nn), units=None)
         self.add_subsystem('stall_R', subsys=RlineStall)
 
         # Evaluate map for the constant speed stall margin (SMN)
-        SMN_map = om.MetaModelStructuredComp(method=method, extrapolate=extrap)
+        SMN_map = om.MetaModelStructuredComp(method=method, extrapolate=extrap, vec_size=nn)
         for p in params:
             SMN_map.add_input(p['name'], val=p['default'], units=p['units'], training_data=p['values'])
         for o in outputs:
@@ -232,7 +248,7 @@ class CompressorMap(om.Group):
         self.connect('stall_R.RlineStall', 'SMN_map.RlineMap')
 
         # Evaluate map for the constant speed stall margin (SMN)
-        SMW_map = om.MetaModelStructuredComp(method=method, extrapolate=extrap)
+        SMW_map = om.MetaModelStructuredComp(method=method, extrapolate=extrap, vec_size=nn)
         for p in params:
             SMW_map.add_input(p['name'], val=p['default'], units=p['units'], training_data=p['values'])
         for o in outputs:
@@ -242,14 +258,14 @@ class CompressorMap(om.Group):
 
         # Use balance to vary NcMap on SMW map to hold corrected flow constant
         SMW_bal = om.BalanceComp()
-        SMW_bal.add_balance('NcMap', val=map_data.defaults['NcMap'], units='rpm', eq_units='lbm/s')
+        SMW_bal.add_balance('NcMap', val=map_data.defaults['NcMap'], shape=nn, units='rpm', eq_units='lbm/s')
         self.add_subsystem(name='SMW_bal', subsys=SMW_bal)
         self.connect('SMW_bal.NcMap', 'SMW_map.NcMap')
         self.connect('WcMap','SMW_bal.lhs:NcMap')
         self.connect('SMW_map.WcMap','SMW_bal.rhs:NcMap')
 
         # Compute the stall margins
-        self.add_subsystem('stall_margins', StallCalcs(), 
+        self.add_subsystem('stall_margins', StallCalcs(num_nodes=nn), 
                                 promotes_inputs=[('PR_actual','PRmap'),('Wc_actual','WcMap')],
                                 promotes_outputs=['SMN','SMW'])
         self.connect('SMN_map.PRmap', 'stall_margins.PR_SMN')
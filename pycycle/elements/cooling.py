@@ -1,7 +1,11 @@
+import numpy as np
+
 import openmdao.api as om
+from openmdao.utils.units import unit_conversion
 
 from pycycle.thermo.cea import species_data
 from pycycle.thermo.thermo import Thermo, ThermoAdd
+from pycycle.thermo.tabular.tabular_thermo import TabularProps, tabular_flow_vars
 
 from pycycle.constants import ALLOWED_THERMOS, THERMO_DEFAULT_COMPOSITIONS
 from pycycle.flow_in import FlowIn
@@ -173,6 +177,282 @@ class CoolingCalcs(om.ExplicitComponent):
         J['Pt_stage', 'Pt_out'] = 1 - self.i_stage
 
 
+class CooledRows(om.ImplicitComponent):
+    """
+    All the blade rows of a cooled turbine, for the TABULAR thermo.
+
+    Replaces the Row groups (CoolingCalcs, ThermoAdd and a total_hP Thermo per row) with a single
+    component. The exit temperature of each row is a state, and the other row outputs are explicit
+    functions of the states and of the outputs of the row upstream, so the partials of the row to row
+    recurrence stay local. `solve_nonlinear` sweeps the rows from the first to the last, with a scalar
+    Newton on the table for each exit temperature.
+    """
+
+    # flow station output -> (units of the table, output units, description)
+    tot_vars = tabular_flow_vars(False, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'))
+
+    # inputs that every row uses
+    row_inputs = ('x_factor', 'turb_pwr', 'Fl_turb_I:tot:P', 'Fl_turb_O:tot:P', 'Fl_cool:tot:T', 'Fl_cool:tot:h')
+
+    def initialize(self):
+        self.options.declare('n_stages', types=int, desc="number of stages in the turbine")
+        self.options.declare('T_metal', types=float, default=2460., desc='safety factor applied') # units=degR
+        self.options.declare('T_safety', types=float, default=150., desc='safety factor applied') # units=degR
+        self.options.declare('spec', recordable=False, desc='Tabular thermo data')
+        self.options.declare('main_flow_composition')
+        self.options.declare('bld_flow_composition')
+        self.options.declare('mix_flow_composition')
+
+    def setup(self):
+        n_stages = self.options['n_stages']
+        self.n_rows = n_rows = 2 * n_stages
+        compositions = {'Fl_turb_I': self.options['main_flow_composition'],
+                        'Fl_cool': self.options['bld_flow_composition'],
+                        'Fl_O': self.options['mix_flow_composition']}
+
+        species = sorted(compositions['Fl_turb_I'])
+        for name, composition in compositions.items():
+            if sorted(composition) != species:
+                raise ValueError(f'The composition of {name} has species {sorted(composition)}, but all the '
+                                 f'flows must have the species {species}.')
+
+        self._props = props = TabularProps(self.options['spec'], compositions['Fl_turb_I'])
+        self.ns = ns = len(species)
+        T_min, T_max = props.T_bounds
+        comp_val = {name: np.array([composition[k] for k in species]) for name, composition in compositions.items()}
+
+        self._h_scale = unit_conversion('J/kg', 'cal/g')[0]
+        self._conv = {name: 1. if units is None else unit_conversion(si_units, units)[0]
+                      for name, (si_units, units, _) in self.tot_vars.items()}
+        self._h_to_si = unit_conversion('Btu/lbm', 'J/kg')[0]
+        self._P_to_si = unit_conversion('lbf/inch**2', 'Pa')[0]
+
+        rows = np.arange(n_rows)
+        self._stator = rows % 2 == 0
+        self._profile_factor = np.where(rows == 0, .3, .13)
+        # integer math to so you get 1,1,2,2 for the rows of 2 stage machine
+        self._i_stage = (rows // 2 + 1) // n_stages
+
+        self.add_input('x_factor', val=1, desc='technology factor. 1 is current technology, lower is more advanced technology')
+        self.add_input('turb_pwr', val=1, units='Btu/s', desc='power produced by the whole turbine')
+        self.add_input('Fl_turb_I:tot:P', val=1, units='psi', desc='turbine inlet pressure')
+        self.add_input('Fl_turb_O:tot:P', val=1, units='psi', desc='turbine exit pressure')
+        self.add_input('Fl_cool:tot:T', val=1, units='degR', desc='total temperature of cooling flow coming into the rows')
+        self.add_input('Fl_cool:tot:h', val=1, units='Btu/lbm', desc='total enthalpy of cooling flow coming into the rows')
+        self.add_input('Fl_cool:tot:composition', val=comp_val['Fl_cool'], desc='composition of the cooling flow')
+
+        self.add_input('Fl_turb_I:stat:W', val=1, units='lbm/s', desc="flow into the first row")
+        self.add_input('Fl_turb_I:tot:T', val=1, units='degR', desc='total temperature of primary flow coming into the first row')
+        self.add_input('Fl_turb_I:tot:h', val=1, units='Btu/lbm', desc='total enthalpy of primary flow coming into the first row')
+        self.add_input('Fl_turb_I:tot:composition', val=comp_val['Fl_turb_I'], desc='composition of the primary flow')
+
+        # the flow into each row comes from the row upstream
+        self._upstream = [('Fl_turb_I:stat:W', 'Fl_turb_I:tot:T', 'Fl_turb_I:tot:h', 'Fl_turb_I:tot:composition')]
+        for i in range(n_rows):
+            row = f'row_{i}'
+            self.add_output(f'{row}:Tt', val=1000., units='degK', lower=T_min, upper=T_max,
+                            desc='exit total temperature of the row')
+            self.add_output(f'{row}:W_cool', val=1, units='lbm/s', desc="flow requires to cool the row")
+            self.add_output(f'{row}:W_out', val=1, units='lbm/s', desc="exit flow of the row")
+            for name, (si_units, units, desc) in self.tot_vars.items():
+                self.add_output(f'{row}:Fl_O:tot:{name}', val=1., units=units, desc=desc)
+            self.add_output(f'{row}:Fl_O:tot:composition', val=comp_val['Fl_O'])
+            self._upstream.append((f'{row}:W_out', f'{row}:Fl_O:tot:T', f'{row}:Fl_O:tot:h',
+                                   f'{row}:Fl_O:tot:composition'))
+
+            of = [f'{row}:Tt', f'{row}:W_cool', f'{row}:W_out'] + [f'{row}:Fl_O:tot:{name}' for name in self.tot_vars]
+            wrt = list(self.row_inputs) + ['Fl_cool:tot:composition', f'{row}:Tt'] + list(self._upstream[i])
+            self.declare_partials(of + [f'{row}:Fl_O:tot:composition'], wrt)
+            for name in of[1:]:
+                self.declare_partials(name, name, val=1.)
+            self.declare_partials(f'{row}:Fl_O:tot:composition', f'{row}:Fl_O:tot:composition', val=np.eye(ns))
+
+    def _rows(self, inputs, rows, W, T, h, composition):
+        """
+        Cooling flows, exit enthalpies, exit pressures and compositions of the given rows, from the flows
+        coming into them. Values and derivatives are per row (last axis). The derivatives are with respect
+        to the row inputs and to the upstream 'W', 'T', 'h' and 'composition'.
+        """
+        T_metal = self.options['T_metal']
+        n_stages = self.options['n_stages']
+        ns = self.ns
+        stator = self._stator[rows]
+        pf = self._profile_factor[rows]
+        nr = len(rows)
+
+        x_factor = inputs['x_factor']
+        T_cool = inputs['Fl_cool:tot:T']
+        h_cool = inputs['Fl_cool:tot:h']
+        comp_cool = inputs['Fl_cool:tot:composition'][:, np.newaxis]
+
+        # even rows are stators, only rotors do work
+        dT_gas = np.where(stator, 1., .92)
+        T_gas = dT_gas * T + self.options['T_safety']
+        d_dh = np.where(stator, 0., 1. / n_stages)
+        dh = d_dh * inputs['turb_pwr']
+
+        cooled = T_gas.real >= T_metal
+        T_gas_c = np.where(cooled, T_gas, T_metal + 1.)
+        phi = (T_gas_c - T_metal) / (T_gas_c - T_cool)
+        phi_prime = (phi + pf) / (pf + 1.)
+        const = .022 * 4. / 3.
+        term = (phi_prime / (1. - phi_prime))**1.25
+        dterm = 1.25 * (phi_prime / (1. - phi_prime))**.25 / (1. - phi_prime)**2
+
+        W_cool = np.where(cooled, const * x_factor * W * term, 0.)
+        base = np.where(cooled, const * x_factor * W * dterm / (pf + 1.), 0.)
+        d_W_cool = {'x_factor': np.where(cooled, const * W * term, 0.),
+                    'W': np.where(cooled, const * x_factor * term, 0.),
+                    'T': base * (T_metal - T_cool) / (T_gas_c - T_cool)**2 * dT_gas,
+                    'Fl_cool:tot:T': base * (T_gas_c - T_metal) / (T_gas_c - T_cool)**2}
+
+        W_tot = W + W_cool
+        h_mix = (W * h + W_cool * h_cool) / W_tot
+        dh_mix_dW_cool = (h_cool - h_mix) / W_tot
+        ht_out = h_mix - dh / W
+        d_ht_out = {name: dh_mix_dW_cool * d for name, d in d_W_cool.items()}
+        d_ht_out['W'] = d_ht_out['W'] + (h - h_mix) / W_tot + dh / W**2
+        d_ht_out['h'] = W / W_tot
+        d_ht_out['Fl_cool:tot:h'] = W_cool / W_tot
+        d_ht_out['turb_pwr'] = -d_dh / W
+
+        d_W_out = dict(d_W_cool)
+        d_W_out['W'] = d_W_cool['W'] + 1.
+
+        i_stage = self._i_stage[rows]
+        Pt_stage = inputs['Fl_turb_O:tot:P'] + (inputs['Fl_turb_I:tot:P'] - inputs['Fl_turb_O:tot:P']) * i_stage
+        d_Pt_stage = {'Fl_turb_I:tot:P': i_stage * np.ones(nr), 'Fl_turb_O:tot:P': 1. - i_stage}
+
+        # mix the compositions by air flow, like the tabular ThermoAdd
+        W_air = W / (1. + np.sum(composition, axis=0))
+        W_air_cool = W_cool / (1. + np.sum(comp_cool, axis=0))
+        W_air_tot = W_air + W_air_cool
+        comp_out = (W_air * composition + W_air_cool * comp_cool) / W_air_tot
+
+        dA = {'W': 1. / (1. + np.sum(composition, axis=0))}
+        dB = {name: d / (1. + np.sum(comp_cool, axis=0)) for name, d in d_W_cool.items()}
+        d_comp_out = {}
+        for name in set(dA).union(dB):
+            d_comp_out[name] = ((composition - comp_out) * dA.get(name, 0.) +
+                                (comp_cool - comp_out) * dB.get(name, 0.)) / W_air_tot
+        # (of species, wrt species, row)
+        eye = np.eye(ns)[:, :, np.newaxis]
+        d_comp_out['composition'] = (W_air * eye - (composition - comp_out)[:, np.newaxis, :] * W_air /
+                                     (1. + np.sum(composition, axis=0))) / W_air_tot
+        d_comp_out['Fl_cool:tot:composition'] = (W_air_cool * eye - (comp_cool - comp_out)[:, np.newaxis, :] *
+                                                 W_air_cool / (1. + np.sum(comp_cool, axis=0))) / W_air_tot
+
+        return {'W_cool': (W_cool, d_W_cool), 'W_out': (W_tot, d_W_out), 'ht_out': (ht_out, d_ht_out),
+                'Pt_stage': (Pt_stage, d_Pt_stage), 'composition': (comp_out, d_comp_out)}
+
+    def _upstream_values(self, inputs, outputs):
+        """
+        Flow coming into each row, as per row arrays
+        """
+        values = []
+        for names in self._upstream[:-1]:
+            vals = [inputs[name] if name in inputs else outputs[name] for name in names]
+            values.append(vals)
+        W, T, h, composition = zip(*values)
+        return (np.concatenate(W), np.concatenate(T), np.concatenate(h),
+                np.stack(composition, axis=-1))
+
+    def _thermo(self, T, Pt_stage, composition):
+        return self._props(T, Pt_stage * self._P_to_si, composition.T)
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+        rows = np.arange(self.n_rows)
+        vals = self._rows(inputs, rows, *self._upstream_values(inputs, outputs))
+        T = np.concatenate([outputs[f'row_{i}:Tt'] for i in rows])
+        props = self._thermo(T, vals['Pt_stage'][0], vals['composition'][0])
+        explicit = self._explicit(T, vals, props)
+
+        for i in rows:
+            row = f'row_{i}'
+            resids[f'{row}:Tt'] = self._h_scale * (props['h'][0][i] - vals['ht_out'][0][i] * self._h_to_si)
+            for name, val in explicit.items():
+                resids[f'{row}:{name}'] = outputs[f'{row}:{name}'] - val[..., i]
+
+    def _explicit(self, T, vals, props):
+        conv = self._conv
+        explicit = {'W_cool': vals['W_cool'][0], 'W_out': vals['W_out'][0],
+                    'Fl_O:tot:T': T * conv['T'], 'Fl_O:tot:P': vals['Pt_stage'][0],
+                    'Fl_O:tot:composition': vals['composition'][0]}
+        for name in ('h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'):
+            explicit[f'Fl_O:tot:{name}'] = props[name][0] * conv[name]
+        return explicit
+
+    def solve_nonlinear(self, inputs, outputs):
+        for i in range(self.n_rows):
+            row = f'row_{i}'
+            W, T, h, composition = (inputs[name] if name in inputs else outputs[name] for name in self._upstream[i])
+            vals = self._rows(inputs, np.array([i]), W, T, h, composition[:, np.newaxis])
+
+            P = vals['Pt_stage'][0] * self._P_to_si
+            comp_out = vals['composition'][0].T
+            Tt = self._props.solve_T('h', vals['ht_out'][0] * self._h_to_si, outputs[f'{row}:Tt'], P, comp_out,
+                                     self._h_scale)
+            outputs[f'{row}:Tt'] = Tt
+
+            props = self._props(Tt, P, comp_out)
+            for name, val in self._explicit(Tt, vals, props).items():
+                outputs[f'{row}:{name}'] = val[..., 0]
+
+    def linearize(self, inputs, outputs, J):
+        rows = np.arange(self.n_rows)
+        conv = self._conv
+        h_to_si = self._h_to_si
+        P_to_si = self._P_to_si
+
+        vals = self._rows(inputs, rows, *self._upstream_values(inputs, outputs))
+        T = np.concatenate([outputs[f'row_{i}:Tt'] for i in rows])
+        props = self._thermo(T, vals['Pt_stage'][0], vals['composition'][0])
+
+        d_Pt = vals['Pt_stage'][1]
+        d_comp = vals['composition'][1]
+
+        for i in rows:
+            row = f'row_{i}'
+            # the generic names of the upstream flow in the derivatives
+            names = dict(zip(('W', 'T', 'h', 'composition'), self._upstream[i]))
+
+            def set_partials(of, derivs, scale=1.):
+                for wrt, d in derivs.items():
+                    wrt = names.get(wrt, wrt)
+                    if of.endswith('composition') and not wrt.endswith('composition'):
+                        # a column of the jacobian
+                        J[of, wrt] = scale * d[:, i:i + 1]
+                    else:
+                        J[of, wrt] = scale * d[..., i]
+
+            # table properties as functions of the variables of the component
+            def table(name):
+                val, d_dT, d_dP, d_dcomp = props[name]
+                derivs = {f'{row}:Tt': d_dT}
+                for wrt, d in d_Pt.items():
+                    derivs[wrt] = d_dP * P_to_si * d
+                for wrt, d in d_comp.items():
+                    # sum over the species of the composition
+                    if d.ndim == 3:
+                        derivs[wrt] = derivs.get(wrt, 0.) + np.einsum('rk,kjr->jr', d_dcomp, d)
+                    else:
+                        derivs[wrt] = derivs.get(wrt, 0.) + np.einsum('rk,kr->r', d_dcomp, d)
+                return derivs
+
+            h_derivs = table('h')
+            resid = {wrt: self._h_scale * d for wrt, d in h_derivs.items()}
+            for wrt, d in vals['ht_out'][1].items():
+                resid[wrt] = resid.get(wrt, 0.) - self._h_scale * h_to_si * d
+            set_partials(f'{row}:Tt', resid)
+
+            set_partials(f'{row}:W_cool', vals['W_cool'][1], -1.)
+            set_partials(f'{row}:W_out', vals['W_out'][1], -1.)
+            set_partials(f'{row}:Fl_O:tot:T', {f'{row}:Tt': conv['T'] * np.ones(self.n_rows)}, -1.)
+            set_partials(f'{row}:Fl_O:tot:P', d_Pt, -1.)
+            set_partials(f'{row}:Fl_O:tot:composition', d_comp, -1.)
+            for name in ('h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'):
+                set_partials(f'{row}:Fl_O:tot:{name}', h_derivs if name == 'h' else table(name), -conv[name])
+
 class Row(om.Group):
 
     def initialize(self):
@@ -251,6 +531,9 @@ class TurbineCooling(Element):
         self.options.declare('T_safety', types=float, default=150., desc='safety factor applied') # units=degR
 
         self.options.declare('owns_x_factor', types=bool, default=True, desc='if True, x_factor will be connected to an IndepVarComp inside this element')
+        self.options.declare('fused_thermo', default=True, types=bool,
+                             desc='If True, the rows of a TABULAR thermo turbine are computed by a single CooledRows '
+                                  'component instead of one Row group each.')
 
         super().initialize()
 
@@ -289,37 +572,51 @@ class TurbineCooling(Element):
         p_inputs_all = ['x_factor', ('Pt_in', 'Fl_turb_I:tot:P'), ('Pt_out', 'Fl_turb_O:tot:P'),
                         ('Tt_cool','Fl_cool:tot:T'), ('ht_cool','Fl_cool:tot:h'), ('cool:composition','Fl_cool:tot:composition'), 'turb_pwr']
 
-        p_row_inputs = [('W_primary',  'Fl_turb_I:stat:W'),
-                        ('Tt_primary', 'Fl_turb_I:tot:T'),
-                        ('ht_primary', 'Fl_turb_I:tot:h'),
-                        ('composition_primary',  'Fl_turb_I:tot:composition')]
-        self.add_subsystem('row_0', Row(n_stages=n_stages, i_row=0,
-                                        T_safety=self.options['T_safety'], T_metal=self.options['T_metal'],
-                                        thermo_data=thermo_data, 
-                                        thermo_method=self.options['thermo_method'],
-                                        main_flow_composition=self.Fl_I_data['Fl_turb_I'], 
-                                        bld_flow_composition=self.Fl_I_data['Fl_cool'], 
-                                        mix_flow_composition=self.Fl_I_data['Fl_turb_O']),
-                           promotes_inputs=p_inputs_all+p_row_inputs)
-
-        for i in range(1,n_rows):
-
-            prev_row = 'row_{}'.format(i-1)
-            curr_row = 'row_{}'.format(i)
-            self.add_subsystem('row_{}'.format(i),
-                               Row(n_stages=n_stages, i_row=i,
-                                   T_safety=self.options['T_safety'], T_metal=self.options['T_metal'],
-                                   thermo_data=thermo_data, 
-                                   thermo_method=self.options['thermo_method'],
-                                   main_flow_composition=self.Fl_I_data['Fl_turb_I'], 
-                                   bld_flow_composition=self.Fl_I_data['Fl_cool'], 
-                                   mix_flow_composition=self.Fl_I_data['Fl_turb_O']),
-                               promotes_inputs=p_inputs_all)
-
-            self.connect('{}.W_out'.format(prev_row), '{}.W_primary'.format(curr_row))
-            self.connect('{}.Fl_O:tot:T'.format(prev_row), '{}.Tt_primary'.format(curr_row))
-            self.connect('{}.Fl_O:tot:h'.format(prev_row), '{}.ht_primary'.format(curr_row))
-            self.connect('{}.Fl_O:tot:composition'.format(prev_row), '{}.composition_primary'.format(curr_row))
+        if self.options['thermo_method'] == 'TABULAR' and self.options['fused_thermo']:
+            rows = CooledRows(n_stages=n_stages, T_safety=self.options['T_safety'], T_metal=self.options['T_metal'],
+                              spec=thermo_data,
+                              main_flow_composition=self.Fl_I_data['Fl_turb_I'],
+                              bld_flow_composition=self.Fl_I_data['Fl_cool'],
+                              mix_flow_composition=self.Fl_I_data['Fl_turb_O'])
+            # the row outputs keep the names they have with the Row groups
+            row_outputs = ['W_cool', 'W_out'] + [f'Fl_O:tot:{name}' for name in CooledRows.tot_vars] + \
+                          ['Fl_O:tot:composition']
+            self.add_subsystem('rows', rows,
+                               promotes_inputs=['x_factor', 'turb_pwr', 'Fl_turb_I:*', 'Fl_turb_O:tot:P', 'Fl_cool:*'],
+                               promotes_outputs=[(f'row_{i}:{name}', f'row_{i}.{name}')
+                                                 for i in range(n_rows) for name in row_outputs])
+        else:
+            p_row_inputs = [('W_primary',  'Fl_turb_I:stat:W'),
+                            ('Tt_primary', 'Fl_turb_I:tot:T'),
+                            ('ht_primary', 'Fl_turb_I:tot:h'),
+                            ('composition_primary',  'Fl_turb_I:tot:composition')]
+            self.add_subsystem('row_0', Row(n_stages=n_stages, i_row=0,
+                                            T_safety=self.options['T_safety'], T_metal=self.options['T_metal'],
+                                            thermo_data=thermo_data, 
+                                            thermo_method=self.options['thermo_method'],
+                                            main_flow_composition=self.Fl_I_data['Fl_turb_I'], 
+                                            bld_flow_composition=self.Fl_I_data['Fl_cool'], 
+                                            mix_flow_composition=self.Fl_I_data['Fl_turb_O']),
+                               promotes_inputs=p_inputs_all+p_row_inputs)
+
+            for i in range(1,n_rows):
+
+                prev_row = 'row_{}'.format(i-1)
+                curr_row = 'row_{}'.format(i)
+                self.add_subsystem('row_{}'.format(i),
+                                   Row(n_stages=n_stages, i_row=i,
+                                       T_safety=self.options['T_safety'], T_metal=self.options['T_metal'],
+                                       thermo_data=thermo_data, 
+                                       thermo_method=self.options['thermo_method'],
+                                       main_flow_composition=self.Fl_I_data['Fl_turb_I'], 
+                                       bld_flow_composition=self.Fl_I_data['Fl_cool'], 
+                                       mix_flow_composition=self.Fl_I_data['Fl_turb_O']),
+                                   promotes_inputs=p_inputs_all)
+
+                self.connect('{}.W_out'.format(prev_row), '{}.W_primary'.format(curr_row))
+                self.connect('{}.Fl_O:tot:T'.format(prev_row), '{}.Tt_primary'.format(curr_row))
+                self.connect('{}.Fl_O:tot:h'.format(prev_row), '{}.ht_primary'.format(curr_row))
+                self.connect('{}.Fl_O:tot:composition'.format(prev_row), '{}.composition_primary'.format(curr_row))
 
         super().setup()
 
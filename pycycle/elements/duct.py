@@ -19,24 +19,27 @@ class MachPressureLossMap(om.ExplicitComponent):
                               desc='Switch between on-design and off-design calculation.')
         self.options.declare('expMN', default=0.0,
                                 desc='MN exponent for loss calculations')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
         design = self.options['design']
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('MN_in', val=0.0,
+        self.add_input('MN_in', val=0.0, shape=nn,
                         desc='Mach number entering duct')
         if design:
-            self.add_input('dPqP', val=0.0,
+            self.add_input('dPqP', val=0.0, shape=nn,
                         desc='Pressure differential as a fraction of incoming pressure')
-            self.add_output('s_dPqP', val=0.0,
+            self.add_output('s_dPqP', val=0.0, shape=nn,
                         desc='Pressure loss scalar')
-            self.declare_partials('s_dPqP', ['dPqP', 'MN_in'])
+            self.declare_partials('s_dPqP', ['dPqP', 'MN_in'], rows=ar, cols=ar)
         else:
-            self.add_input('s_dPqP', val=0.0,
+            self.add_input('s_dPqP', val=0.0, shape=nn,
                         desc='Pressure loss scalar')
-            self.add_output('dPqP', val=0.0,
+            self.add_output('dPqP', val=0.0, shape=nn,
                         desc='Pressure differential as a fraction of incoming pressure')
-            self.declare_partials('dPqP', ['s_dPqP', 'MN_in'])
+            self.declare_partials('dPqP', ['s_dPqP', 'MN_in'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         design = self.options['design']
@@ -63,16 +66,22 @@ class PressureLoss(om.ExplicitComponent):
     Calculates pressure loss across the duct.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('dPqP', val = 0.0,
+        self.add_input('dPqP', val = 0.0, shape=nn,
                        desc='pressure differential as a fraction of incoming pressure')
-        self.add_input('Pt_in', val=5.0, units='lbf/inch**2', desc='Inlet total pressure')
+        self.add_input('Pt_in', val=5.0, shape=nn, units='lbf/inch**2', desc='Inlet total pressure')
 
         # outputs
-        self.add_output('Pt_out', val=14.696, units='lbf/inch**2', desc='Exit total pressure', lower=1e-3)
+        self.add_output('Pt_out', val=14.696, shape=nn, units='lbf/inch**2', desc='Exit total pressure', lower=1e-3)
 
-        self.declare_partials('Pt_out', '*')
+        self.declare_partials('Pt_out', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Pt_out'] = inputs['Pt_in']*(1.0 - inputs['dPqP'])
@@ -87,17 +96,23 @@ class qCalc(om.ExplicitComponent):
     Additional energy added or extracted by the duct.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         #inputs
-        self.add_input('W_in', val=2.0, units='lbm/s', desc='incoming mass flow')
-        self.add_input('Q_dot', val=0.0, units='Btu/s',
+        self.add_input('W_in', val=2.0, shape=nn, units='lbm/s', desc='incoming mass flow')
+        self.add_input('Q_dot', val=0.0, shape=nn, units='Btu/s',
                        desc='heat flow rate into (positive) or out of (negative) the air')
-        self.add_input('ht_in', val=1.0, units='Btu/lbm', desc='incoming total enthalpy')
+        self.add_input('ht_in', val=1.0, shape=nn, units='Btu/lbm', desc='incoming total enthalpy')
 
         #outputs
-        self.add_output('ht_out', val=1.0, units='Btu/lbm', desc='outgoing total enthalpy' )
+        self.add_output('ht_out', val=1.0, shape=nn, units='Btu/lbm', desc='outgoing total enthalpy' )
 
-        self.declare_partials('ht_out', '*')
+        self.declare_partials('ht_out', '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['ht_out'] = inputs['ht_in'] + inputs['Q_dot']/inputs['W_in']
@@ -146,6 +161,8 @@ class Duct(Element):
         dPqP
     """
 
+    _vectorized = True
+
     def initialize(self):
       
         self.options.declare('statics', default=True,
@@ -170,34 +187,35 @@ class Duct(Element):
         statics = self.options['statics']
         design = self.options['design']
         expMN = self.options['expMN']
+        nn = self.options['num_nodes']
 
         composition = self.Fl_I_data['Fl_I']
 
         # Create inlet flowstation
-        flow_in = FlowIn(fl_name='Fl_I')
+        flow_in = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('flow_in', flow_in, promotes=['Fl_I:tot:*', 'Fl_I:stat:*'])
 
         if expMN > 1e-10: # Calcluate pressure losses as function of Mach number
             if design: 
-                self.add_subsystem('dPqP_MN', MachPressureLossMap(design=design, expMN=expMN),
+                self.add_subsystem('dPqP_MN', MachPressureLossMap(design=design, expMN=expMN, num_nodes=nn),
                                 promotes_inputs=['dPqP', ('MN_in', 'Fl_I:stat:MN')], 
                                 promotes_outputs=['s_dPqP'])
             else: 
-                self.add_subsystem('dPqP_MN', MachPressureLossMap(design=design, expMN=expMN),
+                self.add_subsystem('dPqP_MN', MachPressureLossMap(design=design, expMN=expMN, num_nodes=nn),
                                 promotes_inputs=['s_dPqP' ,('MN_in', 'Fl_I:stat:MN')], 
                                 promotes_outputs=['dPqP'])
 
         #Pressure Loss Component
         prom_in = [('Pt_in', 'Fl_I:tot:P'), 'dPqP']
-        self.add_subsystem('p_loss', PressureLoss(), promotes_inputs=prom_in)
+        self.add_subsystem('p_loss', PressureLoss(num_nodes=nn), promotes_inputs=prom_in)
 
         # Energy Calc Component
         prom_in = [('W_in', 'Fl_I:stat:W'), ('ht_in', 'Fl_I:tot:h'), 'Q_dot']
-        self.add_subsystem('q_calc', qCalc(), promotes_inputs=prom_in)
+        self.add_subsystem('q_calc', qCalc(num_nodes=nn), promotes_inputs=prom_in)
 
         # Total Calc
         real_flow = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
-                           method=thermo_method, 
+                           method=thermo_method, num_nodes=nn, 
                            thermo_kwargs={'composition':composition, 
                                           'spec':thermo_data})
         prom_in = [('composition', 'Fl_I:tot:composition')]
@@ -210,7 +228,7 @@ class Duct(Element):
             if design:
             #   Calculate static properties
                 out_stat = Thermo(mode='static_MN', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn, 
                                   thermo_kwargs={'composition':composition, 
                                                  'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -228,7 +246,7 @@ class Duct(Element):
             else:
                 # Calculate static properties
                 out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn, 
                                   thermo_kwargs={'composition':composition, 
                                                  'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -243,7 +261,7 @@ class Duct(Element):
                 self.connect('Fl_O:tot:P', 'out_stat.guess:Pt')
                 self.connect('Fl_O:tot:gamma', 'out_stat.guess:gamt')
         else:
-            self.add_subsystem('W_passthru', PassThrough('Fl_I:stat:W', 'Fl_O:stat:W', 1.0, units= "lbm/s"),
+            self.add_subsystem('W_passthru', PassThrough('Fl_I:stat:W', 'Fl_O:stat:W', np.ones(nn), units= "lbm/s"),
                                promotes=['*'])
 
         super().setup()
@@ -1,7 +1,11 @@
+import numpy as np
+
 import openmdao.api as om
+from openmdao.utils.units import unit_conversion
 
 from pycycle.thermo.cea import species_data
 from pycycle.thermo.cea import thermo_data
+from pycycle.thermo.tabular.tabular_thermo import TabularProps, tabular_flow_vars, lin_derivs
 from pycycle.constants import THERMO_DEFAULT_COMPOSITIONS
 from pycycle.elements.ambient import Ambient
 from pycycle.elements.flow_start import FlowStart
@@ -9,9 +13,192 @@ from pycycle.thermo.thermo import ThermoAdd, Thermo
 from pycycle.element_base import Element
 
 
+class StagnationFlow(om.ImplicitComponent):
+    """
+    Total and static flow properties from the ambient static state and the Mach number, for the TABULAR thermo.
+
+    Replaces the FlowStart and the balance on its total temperature and pressure in FlightConditions.
+    The static properties are explicit functions of the ambient state. The total temperature and pressure
+    are the states, with the total enthalpy of the static state (hs + V**2/2) and its entropy, and
+    `solve_nonlinear` finds them directly with a vectorized Newton.
+    """
+
+    stat_vars = tabular_flow_vars(True, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R', 'area', 'W', 'V', 'Vsonic',
+                                         'MN'))
+    tot_vars = tabular_flow_vars(False, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'))
+
+    def initialize(self):
+        self.options.declare('spec', recordable=False,
+                              desc='Tabular thermo data')
+        self.options.declare('composition', desc='Composition of the flow')
+        self.options.declare('maxiter', default=50, types=int,
+                              desc='Maximum number of Newton iterations in solve_nonlinear')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+        composition = self.options['composition']
+
+        self._props = props = TabularProps(self.options['spec'], composition)
+        ns = len(props.species)
+        T_min, T_max = props.T_bounds
+
+        # the residuals have the units of the Thermo balances they replace
+        self._h_scale = unit_conversion('J/kg', 'cal/g')[0]
+        self._S_scale = unit_conversion('J/kg/degK', 'cal/(g*degK)')[0]
+        self._T_conv = unit_conversion('degR', 'degK')[0]
+        self._P_conv = unit_conversion('psi', 'Pa')[0]
+        self._W_conv = unit_conversion('lbm/s', 'kg/s')[0]
+
+        comp_val = np.array([composition[k] for k in props.species])
+        if nn > 1:
+            comp_val = np.tile(comp_val, (nn, 1))
+
+        self.add_input('Ts', val=500., shape=nn, units='degK', desc='Ambient static temperature')
+        self.add_input('Ps', val=1e5, shape=nn, units='Pa', desc='Ambient static pressure')
+        self.add_input('MN', val=0.5, shape=nn, desc='Mach number')
+        # same units and default as the reactant ThermoAdd input promoted to the same name
+        self.add_input('W', val=0.0, shape=nn, units='lbm/s', desc='Mass flow rate')
+        self.add_input('composition', val=comp_val, desc='Composition of the flow')
+
+        # same units as the balance they replace, so the initial guesses of the models still apply
+        self.add_output('Tt', val=500., shape=nn, units='degR', lower=T_min / self._T_conv,
+                        upper=T_max / self._T_conv, desc='Total temperature')
+        self.add_output('Pt', val=14.696, shape=nn, units='psi', lower=1e-4, desc='Total pressure')
+
+        # name of the explicit output -> conversion factor from the units of the table
+        self._explicit = {}
+        for name, (si_units, units, desc) in self.tot_vars.items():
+            self._add_explicit(f'Fl_O:tot:{name}', si_units, units, desc)
+        for name, (si_units, units, desc) in self.stat_vars.items():
+            self._add_explicit(f'Fl_O:stat:{name}', si_units, units, desc)
+
+        self.add_output('Fl_O:tot:composition', val=comp_val, desc='Composition of the flow')
+
+        self._wrt = ('Ts', 'Ps', 'MN', 'W', 'Tt', 'Pt')
+        comp_rows = np.repeat(ar, ns)
+        comp_cols = np.arange(nn * ns)
+        for of in ('Tt', 'Pt') + tuple(self._explicit):
+            self.declare_partials(of, self._wrt, rows=ar, cols=ar)
+            self.declare_partials(of, 'composition', rows=comp_rows, cols=comp_cols)
+        for of in self._explicit:
+            self.declare_partials(of, of, val=1., rows=ar, cols=ar)
+
+        self.declare_partials('Fl_O:tot:composition', 'Fl_O:tot:composition', val=1., rows=comp_cols, cols=comp_cols)
+        self.declare_partials('Fl_O:tot:composition', 'composition', val=-1., rows=comp_cols, cols=comp_cols)
+
+    def _add_explicit(self, name, si_units, units, desc):
+        nn = self.options['num_nodes']
+        self.add_output(name, val=1., shape=nn, units=units, desc=desc)
+        self._explicit[name] = 1. if units is None else unit_conversion(si_units, units)[0]
+
+    def _state(self, T, P, composition):
+        """
+        Properties at a flow state given by (value, derivatives) pairs of T and P, with their derivatives
+        with respect to the variables of the component.
+        """
+        return {name: (val, lin_derivs((d_dT, T[1]), (d_dP, P[1]), (1., {'composition': d_dcomp.T})))
+                for name, (val, d_dT, d_dP, d_dcomp) in self._props(T[0], P[0], composition).items()}
+
+    def _evaluate(self, inputs, outputs):
+        """
+        Residuals of the states and values of the explicit outputs (in the units of the table), as
+        (value, derivatives) pairs.
+        """
+        composition = inputs['composition']
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+
+        Ts = inputs['Ts'], {'Ts': 1.}
+        Ps = inputs['Ps'], {'Ps': 1.}
+        MN = inputs['MN'], {'MN': 1.}
+        W = self._W_conv * inputs['W'], {'W': self._W_conv}
+
+        stat = self._state(Ts, Ps, composition)
+        gamma, R, rho = stat['gamma'], stat['R'], stat['rho']
+        Vsonic = np.sqrt(gamma[0] * R[0] * Ts[0])
+        Vsonic = Vsonic, lin_derivs((Vsonic / (2. * gamma[0]), gamma[1]), (Vsonic / (2. * R[0]), R[1]),
+                              (Vsonic / (2. * Ts[0]), Ts[1]))
+        V = MN[0] * Vsonic[0], lin_derivs((Vsonic[0], MN[1]), (MN[0], Vsonic[1]))
+
+        # the area is infinite (and not a function of anything) when there is no flow
+        flow = MN[0].real >= 1e-16
+        V_safe = np.where(flow, V[0], 1.)
+        area = np.where(flow, W[0] / (rho[0] * V_safe), np.inf)
+        area_safe = np.where(flow, area, 0.)
+        area = area, lin_derivs((np.where(flow, 1. / (rho[0] * V_safe), 0.), W[1]), (-area_safe / rho[0], rho[1]),
+                          (-area_safe / V_safe, V[1]))
+
+        stat.update({'T': Ts, 'P': Ps, 'area': area, 'W': W, 'V': V, 'Vsonic': Vsonic, 'MN': MN})
+
+        ht = stat['h'][0] + 0.5 * V[0]**2, lin_derivs((1., stat['h'][1]), (V[0], V[1]))
+
+        Tt = self._T_conv * outputs['Tt'], {'Tt': self._T_conv}
+        Pt = self._P_conv * outputs['Pt'], {'Pt': self._P_conv}
+        tot = self._state(Tt, Pt, composition)
+
+        resids = {'Tt': (h_scale * (tot['h'][0] - ht[0]), lin_derivs((h_scale, tot['h'][1]), (-h_scale, ht[1]))),
+                  'Pt': (S_scale * (tot['S'][0] - stat['S'][0]), lin_derivs((S_scale, tot['S'][1]), (-S_scale, stat['S'][1])))}
+
+        explicit = {}
+        for name, val in tot.items():
+            explicit[f'Fl_O:tot:{name}'] = val
+        explicit['Fl_O:tot:T'] = Tt
+        explicit['Fl_O:tot:P'] = Pt
+        for name, val in stat.items():
+            explicit[f'Fl_O:stat:{name}'] = val
+
+        return resids, explicit
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in states.items():
+            resids[name] = val
+        for name, (val, _) in explicit.items():
+            resids[name] = outputs[name] - self._explicit[name] * val
+        resids['Fl_O:tot:composition'] = outputs['Fl_O:tot:composition'] - inputs['composition']
+
+    def solve_nonlinear(self, inputs, outputs):
+        props = self._props
+        composition = inputs['composition']
+        Ts = inputs['Ts']
+        Ps = inputs['Ps']
+
+        stat = props(Ts, Ps, composition, names=('h', 'S', 'gamma', 'R'))
+        hs, S, gamma, R = (stat[name][0] for name in ('h', 'S', 'gamma', 'R'))
+        ht = hs + 0.5 * inputs['MN']**2 * gamma * R * Ts
+
+        # isentropic relation for the initial guess, then the real gas total state
+        Tt = Ts * (1. + 0.5 * (gamma - 1.) * inputs['MN']**2)
+        Pt = Ps * (Tt / Ts)**(gamma / (gamma - 1.))
+        Tt, Pt = props.solve_TP(('h', 'S'), (ht, S), Tt, Pt, composition, (self._h_scale, self._S_scale),
+                                maxiter=self.options['maxiter'])
+        outputs['Tt'] = Tt / self._T_conv
+        outputs['Pt'] = Pt / self._P_conv
+
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in explicit.items():
+            outputs[name] = self._explicit[name] * val
+        outputs['Fl_O:tot:composition'] = composition
+
+    def linearize(self, inputs, outputs, J):
+        states, explicit = self._evaluate(inputs, outputs)
+        ones = np.ones(self.options['num_nodes'])
+        ns = len(self._props.species)
+
+        for of, (val, derivs), scale in ([(name, val, 1.) for name, val in states.items()] +
+                                         [(name, val, -self._explicit[name]) for name, val in explicit.items()]):
+            for wrt in self._wrt:
+                J[of, wrt] = scale * derivs.get(wrt, 0.) * ones
+            J[of, 'composition'] = scale * (derivs.get('composition', 0.) * np.ones((ns, ones.size))).T.ravel()
+
+
 class FlightConditions(Element):
     """Determines total and static flow properties given an altitude and Mach number using the input atmosphere model"""
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('composition', default=None,
                               desc='composition of the flow. If None, default for thermo package is used')
@@ -20,6 +207,12 @@ class FlightConditions(Element):
                                    'is mixed into the flow at at the ratio set by the `mix_ratio` input')
         self.options.declare('mix_ratio_name', default='mix:ratio', 
                              desc='The name of the input that governs the mix ratio of the reactant to the primary flow')
+        self.options.declare('atm_method', default='table', values=('table', 'layered'),
+                             desc='Interpolate the US 1976 standard atmosphere table, or use its exact layered formulation')
+        self.options.declare('fused_thermo', default=True, types=bool,
+                              desc='If True, the TABULAR thermo total state is computed directly from the ambient '
+                                   'static state by a StagnationFlow component instead of a FlowStart converged by '
+                                   'a Newton solver.')
 
         super().initialize()
         
@@ -49,55 +242,79 @@ class FlightConditions(Element):
         thermo_data = self.options['thermo_data']
         reactant = self.options['reactant']
         mix_ratio_name = self.options['mix_ratio_name']
+        nn = self.options['num_nodes']
 
         # composition = self.Fl_O_data['Fl_O']
         composition = self.options['composition']
 
-        self.add_subsystem('ambient', Ambient(), promotes=('alt', 'dTs'))  # inputs
+        self.add_subsystem('ambient', Ambient(num_nodes=nn, atm_method=self.options['atm_method']),
+                           promotes=('alt', 'dTs'))  # inputs
+
+        if thermo_method == 'TABULAR' and self.options['fused_thermo']:
+            if reactant is not False:
+                thermo_add = ThermoAdd(method=thermo_method, mix_mode='reactant', num_nodes=nn,
+                                       thermo_kwargs={'spec':thermo_data,
+                                                      'inflow_composition':composition,
+                                                      'mix_composition':reactant, })
+                self.add_subsystem('thermo_add', thermo_add,
+                                   promotes_inputs=(('Fl_I:stat:W', 'W'), ('mix:ratio', mix_ratio_name)),
+                                   promotes_outputs=(('composition_out', 'composition'), ))
+
+            # the tabular reactant only changes the amounts of the species of the inflow
+            if composition is None:
+                composition = THERMO_DEFAULT_COMPOSITIONS[thermo_method]
 
-        conv = self.add_subsystem('conv', om.Group(), promotes=['*'])
-        if reactant is not False:
-            proms = ['Fl_O:*', 'MN', 'W', mix_ratio_name]
+            # the total temperature and pressure keep the names of the balance they replace
+            self.add_subsystem('flow', StagnationFlow(spec=thermo_data, composition=composition, num_nodes=nn),
+                               promotes_inputs=['MN', 'W', 'composition'],
+                               promotes_outputs=['Fl_O:*', ('Tt', 'balance.Tt'), ('Pt', 'balance.Pt')])
+            self.connect('ambient.Ps', 'flow.Ps')
+            self.connect('ambient.Ts', 'flow.Ts')
         else:
-            proms = ['Fl_O:*', 'MN', 'W']
-        fs_start = conv.add_subsystem('fs', FlowStart(thermo_method=thermo_method,
-                                                      thermo_data=thermo_data, 
-                                                      composition=composition, 
-                                                      reactant=reactant, 
-                                                      mix_ratio_name=mix_ratio_name), 
-                                      promotes=proms)
-
-        # need to manually call this in this setup, because we have an element within an element
-        fs_start.pyc_setup_output_ports() 
-
-        balance = conv.add_subsystem('balance', om.BalanceComp())
-        balance.add_balance('Tt', val=500.0, lower=1e-4, units='degR', desc='Total temperature', eq_units='degR')
-        balance.add_balance('Pt', val=14.696, lower=1e-4, units='psi', desc='Total pressure', eq_units='psi')
-        # sub.set_order(['fs','balance'])
-
-        newton = conv.nonlinear_solver = om.NewtonSolver()
-        newton.options['atol'] = 1e-10
-        newton.options['rtol'] = 1e-10
-        newton.options['maxiter'] = 10
-        newton.options['iprint'] = -1
-        newton.options['solve_subsystems'] = True
-        newton.options['reraise_child_analysiserror'] = False
-        newton.linesearch = om.BoundsEnforceLS()
-        newton.linesearch.options['bound_enforcement'] = 'scalar'
-
-        newton.linesearch.options['iprint'] = -1
-        # newton.linesearch.options['solve_subsystems'] = True
-
-        conv.linear_solver = om.DirectSolver(assemble_jac=True)
-
-        self.connect('ambient.Ps', 'balance.rhs:Pt')
-        self.connect('ambient.Ts', 'balance.rhs:Tt')
-
-        self.connect('balance.Pt', 'fs.P')
-        self.connect('balance.Tt', 'fs.T')
-
-        self.connect('Fl_O:stat:P', 'balance.lhs:Pt')
-        self.connect('Fl_O:stat:T', 'balance.lhs:Tt')
+            conv = self.add_subsystem('conv', om.Group(), promotes=['*'])
+            if reactant is not False:
+                proms = ['Fl_O:*', 'MN', 'W', mix_ratio_name]
+            else:
+                proms = ['Fl_O:*', 'MN', 'W']
+            fs_start = conv.add_subsystem('fs', FlowStart(thermo_method=thermo_method,
+                                                          thermo_data=thermo_data, 
+                                                          num_nodes=nn, 
+                                                          composition=composition, 
+                                                          reactant=reactant, 
+                                                          mix_ratio_name=mix_ratio_name), 
+                                          promotes=proms)
+
+            # need to manually call this in this setup, because we have an element within an element
+            fs_start.pyc_setup_output_ports() 
+
+            balance = conv.add_subsystem('balance', om.BalanceComp())
+            balance.add_balance('Tt', val=500.0, shape=nn, lower=1e-4, units='degR', desc='Total temperature', eq_units='degR')
+            balance.add_balance('Pt', val=14.696, shape=nn, lower=1e-4, units='psi', desc='Total pressure', eq_units='psi')
+            # sub.set_order(['fs','balance'])
+
+            newton = conv.nonlinear_solver = om.NewtonSolver()
+            newton.options['atol'] = 1e-10
+            newton.options['rtol'] = 1e-10
+            newton.options['maxiter'] = 10
+            newton.options['iprint'] = -1
+            newton.options['solve_subsystems'] = True
+            newton.options['reraise_child_analysiserror'] = False
+            newton.linesearch = om.BoundsEnforceLS()
+            newton.linesearch.options['bound_enforcement'] = 'scalar'
+
+            newton.linesearch.options['iprint'] = -1
+            # newton.linesearch.options['solve_subsystems'] = True
+
+            conv.linear_solver = om.DirectSolver(assemble_jac=True)
+
+            self.connect('ambient.Ps', 'balance.rhs:Pt')
+            self.connect('ambient.Ts', 'balance.rhs:Tt')
+
+            self.connect('balance.Pt', 'fs.P')
+            self.connect('balance.Tt', 'fs.T')
+
+            self.connect('Fl_O:stat:P', 'balance.lhs:Pt')
+            self.connect('Fl_O:stat:T', 'balance.lhs:Tt')
 
         # self.set_order(['ambient', 'subgroup'])
 
@@ -10,6 +10,8 @@ from pycycle.element_base import Element
 
 class FlowStart(Element):
 
+    _vectorized = True
+
     def initialize(self):
 
         self.options.declare('composition', default=None,
@@ -30,9 +32,10 @@ class FlowStart(Element):
         thermo_data = self.options['thermo_data']
         composition = self.options['composition']
         reactant = self.options['reactant']
+        nn = self.options['num_nodes']
 
         if reactant is not False: 
-            self.thermo_add = ThermoAdd(method=thermo_method, mix_mode='reactant', 
+            self.thermo_add = ThermoAdd(method=thermo_method, mix_mode='reactant', num_nodes=nn, 
                                         thermo_kwargs={'spec':thermo_data, 
                                                        'inflow_composition':composition, 
                                                        'mix_composition':reactant, })
@@ -49,6 +52,7 @@ class FlowStart(Element):
         thermo_method = self.options['thermo_method']
         thermo_data = self.options['thermo_data']
         reactant = self.options['reactant']
+        nn = self.options['num_nodes']
 
         composition = self.Fl_O_data['Fl_O']
 
@@ -63,7 +67,7 @@ class FlowStart(Element):
                                 promotes_outputs=(('composition_out', 'composition'), ))
         
         set_TP = Thermo(mode='total_TP', fl_name='Fl_O:tot', 
-                        method=thermo_method, 
+                        method=thermo_method, num_nodes=nn, 
                         thermo_kwargs={'composition':composition, 
                                        'spec':thermo_data})
 
@@ -73,7 +77,7 @@ class FlowStart(Element):
                            promotes_outputs=('Fl_O:tot:*',))
 
         set_stat_MN = Thermo(mode='static_MN', fl_name='Fl_O:stat', 
-                             method=thermo_method, 
+                             method=thermo_method, num_nodes=nn, 
                              thermo_kwargs={'composition':composition, 
                                             'spec':thermo_data} )
 
@@ -1,5 +1,6 @@
 """ Class definition for Inlet."""
 
+import numpy as np
 import openmdao.api as om
 
 from pycycle.constants import g_c
@@ -18,65 +19,69 @@ class MilSpecRecovery(om.ExplicitComponent):
     Performs subsonic, supersonic, and hypsersonic inlet ram recovery calculations.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+
         # inputs
-        self.add_input('MN', val=0.5, units=None, desc='Flight Mach Number')
-        self.add_input('ram_recovery_base', units=None, desc='Base Inlet Ram Recovery')
+        self.add_input('MN', val=0.5, shape=nn, units=None, desc='Flight Mach Number')
+        self.add_input('ram_recovery_base', shape=nn, units=None, desc='Base Inlet Ram Recovery')
         
         # outputs
-        self.add_output('ram_recovery', val=1.0, units=None, desc='Mil Spec Ram Recovery')
+        self.add_output('ram_recovery', val=1.0, shape=nn, units=None, desc='Mil Spec Ram Recovery')
         
-        self.declare_partials('ram_recovery', ['ram_recovery_base' ,'MN'])
+        ar = np.arange(nn)
+        self.declare_partials('ram_recovery', ['ram_recovery_base' ,'MN'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         
         MN = inputs['MN']
         ram_recovery_base = inputs['ram_recovery_base']
-            
-        if MN < 1.0:
-            outputs['ram_recovery'] = ram_recovery_base
-            
-        elif MN >= 1.0 and MN < 5.0:
-            outputs['ram_recovery'] = ram_recovery_base *(1-(0.075*((MN-1)**1.35)))
-            
-        elif MN >= 5.0:
-            outputs['ram_recovery'] = 800/(MN**4 + 935)
+        # clipped so the branches that aren't used don't produce nans
+        MN_super = np.maximum(MN - 1, 0.)
+
+        outputs['ram_recovery'] = np.where(MN < 1.0, ram_recovery_base, 
+                                           np.where(MN < 5.0, ram_recovery_base *(1-(0.075*(MN_super**1.35))), 
+                                                    800/(MN**4 + 935)))
 
     def compute_partials(self, inputs, J):
         
         MN = inputs['MN']
         ram_recovery_base = inputs['ram_recovery_base']
-                
-        if MN < 1.0:
-            J['ram_recovery', 'ram_recovery_base'] = 1
-            J['ram_recovery', 'MN'] = 0
-            
-        elif MN >= 1.0 and MN < 5.0:
-            J['ram_recovery', 'ram_recovery_base'] = 1-(0.075*((MN-1)**1.35))
-            J['ram_recovery', 'MN'] = -0.10125*ram_recovery_base*((MN-1)**0.35)
-            
-        elif MN >= 5.0:
-            J['ram_recovery', 'ram_recovery_base'] = 0
-            J['ram_recovery', 'MN'] = -(3200 * MN**3)/((MN**4 + 935)**2)
+        MN_super = np.maximum(MN - 1, 0.)
+
+        J['ram_recovery', 'ram_recovery_base'] = np.where(MN < 1.0, 1., 
+                                                          np.where(MN < 5.0, 1-(0.075*(MN_super**1.35)), 0.))
+        J['ram_recovery', 'MN'] = np.where(MN < 1.0, 0., 
+                                           np.where(MN < 5.0, -0.10125*ram_recovery_base*(MN_super**0.35), 
+                                                    -(3200 * MN**3)/((MN**4 + 935)**2)))
 
 class Calcs(om.ExplicitComponent):
     """
     Performs inlet engineering calculations.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+
         # inputs
-        self.add_input('Pt_in', val=5.0, units='lbf/inch**2', desc='Entrance total pressure')
-        self.add_input('ram_recovery', val=1.0, desc='Ram recovery')
-        self.add_input('V_in', val=0.0, units='ft/s', desc='Entrance velocity')
-        self.add_input('W_in', val=100.0, units='lbm/s', desc='Entrance flow rate')
+        self.add_input('Pt_in', val=5.0, shape=nn, units='lbf/inch**2', desc='Entrance total pressure')
+        self.add_input('ram_recovery', val=1.0, shape=nn, desc='Ram recovery')
+        self.add_input('V_in', val=0.0, shape=nn, units='ft/s', desc='Entrance velocity')
+        self.add_input('W_in', val=100.0, shape=nn, units='lbm/s', desc='Entrance flow rate')
 
         # outputs
-        self.add_output('Pt_out', val=14.696, units='lbf/inch**2', desc='Exit total pressure')
-        self.add_output('F_ram', val=1.0, units='lbf', desc='Ram drag')
+        self.add_output('Pt_out', val=14.696, shape=nn, units='lbf/inch**2', desc='Exit total pressure')
+        self.add_output('F_ram', val=1.0, shape=nn, units='lbf', desc='Ram drag')
 
-        self.declare_partials('Pt_out', ['Pt_in', 'ram_recovery'])
-        self.declare_partials('F_ram', ['V_in', 'W_in'])
+        ar = np.arange(nn)
+        self.declare_partials('Pt_out', ['Pt_in', 'ram_recovery'], rows=ar, cols=ar)
+        self.declare_partials('F_ram', ['V_in', 'W_in'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Pt_out'] = inputs['Pt_in'] * inputs['ram_recovery']
@@ -124,6 +129,8 @@ class Inlet(Element):
         F_ram
     """
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('statics', default=True,
                               desc='If True, calculate static properties.')
@@ -143,23 +150,24 @@ class Inlet(Element):
         thermo_data = self.options['thermo_data']
         statics = self.options['statics']
         design = self.options['design']
+        nn = self.options['num_nodes']
 
         # elements = self.options['elements']
         composition = self.Fl_I_data['Fl_I']
 
         # Create inlet flow station
-        flow_in = FlowIn(fl_name='Fl_I')
+        flow_in = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('flow_in', flow_in, promotes=['Fl_I:tot:*', 'Fl_I:stat:*'])
         
         # Perform inlet engineering calculations
-        self.add_subsystem('calcs_inlet', Calcs(),
+        self.add_subsystem('calcs_inlet', Calcs(num_nodes=nn),
                            promotes_inputs=['ram_recovery', ('Pt_in', 'Fl_I:tot:P'),
                                             ('V_in', 'Fl_I:stat:V'), ('W_in', 'Fl_I:stat:W')],
                            promotes_outputs=['F_ram'])
 
         # Calculate real flow station properties
         real_flow = Thermo(mode='total_TP', fl_name='Fl_O:tot', 
-                           method=thermo_method, 
+                           method=thermo_method, num_nodes=nn, 
                            thermo_kwargs={'composition':composition, 
                                           'spec':thermo_data})
         self.add_subsystem('real_flow', real_flow,
@@ -174,7 +182,7 @@ class Inlet(Element):
                 #   Calculate static properties
 
                 out_stat = Thermo(mode='static_MN', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn, 
                                   thermo_kwargs={'composition':composition, 
                                                  'spec':thermo_data})
                 self.add_subsystem('out_stat', out_stat,
@@ -189,7 +197,7 @@ class Inlet(Element):
             else:
                 # Calculate static properties
                 out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat', 
-                                  method=thermo_method, 
+                                  method=thermo_method, num_nodes=nn, 
                                   thermo_kwargs={'composition':composition, 
                                                  'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -205,7 +213,7 @@ class Inlet(Element):
                 self.connect('Fl_O:tot:gamma', 'out_stat.guess:gamt')
 
         else:
-            self.add_subsystem('W_passthru', PassThrough('Fl_I:stat:W', 'Fl_O:stat:W', 0.0, units= "lbm/s"),
+            self.add_subsystem('W_passthru', PassThrough('Fl_I:stat:W', 'Fl_O:stat:W', np.zeros(nn), units= "lbm/s"),
                                promotes=['*'])
 
         super().setup()
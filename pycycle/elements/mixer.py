@@ -1,7 +1,11 @@
 import numpy as np
 import openmdao.api as om
+from openmdao.utils.units import unit_conversion
+
+from pycycle.constants import TAB_AIR_FUEL_COMPOSITION
 
 from pycycle.thermo.thermo import Thermo, ThermoAdd
+from pycycle.thermo.tabular.tabular_thermo import TabularProps, tabular_flow_vars, lin_derivs
 
 from pycycle.thermo.cea.species_data import janaf
 from pycycle.flow_in import FlowIn
@@ -96,6 +100,380 @@ class Impulse(om.ExplicitComponent):
         J['impulse', 'W'] = inputs['V']
 
 
+
+class MixerFlow(om.ImplicitComponent):
+    """
+    Static state of the designed stream and mixed out total and static states of a mixer for the TABULAR thermo.
+
+    Replaces the static Thermo of the designed stream and the impulse_converge group (total_hP and static_A
+    Thermos, impulse and balance on the total pressure) with a single component. Mass, energy and impulse
+    conservation are solved directly for the mixed out static state, then the total state is found from
+    its enthalpy and entropy, so no nested Newton solver is needed. The flow station outputs are explicit
+    functions of the states.
+    """
+
+    # output name -> (units of the value computed from the table, output units, description)
+    stat_vars = tabular_flow_vars(True, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R', 'area', 'W', 'V', 'Vsonic',
+                                         'MN'))
+    tot_vars = tabular_flow_vars(False, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'))
+
+    def initialize(self):
+        self.options.declare('designed_stream', default=1, values=(1, 2),
+                              desc='stream whose static state is computed, at the static pressure of the other '
+                                   'stream on design and from its area off design')
+        self.options.declare('design', default=True,
+                              desc='Switch between on-design and off-design calculation.')
+        self.options.declare('spec', recordable=False,
+                              desc='Tabular thermo data')
+        self.options.declare('compositions', types=(list, tuple),
+                              desc='Compositions of the two inflows and of the mixed flow '
+                                   '(None is TAB_AIR_FUEL_COMPOSITION)')
+        self.options.declare('maxiter', default=50, types=int,
+                              desc='Maximum number of Newton iterations in solve_nonlinear, an AnalysisError is '
+                                   'raised if the flow states are not converged')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+        design = self.options['design']
+        d = self.options['designed_stream']
+        o = 3 - d
+        compositions = [TAB_AIR_FUEL_COMPOSITION if composition is None else composition
+                        for composition in self.options['compositions']]
+
+        species = sorted(compositions[0])
+        for composition in compositions:
+            if sorted(composition) != species:
+                raise ValueError(f'The mixed flows have the species {species} and {sorted(composition)}, but '
+                                 'they must all have the same species.')
+
+        self._props = props = TabularProps(self.options['spec'], compositions[0])
+        ns = len(species)
+        T_min, T_max = props.T_bounds
+
+        # the residuals have the units of the Thermo balances they replace
+        self._h_scale = unit_conversion('J/kg', 'cal/g')[0]
+        self._S_scale = unit_conversion('J/kg/degK', 'cal/(g*degK)')[0]
+        self._psi = unit_conversion('psi', 'Pa')[0]
+
+        def comp_val(composition):
+            val = np.array([composition[k] for k in species])
+            return np.tile(val, (nn, 1)) if nn > 1 else val
+
+        self._d = f'Fl_I{d}'
+        self._o = f'Fl_I{o}'
+        self._calc = f'Fl_I{d}_calc:stat'
+
+        self.add_input(f'{self._d}:tot:h', val=1.0, shape=nn, units='J/kg', desc='Total enthalpy of the designed stream')
+        self.add_input(f'{self._d}:tot:S', val=1.0, shape=nn, units='J/kg/degK', desc='Entropy of the designed stream')
+        self.add_input(f'{self._d}:stat:W', val=1.0, shape=nn, units='kg/s', desc='Mass flow of the designed stream')
+        self.add_input(f'{self._d}:tot:composition', val=comp_val(compositions[d-1]),
+                       desc='Composition of the designed stream')
+        for name, units in (('W', 'kg/s'), ('P', 'Pa'), ('V', 'm/s'), ('area', 'm**2')):
+            self.add_input(f'{self._o}:stat:{name}', val=1.0, shape=nn, units=units,
+                           desc=f'Static {name} of the other stream')
+        self.add_input('ht', val=1.0, shape=nn, units='J/kg', desc='Total enthalpy of the mixed flow')
+        self.add_input('W', val=1.0, shape=nn, units='kg/s', desc='Mass flow of the mixed flow')
+        self.add_input('composition', val=comp_val(compositions[2]), desc='Composition of the mixed flow')
+
+        states = ['calc:T', 'tot:T', 'P_tot', 'stat:T', 'stat:P']
+        self.add_output('calc:T', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Static temperature of the designed stream')
+        if not design:
+            self.add_input('area', val=1.0, shape=nn, units='m**2', desc='Flow area of the mixed flow')
+            self.add_input('calc:area', val=1.0, shape=nn, units='m**2', desc='Flow area of the designed stream')
+            # only used for the initial guess of the static pressure
+            self.add_input(f'{self._d}:tot:P', val=1e5, shape=nn, units='Pa',
+                           desc='Total pressure of the designed stream')
+            self.add_input(f'{self._d}:tot:gamma', val=1.4, shape=nn, desc='Total gamma of the designed stream')
+            self.add_output('calc:P', val=1e5, shape=nn, units='Pa', lower=10., ref=1e5,
+                            desc='Static pressure of the designed stream')
+            states.append('calc:P')
+
+        self.add_output('tot:T', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Total temperature of the mixed flow')
+        self.add_output('P_tot', val=100., shape=nn, units='psi', lower=1e-3, upper=10000,
+                        desc='Total pressure of the mixed flow')
+        self.add_output('stat:T', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Static temperature of the mixed flow')
+        self.add_output('stat:P', val=1e5, shape=nn, units='Pa', lower=10., ref=1e5,
+                        desc='Static pressure of the mixed flow')
+        self._states = states
+
+        # name of the explicit output -> conversion factor from the units of the table
+        self._explicit = {}
+        for name, (si_units, units, desc) in self.stat_vars.items():
+            self._add_explicit(f'{self._calc}:{name}', si_units, units, desc)
+        for name, (si_units, units, desc) in self.tot_vars.items():
+            self._add_explicit(f'Fl_O:tot:{name}', si_units, units, desc)
+        for name, (si_units, units, desc) in self.stat_vars.items():
+            self._add_explicit(f'Fl_O:stat:{name}', si_units, units, desc)
+
+        self.add_output('Fl_O:tot:composition', val=comp_val(compositions[2]), desc='Composition of the mixed flow')
+
+        self._wrt = [f'{self._d}:tot:h', f'{self._d}:tot:S', f'{self._d}:stat:W', 'ht', 'W'] + \
+                    [f'{self._o}:stat:{name}' for name in ('W', 'P', 'V', 'area')] + states
+        if not design:
+            self._wrt += ['area', 'calc:area']
+        self._comps = [f'{self._d}:tot:composition', 'composition']
+
+        comp_rows = np.repeat(ar, ns)
+        comp_cols = np.arange(nn * ns)
+        for of in states + list(self._explicit):
+            self.declare_partials(of, self._wrt, rows=ar, cols=ar)
+            self.declare_partials(of, self._comps, rows=comp_rows, cols=comp_cols)
+        for of in self._explicit:
+            self.declare_partials(of, of, val=1., rows=ar, cols=ar)
+
+        self.declare_partials('Fl_O:tot:composition', 'Fl_O:tot:composition', val=1., rows=comp_cols, cols=comp_cols)
+        self.declare_partials('Fl_O:tot:composition', 'composition', val=-1., rows=comp_cols, cols=comp_cols)
+
+    def _add_explicit(self, name, si_units, units, desc):
+        nn = self.options['num_nodes']
+        self.add_output(name, val=1., shape=nn, units=units, desc=desc)
+        self._explicit[name] = 1. if units is None else unit_conversion(si_units, units)[0]
+
+    def _state(self, T, P, comp_name, composition):
+        """
+        Properties at a flow state given by (value, derivatives) pairs of T and P, with their derivatives
+        with respect to the variables of the component.
+        """
+        return {name: (val, lin_derivs((d_dT, T[1]), (d_dP, P[1]), (1., {comp_name: d_dcomp.T})))
+                for name, (val, d_dT, d_dP, d_dcomp) in self._props(T[0], P[0], composition).items()}
+
+    def _static(self, props, T, P, W, ht=None, area=None):
+        """
+        Static flow station from the properties at the static state, and either the total enthalpy
+        (static pressure known) or the flow area.
+        """
+        gamma, R, rho = props['gamma'], props['R'], props['rho']
+        Vsonic = np.sqrt(gamma[0] * R[0] * T[0])
+        Vsonic = Vsonic, lin_derivs((Vsonic / (2. * gamma[0]), gamma[1]), (Vsonic / (2. * R[0]), R[1]),
+                              (Vsonic / (2. * T[0]), T[1]))
+        if area is None:
+            # if ht < hs, the inverse relationship lets the solvers continue
+            dh = ht[0] - props['h'][0]
+            sign = np.where(dh.real >= 0., 1., -1.)
+            V = np.sqrt(2.0 * sign * dh)
+            V = V, lin_derivs((sign / V, ht[1]), (-sign / V, props['h'][1]))
+            area = W[0] / (rho[0] * V[0])
+            area = area, lin_derivs((1. / (rho[0] * V[0]), W[1]), (-area / rho[0], rho[1]), (-area / V[0], V[1]))
+        else:
+            V = W[0] / (rho[0] * area[0])
+            V = V, lin_derivs((1. / (rho[0] * area[0]), W[1]), (-V / rho[0], rho[1]), (-V / area[0], area[1]))
+        MN = V[0] / Vsonic[0], lin_derivs((1. / Vsonic[0], V[1]), (-V[0] / Vsonic[0]**2, Vsonic[1]))
+
+        stat = dict(props)
+        stat.update({'T': T, 'P': P, 'area': area, 'W': W, 'V': V, 'Vsonic': Vsonic, 'MN': MN})
+        return stat
+
+    def _evaluate(self, inputs, outputs):
+        """
+        Residuals of the states and values of the explicit outputs (in the units of the table), as
+        (value, derivatives) pairs.
+        """
+        design = self.options['design']
+        d, o = self._d, self._o
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+
+        def var(vec, name, scale=1.):
+            return scale * vec[name], {name: scale}
+
+        resids = {}
+        explicit = {}
+
+        # static state of the designed stream
+        ht_d = var(inputs, f'{d}:tot:h')
+        S_d = var(inputs, f'{d}:tot:S')
+        T = var(outputs, 'calc:T')
+        P = var(inputs, f'{o}:stat:P') if design else var(outputs, 'calc:P')
+        props = self._state(T, P, f'{d}:tot:composition', inputs[f'{d}:tot:composition'])
+        resids['calc:T'] = S_scale * (props['S'][0] - S_d[0]), lin_derivs((S_scale, props['S'][1]), (-S_scale, S_d[1]))
+        if design:
+            calc = self._static(props, T, P, var(inputs, f'{d}:stat:W'), ht=ht_d)
+        else:
+            calc = self._static(props, T, P, var(inputs, f'{d}:stat:W'), area=var(inputs, 'calc:area'))
+            resids['calc:P'] = self._energy(calc, ht_d)
+        for name, val in calc.items():
+            explicit[f'{self._calc}:{name}'] = val
+
+        # impulse of the two streams
+        impulse = lin_derivs((calc['area'][0], calc['P'][1]), (calc['P'][0], calc['area'][1]),
+                       (calc['V'][0], calc['W'][1]), (calc['W'][0], calc['V'][1]),
+                       (inputs[f'{o}:stat:area'], {f'{o}:stat:P': 1.}),
+                       (inputs[f'{o}:stat:P'], {f'{o}:stat:area': 1.}),
+                       (inputs[f'{o}:stat:V'], {f'{o}:stat:W': 1.}),
+                       (inputs[f'{o}:stat:W'], {f'{o}:stat:V': 1.}))
+        impulse = (calc['P'][0] * calc['area'][0] + calc['W'][0] * calc['V'][0] +
+                   inputs[f'{o}:stat:P'] * inputs[f'{o}:stat:area'] + inputs[f'{o}:stat:W'] * inputs[f'{o}:stat:V'],
+                   impulse)
+
+        # mixed out total state
+        ht = var(inputs, 'ht')
+        composition = inputs['composition']
+        Tt = var(outputs, 'tot:T')
+        Pt = var(outputs, 'P_tot', self._psi)
+        tot = self._state(Tt, Pt, 'composition', composition)
+        resids['tot:T'] = h_scale * (tot['h'][0] - ht[0]), lin_derivs((h_scale, tot['h'][1]), (-h_scale, ht[1]))
+        for name, val in tot.items():
+            explicit[f'Fl_O:tot:{name}'] = val
+        explicit['Fl_O:tot:T'] = Tt
+        explicit['Fl_O:tot:P'] = Pt
+
+        # mixed out static state, on design the area is the sum of the areas of the two streams
+        if design:
+            area = (calc['area'][0] + inputs[f'{o}:stat:area'],
+                    lin_derivs((1., calc['area'][1]), (1., {f'{o}:stat:area': 1.})))
+        else:
+            area = var(inputs, 'area')
+        Ts = var(outputs, 'stat:T')
+        Ps = var(outputs, 'stat:P')
+        stat = self._static(self._state(Ts, Ps, 'composition', composition), Ts, Ps, var(inputs, 'W'), area=area)
+        resids['stat:T'] = (S_scale * (stat['S'][0] - tot['S'][0]),
+                            lin_derivs((S_scale, stat['S'][1]), (-S_scale, tot['S'][1])))
+        resids['stat:P'] = self._energy(stat, ht)
+        for name, val in stat.items():
+            explicit[f'Fl_O:stat:{name}'] = val
+
+        # the total pressure matches the impulse of the mixed flow to the impulse of the two streams
+        resids['P_tot'] = (Ps[0] * stat['area'][0] + stat['W'][0] * stat['V'][0] - impulse[0],
+                           lin_derivs((stat['area'][0], Ps[1]), (Ps[0], stat['area'][1]), (stat['V'][0], stat['W'][1]),
+                                (stat['W'][0], stat['V'][1]), (-1., impulse[1])))
+
+        return resids, explicit
+
+    def _energy(self, stat, ht):
+        """
+        Relative difference between the total enthalpy of a static state and ht
+        """
+        h, V = stat['h'], stat['V']
+        num = h[0] + 0.5 * V[0]**2 - ht[0]
+        d_num = lin_derivs((1., h[1]), (V[0], V[1]), (-1., ht[1]))
+        return num / ht[0], lin_derivs((1. / ht[0], d_num), (-num / ht[0]**2, ht[1]))
+
+    def _newton(self, resid, T, P, maxiter):
+        """
+        Vectorized Newton on a pair of residuals of T and P. `resid(T, P)` returns the residuals and
+        their derivatives (r1, r2, dr1_dT, dr1_dP, dr2_dT, dr2_dP). Raises an AnalysisError if they are
+        not converged in `maxiter` iterations.
+        """
+        T_min, T_max = self._props.T_bounds
+        for i in range(maxiter):
+            r1, r2, a, b, c, d = resid(T, P)
+            if np.all(np.abs(r1) < 1e-10) and np.all(np.abs(r2) < 1e-10):
+                break
+            det = a * d - b * c
+            T = np.clip(T - (r1 * d - b * r2) / det, T_min, T_max)
+            P = np.maximum(P - (a * r2 - c * r1) / det, 0.1 * P)
+        else:
+            raise om.AnalysisError(f'Flow state in {self.pathname} failed to converge in {maxiter} iterations, '
+                                   f'T={T}, P={P}.')
+        return T, P
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in states.items():
+            resids[name] = val
+        for name, (val, _) in explicit.items():
+            resids[name] = outputs[name] - self._explicit[name] * val
+        resids['Fl_O:tot:composition'] = outputs['Fl_O:tot:composition'] - inputs['composition']
+
+    def solve_nonlinear(self, inputs, outputs):
+        props = self._props
+        design = self.options['design']
+        maxiter = self.options['maxiter']
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+        d, o = self._d, self._o
+
+        # static state of the designed stream
+        ht_d = inputs[f'{d}:tot:h']
+        S_d = inputs[f'{d}:tot:S']
+        W_d = inputs[f'{d}:stat:W']
+        comp_d = inputs[f'{d}:tot:composition']
+        if design:
+            P_d = inputs[f'{o}:stat:P']
+            outputs['calc:T'] = T_d = props.solve_T('S', S_d, outputs['calc:T'], P_d, comp_d, S_scale,
+                                                    maxiter=maxiter)
+            h, rho = (props(T_d, P_d, comp_d, names=('h', 'rho'))[name][0] for name in ('h', 'rho'))
+            V_d = np.sqrt(2.0 * np.abs(ht_d - h))
+            A_d = W_d / (rho * V_d)
+        else:
+            A_d = inputs['calc:area']
+            # same initial guess as the static_A Thermo, at a Mach number of 0.5
+            gamt = inputs[f'{d}:tot:gamma']
+            P_d = inputs[f'{d}:tot:P'] * (1 + (gamt - 1) / 2 * 0.5**2)**(-gamt / (gamt - 1))
+            T_d = props.solve_T('S', S_d, outputs['calc:T'], P_d, comp_d, S_scale, maxiter=maxiter)
+
+            def resid(T, P):
+                p = props(T, P, comp_d, names=('h', 'S', 'rho'))
+                h, h_T, h_P, _ = p['h']
+                S, S_T, S_P, _ = p['S']
+                rho, rho_T, rho_P, _ = p['rho']
+                V = W_d / (rho * A_d)
+                return (S_scale * (S - S_d), (h + 0.5 * V**2 - ht_d) / ht_d, S_scale * S_T, S_scale * S_P,
+                        (h_T - V**2 / rho * rho_T) / ht_d, (h_P - V**2 / rho * rho_P) / ht_d)
+
+            outputs['calc:T'], outputs['calc:P'] = T_d, P_d = self._newton(resid, T_d, P_d, maxiter)
+            rho = props(T_d, P_d, comp_d, names=('rho',))['rho'][0]
+            V_d = W_d / (rho * A_d)
+
+        impulse = (P_d * A_d + W_d * V_d + inputs[f'{o}:stat:P'] * inputs[f'{o}:stat:area'] +
+                   inputs[f'{o}:stat:W'] * inputs[f'{o}:stat:V'])
+
+        # mixed out static state from the conservation of energy and impulse
+        ht = inputs['ht']
+        W = inputs['W']
+        A = A_d + inputs[f'{o}:stat:area'] if design else inputs['area']
+        composition = inputs['composition']
+
+        # subsonic root of P*A + W**2*R*T/(P*A) = impulse, at the temperature of the total enthalpy
+        T = props.solve_T('h', ht, outputs['stat:T'], outputs['stat:P'], composition, h_scale, maxiter=maxiter)
+        R = props(T, outputs['stat:P'], composition, names=('R',))['R'][0]
+        P = (impulse + np.sqrt(np.maximum(impulse**2 - 4. * W**2 * R * T, 0.))) / (2. * A)
+
+        def resid(T, P):
+            p = props(T, P, composition, names=('h', 'rho'))
+            h, h_T, h_P, _ = p['h']
+            rho, rho_T, rho_P, _ = p['rho']
+            V = W / (rho * A)
+            V_T = -V / rho * rho_T
+            V_P = -V / rho * rho_P
+            return ((h + 0.5 * V**2 - ht) / ht, (P * A + W * V - impulse) / impulse,
+                    (h_T + V * V_T) / ht, (h_P + V * V_P) / ht, W * V_T / impulse, (A + W * V_P) / impulse)
+
+        outputs['stat:T'], outputs['stat:P'] = Ts, Ps = self._newton(resid, T, P, maxiter)
+
+        # mixed out total state, with the enthalpy and the entropy of the static state
+        S_s = props(Ts, Ps, composition, names=('S',))['S'][0]
+        Tt = props.solve_T('h', ht, outputs['tot:T'], Ps, composition, h_scale, maxiter=maxiter)
+        gamma = props(Ts, Ps, composition, names=('gamma',))['gamma'][0]
+        Pt = Ps * (Tt / Ts)**(gamma / (gamma - 1.))
+
+        Tt, Pt = props.solve_TP(('h', 'S'), (ht, S_s), Tt, Pt, composition, (h_scale, S_scale), maxiter=maxiter)
+        outputs['tot:T'] = Tt
+        outputs['P_tot'] = Pt / self._psi
+
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in explicit.items():
+            outputs[name] = self._explicit[name] * val
+        outputs['Fl_O:tot:composition'] = composition
+
+    def linearize(self, inputs, outputs, J):
+        states, explicit = self._evaluate(inputs, outputs)
+        ones = np.ones(self.options['num_nodes'])
+        ns = len(self._props.species)
+
+        for of, (val, derivs), scale in ([(name, val, 1.) for name, val in states.items()] +
+                                         [(name, val, -self._explicit[name]) for name, val in explicit.items()]):
+            for wrt in self._wrt:
+                J[of, wrt] = scale * derivs.get(wrt, 0.) * ones
+            for wrt in self._comps:
+                J[of, wrt] = scale * (derivs.get(wrt, 0.) * np.ones((ns, ones.size))).T.ravel()
+
+
 class Mixer(Element):
     """
     Combines two incomming flows into a single outgoing flow
@@ -141,6 +519,10 @@ class Mixer(Element):
                               desc='control for which stream has its area varied to match static pressure (1 means, you vary Fl_I1)')
         self.options.declare('internal_solver', default=True,
                               desc='If True, a newton solver is used inside the mixer to converge the impulse balance')
+        self.options.declare('fused_thermo', default=True, types=bool,
+                              desc='If True, the TABULAR thermo static and mixed out flow properties are computed by '
+                                   'a single MixerFlow component instead of the Thermo groups and the impulse_converge '
+                                   'group.')
 
         
 
@@ -185,7 +567,10 @@ class Mixer(Element):
                 ('Fl_I2_calc:stat:area', 'Fl_I2_stat_calc.area')
             ]
 
-        if design:
+        fused = thermo_method == 'TABULAR' and self.options['fused_thermo']
+
+        # with fused_thermo the static state of the designed stream is computed by MixerFlow
+        if design and not fused:
             # internal flow station to compute the area that is needed to match the static pressures
             if self.options['designed_stream'] == 1:
                 Fl1_stat = Thermo(mode='static_Ps', fl_name="Fl_I1_calc:stat", 
@@ -215,7 +600,7 @@ class Mixer(Element):
                                    promotes_outputs=[('area_sum', 'area')])
                 self.connect('Fl_I2_calc:stat:area', 'area_calc.Fl_I2:stat:area')
 
-        else:
+        elif not fused:
             if self.options['designed_stream'] == 1:
                 Fl1_stat = Thermo(mode='static_A', fl_name="Fl_I1_calc:stat", 
                                   method=thermo_method, 
@@ -248,65 +633,86 @@ class Mixer(Element):
                                            ('mix:W', 'Fl_I2:stat:W'), ('mix:composition', 'Fl_I2:tot:composition'), ('mix:h', 'Fl_I2:tot:h')])
 
 
-        if self.options['designed_stream'] == 1:
-            self.add_subsystem('impulse_mix', MixImpulse(),
-                               promotes_inputs=[('Fl_I1:stat:W','Fl_I1_calc:stat:W'), ('Fl_I1:stat:P','Fl_I1_calc:stat:P'),
-                                                ('Fl_I1:stat:V','Fl_I1_calc:stat:V'), ('Fl_I1:stat:area','Fl_I1_calc:stat:area'),
-                                                'Fl_I2:stat:W', 'Fl_I2:stat:P', 'Fl_I2:stat:V', 'Fl_I2:stat:area'])
+        if fused:
+            d = self.options['designed_stream']
+            flow = MixerFlow(designed_stream=d, design=design, spec=thermo_data,
+                             compositions=[flow1_composition, flow2_composition, self.flow_add.output_port_data()])
+            # the total pressure and the area of the designed stream keep the names they have in the Thermo based mixer
+            prom_in = ['Fl_I1:*', 'Fl_I2:*']
+            if not design:
+                prom_in += ['area', ('calc:area', f'Fl_I{d}_stat_calc.area')]
+            self.add_subsystem('mix_flow', flow, promotes_inputs=prom_in,
+                               promotes_outputs=['Fl_O:*', f'Fl_I{d}_calc:stat:*', ('P_tot', 'balance.P_tot')])
+            self.connect('flow_add.composition_out', 'mix_flow.composition')
+            self.connect('flow_add.mass_avg_h', 'mix_flow.ht')
+            self.connect('flow_add.Wout', 'mix_flow.W')
+
+            if design:
+                # total area of the two streams at the same static pressure
+                self.add_subsystem('area_calc', AreaSum(), promotes_inputs=[f'Fl_I{3-d}:stat:area'],
+                                   promotes_outputs=[('area_sum', 'area')])
+                self.connect(f'Fl_I{d}_calc:stat:area', f'area_calc.Fl_I{d}:stat:area')
+
         else:
-            self.add_subsystem('impulse_mix', MixImpulse(),
-                               promotes_inputs=['Fl_I1:stat:W', 'Fl_I1:stat:P', 'Fl_I1:stat:V', 'Fl_I1:stat:area',
-                                                ('Fl_I2:stat:W','Fl_I2_calc:stat:W'), ('Fl_I2:stat:P','Fl_I2_calc:stat:P'),
-                                                ('Fl_I2:stat:V','Fl_I2_calc:stat:V'), ('Fl_I2:stat:area','Fl_I2_calc:stat:area')])
-
-
-        # group to converge for the impulse balance
-        conv = self.add_subsystem('impulse_converge', om.Group(), promotes=['*'])
-
-        if self.options['internal_solver']:
-            newton = conv.nonlinear_solver = om.NewtonSolver()
-            newton.options['maxiter'] = 30
-            newton.options['atol'] = 1e-5
-            newton.options['rtol'] = 1e-99
-            newton.options['solve_subsystems'] = True
-            newton.options['max_sub_solves'] = 20
-            newton.options['reraise_child_analysiserror'] = False
-            newton.linesearch = om.BoundsEnforceLS()
-            newton.linesearch.options['iprint'] = -1
-            conv.linear_solver = om.DirectSolver()
-
-        out_tot = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
-                         method=thermo_method, 
-                         thermo_kwargs={'composition':flow1_composition, 
-                                        'spec':thermo_data})
-        conv.add_subsystem('out_tot', out_tot, promotes_outputs=['Fl_O:tot:*'])
-        self.connect('flow_add.composition_out', 'out_tot.composition')
-        self.connect('flow_add.mass_avg_h', 'out_tot.h')
-        # note: gets Pt from the balance comp
-
-        out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat', 
-                          method=thermo_method, 
-                          thermo_kwargs={'composition':flow1_composition, 
-                                         'spec':thermo_data})
-        conv.add_subsystem('out_stat', out_stat, promotes_outputs=['Fl_O:stat:*'], promotes_inputs=['area', ])
-        self.connect('flow_add.composition_out', 'out_stat.composition')
-        self.connect('flow_add.Wout','out_stat.W')
-        conv.connect('Fl_O:tot:S', 'out_stat.S')
-        self.connect('flow_add.mass_avg_h', 'out_stat.ht')
-        conv.connect('Fl_O:tot:P', 'out_stat.guess:Pt')
-        conv.connect('Fl_O:tot:gamma', 'out_stat.guess:gamt')
-
-        conv.add_subsystem('imp_out', Impulse())
-        conv.connect('Fl_O:stat:P', 'imp_out.P')
-        conv.connect('Fl_O:stat:area', 'imp_out.area')
-        conv.connect('Fl_O:stat:V', 'imp_out.V')
-        conv.connect('Fl_O:stat:W', 'imp_out.W')
-
-        balance = conv.add_subsystem('balance', om.BalanceComp())
-        balance.add_balance('P_tot', val=100, units='psi', eq_units='N', lower=1e-3, upper=10000)
-        conv.connect('balance.P_tot', 'out_tot.P')
-        conv.connect('imp_out.impulse', 'balance.lhs:P_tot')
-        self.connect('impulse_mix.impulse_mix', 'balance.rhs:P_tot') #note that this connection comes from outside the convergence group
+            if self.options['designed_stream'] == 1:
+                self.add_subsystem('impulse_mix', MixImpulse(),
+                                   promotes_inputs=[('Fl_I1:stat:W','Fl_I1_calc:stat:W'), ('Fl_I1:stat:P','Fl_I1_calc:stat:P'),
+                                                    ('Fl_I1:stat:V','Fl_I1_calc:stat:V'), ('Fl_I1:stat:area','Fl_I1_calc:stat:area'),
+                                                    'Fl_I2:stat:W', 'Fl_I2:stat:P', 'Fl_I2:stat:V', 'Fl_I2:stat:area'])
+            else:
+                self.add_subsystem('impulse_mix', MixImpulse(),
+                                   promotes_inputs=['Fl_I1:stat:W', 'Fl_I1:stat:P', 'Fl_I1:stat:V', 'Fl_I1:stat:area',
+                                                    ('Fl_I2:stat:W','Fl_I2_calc:stat:W'), ('Fl_I2:stat:P','Fl_I2_calc:stat:P'),
+                                                    ('Fl_I2:stat:V','Fl_I2_calc:stat:V'), ('Fl_I2:stat:area','Fl_I2_calc:stat:area')])
+
+
+            # group to converge for the impulse balance
+            conv = self.add_subsystem('impulse_converge', om.Group(), promotes=['*'])
+
+            if self.options['internal_solver']:
+                newton = conv.nonlinear_solver = om.NewtonSolver()
+                newton.options['maxiter'] = 30
+                newton.options['atol'] = 1e-5
+                newton.options['rtol'] = 1e-99
+                newton.options['solve_subsystems'] = True
+                newton.options['max_sub_solves'] = 20
+                newton.options['reraise_child_analysiserror'] = False
+                newton.linesearch = om.BoundsEnforceLS()
+                newton.linesearch.options['iprint'] = -1
+                conv.linear_solver = om.DirectSolver(assemble_jac=True)
+
+            out_tot = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
+                             method=thermo_method, 
+                             thermo_kwargs={'composition':flow1_composition, 
+                                            'spec':thermo_data})
+            conv.add_subsystem('out_tot', out_tot, promotes_outputs=['Fl_O:tot:*'])
+            self.connect('flow_add.composition_out', 'out_tot.composition')
+            self.connect('flow_add.mass_avg_h', 'out_tot.h')
+            # note: gets Pt from the balance comp
+
+            out_stat = Thermo(mode='static_A', fl_name='Fl_O:stat', 
+                              method=thermo_method, 
+                              thermo_kwargs={'composition':flow1_composition, 
+                                             'spec':thermo_data})
+            conv.add_subsystem('out_stat', out_stat, promotes_outputs=['Fl_O:stat:*'], promotes_inputs=['area', ])
+            self.connect('flow_add.composition_out', 'out_stat.composition')
+            self.connect('flow_add.Wout','out_stat.W')
+            conv.connect('Fl_O:tot:S', 'out_stat.S')
+            self.connect('flow_add.mass_avg_h', 'out_stat.ht')
+            conv.connect('Fl_O:tot:P', 'out_stat.guess:Pt')
+            conv.connect('Fl_O:tot:gamma', 'out_stat.guess:gamt')
+
+            conv.add_subsystem('imp_out', Impulse())
+            conv.connect('Fl_O:stat:P', 'imp_out.P')
+            conv.connect('Fl_O:stat:area', 'imp_out.area')
+            conv.connect('Fl_O:stat:V', 'imp_out.V')
+            conv.connect('Fl_O:stat:W', 'imp_out.W')
+
+            balance = conv.add_subsystem('balance', om.BalanceComp())
+            balance.add_balance('P_tot', val=100, units='psi', eq_units='N', lower=1e-3, upper=10000)
+            conv.connect('balance.P_tot', 'out_tot.P')
+            conv.connect('imp_out.impulse', 'balance.lhs:P_tot')
+            self.connect('impulse_mix.impulse_mix', 'balance.rhs:P_tot') #note that this connection comes from outside the convergence group
 
         super().setup()
 
@@ -1,10 +1,14 @@
 """ Class definition for Nozzle."""
 
+import numpy as np
+
 import openmdao.api as om
+from openmdao.utils.units import unit_conversion
 
-from pycycle.constants import g_c
+from pycycle.constants import g_c, TAB_AIR_FUEL_COMPOSITION
 from pycycle.thermo.cea import species_data
 from pycycle.thermo.thermo import Thermo
+from pycycle.thermo.tabular.tabular_thermo import TabularProps, tabular_flow_vars, lin_derivs
 from pycycle.flow_in import FlowIn
 from pycycle.element_base import Element
 
@@ -16,14 +20,20 @@ class PR_bal(om.ImplicitComponent):
     pressure ratio (Pt/Ps) drops below 1.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('Ps_exhaust', val=5.0, units='lbf/inch**2', desc='Exhaust static pressure')
-        self.add_input('Ps_calc', val=5.0, units='lbf/inch**2', desc='Calculated exhaust static pressure')
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('Ps_exhaust', val=5.0, shape=nn, units='lbf/inch**2', desc='Exhaust static pressure')
+        self.add_input('Ps_calc', val=5.0, shape=nn, units='lbf/inch**2', desc='Calculated exhaust static pressure')
 
-        self.add_output('PR', val=2.0, lower=1.000001, units=None, desc='Total-to-staic pressure ratio')
+        self.add_output('PR', val=2.0, shape=nn, lower=1.000001, units=None, desc='Total-to-staic pressure ratio')
 
-        self.declare_partials('PR', 'Ps_exhaust', val=1.0)
-        self.declare_partials('PR', 'Ps_calc', val=-1.0)
+        self.declare_partials('PR', 'Ps_exhaust', val=1.0, rows=ar, cols=ar)
+        self.declare_partials('PR', 'Ps_calc', val=-1.0, rows=ar, cols=ar)
 
     def apply_nonlinear(self, inputs, outputs, resids):
         resids['PR'] = inputs['Ps_exhaust'] - inputs['Ps_calc']
@@ -37,18 +47,24 @@ class PressureCalcs(om.ExplicitComponent):
     Performs pressure calculations to get throat conditions.
     """
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('Pt_in', val=10.0, units='lbf/inch**2', desc='Entrance total pressure')
-        self.add_input('PR', val=2.0, desc='Total-to-staic pressure ratio')
-        self.add_input('dPqP', val=0.0, desc='Total pressure loss from inlet to throat')
+        self.add_input('Pt_in', val=10.0, shape=nn, units='lbf/inch**2', desc='Entrance total pressure')
+        self.add_input('PR', val=2.0, shape=nn, desc='Total-to-staic pressure ratio')
+        self.add_input('dPqP', val=0.0, shape=nn, desc='Total pressure loss from inlet to throat')
 
         # outputs
-        self.add_output('Pt_th', shape=1, units='lbf/inch**2', desc='Throat total pressure', lower=1e-3)
-        self.add_output('Ps_calc', val=5.0, units='lbf/inch**2', desc='Calculated exhaust static pressure')
+        self.add_output('Pt_th', shape=nn, units='lbf/inch**2', desc='Throat total pressure', lower=1e-3)
+        self.add_output('Ps_calc', val=5.0, shape=nn, units='lbf/inch**2', desc='Calculated exhaust static pressure')
 
-        self.declare_partials('Pt_th', ['Pt_in', 'dPqP'])
-        self.declare_partials('Ps_calc', ['Pt_in', 'PR', 'dPqP'])
+        self.declare_partials('Pt_th', ['Pt_in', 'dPqP'], rows=ar, cols=ar)
+        self.declare_partials('Ps_calc', ['Pt_in', 'PR', 'dPqP'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Pt_th'] = inputs['Pt_in'] * (1. - inputs['dPqP'])
@@ -70,39 +86,43 @@ class PerformanceCalcs(om.ExplicitComponent):
     def initialize(self):
         self.options.declare('lossCoef', default='Cfg',
                               desc='If set to "Cfg", then Gross Thrust Coefficient is an input.')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         lossCoef = self.options['lossCoef']
 
         if not (lossCoef=="Cfg" or lossCoef=="Cv"):
             raise ValueError("lossCoef must be 'Cfg' or 'Cv', but '{}' was given.".format(lossCoef))
 
         # input
-        self.add_input('W_in', val=1.0, units='lbm/s', desc='incoming Mass flow rate')
-        self.add_input('Ps_calc', val=5.0, units='lbf/inch**2', desc='Exhaust static pressure')
-        self.add_input('V_ideal', val=10.0, units='ft/s', desc='Ideal exit velocity')
+        self.add_input('W_in', val=1.0, shape=nn, units='lbm/s', desc='incoming Mass flow rate')
+        self.add_input('Ps_calc', val=5.0, shape=nn, units='lbf/inch**2', desc='Exhaust static pressure')
+        self.add_input('V_ideal', val=10.0, shape=nn, units='ft/s', desc='Ideal exit velocity')
         # self.add_input('A_ideal', val=1.0, units='inch**2', desc='Ideal exit area')
 
         if lossCoef == 'Cfg':
-            self.add_input('Cfg', val=1.0, desc='Gross thrust coefficient')
+            self.add_input('Cfg', val=1.0, shape=nn, desc='Gross thrust coefficient')
         else:
-            self.add_input('Cv', val=1.0, desc='Velocity coefficient')
-            self.add_input('Cang', val=1.0, desc='Angle coefficient')
-            self.add_input('CmixCorr', val=1.0, desc='Mix efficiency coefficient')
-            self.add_input('V_actual', val=10.0, units='ft/s', desc='Actual exit velocity')
-            self.add_input('A_actual', val=1.0, units='inch**2', desc='Actal exit area')
-            self.add_input('Ps_actual', val=5.0, units='lbf/inch**2', desc='Actual exit static pressure')
+            self.add_input('Cv', val=1.0, shape=nn, desc='Velocity coefficient')
+            self.add_input('Cang', val=1.0, shape=nn, desc='Angle coefficient')
+            self.add_input('CmixCorr', val=1.0, shape=nn, desc='Mix efficiency coefficient')
+            self.add_input('V_actual', val=10.0, shape=nn, units='ft/s', desc='Actual exit velocity')
+            self.add_input('A_actual', val=1.0, shape=nn, units='inch**2', desc='Actal exit area')
+            self.add_input('Ps_actual', val=5.0, shape=nn, units='lbf/inch**2', desc='Actual exit static pressure')
 
         # output
-        self.add_output('Fg_ideal', val=12000.0, shape=1, units='lbf', desc='Ideal gross thrust', ref=1e2, res_ref=1e3)
-        self.add_output('Fg', val=11800.0, shape=1, units='lbf', desc='Gross thrust', ref=1e2, res_ref=1e3)
+        self.add_output('Fg_ideal', val=12000.0, shape=nn, units='lbf', desc='Ideal gross thrust', ref=1e2, res_ref=1e3)
+        self.add_output('Fg', val=11800.0, shape=nn, units='lbf', desc='Gross thrust', ref=1e2, res_ref=1e3)
 
-        self.declare_partials('Fg_ideal', ['W_in', 'V_ideal'])
+        self.declare_partials('Fg_ideal', ['W_in', 'V_ideal'], rows=ar, cols=ar)
         if lossCoef == 'Cfg':
             # self.declare_partials('Fg', ['W_in', 'V_ideal', 'Ps_calc', 'A_ideal', 'Cfg'])
-            self.declare_partials('Fg', ['W_in', 'V_ideal', 'Ps_calc', 'Cfg'])
+            self.declare_partials('Fg', ['W_in', 'V_ideal', 'Ps_calc', 'Cfg'], rows=ar, cols=ar)
         else:
-            self.declare_partials('Fg', ['W_in', 'V_actual', 'Cv', 'Cang', 'CmixCorr', 'Ps_actual', 'Ps_calc', 'A_actual'])
+            self.declare_partials('Fg', ['W_in', 'V_actual', 'Cv', 'Cang', 'CmixCorr', 'Ps_actual', 'Ps_calc', 'A_actual'], rows=ar, cols=ar)
 
 
     def compute(self, inputs, outputs):
@@ -148,8 +168,12 @@ class Mux(om.ExplicitComponent):
                               desc='Nozzle type: CD, CV, or CD_CV.')
         self.options.declare('fl_out_name', default='Fl_O',
                               desc='Outflow station prefix.')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         nozzType = self.options['nozzType']
         fl_out_name = self.options['fl_out_name']
 
@@ -158,155 +182,400 @@ class Mux(om.ExplicitComponent):
             raise ValueError(msg)
 
         # input
-        self.add_input('Ps_calc', val=5.0, units='lbf/inch**2', desc='Exhaust static pressure')
-        self.add_input('S', val=0.0, desc='entropy', units='Btu/(lbm*degR)')
+        self.add_input('Ps_calc', val=5.0, shape=nn, units='lbf/inch**2', desc='Exhaust static pressure')
+        self.add_input('S', val=0.0, shape=nn, desc='entropy', units='Btu/(lbm*degR)')
 
         for prefix in ('Ps', 'MN'):
-            self.add_input('%s:h' % prefix, val=0.0, desc='static enthalpy', units='Btu/lbm')
-            self.add_input('%s:T' % prefix, val=0.0, desc='static temperature', units='degR')
-            self.add_input('%s:P' % prefix, val=0.0, desc='static pressure', units='lbf/inch**2')
-            self.add_input('%s:rho' % prefix, val=0.0, desc='static density', units='lbm/ft**3')
-            self.add_input('%s:gamma' % prefix, val=0.0, desc='static gamma')
-            self.add_input('%s:V' % prefix, val=0.0, desc='Velocity', units='ft/s')
-            self.add_input('%s:Vsonic' % prefix, val=0.0, desc='Speed of sound', units='ft/s')
-            self.add_input('%s:MN' % prefix, val=0.0, desc='Mach number')
-            self.add_input('%s:area' % prefix, val=0.0, desc='Flow area', units='inch**2')
-            self.add_input('%s:Cp' % prefix, val=0.0, desc='specific heat at constant pressure', units='Btu/(lbm*degR)')
-            self.add_input('%s:Cv' % prefix, val=0.0, desc='specific heat at constant volume', units='Btu/(lbm*degR)')
-            self.add_input('%s:W' % prefix, val=0.0, desc='Mass flow rate', units='lbm/s')
+            self.add_input('%s:h' % prefix, val=0.0, shape=nn, desc='static enthalpy', units='Btu/lbm')
+            self.add_input('%s:T' % prefix, val=0.0, shape=nn, desc='static temperature', units='degR')
+            self.add_input('%s:P' % prefix, val=0.0, shape=nn, desc='static pressure', units='lbf/inch**2')
+            self.add_input('%s:rho' % prefix, val=0.0, shape=nn, desc='static density', units='lbm/ft**3')
+            self.add_input('%s:gamma' % prefix, val=0.0, shape=nn, desc='static gamma')
+            self.add_input('%s:V' % prefix, val=0.0, shape=nn, desc='Velocity', units='ft/s')
+            self.add_input('%s:Vsonic' % prefix, val=0.0, shape=nn, desc='Speed of sound', units='ft/s')
+            self.add_input('%s:MN' % prefix, val=0.0, shape=nn, desc='Mach number')
+            self.add_input('%s:area' % prefix, val=0.0, shape=nn, desc='Flow area', units='inch**2')
+            self.add_input('%s:Cp' % prefix, val=0.0, shape=nn, desc='specific heat at constant pressure', units='Btu/(lbm*degR)')
+            self.add_input('%s:Cv' % prefix, val=0.0, shape=nn, desc='specific heat at constant volume', units='Btu/(lbm*degR)')
+            self.add_input('%s:W' % prefix, val=0.0, shape=nn, desc='Mass flow rate', units='lbm/s')
 
         # output
-        self.add_output('choked', shape=1, desc='Flag for choked flow')
+        self.add_output('choked', shape=nn, desc='Flag for choked flow')
 
         for prefix in ('Throat', fl_out_name):
-            self.add_output('%s:stat:h' % prefix, shape=1, desc='static enthalpy', units='Btu/lbm')
-            self.add_output('%s:stat:T' % prefix, shape=1, desc='static temperature', units='degR')
-            self.add_output('%s:stat:P' % prefix, shape=1, desc='static pressure', units='lbf/inch**2')
-            self.add_output('%s:stat:rho' % prefix, shape=1, desc='static density', units='lbm/ft**3')
-            self.add_output('%s:stat:gamma' % prefix, shape=1, desc='static gamma')
-            self.add_output('%s:stat:S' % prefix, shape=1, desc='entropy', units='Btu/(lbm*degR)')
-            self.add_output('%s:stat:Cp' % prefix, shape=1, desc='specific heat at constant pressure', units='Btu/(lbm*degR)')
-            self.add_output('%s:stat:Cv' % prefix, shape=1, desc='specific heat at constant volume', units='Btu/(lbm*degR)')
-            self.add_output('%s:stat:V' % prefix, shape=1, desc='Velocity', units='ft/s')
-            self.add_output('%s:stat:Vsonic' % prefix, shape=1, desc='Speed of sound', units='ft/s')
-            self.add_output('%s:stat:MN' % prefix, shape=1, desc='Mach number')
-            self.add_output('%s:stat:area' % prefix, shape=1, desc='Flow area', units='inch**2')
-            self.add_output('%s:stat:W' % prefix, shape=1, desc='Mass Flow Rate', units='lbm/s')
+            self.add_output('%s:stat:h' % prefix, shape=nn, desc='static enthalpy', units='Btu/lbm')
+            self.add_output('%s:stat:T' % prefix, shape=nn, desc='static temperature', units='degR')
+            self.add_output('%s:stat:P' % prefix, shape=nn, desc='static pressure', units='lbf/inch**2')
+            self.add_output('%s:stat:rho' % prefix, shape=nn, desc='static density', units='lbm/ft**3')
+            self.add_output('%s:stat:gamma' % prefix, shape=nn, desc='static gamma')
+            self.add_output('%s:stat:S' % prefix, shape=nn, desc='entropy', units='Btu/(lbm*degR)')
+            self.add_output('%s:stat:Cp' % prefix, shape=nn, desc='specific heat at constant pressure', units='Btu/(lbm*degR)')
+            self.add_output('%s:stat:Cv' % prefix, shape=nn, desc='specific heat at constant volume', units='Btu/(lbm*degR)')
+            self.add_output('%s:stat:V' % prefix, shape=nn, desc='Velocity', units='ft/s')
+            self.add_output('%s:stat:Vsonic' % prefix, shape=nn, desc='Speed of sound', units='ft/s')
+            self.add_output('%s:stat:MN' % prefix, shape=nn, desc='Mach number')
+            self.add_output('%s:stat:area' % prefix, shape=nn, desc='Flow area', units='inch**2')
+            self.add_output('%s:stat:W' % prefix, shape=nn, desc='Mass Flow Rate', units='lbm/s')
 
         self.flow_out = ['h', 'T', 'P', 'rho', 'gamma', 'Cp', 'Cv', 'V', 'Vsonic', 'MN', 'area', 'W']
 
-        self.declare_partials('*:stat:h', '*:h')
-        self.declare_partials('*:stat:T', '*:T')
-        self.declare_partials('*:stat:P', '*:P')
-        self.declare_partials('*:stat:rho', '*:rho')
-        self.declare_partials('*:stat:gamma', '*:gamma')
-        self.declare_partials('*:stat:S', 'S')
-        self.declare_partials('*:stat:Cp', '*:Cp')
-        self.declare_partials('*:stat:Cv', '*:Cv')
-        self.declare_partials('*:stat:V', '*:V')
-        self.declare_partials('*:stat:Vsonic', '*:Vsonic')
-        self.declare_partials('*:stat:MN', '*:MN')
-        self.declare_partials('*:stat:area', '*:area')
-        self.declare_partials('*:stat:W', '*:W')
+        self.declare_partials('*:stat:h', '*:h', rows=ar, cols=ar)
+        self.declare_partials('*:stat:T', '*:T', rows=ar, cols=ar)
+        self.declare_partials('*:stat:P', '*:P', rows=ar, cols=ar)
+        self.declare_partials('*:stat:rho', '*:rho', rows=ar, cols=ar)
+        self.declare_partials('*:stat:gamma', '*:gamma', rows=ar, cols=ar)
+        self.declare_partials('*:stat:S', 'S', rows=ar, cols=ar)
+        self.declare_partials('*:stat:Cp', '*:Cp', rows=ar, cols=ar)
+        self.declare_partials('*:stat:Cv', '*:Cv', rows=ar, cols=ar)
+        self.declare_partials('*:stat:V', '*:V', rows=ar, cols=ar)
+        self.declare_partials('*:stat:Vsonic', '*:Vsonic', rows=ar, cols=ar)
+        self.declare_partials('*:stat:MN', '*:MN', rows=ar, cols=ar)
+        self.declare_partials('*:stat:area', '*:area', rows=ar, cols=ar)
+        self.declare_partials('*:stat:W', '*:W', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         nozzType = self.options['nozzType']
         fl_out_name = self.options['fl_out_name']
 
         # Determine if nozzle is choked and pass appropriate flow parameters to nozzle exit
-        if nozzType == "CV":
-            if inputs['Ps_calc'] < inputs['MN:P']:
-                prefix = "MN"
-            else:
-                prefix = "Ps"
-
-            for p in self.flow_out:
-                outputs['Throat:stat:%s' %p] = inputs['%s:%s' %(prefix, p)]
-                outputs['%s:stat:%s' %(fl_out_name, p)] = inputs['%s:%s' %(prefix, p)]
-
-            outputs['Throat:stat:S'] = inputs['S']
-            outputs['%s:stat:S' %fl_out_name] = inputs['S']
-
-        elif nozzType == "CD":
-            for p in self.flow_out:
-                outputs['Throat:stat:%s' %p] = inputs['MN:%s' %p]
-                outputs['%s:stat:%s' %(fl_out_name, p)] = inputs['Ps:%s' %p]
-
-            outputs['Throat:stat:S'] = inputs['S']
-            outputs['%s:stat:S' %fl_out_name] = inputs['S']
+        if nozzType == "CD":
+            choked = np.ones(self.options['num_nodes'], dtype=bool)
+        else:
+            choked = inputs['Ps_calc'] < inputs['MN:P']
 
-        elif nozzType == "CD_CV":
-            if inputs['Ps_calc'] < inputs['MN:P']:
-                prefix = "MN"
+        for p in self.flow_out:
+            throat = np.where(choked, inputs['MN:%s' %p], inputs['Ps:%s' %p])
+            outputs['Throat:stat:%s' %p] = throat
+            if nozzType == "CV":
+                outputs['%s:stat:%s' %(fl_out_name, p)] = throat
             else:
-                prefix = "Ps"
-
-            for p in self.flow_out:
-                outputs['Throat:stat:%s' %p] = inputs['%s:%s' %(prefix, p)]
                 outputs['%s:stat:%s' %(fl_out_name, p)] = inputs['Ps:%s' %p]
 
-            outputs['Throat:stat:S'] = inputs['S']
-            outputs['%s:stat:S' %fl_out_name] = inputs['S']
+        outputs['Throat:stat:S'] = inputs['S']
+        outputs['%s:stat:S' %fl_out_name] = inputs['S']
 
     def compute_partials(self, inputs, J):
         nozzType = self.options['nozzType']
         fl_out_name = self.options['fl_out_name']
 
-        if nozzType == "CV":
+        if nozzType == "CD":
+            choked = np.ones(self.options['num_nodes'])
+        else:
+            choked = (inputs['Ps_calc'] < inputs['MN:P']).astype(float)
+
+        for p in self.flow_out:
+            J['Throat:stat:%s' %p, 'MN:%s' %p] = choked
+            J['Throat:stat:%s' %p, 'Ps:%s' %p] = 1. - choked
 
-            if inputs['Ps_calc'] < inputs['MN:P']:
-                prefix = "MN"
-                other = "Ps"
+            if nozzType == "CV":
+                J['%s:stat:%s' %(fl_out_name, p), 'MN:%s' %p] = choked
+                J['%s:stat:%s' %(fl_out_name, p), 'Ps:%s' %p] = 1. - choked
             else:
-                prefix = "Ps"
-                other = "MN"
+                J['%s:stat:%s' %(fl_out_name, p), 'MN:%s' %p] = 0.
+                J['%s:stat:%s' %(fl_out_name, p), 'Ps:%s' %p] = 1.
 
-            for p in self.flow_out:
-                J['Throat:stat:%s' %p, '%s:%s' %(prefix, p)] = 1.
-                J['%s:stat:%s' %(fl_out_name, p), '%s:%s' %(prefix, p)] = 1.
+        J['Throat:stat:S', 'S'] = 1.
+        J['%s:stat:S' %fl_out_name, 'S'] = 1.
+
+def _select(mask, a, b):
+    """
+    Per node choice between the (value, derivatives) pairs a and b.
+    """
+    derivs = {name: np.where(mask, a[1].get(name, 0.), b[1].get(name, 0.)) for name in set(a[1]).union(b[1])}
+    return np.where(mask, a[0], b[0]), derivs
 
-                J['Throat:stat:%s' %p, '%s:%s' %(other, p)] = 0.
-                J['%s:stat:%s' %(fl_out_name, p), '%s:%s' %(other, p)] = 0.
 
-            J['Throat:stat:S', 'S'] = 1.
-            J['%s:stat:S' %fl_out_name, 'S'] = 1.
+class NozzleFlow(om.ImplicitComponent):
+    """
+    Throat total, throat static and ideal exit flow properties of a nozzle for the TABULAR thermo.
 
-        elif nozzType == "CD":
-            for p in self.flow_out:
-                J['Throat:stat:%s' %p, 'MN:%s' %p] = 1.0
-                J['%s:stat:%s' %(fl_out_name, p), 'Ps:%s' %p] = 1.0
+    Replaces the four Thermo groups and the Mux of the nozzle with a single component. The throat total
+    temperature, the choked throat static temperature and pressure, the static temperature at the exhaust
+    pressure and the ideal exit temperature are the states, which `solve_nonlinear` converges together
+    with a vectorized Newton. The flow station outputs are explicit functions of the states.
+    """
 
-            J['Throat:stat:S', 'S'] = 1.0
-            J['%s:stat:S' %fl_out_name, 'S'] = 1.0
+    # output name -> (units of the value computed from the table, output units, description)
+    stat_vars = tabular_flow_vars(True, ('h', 'T', 'P', 'rho', 'gamma', 'S', 'Cp', 'Cv', 'V', 'Vsonic', 'MN', 'area', 'W'))
+    tot_vars = tabular_flow_vars(False, ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'))
 
-        elif nozzType == "CD_CV":
-            if inputs['Ps_calc'] < inputs['MN:P']:
-                prefix = "MN"
-                other = "Ps"
+    def initialize(self):
+        self.options.declare('nozzType', default='CV', values=('CV', 'CD', 'CD_CV'),
+                              desc='Nozzle type: CD, CV, or CD_CV.')
+        self.options.declare('fl_out_name', default='Fl_O',
+                              desc='Outflow station prefix.')
+        self.options.declare('spec', recordable=False,
+                              desc='Tabular thermo data')
+        self.options.declare('composition', default=None,
+                              desc='Composition of the flow (default: TAB_AIR_FUEL_COMPOSITION)')
+        self.options.declare('maxiter', default=50, types=int,
+                              desc='Maximum number of Newton iterations in solve_nonlinear, an AnalysisError is '
+                                   'raised if the flow states are not converged')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+        fl_out_name = self.options['fl_out_name']
+        composition = self.options['composition']
+        if composition is None:
+            composition = TAB_AIR_FUEL_COMPOSITION
+
+        self._props = props = TabularProps(self.options['spec'], composition)
+        ns = len(props.species)
+        T_min, T_max = props.T_bounds
+
+        # the residuals have the units of the Thermo balances they replace
+        self._h_scale = unit_conversion('J/kg', 'cal/g')[0]
+        self._S_scale = unit_conversion('J/kg/degK', 'cal/(g*degK)')[0]
+
+        comp_val = np.array([composition[k] for k in props.species])
+        if nn > 1:
+            comp_val = np.tile(comp_val, (nn, 1))
+
+        self.add_input('Fl_I:tot:h', val=1.0, shape=nn, units='J/kg', desc='Entrance total enthalpy')
+        self.add_input('Fl_I:tot:S', val=1.0, shape=nn, units='J/kg/degK', desc='Entrance entropy')
+        self.add_input('Fl_I:stat:W', val=1.0, shape=nn, units='kg/s', desc='Mass flow rate')
+        self.add_input('Fl_I:tot:composition', val=comp_val, desc='Composition of the flow')
+        self.add_input('Pt_th', val=1e5, shape=nn, units='Pa', desc='Throat total pressure')
+        self.add_input('Ps_calc', val=1e5, shape=nn, units='Pa', desc='Calculated exhaust static pressure')
+
+        self.add_output('tot:T', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Throat total temperature')
+        self.add_output('MN:T', val=450., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Static temperature of the choked throat')
+        self.add_output('MN:P', val=5e4, shape=nn, units='Pa', lower=10., ref=1e5,
+                        desc='Static pressure of the choked throat')
+        self.add_output('Ps:T', val=450., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Static temperature at the calculated exhaust static pressure')
+        self.add_output('ideal:T', val=450., shape=nn, units='degK', lower=T_min, upper=T_max,
+                        desc='Static temperature of the ideal expansion to the calculated exhaust static pressure')
+
+        # name of the explicit output -> conversion factor from the units of the table
+        self._explicit = {}
+        for name, (si_units, units, desc) in self.tot_vars.items():
+            self._add_explicit(f'{fl_out_name}:tot:{name}', si_units, units, desc)
+        for prefix in ('Throat', fl_out_name):
+            for name, (si_units, units, desc) in self.stat_vars.items():
+                self._add_explicit(f'{prefix}:stat:{name}', si_units, units, desc)
+        self._add_explicit('V_ideal', 'm/s', 'm/s', 'Ideal exit velocity')
+
+        self.add_output(f'{fl_out_name}:tot:composition', val=comp_val, desc='Composition of the flow')
+
+        self._wrt = ('Fl_I:tot:h', 'Fl_I:tot:S', 'Fl_I:stat:W', 'Pt_th', 'Ps_calc',
+                     'tot:T', 'MN:T', 'MN:P', 'Ps:T', 'ideal:T')
+        comp_rows = np.repeat(ar, ns)
+        comp_cols = np.arange(nn * ns)
+        for of in ('tot:T', 'MN:T', 'MN:P', 'Ps:T', 'ideal:T') + tuple(self._explicit):
+            self.declare_partials(of, self._wrt, rows=ar, cols=ar)
+            self.declare_partials(of, 'Fl_I:tot:composition', rows=comp_rows, cols=comp_cols)
+        for of in self._explicit:
+            self.declare_partials(of, of, val=1., rows=ar, cols=ar)
+
+        self.declare_partials(f'{fl_out_name}:tot:composition', f'{fl_out_name}:tot:composition', val=1.,
+                              rows=comp_cols, cols=comp_cols)
+        self.declare_partials(f'{fl_out_name}:tot:composition', 'Fl_I:tot:composition', val=-1.,
+                              rows=comp_cols, cols=comp_cols)
+
+    def _add_explicit(self, name, si_units, units, desc):
+        nn = self.options['num_nodes']
+        self.add_output(name, val=1., shape=nn, units=units, desc=desc)
+        self._explicit[name] = 1. if units is None else unit_conversion(si_units, units)[0]
+
+    def _state(self, T_name, P_name, T, P, composition, names=None):
+        """
+        Properties at a flow state, with their derivatives with respect to the variables of the component.
+        """
+        return {name: (val, {T_name: d_dT, P_name: d_dP, 'Fl_I:tot:composition': d_dcomp.T})
+                for name, (val, d_dT, d_dP, d_dcomp) in self._props(T, P, composition, names).items()}
+
+    def _evaluate(self, inputs, outputs):
+        """
+        Residuals of the states and values of the explicit outputs (in the units of the table), as
+        (value, derivatives) pairs.
+        """
+        nozzType = self.options['nozzType']
+        fl_out_name = self.options['fl_out_name']
+        composition = inputs['Fl_I:tot:composition']
+
+        ht = inputs['Fl_I:tot:h'], {'Fl_I:tot:h': 1.}
+        S_in = inputs['Fl_I:tot:S'], {'Fl_I:tot:S': 1.}
+        W = inputs['Fl_I:stat:W'], {'Fl_I:stat:W': 1.}
+        Pt = inputs['Pt_th'], {'Pt_th': 1.}
+        Ps = inputs['Ps_calc'], {'Ps_calc': 1.}
+
+        tot = self._state('tot:T', 'Pt_th', outputs['tot:T'], Pt[0], composition)
+        states = {'MN': self._state('MN:T', 'MN:P', outputs['MN:T'], outputs['MN:P'], composition),
+                  'Ps': self._state('Ps:T', 'Ps_calc', outputs['Ps:T'], Ps[0], composition)}
+        ideal = self._state('ideal:T', 'Ps_calc', outputs['ideal:T'], Ps[0], composition, names=('h', 'S'))
+
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+        S_t = tot['S']
+
+        resids = {}
+        resids['tot:T'] = h_scale * (tot['h'][0] - ht[0]), lin_derivs((h_scale, tot['h'][1]), (-h_scale, ht[1]))
+        resids['MN:T'] = (S_scale * (states['MN']['S'][0] - S_t[0]),
+                          lin_derivs((S_scale, states['MN']['S'][1]), (-S_scale, S_t[1])))
+        resids['Ps:T'] = (S_scale * (states['Ps']['S'][0] - S_t[0]),
+                          lin_derivs((S_scale, states['Ps']['S'][1]), (-S_scale, S_t[1])))
+        resids['ideal:T'] = S_scale * (ideal['S'][0] - S_in[0]), lin_derivs((S_scale, ideal['S'][1]), (-S_scale, S_in[1]))
+
+        # sonic throat: the static and total enthalpies differ by Vsonic**2 / 2
+        h, gamma, R = (states['MN'][name] for name in ('h', 'gamma', 'R'))
+        Ts = outputs['MN:T']
+        num = h[0] + 0.5 * gamma[0] * R[0] * Ts - ht[0]
+        d_num = lin_derivs((1., h[1]), (0.5 * R[0] * Ts, gamma[1]), (0.5 * gamma[0] * Ts, R[1]),
+                     (0.5 * gamma[0] * R[0], {'MN:T': 1.}), (-1., ht[1]))
+        resids['MN:P'] = num / ht[0], lin_derivs((1. / ht[0], d_num), (-num / ht[0]**2, ht[1]))
+
+        stats = {}
+        for branch, P in (('MN', (outputs['MN:P'], {'MN:P': 1.})), ('Ps', Ps)):
+            props = states[branch]
+            T = outputs[f'{branch}:T'], {f'{branch}:T': 1.}
+            gamma, R, rho = props['gamma'], props['R'], props['rho']
+
+            Vsonic = np.sqrt(gamma[0] * R[0] * T[0])
+            Vsonic = Vsonic, lin_derivs((Vsonic / (2. * gamma[0]), gamma[1]), (Vsonic / (2. * R[0]), R[1]),
+                                  (Vsonic / (2. * T[0]), T[1]))
+            if branch == 'MN':
+                V = Vsonic
+                MN = np.ones_like(V[0]), {}
             else:
-                prefix = "Ps"
-                other = "MN"
+                V = self._velocity(ht, props['h'])
+                MN = V[0] / Vsonic[0], lin_derivs((1. / Vsonic[0], V[1]), (-V[0] / Vsonic[0]**2, Vsonic[1]))
+            area = W[0] / (rho[0] * V[0])
+            area = area, lin_derivs((1. / (rho[0] * V[0]), W[1]), (-area / rho[0], rho[1]), (-area / V[0], V[1]))
+
+            stats[branch] = {'h': props['h'], 'T': T, 'P': P, 'rho': rho, 'gamma': gamma, 'S': S_t,
+                             'Cp': props['Cp'], 'Cv': props['Cv'], 'V': V, 'Vsonic': Vsonic, 'MN': MN,
+                             'area': area, 'W': W}
+
+        # the throat is choked when the exhaust pressure is below the sonic static pressure
+        if nozzType == 'CD':
+            choked = np.ones(self.options['num_nodes'], dtype=bool)
+        else:
+            choked = inputs['Ps_calc'].real < outputs['MN:P'].real
+
+        explicit = {}
+        for name, val in tot.items():
+            explicit[f'{fl_out_name}:tot:{name}'] = val
+        explicit[f'{fl_out_name}:tot:T'] = outputs['tot:T'], {'tot:T': 1.}
+        explicit[f'{fl_out_name}:tot:P'] = Pt
+        for name in self.stat_vars:
+            throat = _select(choked, stats['MN'][name], stats['Ps'][name])
+            explicit[f'Throat:stat:{name}'] = throat
+            explicit[f'{fl_out_name}:stat:{name}'] = throat if nozzType == 'CV' else stats['Ps'][name]
+        explicit['V_ideal'] = self._velocity(ht, ideal['h'])
+
+        return resids, explicit
+
+    def _velocity(self, ht, hs):
+        """
+        Velocity from the drop in enthalpy. If ht < hs, the inverse relationship lets the solvers continue.
+        """
+        dh = ht[0] - hs[0]
+        sign = np.where(dh.real >= 0., 1., -1.)
+        V = np.sqrt(2.0 * sign * dh)
+        return V, lin_derivs((sign / V, ht[1]), (-sign / V, hs[1]))
 
-            for p in self.flow_out:
-                J['Throat:stat:%s' %p, '%s:%s' %(prefix, p)] = 1.0
-                J['%s:stat:%s' %(fl_out_name, p), 'Ps:%s' %p] = 1.0
+    def apply_nonlinear(self, inputs, outputs, resids):
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in states.items():
+            resids[name] = val
+        for name, (val, _) in explicit.items():
+            resids[name] = outputs[name] - self._explicit[name] * val
 
-                J['Throat:stat:%s' %p, '%s:%s' %(other, p)] = 0.0
+        fl_out_name = self.options['fl_out_name']
+        resids[f'{fl_out_name}:tot:composition'] = (outputs[f'{fl_out_name}:tot:composition'] -
+                                                    inputs['Fl_I:tot:composition'])
+
+    def solve_nonlinear(self, inputs, outputs):
+        props = self._props
+        T_min, T_max = props.T_bounds
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+
+        ht = inputs['Fl_I:tot:h']
+        Pt = inputs['Pt_th']
+        Ps = inputs['Ps_calc']
+        composition = inputs['Fl_I:tot:composition']
+
+        maxiter = self.options['maxiter']
+        outputs['tot:T'] = Tt = props.solve_T('h', ht, outputs['tot:T'], Pt, composition, h_scale, maxiter=maxiter)
+        tot = props(Tt, Pt, composition, names=('S', 'gamma'))
+        S_t = tot['S'][0]
+        gamma = tot['gamma'][0]
+
+        # isentropic expansion from the throat totals for the initial guesses
+        T_guess = Tt * (Ps / Pt)**((gamma - 1.) / gamma)
+        outputs['Ps:T'] = props.solve_T('S', S_t, T_guess, Ps, composition, S_scale, maxiter=maxiter)
+        outputs['ideal:T'] = props.solve_T('S', inputs['Fl_I:tot:S'], T_guess, Ps, composition, S_scale,
+                                           maxiter=maxiter)
+
+        # sonic throat, the entropy and energy residuals are converged together
+        Ts = Tt * 2. / (gamma + 1.)
+        P = Pt * (2. / (gamma + 1.))**(gamma / (gamma - 1.))
+        for i in range(maxiter):
+            p = props(Ts, P, composition, names=('h', 'S', 'gamma', 'R'))
+            h, h_T, h_P, _ = p['h']
+            S, S_T, S_P, _ = p['S']
+            g, g_T, g_P, _ = p['gamma']
+            R, R_T, R_P, _ = p['R']
+
+            r_S = S_scale * (S - S_t)
+            r_h = (h + 0.5 * g * R * Ts - ht) / ht
+            if np.all(np.abs(r_S) < 1e-10) and np.all(np.abs(r_h) < 1e-10):
+                break
+
+            a = S_scale * S_T
+            b = S_scale * S_P
+            c = (h_T + 0.5 * (g_T * R * Ts + g * R_T * Ts + g * R)) / ht
+            d = (h_P + 0.5 * (g_P * R + g * R_P) * Ts) / ht
+            det = a * d - b * c
+            Ts = np.clip(Ts - (r_S * d - b * r_h) / det, T_min, T_max)
+            P = np.maximum(P - (a * r_h - c * r_S) / det, 0.1 * P)
+        else:
+            raise om.AnalysisError(f'Sonic throat state in {self.pathname} failed to converge in {maxiter} '
+                                   f'iterations, Ts={Ts}, Ps={P}.')
+
+        outputs['MN:T'] = Ts
+        outputs['MN:P'] = P
+
+        states, explicit = self._evaluate(inputs, outputs)
+        for name, (val, _) in explicit.items():
+            outputs[name] = self._explicit[name] * val
+        fl_out_name = self.options['fl_out_name']
+        outputs[f'{fl_out_name}:tot:composition'] = inputs['Fl_I:tot:composition']
+
+    def linearize(self, inputs, outputs, J):
+        states, explicit = self._evaluate(inputs, outputs)
+        ones = np.ones(self.options['num_nodes'])
+
+        for of, (val, derivs), scale in ([(name, val, 1.) for name, val in states.items()] +
+                                         [(name, val, -self._explicit[name]) for name, val in explicit.items()]):
+            for wrt in self._wrt:
+                J[of, wrt] = scale * derivs.get(wrt, 0.) * ones
+            J[of, 'Fl_I:tot:composition'] = scale * (derivs.get('Fl_I:tot:composition', 0.) *
+                                                     np.ones((len(self._props.species), ones.size))).T.ravel()
 
-            J['Throat:stat:S', 'S'] = 1.0
-            J['%s:stat:S' %fl_out_name, 'S'] = 1.0
 
 class Nozzle(Element):
     """
     An assembly that models a convergent Nozzle.
     """
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('nozzType', default='CV',
                               desc='Nozzle type: CD, CV, or CD_CV.')
         self.options.declare('lossCoef', default='Cv',
                               desc='If set to "Cfg", then Gross Thrust Coefficient is an input.')
         self.options.declare('internal_solver', default=False)
+        self.options.declare('fused_thermo', default=True, types=bool,
+                              desc='If True, the TABULAR thermo throat and exit flow properties are computed by '
+                                   'a single NozzleFlow component instead of four Thermo groups.')
 
         super().initialize()
 
@@ -319,14 +588,13 @@ class Nozzle(Element):
         thermo_data = self.options['thermo_data']
         nozzType = self.options['nozzType']
         lossCoef = self.options['lossCoef']
+        nn = self.options['num_nodes']
 
         # elements = self.options['elements']
         composition = self.Fl_I_data['Fl_I']
 
-        self.add_subsystem('mach_choked', om.IndepVarComp('MN', 1.000, ))
-
         # Create inlet flow station
-        in_flow = FlowIn(fl_name="Fl_I")
+        in_flow = FlowIn(fl_name="Fl_I", num_nodes=nn)
         self.add_subsystem('in_flow', in_flow, promotes_inputs=['Fl_I:*'])
 
         # PR_bal = self.add_subsystem('PR_bal', BalanceComp())
@@ -335,104 +603,114 @@ class Nozzle(Element):
         # self.connect('Ps_exhaust', 'PR_bal.lhs:PR')
         # self.connect('Ps_calc', 'PR_bal.rhs:PR')
 
-        self.add_subsystem('PR_bal', PR_bal(), promotes_inputs=['*'], promotes_outputs=['*'] )
+        self.add_subsystem('PR_bal', PR_bal(num_nodes=nn), promotes_inputs=['*'], promotes_outputs=['*'] )
 
         # Calculate pressure at the throat
         prom_in = [('Pt_in', 'Fl_I:tot:P'),
                    'PR', 'dPqP']
-        self.add_subsystem('press_calcs', PressureCalcs(), promotes_inputs=prom_in,
+        self.add_subsystem('press_calcs', PressureCalcs(num_nodes=nn), promotes_inputs=prom_in,
                            promotes_outputs=['Ps_calc'])
 
-        # Calculate throat total flow properties
-        throat_total = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
-                              method=thermo_method, 
-                              thermo_kwargs={'composition':composition, 
-                                             'spec':thermo_data})
-        prom_in = [('h', 'Fl_I:tot:h'),
-                   ('composition', 'Fl_I:tot:composition')]
-        self.add_subsystem('throat_total', throat_total, promotes_inputs=prom_in,
-                           promotes_outputs=['Fl_O:*'])
-        self.connect('press_calcs.Pt_th', 'throat_total.P')
-
-        # Calculate static properties for sonic flow
-        throat_static_MN = Thermo(mode='static_MN', 
-                                  method=thermo_method, 
-                                  thermo_kwargs={'composition':composition, 
-                                                 'spec':thermo_data})
-        prom_in = [('ht', 'Fl_I:tot:h'),
-                   ('W', 'Fl_I:stat:W'),
-                   ('composition', 'Fl_I:tot:composition')]
-        self.add_subsystem('staticMN', throat_static_MN,
-                           promotes_inputs=prom_in)
-        self.connect('throat_total.S', 'staticMN.S')
-        self.connect('mach_choked.MN', 'staticMN.MN')
-        self.connect('press_calcs.Pt_th', 'staticMN.guess:Pt')
-        self.connect('throat_total.gamma', 'staticMN.guess:gamt')
-        # self.connect('Fl_I.flow:flow_products','staticMN.init_prod_amounts')
-
-        # Calculate static properties based on exit static pressure
-        throat_static_Ps = Thermo(mode='static_Ps', 
-                                  method=thermo_method, 
+        if thermo_method == 'TABULAR' and self.options['fused_thermo']:
+            flow = NozzleFlow(nozzType=nozzType, fl_out_name='Fl_O', spec=thermo_data,
+                              composition=composition, num_nodes=nn)
+            # the ideal velocity keeps the name it has in the Thermo based nozzle
+            self.add_subsystem('flow', flow, promotes_inputs=['Fl_I:*', 'Ps_calc'],
+                               promotes_outputs=['Fl_O:*', 'Throat:*', ('V_ideal', 'ideal_flow.V')])
+            self.connect('press_calcs.Pt_th', 'flow.Pt_th')
+        else:
+            self.add_subsystem('mach_choked', om.IndepVarComp('MN', np.ones(nn)))
+
+            # Calculate throat total flow properties
+            throat_total = Thermo(mode='total_hP', fl_name='Fl_O:tot', 
+                                  method=thermo_method, num_nodes=nn,
                                   thermo_kwargs={'composition':composition, 
                                                  'spec':thermo_data})
-        prom_in = [('ht', 'Fl_I:tot:h'),
-                   ('W', 'Fl_I:stat:W'),
-                   ('Ps', 'Ps_calc'),
-                   ('composition', 'Fl_I:tot:composition')]
-        self.add_subsystem('staticPs', throat_static_Ps,
-                           promotes_inputs=prom_in)
-        self.connect('throat_total.S', 'staticPs.S')
-        # self.connect('press_calcs.Ps_calc', 'staticPs.Ps')
-        # self.connect('Fl_I.flow:flow_products','staticPs.init_prod_amounts')
-
-        # Calculate ideal exit flow properties
-        ideal_flow = Thermo(mode='static_Ps', 
-                            method=thermo_method, 
-                            thermo_kwargs={'composition':composition, 
-                                                 'spec':thermo_data})
-        prom_in = [('ht', 'Fl_I:tot:h'),
-                   ('S', 'Fl_I:tot:S'),
-                   ('W', 'Fl_I:stat:W'),
-                   ('Ps', 'Ps_calc'),
-                   ('composition', 'Fl_I:tot:composition')]
-        self.add_subsystem('ideal_flow', ideal_flow,
-                           promotes_inputs=prom_in)
-        # self.connect('press_calcs.Ps_calc', 'ideal_flow.Ps')
-        # self.connect('Fl_I.flow:flow_products','ideal_flow.init_prod_amounts')
-
-        # Determine throat and exit flow properties based on nozzle type and exit static pressure
-        mux = Mux(nozzType=nozzType, fl_out_name='Fl_O')
-        prom_in = [('Ps:W', 'Fl_I:stat:W'),
-                   ('MN:W', 'Fl_I:stat:W'),
-                   ('Ps:P', 'Ps_calc'),
-                   'Ps_calc']
-        self.add_subsystem('mux', mux, promotes_inputs=prom_in, promotes_outputs=['*:stat:*'])
-        self.connect('throat_total.S', 'mux.S')
-        self.connect('staticPs.h', 'mux.Ps:h')
-        self.connect('staticPs.T', 'mux.Ps:T')
-        self.connect('staticPs.rho', 'mux.Ps:rho')
-        self.connect('staticPs.gamma', 'mux.Ps:gamma')
-        self.connect('staticPs.Cp', 'mux.Ps:Cp')
-        self.connect('staticPs.Cv', 'mux.Ps:Cv')
-        self.connect('staticPs.V', 'mux.Ps:V')
-        self.connect('staticPs.Vsonic', 'mux.Ps:Vsonic')
-        self.connect('staticPs.MN', 'mux.Ps:MN')
-        self.connect('staticPs.area', 'mux.Ps:area')
-
-        self.connect('staticMN.h', 'mux.MN:h')
-        self.connect('staticMN.T', 'mux.MN:T')
-        self.connect('staticMN.Ps', 'mux.MN:P')
-        self.connect('staticMN.rho', 'mux.MN:rho')
-        self.connect('staticMN.gamma', 'mux.MN:gamma')
-        self.connect('staticMN.Cp', 'mux.MN:Cp')
-        self.connect('staticMN.Cv', 'mux.MN:Cv')
-        self.connect('staticMN.V', 'mux.MN:V')
-        self.connect('staticMN.Vsonic', 'mux.MN:Vsonic')
-        self.connect('mach_choked.MN', 'mux.MN:MN')
-        self.connect('staticMN.area', 'mux.MN:area')
+            prom_in = [('h', 'Fl_I:tot:h'),
+                       ('composition', 'Fl_I:tot:composition')]
+            self.add_subsystem('throat_total', throat_total, promotes_inputs=prom_in,
+                               promotes_outputs=['Fl_O:*'])
+            self.connect('press_calcs.Pt_th', 'throat_total.P')
+
+            # Calculate static properties for sonic flow
+            throat_static_MN = Thermo(mode='static_MN', 
+                                      method=thermo_method, num_nodes=nn,
+                                      thermo_kwargs={'composition':composition, 
+                                                     'spec':thermo_data})
+            prom_in = [('ht', 'Fl_I:tot:h'),
+                       ('W', 'Fl_I:stat:W'),
+                       ('composition', 'Fl_I:tot:composition')]
+            self.add_subsystem('staticMN', throat_static_MN,
+                               promotes_inputs=prom_in)
+            self.connect('throat_total.S', 'staticMN.S')
+            self.connect('mach_choked.MN', 'staticMN.MN')
+            self.connect('press_calcs.Pt_th', 'staticMN.guess:Pt')
+            self.connect('throat_total.gamma', 'staticMN.guess:gamt')
+            # self.connect('Fl_I.flow:flow_products','staticMN.init_prod_amounts')
+
+            # Calculate static properties based on exit static pressure
+            throat_static_Ps = Thermo(mode='static_Ps', 
+                                      method=thermo_method, num_nodes=nn,
+                                      thermo_kwargs={'composition':composition, 
+                                                     'spec':thermo_data})
+            prom_in = [('ht', 'Fl_I:tot:h'),
+                       ('W', 'Fl_I:stat:W'),
+                       ('Ps', 'Ps_calc'),
+                       ('composition', 'Fl_I:tot:composition')]
+            self.add_subsystem('staticPs', throat_static_Ps,
+                               promotes_inputs=prom_in)
+            self.connect('throat_total.S', 'staticPs.S')
+            # self.connect('press_calcs.Ps_calc', 'staticPs.Ps')
+            # self.connect('Fl_I.flow:flow_products','staticPs.init_prod_amounts')
+
+            # Calculate ideal exit flow properties
+            ideal_flow = Thermo(mode='static_Ps', 
+                                method=thermo_method, num_nodes=nn,
+                                thermo_kwargs={'composition':composition, 
+                                                     'spec':thermo_data})
+            prom_in = [('ht', 'Fl_I:tot:h'),
+                       ('S', 'Fl_I:tot:S'),
+                       ('W', 'Fl_I:stat:W'),
+                       ('Ps', 'Ps_calc'),
+                       ('composition', 'Fl_I:tot:composition')]
+            self.add_subsystem('ideal_flow', ideal_flow,
+                               promotes_inputs=prom_in)
+            # self.connect('press_calcs.Ps_calc', 'ideal_flow.Ps')
+            # self.connect('Fl_I.flow:flow_products','ideal_flow.init_prod_amounts')
+
+            # Determine throat and exit flow properties based on nozzle type and exit static pressure
+            mux = Mux(nozzType=nozzType, fl_out_name='Fl_O', num_nodes=nn)
+            prom_in = [('Ps:W', 'Fl_I:stat:W'),
+                       ('MN:W', 'Fl_I:stat:W'),
+                       ('Ps:P', 'Ps_calc'),
+                       'Ps_calc']
+            self.add_subsystem('mux', mux, promotes_inputs=prom_in, promotes_outputs=['*:stat:*'])
+            self.connect('throat_total.S', 'mux.S')
+            self.connect('staticPs.h', 'mux.Ps:h')
+            self.connect('staticPs.T', 'mux.Ps:T')
+            self.connect('staticPs.rho', 'mux.Ps:rho')
+            self.connect('staticPs.gamma', 'mux.Ps:gamma')
+            self.connect('staticPs.Cp', 'mux.Ps:Cp')
+            self.connect('staticPs.Cv', 'mux.Ps:Cv')
+            self.connect('staticPs.V', 'mux.Ps:V')
+            self.connect('staticPs.Vsonic', 'mux.Ps:Vsonic')
+            self.connect('staticPs.MN', 'mux.Ps:MN')
+            self.connect('staticPs.area', 'mux.Ps:area')
+
+            self.connect('staticMN.h', 'mux.MN:h')
+            self.connect('staticMN.T', 'mux.MN:T')
+            self.connect('staticMN.Ps', 'mux.MN:P')
+            self.connect('staticMN.rho', 'mux.MN:rho')
+            self.connect('staticMN.gamma', 'mux.MN:gamma')
+            self.connect('staticMN.Cp', 'mux.MN:Cp')
+            self.connect('staticMN.Cv', 'mux.MN:Cv')
+            self.connect('staticMN.V', 'mux.MN:V')
+            self.connect('staticMN.Vsonic', 'mux.MN:Vsonic')
+            self.connect('mach_choked.MN', 'mux.MN:MN')
+            self.connect('staticMN.area', 'mux.MN:area')
 
         # Calculate nozzle performance paramters based on
-        perf_calcs = PerformanceCalcs(lossCoef=lossCoef)
+        perf_calcs = PerformanceCalcs(lossCoef=lossCoef, num_nodes=nn)
         if lossCoef == "Cv":
             other_inputs = ['Cv', 'Ps_calc']
         else:
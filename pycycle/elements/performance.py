@@ -1,3 +1,5 @@
+import numpy as np
+
 from openmdao.api import ExplicitComponent
 
 
@@ -8,48 +10,52 @@ class Performance(ExplicitComponent):
 
         self.options.declare('num_nozzles', default=1, types=int)
         self.options.declare('num_burners', default=1, types=int)
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('Pt2', val=14.696, units='lbf/inch**2', desc='pressure at the inlet of the first compressor')
-        self.add_input('Pt3', val=14.696, units='lbf/inch**2', desc='pressure at the exit of the last compressor')
+        self.add_input('Pt2', val=14.696, shape=nn, units='lbf/inch**2', desc='pressure at the inlet of the first compressor')
+        self.add_input('Pt3', val=14.696, shape=nn, units='lbf/inch**2', desc='pressure at the exit of the last compressor')
         # self.add_input('Wfuel', val=0.0, units='lbm/s', desc='mass flow rate of fuel to combustor')
-        self.add_input('ram_drag', val=0.0, units='lbf', desc='ram drag from inlet')
-        self.add_input('power', val=1.0, units='hp', desc='shaft power')
+        self.add_input('ram_drag', val=0.0, shape=nn, units='lbf', desc='ram drag from inlet')
+        self.add_input('power', val=1.0, shape=nn, units='hp', desc='shaft power')
 
         num_nozzles = self.options['num_nozzles']
         self.Fg_vals = []
         for i in range(num_nozzles):
             Fg_val_name = 'Fg_{:d}'.format(i)
-            self.add_input(Fg_val_name, val=0., units='lbf', desc='gross thrust from nozzle {:d}'.format(i))
+            self.add_input(Fg_val_name, val=0., shape=nn, units='lbf', desc='gross thrust from nozzle {:d}'.format(i))
             self.Fg_vals.append(Fg_val_name)
 
         num_burners = self.options['num_burners']
         self.Wfuel_vals = []
         for i in range(num_burners):
             Wfuel_val_name = 'Wfuel_{:d}'.format(i)
-            self.add_input(Wfuel_val_name, val=0., units='lbm/s', desc='fuel flow rate entering combustor {:d}'.format(i))
+            self.add_input(Wfuel_val_name, val=0., shape=nn, units='lbm/s', desc='fuel flow rate entering combustor {:d}'.format(i))
             self.Wfuel_vals.append(Wfuel_val_name)
 
         # outputs
-        self.add_output('OPR', val=1.0, desc='overall pressure ratio, Pt3/Pt2')
-        self.add_output('Fg', val=10000.0, units='lbf', desc='gross thrust of all nozzles')
-        self.add_output('Fn', val=10000.0, units='lbf', desc='net thrust of the engine')
+        self.add_output('OPR', val=1.0, shape=nn, desc='overall pressure ratio, Pt3/Pt2')
+        self.add_output('Fg', val=10000.0, shape=nn, units='lbf', desc='gross thrust of all nozzles')
+        self.add_output('Fn', val=10000.0, shape=nn, units='lbf', desc='net thrust of the engine')
 
-        self.declare_partials('OPR', ['Pt3', 'Pt2'])
-        self.declare_partials('Fg', 'Fg_*', val=1.0)
-        self.declare_partials('Fn', 'Fg_*', val=1.0)
-        self.declare_partials('Fn', 'ram_drag', val=-1.0)
+        self.declare_partials('OPR', ['Pt3', 'Pt2'], rows=ar, cols=ar)
+        self.declare_partials('Fg', 'Fg_*', val=1.0, rows=ar, cols=ar)
+        self.declare_partials('Fn', 'Fg_*', val=1.0, rows=ar, cols=ar)
+        self.declare_partials('Fn', 'ram_drag', val=-1.0, rows=ar, cols=ar)
 
         if num_burners > 0:
-            self.add_output('TSFC', val=1.0, units='lbm/(h*lbf)', desc='thrust specific fuel consumption')
-            self.add_output('PSFC', val=1.0, units='lbm/(h*lbf)', desc='power specific fuel consumption')
-            self.add_output('Wfuel', val=.001, units='lbm/s', desc='mass flow rate of fuel to combustor')
+            self.add_output('TSFC', val=1.0, shape=nn, units='lbm/(h*lbf)', desc='thrust specific fuel consumption')
+            self.add_output('PSFC', val=1.0, shape=nn, units='lbm/(h*lbf)', desc='power specific fuel consumption')
+            self.add_output('Wfuel', val=.001, shape=nn, units='lbm/s', desc='mass flow rate of fuel to combustor')
 
 
-            self.declare_partials('TSFC', ['Fg_*', 'ram_drag', 'Wfuel_*'])
-            self.declare_partials('PSFC', ['power', 'Wfuel_*'])
-            self.declare_partials('Wfuel', 'Wfuel_*', val=1.0)
+            self.declare_partials('TSFC', ['Fg_*', 'ram_drag', 'Wfuel_*'], rows=ar, cols=ar)
+            self.declare_partials('PSFC', ['power', 'Wfuel_*'], rows=ar, cols=ar)
+            self.declare_partials('Wfuel', 'Wfuel_*', val=1.0, rows=ar, cols=ar)
 
 
     def compute(self, inputs, outputs):
@@ -10,23 +10,26 @@ class Shaft(ExplicitComponent):
     def initialize(self):
         self.options.declare('num_ports', default=2,
                               desc="number shaft connections to make")
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
 
         num_ports = self.options['num_ports']
-
-        self.add_input('Nmech', val = 1000.0, units="rpm")
-        self.add_input('HPX', val = 0.0, units='hp')
-        self.add_input('fracLoss', val = 0.0)
-
-        self.add_output('trq_in', val=1.0, units='ft*lbf')
-        self.add_output('trq_out', val=1.0, units='ft*lbf')
-        self.add_output('trq_net', val=1.0, units='ft*lbf')
-        self.add_output('pwr_in', val=1.0, units='hp')
-        self.add_output('pwr_in_real', val=1.0, units='hp')
-        self.add_output('pwr_out', val=1.0, units='hp')
-        self.add_output('pwr_out_real', val=1.0, units='hp')
-        self.add_output('pwr_net', val=1.0, units='hp')
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('Nmech', val = 1000.0, shape=nn, units="rpm")
+        self.add_input('HPX', val = 0.0, shape=nn, units='hp')
+        self.add_input('fracLoss', val = 0.0, shape=nn)
+
+        self.add_output('trq_in', val=1.0, shape=nn, units='ft*lbf')
+        self.add_output('trq_out', val=1.0, shape=nn, units='ft*lbf')
+        self.add_output('trq_net', val=1.0, shape=nn, units='ft*lbf')
+        self.add_output('pwr_in', val=1.0, shape=nn, units='hp')
+        self.add_output('pwr_in_real', val=1.0, shape=nn, units='hp')
+        self.add_output('pwr_out', val=1.0, shape=nn, units='hp')
+        self.add_output('pwr_out_real', val=1.0, shape=nn, units='hp')
+        self.add_output('pwr_net', val=1.0, shape=nn, units='hp')
 
         HP_to_FT_LBF_per_SEC = 550
         self.convert = 2. * np.pi / 60. / HP_to_FT_LBF_per_SEC
@@ -34,15 +37,15 @@ class Shaft(ExplicitComponent):
         self.trq_vars = []
         for i in range(num_ports):
             trq_var_name = 'trq_{:d}'.format(i)
-            self.add_input(trq_var_name, val=0., units='ft*lbf')
+            self.add_input(trq_var_name, val=0., shape=nn, units='ft*lbf')
 
             self.trq_vars.append(trq_var_name)
 
-            self.declare_partials(['trq_in', 'trq_out', 'pwr_in', 'pwr_out'], trq_var_name)
+            self.declare_partials(['trq_in', 'trq_out', 'pwr_in', 'pwr_out'], trq_var_name, rows=ar, cols=ar)
 
-        self.declare_partials('trq_net', '*')
-        self.declare_partials('pwr_net', '*')
-        self.declare_partials(['pwr_in', 'pwr_out', 'pwr_in_real', 'pwr_out_real'], '*')
+        self.declare_partials('trq_net', '*', rows=ar, cols=ar)
+        self.declare_partials('pwr_net', '*', rows=ar, cols=ar)
+        self.declare_partials(['pwr_in', 'pwr_out', 'pwr_in_real', 'pwr_out_real'], '*', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -55,10 +58,9 @@ class Shaft(ExplicitComponent):
 
         for trq_var in self.trq_vars:
             trq = inputs[trq_var]
-            if trq >= 0:
-                trq_in += trq
-            else:
-                trq_out += trq
+            driving = trq.real >= 0
+            trq_in = trq_in + np.where(driving, trq, 0.)
+            trq_out = trq_out + np.where(driving, 0., trq)
 
         trq_net = trq_in * (1. - fracLoss) + trq_out - HPX / (Nmech * self.convert)
         outputs['trq_net'] = trq_net
@@ -85,10 +87,9 @@ class Shaft(ExplicitComponent):
 
         for trq_var in self.trq_vars:
             trq = inputs[trq_var]
-            if trq >= 0:
-                trq_in += trq
-            else:
-                trq_out += trq
+            driving = trq.real >= 0
+            trq_in = trq_in + np.where(driving, trq, 0.)
+            trq_out = trq_out + np.where(driving, 0., trq)
 
         J['trq_net', 'Nmech'] = HPX * Nmech ** (-2.) / self.convert
         J['trq_net', 'HPX'] = -1. / (Nmech * self.convert)
@@ -112,26 +113,17 @@ class Shaft(ExplicitComponent):
         for i in range(num_ports):
             trq_var_name = 'trq_%d'%i
 
-            if PortTrqs[i] >= 0:
-                J['trq_in', trq_var_name]= 1.0
-                J['trq_out', trq_var_name]= 0.0
-                J['trq_net', trq_var_name]= 1 - fracLoss
-                J['pwr_in', trq_var_name]= Nmech * self.convert
-                J['pwr_out', trq_var_name] = 0.0
-                J['pwr_in_real', trq_var_name]= Nmech * self.convert * (1 - fracLoss)
-                J['pwr_out_real', trq_var_name] = 0.0
-                J['pwr_net', trq_var_name]= Nmech * \
-                    self.convert * (1 - fracLoss)
-
-            elif PortTrqs[i] < 0:
-                J['trq_out', trq_var_name] = 1.0
-                J['trq_in', trq_var_name] = 0.0
-                J['trq_net', trq_var_name] = 1.0
-                J['pwr_in', trq_var_name]= 0.
-                J['pwr_out', trq_var_name] = Nmech * self.convert
-                J['pwr_in_real', trq_var_name]= 0.
-                J['pwr_out_real', trq_var_name] = Nmech * self.convert
-                J['pwr_net', trq_var_name] = Nmech * self.convert
+            driving = PortTrqs[i].real >= 0
+
+            J['trq_in', trq_var_name] = np.where(driving, 1.0, 0.0)
+            J['trq_out', trq_var_name] = np.where(driving, 0.0, 1.0)
+            J['trq_net', trq_var_name] = np.where(driving, 1 - fracLoss, 1.0)
+            J['pwr_in', trq_var_name] = np.where(driving, Nmech * self.convert, 0.)
+            J['pwr_out', trq_var_name] = np.where(driving, 0.0, Nmech * self.convert)
+            J['pwr_in_real', trq_var_name] = np.where(driving, Nmech * self.convert * (1 - fracLoss), 0.)
+            J['pwr_out_real', trq_var_name] = np.where(driving, 0.0, Nmech * self.convert)
+            J['pwr_net', trq_var_name] = np.where(driving, Nmech * self.convert * (1 - fracLoss),
+                                                  Nmech * self.convert)
 
 
 if __name__ == "__main__":
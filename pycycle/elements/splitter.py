@@ -12,15 +12,20 @@ from pycycle.element_base import Element
 class BPRcalc(om.ExplicitComponent):
     """Calculates flow split"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
-        self.add_input('W_in', 1.0, desc='total weight flow in', units='lbm/s')
-        self.add_input('BPR', 1.5, desc='ratio of mass flow in Fl_O2 to Fl_O1')
+        self.add_input('W_in', 1.0, shape=nn, desc='total weight flow in', units='lbm/s')
+        self.add_input('BPR', 1.5, shape=nn, desc='ratio of mass flow in Fl_O2 to Fl_O1')
 
-        self.add_output('W1', 0.44, desc='weight flow for Fl_O1', units='lbm/s')
-        self.add_output('W2', 0.56, desc='Weight flow for Fl_O2', units='lbm/s')
+        self.add_output('W1', 0.44, shape=nn, desc='weight flow for Fl_O1', units='lbm/s')
+        self.add_output('W2', 0.56, shape=nn, desc='Weight flow for Fl_O2', units='lbm/s')
 
-        self.declare_partials('*', '*')
+        self.declare_partials('*', '*', rows=ar, cols=ar)
  
 
     def compute(self, inputs, outputs):
@@ -75,6 +80,8 @@ class Splitter(Element):
 
     """
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('statics', default=True,
                               desc='If True, calculate static properties.')
@@ -98,42 +105,34 @@ class Splitter(Element):
         thermo_data = self.options['thermo_data']
         statics = self.options['statics']
         design = self.options['design']
+        nn = self.options['num_nodes']
 
         composition = self.Fl_I_data['Fl_I']
 
         # Create inlet flowstation
-        flow_in = FlowIn(fl_name='Fl_I')
+        flow_in = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('flow_in', flow_in, promotes_inputs=('Fl_I:*',))
 
         # Split the flows
-        self.add_subsystem('split_calc', BPRcalc(), promotes_inputs=('BPR', ('W_in', 'Fl_I:stat:W')))
-
-        # Set Fl_out1 totals based on T, P
-        real_flow1 = Thermo(mode='total_TP', fl_name='Fl_O1:tot', 
-                            method=thermo_method, 
-                            thermo_kwargs={'composition':composition, 
-                                          'spec':thermo_data})
-        self.add_subsystem('real_flow1', real_flow1,
-                           promotes_inputs=(('composition', 'Fl_I:tot:composition'),
-                                            ('P', 'Fl_I:tot:P'),
-                                            ('T', 'Fl_I:tot:T')),
-                           promotes_outputs=('Fl_O1:tot:*', ))
-
-        # Set Fl_out2 totals based on T, P
-        real_flow2 = Thermo(mode='total_TP', fl_name='Fl_O2:tot', 
-                            method=thermo_method, 
-                            thermo_kwargs={'composition':composition, 
-                                          'spec':thermo_data})
-        self.add_subsystem('real_flow2', real_flow2, promotes_inputs=(('composition', 'Fl_I:tot:composition'),
-                                            ('P', 'Fl_I:tot:P'),
-                                            ('T', 'Fl_I:tot:T')),
-                           promotes_outputs=('Fl_O2:tot:*', ))
+        self.add_subsystem('split_calc', BPRcalc(num_nodes=nn), promotes_inputs=('BPR', ('W_in', 'Fl_I:stat:W')))
+
+        # Set Fl_out1 and Fl_out2 totals based on T, P. Both are the inlet state, so with the
+        # dedup_thermo option Fl_O2:tot is a copy of Fl_O1:tot
+        prom_in = [('composition', 'Fl_I:tot:composition'),
+                   ('P', 'Fl_I:tot:P'),
+                   ('T', 'Fl_I:tot:T')]
+        for i in (1, 2):
+            real_flow = Thermo(mode='total_TP', fl_name=f'Fl_O{i}:tot',
+                               method=thermo_method, num_nodes=nn,
+                               thermo_kwargs={'composition':composition,
+                                              'spec':thermo_data})
+            self.add_thermo(f'real_flow{i}', real_flow, promotes_inputs=prom_in)
 
         if statics:
             if design:
             #   Calculate static properties
                 out1_stat = Thermo(mode='static_MN', fl_name='Fl_O1:stat', 
-                                   method=thermo_method, 
+                                   method=thermo_method, num_nodes=nn,
                                    thermo_kwargs={'composition':composition, 
                                                   'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -148,7 +147,7 @@ class Splitter(Element):
                 self.connect('split_calc.W1', 'out1_stat.W')
 
                 out2_stat = Thermo(mode='static_MN', fl_name='Fl_O2:stat', 
-                                   method=thermo_method, 
+                                   method=thermo_method, num_nodes=nn,
                                    thermo_kwargs={'composition':composition, 
                                                   'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -165,7 +164,7 @@ class Splitter(Element):
             else:
                 # Calculate static properties
                 out1_stat = Thermo(mode='static_A', fl_name='Fl_O1:stat', 
-                                   method=thermo_method, 
+                                   method=thermo_method, num_nodes=nn,
                                    thermo_kwargs={'composition':composition, 
                                                   'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -180,7 +179,7 @@ class Splitter(Element):
                 self.connect('split_calc.W1', 'out1_stat.W')
 
                 out2_stat = Thermo(mode='static_A', fl_name='Fl_O2:stat', 
-                                   method=thermo_method, 
+                                   method=thermo_method, num_nodes=nn,
                                    thermo_kwargs={'composition':composition, 
                                                   'spec':thermo_data})
                 prom_in = [('composition', 'Fl_I:tot:composition'),
@@ -195,9 +194,9 @@ class Splitter(Element):
                 self.connect('split_calc.W2', 'out2_stat.W')
 
         else:
-            self.add_subsystem('W1_passthru', PassThrough('split_calc_W1', 'Fl_O1:stat:W', 1.0, units= "lbm/s"),
+            self.add_subsystem('W1_passthru', PassThrough('split_calc_W1', 'Fl_O1:stat:W', np.ones(nn), units= "lbm/s"),
                                promotes=['*'])
-            self.add_subsystem('W2_passthru', PassThrough('split_calc_W2', 'Fl_O2:stat:W', 1.0, units= "lbm/s"),
+            self.add_subsystem('W2_passthru', PassThrough('split_calc_W2', 'Fl_O2:stat:W', np.ones(nn), units= "lbm/s"),
                                promotes=['*'])
             self.connect('split_calc.W1', 'split_calc_W1')
             self.connect('split_calc.W2', 'split_calc_W2')
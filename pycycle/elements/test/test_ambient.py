@@ -53,7 +53,7 @@ class FlowStartTestCase(unittest.TestCase):
                 self.assertLessEqual(rel_err, tol)
 
                 partial_data = self.prob.check_partials(out_stream=None, method='cs',
-                                                        includes=['amb.*'], excludes=['*.base_thermo.*', 'amb.readAtmTable'])
+                                                        includes=['amb.*'], excludes=['*.base_thermo.*'])
                 assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
         finally:
             np.seterr(**old)
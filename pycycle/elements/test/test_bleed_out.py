@@ -13,6 +13,7 @@ from pycycle.elements.bleed_out import BleedOut
 from pycycle.elements.flow_start import FlowStart
 from pycycle import constants
 from pycycle.thermo.cea import species_data
+from pycycle.thermo.unit_comps import FlowCopy
 
 
 class BleedOutTestCase(unittest.TestCase):
@@ -63,5 +64,35 @@ class BleedOutTestCase(unittest.TestCase):
                                                 includes=['bleed.*'], excludes=['*.base_thermo.*',])
         assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
 
+    def test_dedup_thermo(self):
+        # the bleeds have the outlet state, so with the dedup_thermo option only the outlet Thermo is solved
+        prob = Problem()
+        cycle = prob.model = Cycle(thermo_method='CEA', thermo_data=species_data.janaf, dedup_thermo=True)
+
+        cycle.add_subsystem('flow_start', FlowStart(), promotes=['MN', 'P', 'T'])
+        cycle.add_subsystem('bleed', BleedOut(bleed_names=['bld1', 'bld2']), promotes=['MN'])
+
+        cycle.pyc_connect_flow('flow_start.Fl_O', 'bleed.Fl_I')
+
+        cycle.set_input_defaults('MN', 0.5)
+        cycle.set_input_defaults('bleed.bld1:frac_W', 0.1)
+        cycle.set_input_defaults('bleed.bld2:frac_W', 0.1)
+        cycle.set_input_defaults('P', 17., units='psi')
+        cycle.set_input_defaults('T', 500., units='degR')
+        cycle.set_input_defaults('flow_start.W', 500., units='lbm/s')
+
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.set_solver_print(level=-1)
+        prob.run_model()
+
+        for BN in ('bld1', 'bld2'):
+            self.assertIsInstance(getattr(cycle.bleed, f'{BN}_flow'), FlowCopy)
+            for var in ('T', 'P', 'h', 'S', 'gamma', 'composition'):
+                assert_near_equal(prob[f'bleed.{BN}:tot:{var}'], prob[f'bleed.Fl_O:tot:{var}'], 1e-15)
+
+        partial_data = prob.check_partials(out_stream=None, method='cs',
+                                           includes=['bleed.*'], excludes=['*.base_thermo.*',])
+        assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
+
 if __name__ == "__main__":
     unittest.main()
@@ -126,6 +126,36 @@ class BurnerTestCase(unittest.TestCase):
                                                includes=['combustor.*',], excludes=['*.base_thermo.*', '*.mix_fuel.*'])
             assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
 
+    def test_vitiated_guess(self):
+
+        def sweep(vitiated_guess):
+            prob = Problem()
+            model = prob.model = Cycle(thermo_method='CEA', thermo_data=species_data.janaf)
+            model.add_subsystem('flow_start', FlowStart())
+            model.add_subsystem('combustor', Combustor(vitiated_guess=vitiated_guess))
+            model.pyc_connect_flow('flow_start.Fl_O', 'combustor.Fl_I')
+            model.set_input_defaults('combustor.Fl_I:FAR', 0.0)
+            model.set_input_defaults('combustor.MN', 0.5)
+
+            prob.set_solver_print(level=-1)
+            prob.setup(check=False)
+            prob.set_val('flow_start.P', 200., units='psi')
+            prob.set_val('flow_start.T', 1200., units='degR')
+            prob.set_val('flow_start.W', 100., units='lbm/s')
+
+            T, iters = [], 0
+            for FAR in np.linspace(0.01, 0.03, 6):
+                prob['combustor.Fl_I:FAR'] = FAR
+                prob.run_model()
+                T.append(prob.get_val('combustor.Fl_O:tot:T', units='degR')[0])
+                iters += prob.model.combustor.vitiated_flow.nonlinear_solver._iter_count
+            return np.array(T), iters
+
+        T, iters = sweep(True)
+        T_ref, iters_ref = sweep(False)
+        assert_near_equal(T, T_ref, 1e-8)
+        self.assertLess(iters, iters_ref)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -111,7 +111,8 @@ from openmdao.utils.assert_utils import assert_check_partials
 from pycycle.elements import cooling, flow_start
 from pycycle.thermo.cea import species_data
 from pycycle.thermo.thermo import ThermoAdd
-from pycycle.constants import CEA_AIR_COMPOSITION, CEA_AIR_FUEL_COMPOSITION
+from pycycle.constants import CEA_AIR_COMPOSITION, CEA_AIR_FUEL_COMPOSITION, TAB_AIR_FUEL_COMPOSITION, \
+    AIR_JETA_TAB_SPEC
 
 
 class Tests(unittest.TestCase):
@@ -265,5 +266,60 @@ class Tests(unittest.TestCase):
         assert_check_partials(check, atol=1e-6, rtol=1e2)
 
 
+    def run_tabular_turbine_cooling(self, fused_thermo):
+        p = Problem()
+
+        ivc = p.model.add_subsystem('ivc', IndepVarComp())
+        ivc.add_output('air_composition', [0.])
+        ivc.add_output('mix_composition', [0.03])
+
+        p.model.set_input_defaults('turb_cool.turb_pwr', val=24193.5, units='hp')
+        p.model.set_input_defaults('turb_cool.Fl_turb_I:tot:P', val=616.736, units='psi')
+        p.model.set_input_defaults('turb_cool.Fl_turb_O:tot:P', val=149.113, units='psi')
+        p.model.set_input_defaults('turb_cool.Fl_turb_I:stat:W', val=62.15, units='lbm/s')
+        p.model.set_input_defaults('turb_cool.Fl_turb_I:tot:T', val=3400.00, units='degR')
+        p.model.set_input_defaults('turb_cool.Fl_cool:tot:T', val=1721.97, units='degR')
+        p.model.set_input_defaults('turb_cool.Fl_turb_I:tot:h', val=250.097, units='Btu/lbm')
+        p.model.set_input_defaults('turb_cool.Fl_cool:tot:h', val=298.48, units='Btu/lbm')
+
+        cool_comp = p.model.add_subsystem('turb_cool',
+                                          cooling.TurbineCooling(
+                                            n_stages=2,
+                                            T_metal=2460.,
+                                            T_safety=150.,
+                                            thermo_method='TABULAR',
+                                            thermo_data=AIR_JETA_TAB_SPEC,
+                                            fused_thermo=fused_thermo))
+
+        cool_comp.Fl_I_data['Fl_turb_I'] = TAB_AIR_FUEL_COMPOSITION
+        cool_comp.Fl_I_data['Fl_cool'] = TAB_AIR_FUEL_COMPOSITION
+        cool_comp.Fl_I_data['Fl_turb_O'] = TAB_AIR_FUEL_COMPOSITION
+        cool_comp.pyc_setup_output_ports()
+
+        p.model.connect('ivc.mix_composition', ['turb_cool.Fl_turb_I:tot:composition',
+                                                'turb_cool.Fl_turb_I:stat:composition',
+                                                'turb_cool.Fl_turb_O:tot:composition',
+                                                'turb_cool.Fl_turb_O:stat:composition'])
+        p.model.connect('ivc.air_composition', ['turb_cool.Fl_cool:tot:composition',
+                                                'turb_cool.Fl_cool:stat:composition'])
+
+        p.setup(force_alloc_complex=True)
+        p.set_solver_print(-1)
+        p.set_val('turb_cool.x_factor', .9)
+        p.run_model()
+        return p
+
+    def test_turbine_cooling_fused_rows(self):
+        fused = self.run_tabular_turbine_cooling(True)
+        rows = self.run_tabular_turbine_cooling(False)
+
+        for i in range(4):
+            for name in ('W_cool', 'W_out', 'Fl_O:tot:T', 'Fl_O:tot:h', 'Fl_O:tot:S', 'Fl_O:tot:composition'):
+                assert_near_equal(fused[f'turb_cool.row_{i}.{name}'], rows[f'turb_cool.row_{i}.{name}'], 1e-8)
+
+        check = fused.check_partials(includes=['turb_cool.rows'], method='cs', out_stream=None)
+        assert_check_partials(check, atol=1e-8, rtol=1e-8)
+
+
 if __name__ == "__main__":
     unittest.main()
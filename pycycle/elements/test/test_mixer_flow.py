@@ -0,0 +1,102 @@
+""" Tests the fused MixerFlow component against the Thermo based mixer. """
+
+import unittest
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
+
+from pycycle.mp_cycle import Cycle
+from pycycle.constants import AIR_JETA_TAB_SPEC
+from pycycle.elements.flow_start import FlowStart
+from pycycle.elements.mixer import Mixer
+
+
+def run_mixer(designed_stream, fused_thermo, design=True, area=None, area_calc=None):
+    prob = om.Problem()
+    cycle = prob.model = Cycle(thermo_method='TABULAR', thermo_data=AIR_JETA_TAB_SPEC, design=design)
+
+    cycle.add_subsystem('start1', FlowStart(), promotes=['MN'])
+    cycle.add_subsystem('start2', FlowStart(), promotes=['MN'])
+    cycle.add_subsystem('mixer', Mixer(designed_stream=designed_stream, fused_thermo=fused_thermo))
+    cycle.pyc_connect_flow('start1.Fl_O', 'mixer.Fl_I1')
+    cycle.pyc_connect_flow('start2.Fl_O', 'mixer.Fl_I2')
+
+    cycle.set_input_defaults('start1.P', 17., units='psi')
+    cycle.set_input_defaults('start2.P', 15., units='psi')
+    cycle.set_input_defaults('start1.T', 1000., units='degR')
+    cycle.set_input_defaults('start2.T', 500., units='degR')
+    cycle.set_input_defaults('start1.W', 100., units='lbm/s')
+    cycle.set_input_defaults('start2.W', 80., units='lbm/s')
+    cycle.set_input_defaults('MN', 0.5)
+
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+
+    if not design:
+        prob.set_val('mixer.area', area, units='inch**2')
+        prob.set_val(f'mixer.Fl_I{designed_stream}_stat_calc.area', area_calc, units='inch**2')
+
+    if not fused_thermo:
+        # converge the impulse balance tightly for the comparison
+        prob.model.mixer.impulse_converge.nonlinear_solver.options['atol'] = 1e-10
+        prob.model.mixer.impulse_converge.nonlinear_solver.options['maxiter'] = 100
+
+    prob.run_model()
+    return prob
+
+
+class MixerFlowTestCase(unittest.TestCase):
+
+    def test_matches_thermo(self):
+        for designed_stream in (1, 2):
+            calc = f'Fl_I{designed_stream}_calc:stat'
+            names = ['ER', 'balance.P_tot'] + \
+                    [f'Fl_O:tot:{name}' for name in ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R')] + \
+                    [f'{prefix}:{name}' for prefix in ('Fl_O:stat', calc)
+                     for name in ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R', 'area', 'W', 'V', 'Vsonic', 'MN')]
+
+            with self.subTest(designed_stream=designed_stream, design=True):
+                fused = run_mixer(designed_stream, True)
+                thermo = run_mixer(designed_stream, False)
+                for name in names + ['area']:
+                    assert_near_equal(fused.get_val(f'mixer.{name}'), thermo.get_val(f'mixer.{name}'), 1e-8)
+
+            area = 1.02 * thermo.get_val('mixer.Fl_O:stat:area', units='inch**2')
+            area_calc = 1.03 * thermo.get_val(f'mixer.{calc}:area', units='inch**2')
+            with self.subTest(designed_stream=designed_stream, design=False):
+                fused = run_mixer(designed_stream, True, False, area, area_calc)
+                thermo = run_mixer(designed_stream, False, False, area, area_calc)
+                for name in names:
+                    assert_near_equal(fused.get_val(f'mixer.{name}'), thermo.get_val(f'mixer.{name}'), 1e-8)
+
+    def test_partials(self):
+        for designed_stream in (1, 2):
+            prob = run_mixer(designed_stream, True)
+            data = prob.check_partials(includes=['mixer.mix_flow'], method='cs', out_stream=None)
+            # the impulse residual is in N, so the absolute errors are larger
+            assert_check_partials(data, atol=1e-6, rtol=1e-8)
+
+            area = prob.get_val('mixer.Fl_O:stat:area', units='inch**2')
+            area_calc = prob.get_val(f'mixer.Fl_I{designed_stream}_calc:stat:area', units='inch**2')
+            prob = run_mixer(designed_stream, True, False, 1.02 * area, 1.03 * area_calc)
+            data = prob.check_partials(includes=['mixer.mix_flow'], method='cs', out_stream=None)
+            assert_check_partials(data, atol=1e-6, rtol=1e-8)
+
+    def test_not_converged(self):
+        prob = run_mixer(1, True)
+        mix_flow = prob.model.mixer.mix_flow
+
+        # T**2 = 1e6 and P = T can't be solved in one step from a far away guess
+        def resid(T, P):
+            return (T**2 - 1e6) / 1e6, (T - P) / 1e3, 2. * T / 1e6, 0., 1e-3, -1e-3
+
+        T, P = mix_flow._newton(resid, 400., 400., 50)
+        assert_near_equal(T, 1000., 1e-10)
+        assert_near_equal(P, 1000., 1e-10)
+
+        with self.assertRaises(om.AnalysisError):
+            mix_flow._newton(resid, 400., 400., 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
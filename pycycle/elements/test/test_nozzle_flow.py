@@ -0,0 +1,71 @@
+""" Tests the fused NozzleFlow component against the Thermo based nozzle. """
+
+import unittest
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
+
+from pycycle.mp_cycle import Cycle
+from pycycle.constants import AIR_JETA_TAB_SPEC
+from pycycle.elements.flow_start import FlowStart
+from pycycle.elements.nozzle import Nozzle
+
+
+def run_nozzle(nozzType, fused_thermo, Ps_exhaust, num_nodes=1):
+    prob = om.Problem()
+    cycle = prob.model = Cycle(thermo_method='TABULAR', thermo_data=AIR_JETA_TAB_SPEC, num_nodes=num_nodes)
+
+    cycle.add_subsystem('flow_start', FlowStart())
+    cycle.add_subsystem('nozzle', Nozzle(nozzType=nozzType, lossCoef='Cv', internal_solver=True,
+                                         fused_thermo=fused_thermo))
+    cycle.pyc_connect_flow('flow_start.Fl_O', 'nozzle.Fl_I')
+
+    cycle.set_input_defaults('flow_start.P', 17.0 * np.ones(num_nodes), units='psi')
+    cycle.set_input_defaults('flow_start.T', 1500.0 * np.ones(num_nodes), units='degR')
+    cycle.set_input_defaults('flow_start.MN', 0.2 * np.ones(num_nodes))
+    cycle.set_input_defaults('flow_start.W', 100.0 * np.ones(num_nodes), units='lbm/s')
+    cycle.set_input_defaults('nozzle.Ps_exhaust', Ps_exhaust * np.ones(num_nodes), units='psi')
+    cycle.set_input_defaults('nozzle.Cv', 0.99 * np.ones(num_nodes))
+
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+    prob.run_model()
+    return prob
+
+
+class NozzleFlowTestCase(unittest.TestCase):
+
+    def test_matches_thermo(self):
+        names = ['Fg', 'PR', 'ideal_flow.V'] + \
+                [f'Fl_O:tot:{name}' for name in ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R')] + \
+                [f'{prefix}:stat:{name}' for prefix in ('Throat', 'Fl_O')
+                 for name in ('h', 'T', 'P', 'rho', 'gamma', 'S', 'Cp', 'Cv', 'V', 'Vsonic', 'MN', 'area', 'W')]
+
+        # choked and unchoked
+        for Ps_exhaust in (5., 14.):
+            for nozzType in ('CV', 'CD', 'CD_CV'):
+                with self.subTest(nozzType=nozzType, Ps_exhaust=Ps_exhaust):
+                    fused = run_nozzle(nozzType, True, Ps_exhaust)
+                    thermo = run_nozzle(nozzType, False, Ps_exhaust)
+                    for name in names:
+                        assert_near_equal(fused.get_val(f'nozzle.{name}'), thermo.get_val(f'nozzle.{name}'), 1e-8)
+
+    def test_partials(self):
+        for Ps_exhaust in (5., 14.):
+            prob = run_nozzle('CD_CV', True, Ps_exhaust, num_nodes=2)
+            data = prob.check_partials(includes=['nozzle.flow'], method='cs', out_stream=None)
+            assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+    def test_not_converged(self):
+        prob = run_nozzle('CD_CV', True, 5.)
+        flow = prob.model.nozzle.flow
+        flow.options['maxiter'] = 1
+        prob.set_val('nozzle.flow.tot:T', 500., units='degK')
+        with self.assertRaises(om.AnalysisError):
+            flow.run_solve_nonlinear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,10 +7,14 @@ from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
 
 
 from pycycle.mp_cycle import Cycle
+from pycycle.element_base import Element
+from pycycle.constants import CEA_AIR_COMPOSITION
 from pycycle.thermo.cea.species_data import janaf
 
 from pycycle.elements.splitter import Splitter
 from pycycle.elements.flow_start import FlowStart
+from pycycle.thermo.thermo import Thermo
+from pycycle.thermo.unit_comps import FlowCopy
 
 
 fpath = os.path.dirname(os.path.realpath(__file__))
@@ -130,5 +134,47 @@ class splitterTestCase(unittest.TestCase):
                                                     includes=['splitter.*'], excludes=['*.base_thermo.*',])
             assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
 
+    def test_dedup_thermo(self):
+        # off by default, so both outlet totals are solved
+        self.assertIsInstance(self.prob.model.splitter.real_flow2, Thermo)
+
+        # with the option Fl_O2:tot is a copy of Fl_O1:tot, so only one total Thermo is solved
+        prob = Problem()
+        cycle = prob.model = Cycle(thermo_method='CEA', thermo_data=janaf, dedup_thermo=True)
+        cycle.add_subsystem('flow_start', FlowStart())
+        cycle.add_subsystem('splitter', Splitter())
+        cycle.pyc_connect_flow('flow_start.Fl_O', 'splitter.Fl_I')
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False)
+        self.assertIsInstance(cycle.splitter.real_flow1, Thermo)
+        self.assertIsInstance(cycle.splitter.real_flow2, FlowCopy)
+
+        for p in (self.prob, prob):
+            p.set_val('flow_start.P', 17., units='psi')
+            p.set_val('flow_start.T', 500., units='degR')
+            p.set_val('flow_start.W', 10., units='lbm/s')
+            p['splitter.BPR'] = 5.
+            p['splitter.MN1'] = 0.5
+            p['splitter.MN2'] = 0.4
+            p.run_model()
+
+        for name in ('Fl_O2:tot:T', 'Fl_O2:tot:P', 'Fl_O2:tot:h', 'Fl_O2:tot:S', 'Fl_O2:tot:gamma',
+                     'Fl_O2:tot:composition', 'Fl_O2:stat:P', 'Fl_O2:stat:area'):
+            assert_near_equal(self.prob[f'splitter.{name}'], prob[f'splitter.{name}'], 1e-8)
+
+    def test_dedup_thermo_kwargs(self):
+        # the thermo_kwargs are compared by value, so an equal composition dict is also a copy
+        kwargs = {'spec': janaf, 'composition': CEA_AIR_COMPOSITION}
+        other_composition = dict(CEA_AIR_COMPOSITION, Ar=0.)
+        elem = Element(dedup_thermo=True)
+        for name, thermo_kwargs in (('flow1', kwargs), ('flow2', {'spec': janaf, 'composition': dict(CEA_AIR_COMPOSITION)}),
+                                    ('flow3', {'spec': janaf, 'composition': other_composition})):
+            thermo = Thermo(mode='total_TP', fl_name=f'{name}:tot', method='CEA', thermo_kwargs=thermo_kwargs)
+            elem.add_thermo(name, thermo, promotes_inputs=['T', 'P'])
+
+        self.assertIsInstance(elem.flow1, Thermo)
+        self.assertIsInstance(elem.flow2, FlowCopy)
+        self.assertIsInstance(elem.flow3, Thermo)
+
 if __name__ == "__main__":
     unittest.main()
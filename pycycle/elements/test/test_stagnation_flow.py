@@ -0,0 +1,70 @@
+""" Tests the fused StagnationFlow component against the FlowStart based flight conditions. """
+
+import unittest
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
+
+from pycycle.constants import AIR_JETA_TAB_SPEC
+from pycycle.elements.flight_conditions import FlightConditions
+
+
+def run_fc(alt, MN, fused_thermo, reactant=False):
+    nn = len(alt)
+    prob = om.Problem()
+    prob.model.add_subsystem('fc', FlightConditions(thermo_method='TABULAR', thermo_data=AIR_JETA_TAB_SPEC,
+                                                    num_nodes=nn, reactant=reactant, fused_thermo=fused_thermo),
+                             promotes_inputs=['*'])
+
+    prob.set_solver_print(level=-1)
+    prob.setup(check=False, force_alloc_complex=True)
+
+    prob.set_val('alt', alt, units='ft')
+    prob.set_val('MN', MN)
+    prob.set_val('W', 100., units='lbm/s')
+    if reactant:
+        prob.set_val('mix:ratio', 0.01)
+
+    if not fused_thermo:
+        # converge the stagnation state tightly for the comparison
+        prob.model.fc.conv.nonlinear_solver.options['maxiter'] = 50
+
+    prob.run_model()
+    return prob
+
+
+class StagnationFlowTestCase(unittest.TestCase):
+
+    names = ['balance.Tt', 'balance.Pt'] + \
+            [f'Fl_O:tot:{name}' for name in ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R', 'composition')] + \
+            [f'Fl_O:stat:{name}' for name in ('T', 'P', 'h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R',
+                                              'area', 'W', 'V', 'Vsonic', 'MN')]
+
+    def test_matches_thermo(self):
+        alt = [0., 10000., 35000.]
+        MN = [0.1, 0.5, 0.8]
+
+        fused = run_fc(alt, MN, True)
+        thermo = run_fc(alt, MN, False)
+        for name in self.names:
+            assert_near_equal(fused.get_val(f'fc.{name}'), thermo.get_val(f'fc.{name}'), 1e-8)
+
+        # the points are independent
+        for i in range(len(alt)):
+            single = run_fc(alt[i:i+1], MN[i:i+1], True)
+            assert_near_equal(fused.get_val('fc.Fl_O:tot:P')[i], single.get_val('fc.Fl_O:tot:P')[0], 1e-10)
+
+    def test_reactant(self):
+        fused = run_fc([5000.], [0.6], True, reactant='FAR')
+        thermo = run_fc([5000.], [0.6], False, reactant='FAR')
+        for name in self.names:
+            assert_near_equal(fused.get_val(f'fc.{name}'), thermo.get_val(f'fc.{name}'), 1e-8)
+
+    def test_partials(self):
+        prob = run_fc([0., 30000.], [0.3, 0.8], True)
+        data = prob.check_partials(includes=['fc.flow'], method='cs', out_stream=None)
+        assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
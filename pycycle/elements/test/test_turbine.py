@@ -10,6 +10,7 @@ from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
 
 from pycycle.mp_cycle import Cycle
 from pycycle.thermo.cea.species_data import janaf
+from pycycle.constants import AIR_JETA_TAB_SPEC
 from pycycle.connect_flow import connect_flow
 from pycycle.elements.turbine import Turbine
 from pycycle.elements.flow_start import FlowStart
@@ -171,6 +172,58 @@ class TurbineTestCase(unittest.TestCase):
                                                     includes=['turbine.*'], excludes=['*.base_thermo.*', '*.mix_fuel.*', '*.thermo_add'])
             assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
 
+class TurbineBleedExpansionTestCase(unittest.TestCase):
+
+    def run_turbine(self, fused_thermo):
+        prob = Problem()
+        cycle = prob.model = Cycle(thermo_method='TABULAR', thermo_data=AIR_JETA_TAB_SPEC)
+
+        cycle.add_subsystem('flow_start', FlowStart())
+        cycle.add_subsystem('cool1', FlowStart())
+        cycle.add_subsystem('cool2', FlowStart())
+        cycle.add_subsystem('turbine', Turbine(map_data=LPT2269, bleed_names=['cool1', 'cool2'],
+                                               fused_thermo=fused_thermo))
+
+        cycle.pyc_connect_flow('flow_start.Fl_O', 'turbine.Fl_I')
+        cycle.pyc_connect_flow('cool1.Fl_O', 'turbine.cool1', connect_stat=False)
+        cycle.pyc_connect_flow('cool2.Fl_O', 'turbine.cool2', connect_stat=False)
+
+        cycle.set_input_defaults('flow_start.P', 150., units='psi')
+        cycle.set_input_defaults('flow_start.T', 2800., units='degR')
+        cycle.set_input_defaults('flow_start.MN', 0.2)
+        cycle.set_input_defaults('flow_start.W', 100., units='lbm/s')
+        cycle.set_input_defaults('flow_start.composition', [0.02])
+        for name, P, T in (('cool1', 200., 1300.), ('cool2', 120., 1100.)):
+            cycle.set_input_defaults(f'{name}.P', P, units='psi')
+            cycle.set_input_defaults(f'{name}.T', T, units='degR')
+            cycle.set_input_defaults(f'{name}.MN', 0.3)
+            cycle.set_input_defaults(f'{name}.W', 3., units='lbm/s')
+        cycle.set_input_defaults('turbine.cool1:frac_P', 1.)
+        cycle.set_input_defaults('turbine.cool2:frac_P', 0.)
+        cycle.set_input_defaults('turbine.PR', 4.)
+        cycle.set_input_defaults('turbine.eff', 0.9)
+        cycle.set_input_defaults('turbine.Nmech', 8000., units='rpm')
+        cycle.set_input_defaults('turbine.MN', 0.4)
+
+        prob.set_solver_print(level=-1)
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.run_model()
+        return prob
+
+    def test_fused_bleeds(self):
+        fused = self.run_turbine(True)
+        thermo = self.run_turbine(False)
+
+        for name in ('power', 'trq', 'eff_poly', 'Fl_O:tot:T', 'Fl_O:tot:h', 'Fl_O:stat:area'):
+            assert_near_equal(fused.get_val(f'turbine.{name}'), thermo.get_val(f'turbine.{name}'), 1e-8)
+        for name in ('cool1:ht_ideal', 'cool2:ht_ideal'):
+            assert_near_equal(fused.get_val(f'turbine.{name}', units='Btu/lbm'),
+                              thermo.get_val(f'turbine.{name}', units='Btu/lbm'), 1e-8)
+
+        data = fused.check_partials(includes=['turbine.bld_expansion'], method='cs', out_stream=None)
+        assert_check_partials(data, atol=1e-7, rtol=1e-8)
+
+
 if __name__ == "__main__":
     np.seterr(divide='warn')
     unittest.main()
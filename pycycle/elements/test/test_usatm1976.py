@@ -3,25 +3,71 @@ import unittest
 import os
 
 from openmdao.api import Problem
-from openmdao.utils.assert_utils import assert_check_partials
+from openmdao.utils.assert_utils import assert_check_partials, assert_near_equal
 
-from pycycle.elements.US1976 import USatm1976Comp
+from pycycle.elements.US1976 import USatm1976Comp, USatm1976Data, usatm1976, T_interp, P_interp, rho_interp, \
+    rho_interp_deriv
 
 class TestCase1976(unittest.TestCase):
 
     def test_derivs(self):
 
-        p = Problem()
-        p.model.add_subsystem('std_1976', USatm1976Comp())
+        for method in ('table', 'layered'):
+            p = Problem()
+            p.model.add_subsystem('std_1976', USatm1976Comp(num_nodes=5, method=method))
+
+            p.setup(force_alloc_complex=True)
+            p.set_val('std_1976.alt', [-500., 12345., 36089.3, 61000., 120000.], units='ft')
+            p.run_model()
+
+            data = p.check_partials(out_stream=None, method='cs')
+
+            assert_check_partials(data, atol=1e-10, rtol=1e-8)
+
+    def test_table(self):
+        # same splines as the scipy interpolants, evaluated from the precomputed coefficients
+        alt = np.linspace(-1000., 150000., 1001)
+        T, P, rho = usatm1976(alt, n_derivs=1)
+
+        assert_near_equal(T[0], T_interp(alt), 1e-12)
+        assert_near_equal(P[0], P_interp(alt), 1e-12)
+        assert_near_equal(rho[0], rho_interp(alt), 1e-12)
+        assert_near_equal(rho[1], rho_interp_deriv(alt), 1e-10)
+
+        self.assertEqual(usatm1976(30000.).shape, (3, 1))
+        self.assertEqual(usatm1976(np.ones((4, 5)), n_derivs=2).shape, (3, 3, 4, 5))
 
-        p.setup(force_alloc_complex=True)
-        p.final_setup()
+    def test_layered(self):
+        T, P, rho = usatm1976(USatm1976Data.alt, method='layered')[:, 0]
 
-        data = p.check_partials(out_stream=None)
+        assert_near_equal(T, USatm1976Data.T, 2e-6)
+        assert_near_equal(rho, USatm1976Data.rho, 5e-4)
 
-        assert_check_partials(data, atol=1e-4, rtol=1e-1)
+        # the table pressure at 19000 ft is out of line with its neighbors
+        good = USatm1976Data.alt != 19000
+        assert_near_equal(P[good], USatm1976Data.P[good], 5e-6)
+
+        with self.assertRaises(ValueError) as cm:
+            usatm1976(0., method='cubic')
+        self.assertEqual(str(cm.exception), "method must be 'table' or 'layered', not 'cubic'")
+
+    def test_out_of_range(self):
+        # no extrapolation: like the scipy interpolants, the values are NaN outside of the data
+        for method, alt_max in (('table', 150000.), ('layered', 278385.8)):
+            props = usatm1976([-1000.1, -1000., alt_max, alt_max + 0.1], method=method, n_derivs=2)
+
+            self.assertTrue(np.all(np.isnan(props[..., [0, 3]])))
+            self.assertTrue(np.all(np.isfinite(props[..., [1, 2]])))
+
+        p = Problem()
+        p.model.add_subsystem('std_1976', USatm1976Comp(num_nodes=2))
+        p.setup()
+        p.set_val('std_1976.alt', [160000., 30000.], units='ft')
+        p.run_model()
+
+        self.assertTrue(np.isnan(p.get_val('std_1976.Ts')[0]))
+        assert_near_equal(p.get_val('std_1976.Ts')[1], T_interp(30000.), 1e-12)
 
 
 if __name__ == "__main__":
     unittest.main()
-
@@ -4,9 +4,11 @@ from copy import copy
 import numpy as np
 
 import openmdao.api as om
+from openmdao.utils.units import unit_conversion
 
 from pycycle.constants import BTU_s2HP, HP_per_RPM_to_FT_LBF
 from pycycle.thermo.thermo import Thermo, ThermoAdd
+from pycycle.thermo.tabular.tabular_thermo import TabularProps
 from pycycle.thermo.cea import species_data
 from pycycle.flow_in import FlowIn
 from pycycle.passthrough import PassThrough
@@ -19,20 +21,26 @@ from pycycle.maps.lpt2269 import LPT2269
 class CorrectedInputsCalc(om.ExplicitComponent):
     """Compute design corrected flow (Wp) and design corrected speed (Np)"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('Tt', val=500., units='degR',
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('Tt', val=500., shape=nn, units='degR',
                        desc='incoming temperature')
-        self.add_input('Pt', val=14., units='psi', desc='incoming pressure')
-        self.add_input('W_in', val=30.0, units='lbm/s', desc='mass flow')
-        self.add_input('Nmech', val=1000.0, units='rpm', desc='shaft speed')
+        self.add_input('Pt', val=14., shape=nn, units='psi', desc='incoming pressure')
+        self.add_input('W_in', val=30.0, shape=nn, units='lbm/s', desc='mass flow')
+        self.add_input('Nmech', val=1000.0, shape=nn, units='rpm', desc='shaft speed')
 
-        self.add_output('Wp', val=30.0, units='lbm/s',
+        self.add_output('Wp', val=30.0, shape=nn, units='lbm/s',
                         desc='corrected mass flow')
-        self.add_output('Np', val=100., units='rpm',
+        self.add_output('Np', val=100., shape=nn, units='rpm',
                         desc='corrected shaft speed')
 
-        self.declare_partials('Wp', ['Tt', 'Pt', 'W_in'])
-        self.declare_partials('Np', ['Nmech', 'Tt'])
+        self.declare_partials('Wp', ['Tt', 'Pt', 'W_in'], rows=ar, cols=ar)
+        self.declare_partials('Np', ['Nmech', 'Tt'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -57,21 +65,27 @@ class CorrectedInputsCalc(om.ExplicitComponent):
 class eff_poly_calc(om.ExplicitComponent):
     """ Calculate polytropic efficiency for turbine"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # list_inputs
         # Note, Cp - Cv method for caluclating Rt was used because resulting values matched NPSS well.
         # calculating Rt with molecular weight and the universal R is also valid.
         # self.add_input(     'Cp', 1.0,units='Btu/(lbm*degR)',desc='specific heat at constant pressure')
         # self.add_input(     'Cv', 1.0,units='Btu/(lbm*degR)',desc='specific heat at constant volume')
-        self.add_input(     'PR', 1.0,units=None            ,desc='turbine pressure ratio (Pin/Pout)')
-        self.add_input(   'S_in', 1.0,units='Btu/(lbm*degR)',desc='element input entropy')
-        self.add_input(  'S_out', 1.0,units='Btu/(lbm*degR)',desc='element output entropy')
-        self.add_input(     'Rt', val=0.0686, units='Btu/(lbm*degR)', desc='specific gas constant')
+        self.add_input(     'PR', 1.0, shape=nn, units=None            ,desc='turbine pressure ratio (Pin/Pout)')
+        self.add_input(   'S_in', 1.0, shape=nn, units='Btu/(lbm*degR)',desc='element input entropy')
+        self.add_input(  'S_out', 1.0, shape=nn, units='Btu/(lbm*degR)',desc='element output entropy')
+        self.add_input(     'Rt', val=0.0686, shape=nn, units='Btu/(lbm*degR)', desc='specific gas constant')
         # list_outputs
-        self.add_output('eff_poly',    val=1.0,             units=None, desc='polytropic efficiency', lower=1e-6)
+        self.add_output('eff_poly',    val=1.0, shape=nn, units=None, desc='polytropic efficiency', lower=1e-6)
         # self.add_output(     'Rt', val=0.0686, units='Btu/(lbm*degR)', desc='specific gas constant', lower=1e-6)
         # define partials
-        self.declare_partials('eff_poly','*')
+        self.declare_partials('eff_poly','*', rows=ar, cols=ar)
         # self.declare_partials('Rt','Cp',val=1.0)
         # self.declare_partials('Rt','Cv',val=-1.0)
 
@@ -115,17 +129,23 @@ class eff_poly_calc(om.ExplicitComponent):
 class PressureDrop(om.ExplicitComponent):
     """Calculates pressure drop across the turbine"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('PR', val=3.0, desc='Design PR')
-        self.add_input('Pt_in', val=5.0, units='psi',
+        self.add_input('PR', val=3.0, shape=nn, desc='Design PR')
+        self.add_input('Pt_in', val=5.0, shape=nn, units='psi',
                        desc='Inlet total pressure')
 
         # outputs
-        self.add_output('Pt_out', shape=1, units='psi',
+        self.add_output('Pt_out', shape=nn, units='psi',
                         desc='Exit total pressure', lower=1e-3)
 
-        self.declare_partials('Pt_out', ['Pt_in', 'PR'])
+        self.declare_partials('Pt_out', ['Pt_in', 'PR'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['Pt_out'] = inputs['Pt_in'] / inputs['PR']
@@ -139,19 +159,25 @@ class PressureDrop(om.ExplicitComponent):
 class EnthalpyDrop(om.ExplicitComponent):
     """EnthalpyDrop is a component that calculates the actual enthalpy drop"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         # inputs
-        self.add_input('ht_in', val=10.0, units='Btu/lbm',
+        self.add_input('ht_in', val=10.0, shape=nn, units='Btu/lbm',
                        desc='incoming enthalpy')
-        self.add_input('ht_out_ideal', val=10.0, units='Btu/lbm',
+        self.add_input('ht_out_ideal', val=10.0, shape=nn, units='Btu/lbm',
                        desc='incoming ideal enthalpy')
-        self.add_input('eff', val=0.8, desc='isentropic efficiency')
+        self.add_input('eff', val=0.8, shape=nn, desc='isentropic efficiency')
 
         # outputs
-        self.add_output('ht_out', shape=1, units='Btu/lbm',
+        self.add_output('ht_out', shape=nn, units='Btu/lbm',
                         desc='actual enthalpy')
 
-        self.declare_partials('ht_out', ['ht_in', 'ht_out_ideal', 'eff'])
+        self.declare_partials('ht_out', ['ht_in', 'ht_out_ideal', 'eff'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['ht_out'] = inputs['ht_in'] - \
@@ -170,31 +196,34 @@ class BleedPressure(om.ExplicitComponent):
         self.options.declare('bleed_names', types=Iterable, 
                               desc='list of names for the bleed ports',
                               default=[])
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
 
         bleeds = self.options['bleed_names']
 
 
         # primary inputs and outputs
-        self.add_input('Pt_in', val=0.0, units='psi',
+        self.add_input('Pt_in', val=0.0, shape=nn, units='psi',
                        desc='turbine entrance pressure')
-        self.add_input('Pt_out', val=0.0, units='psi',
+        self.add_input('Pt_out', val=0.0, shape=nn, units='psi',
                        desc='turbine exit pressure')
         # self.add_input('W_in', val=0.0, units='lbm/s',
         #                desc='turbine entrance mass flow rate')
         
         # bleed inputs and outputs
         for BN in bleeds:
-            self.add_input(BN + ':frac_P', val=0.0,
+            self.add_input(BN + ':frac_P', val=0.0, shape=nn,
                            desc='fraction of pressure drop where bleed flow introduced')
-            self.add_input(BN + ':W', val=0.0, units='lbm/s',
+            self.add_input(BN + ':W', val=0.0, shape=nn, units='lbm/s',
                            desc='bleed mass flow rate')
          
-            self.add_output(BN + ':Pt', shape=1, units='psi',
+            self.add_output(BN + ':Pt', shape=nn, units='psi',
                             desc='pressure of incomming bleed flow', lower=1e-3)
 
-            self.declare_partials(BN+':Pt', ['Pt_in', 'Pt_out', BN+':frac_P'])
+            self.declare_partials(BN+':Pt', ['Pt_in', 'Pt_out', BN+':frac_P'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
 
@@ -226,32 +255,188 @@ class BleedPressure(om.ExplicitComponent):
             J[BN_pt, 'Pt_out'] = 1.0 - frac_P
             J[BN_pt, BN_frac_P] = Pt_in - Pt_out
 
+class BleedExpansion(om.ImplicitComponent):
+    """
+    Ideal expansion of all the bleeds of a turbine to the exit pressure, for the TABULAR thermo.
+
+    Replaces the two Thermo groups of each bleed, for the bleed inflow at the bleed pressure and its
+    isentropic expansion to the exit pressure. The temperatures of all the bleeds are the states, and
+    `solve_nonlinear` converges them together with one table evaluation per Newton iteration.
+    """
+
+    def initialize(self):
+        self.options.declare('bleed_names', types=Iterable, desc='list of names for the bleed ports',
+                              default=[])
+        self.options.declare('bleed_compositions', types=Iterable, default=[],
+                              desc='composition of each bleed flow')
+        self.options.declare('spec', recordable=False, desc='Tabular thermo data')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+        bleeds = self.options['bleed_names']
+        compositions = self.options['bleed_compositions']
+
+        species = sorted(compositions[0])
+        for BN, composition in zip(bleeds, compositions):
+            if sorted(composition) != species:
+                raise ValueError(f'The composition of bleed {BN} has species {sorted(composition)}, but '
+                                 f'all the bleeds must have the species {species}.')
+
+        self._props = props = TabularProps(self.options['spec'], compositions[0])
+        ns = len(species)
+        T_min, T_max = props.T_bounds
+
+        # the residuals have the units of the Thermo balances they replace
+        self._h_scale = unit_conversion('J/kg', 'cal/g')[0]
+        self._S_scale = unit_conversion('J/kg/degK', 'cal/(g*degK)')[0]
+
+        self.add_input('Pt_out', val=1e5, shape=nn, units='Pa', desc='exit total pressure')
+        self.declare_partials('*:Tt_ideal', 'Pt_out', rows=ar, cols=ar)
+        self.declare_partials('*:ht_ideal', 'Pt_out', rows=ar, cols=ar)
+
+        comp_rows = np.repeat(ar, ns)
+        comp_cols = np.arange(nn * ns)
+        for BN, composition in zip(bleeds, compositions):
+            comp_val = np.array([composition[k] for k in species])
+            if nn > 1:
+                comp_val = np.tile(comp_val, (nn, 1))
+
+            self.add_input(f'{BN}:ht', val=1.0, shape=nn, units='J/kg', desc='bleed total enthalpy')
+            self.add_input(f'{BN}:Pt', val=1e5, shape=nn, units='Pa', desc='pressure of incomming bleed flow')
+            self.add_input(f'{BN}:composition', val=comp_val, desc='composition of the bleed flow')
+
+            self.add_output(f'{BN}:Tt', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                            desc='bleed total temperature')
+            self.add_output(f'{BN}:Tt_ideal', val=500., shape=nn, units='degK', lower=T_min, upper=T_max,
+                            desc='ideally expanded bleed total temperature')
+            self.add_output(f'{BN}:ht_ideal', val=1., shape=nn, units='J/kg',
+                            desc='ideally expanded bleed total enthalpy')
+
+            self.declare_partials(f'{BN}:Tt', [f'{BN}:Tt', f'{BN}:Pt', f'{BN}:ht'], rows=ar, cols=ar)
+            self.declare_partials(f'{BN}:Tt_ideal', [f'{BN}:Tt_ideal', f'{BN}:Tt', f'{BN}:Pt'], rows=ar, cols=ar)
+            self.declare_partials(f'{BN}:ht_ideal', f'{BN}:Tt_ideal', rows=ar, cols=ar)
+            self.declare_partials(f'{BN}:ht_ideal', f'{BN}:ht_ideal', val=1., rows=ar, cols=ar)
+            self.declare_partials([f'{BN}:Tt', f'{BN}:Tt_ideal', f'{BN}:ht_ideal'], f'{BN}:composition',
+                                  rows=comp_rows, cols=comp_cols)
+
+    def _stacked(self, inputs, T, T_ideal):
+        """
+        Pressures and compositions of the inflow states of all the bleeds, followed by their ideal states
+        """
+        nn = self.options['num_nodes']
+        bleeds = self.options['bleed_names']
+        ns = len(self._props.species)
+
+        P = np.concatenate([inputs[f'{BN}:Pt'] for BN in bleeds] + [inputs['Pt_out']] * len(bleeds))
+        composition = np.concatenate([np.reshape(inputs[f'{BN}:composition'], (nn, ns)) for BN in bleeds] * 2)
+        return np.concatenate((T, T_ideal)), P, composition
+
+    def _evaluate(self, inputs, outputs):
+        """
+        h and S of the inflow and ideal states, with their derivatives, as (2, n_bleeds, num_nodes) arrays
+        """
+        nn = self.options['num_nodes']
+        bleeds = self.options['bleed_names']
+        ns = len(self._props.species)
+
+        T = np.concatenate([outputs[f'{BN}:Tt'] for BN in bleeds])
+        T_ideal = np.concatenate([outputs[f'{BN}:Tt_ideal'] for BN in bleeds])
+        props = self._props(*self._stacked(inputs, T, T_ideal), names=('h', 'S'))
+
+        return {name: (val.reshape(2, len(bleeds), nn), d_dT.reshape(2, len(bleeds), nn),
+                       d_dP.reshape(2, len(bleeds), nn), d_dcomp.reshape(2, len(bleeds), nn, ns))
+                for name, (val, d_dT, d_dP, d_dcomp) in props.items()}
+
+    def apply_nonlinear(self, inputs, outputs, resids):
+        props = self._evaluate(inputs, outputs)
+        h = props['h'][0]
+        S = props['S'][0]
+
+        for i, BN in enumerate(self.options['bleed_names']):
+            resids[f'{BN}:Tt'] = self._h_scale * (h[0, i] - inputs[f'{BN}:ht'])
+            resids[f'{BN}:Tt_ideal'] = self._S_scale * (S[1, i] - S[0, i])
+            resids[f'{BN}:ht_ideal'] = outputs[f'{BN}:ht_ideal'] - h[1, i]
+
+    def solve_nonlinear(self, inputs, outputs):
+        nn = self.options['num_nodes']
+        bleeds = self.options['bleed_names']
+        props = self._props
+        nb = len(bleeds)
+
+        T = np.concatenate([outputs[f'{BN}:Tt'] for BN in bleeds])
+        _, P, composition = self._stacked(inputs, T, T)
+
+        ht = np.concatenate([inputs[f'{BN}:ht'] for BN in bleeds])
+        T = props.solve_T('h', ht, T, P[:nb * nn], composition[:nb * nn], self._h_scale)
+        inflow = props(T, P[:nb * nn], composition[:nb * nn], names=('S', 'gamma'))
+        gamma = inflow['gamma'][0]
+
+        # start from an isentropic expansion at the inflow gamma
+        T_ideal = T * (P[nb * nn:] / P[:nb * nn])**((gamma - 1.) / gamma)
+        T_ideal = props.solve_T('S', inflow['S'][0], T_ideal, P[nb * nn:], composition[nb * nn:], self._S_scale)
+        h_ideal = props(T_ideal, P[nb * nn:], composition[nb * nn:], names=('h',))['h'][0]
+
+        for i, BN in enumerate(bleeds):
+            outputs[f'{BN}:Tt'] = T[i * nn:(i + 1) * nn]
+            outputs[f'{BN}:Tt_ideal'] = T_ideal[i * nn:(i + 1) * nn]
+            outputs[f'{BN}:ht_ideal'] = h_ideal[i * nn:(i + 1) * nn]
+
+    def linearize(self, inputs, outputs, J):
+        props = self._evaluate(inputs, outputs)
+        h, h_T, h_P, h_c = props['h']
+        S, S_T, S_P, S_c = props['S']
+        h_scale = self._h_scale
+        S_scale = self._S_scale
+
+        for i, BN in enumerate(self.options['bleed_names']):
+            J[f'{BN}:Tt', f'{BN}:Tt'] = h_scale * h_T[0, i]
+            J[f'{BN}:Tt', f'{BN}:Pt'] = h_scale * h_P[0, i]
+            J[f'{BN}:Tt', f'{BN}:ht'] = -h_scale
+            J[f'{BN}:Tt', f'{BN}:composition'] = h_scale * h_c[0, i].ravel()
+
+            J[f'{BN}:Tt_ideal', f'{BN}:Tt_ideal'] = S_scale * S_T[1, i]
+            J[f'{BN}:Tt_ideal', 'Pt_out'] = S_scale * S_P[1, i]
+            J[f'{BN}:Tt_ideal', f'{BN}:Tt'] = -S_scale * S_T[0, i]
+            J[f'{BN}:Tt_ideal', f'{BN}:Pt'] = -S_scale * S_P[0, i]
+            J[f'{BN}:Tt_ideal', f'{BN}:composition'] = S_scale * (S_c[1, i] - S_c[0, i]).ravel()
+
+            J[f'{BN}:ht_ideal', f'{BN}:Tt_ideal'] = -h_T[1, i]
+            J[f'{BN}:ht_ideal', 'Pt_out'] = -h_P[1, i]
+            J[f'{BN}:ht_ideal', f'{BN}:composition'] = -h_c[1, i].ravel()
+
+
 class EnthalpyAndPower(om.ExplicitComponent):
     """Calculates exit enthalpy and shaft power for the turbine"""
 
     def initialize(self):
         self.options.declare('bleed_names', types=Iterable, desc='list of names for the bleed ports',
                               default=[])
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
         bleeds = self.options['bleed_names']
         # primary inputs and outputs
-        self.add_input('W_in', val=30.0, units='lbm/s',
+        self.add_input('W_in', val=30.0, shape=nn, units='lbm/s',
                        desc='entrance mass flow')
-        self.add_input('W_out', val=30.0, units='lbm/s', desc='exit mass flow')
-        self.add_input('ht_in', val=10.0, units='Btu/lbm',
+        self.add_input('W_out', val=30.0, shape=nn, units='lbm/s', desc='exit mass flow')
+        self.add_input('ht_in', val=10.0, shape=nn, units='Btu/lbm',
                        desc='entrance enthalpy')
-        self.add_input('ht_out_ideal', val=10.0,
+        self.add_input('ht_out_ideal', val=10.0, shape=nn,
                        units='Btu/lbm', desc='ideal exit enthalpy')
-        self.add_input('eff', val=1.0, desc='turbine efficiency')
-        self.add_input('Nmech', val=1000.0, units='rpm', desc='shaft speed')
+        self.add_input('eff', val=1.0, shape=nn, desc='turbine efficiency')
+        self.add_input('Nmech', val=1000.0, shape=nn, units='rpm', desc='shaft speed')
 
-        self.add_output('ht_out_b4bld', shape=1, units='Btu/lbm',
+        self.add_output('ht_out_b4bld', shape=nn, units='Btu/lbm',
                         desc='downstream enthalpy')
-        self.add_output('ht_out', shape=1, units='Btu/lbm',
+        self.add_output('ht_out', shape=nn, units='Btu/lbm',
                         desc='downstream enthalpy')
-        self.add_output('power', shape=1, units='hp', desc='turbine power', res_ref=1e3)
-        self.add_output('trq', shape=1, units='ft*lbf', desc='turbine torque', res_ref=1e3)
+        self.add_output('power', shape=nn, units='hp', desc='turbine power', res_ref=1e3)
+        self.add_output('trq', shape=nn, units='ft*lbf', desc='turbine torque', res_ref=1e3)
 
         self._bleed_tups = []
 
@@ -261,22 +446,22 @@ class EnthalpyAndPower(om.ExplicitComponent):
             BN_ht = BN + ':ht'
             BN_ht_ideal = BN + ':ht_ideal'
 
-            self.add_input(BN_W, val=0.0, units='lbm/s',
+            self.add_input(BN_W, val=0.0, shape=nn, units='lbm/s',
                            desc='bleed mass flow rate')
-            self.add_input(BN_ht, val=0.0, units='Btu/lbm',
+            self.add_input(BN_ht, val=0.0, shape=nn, units='Btu/lbm',
                            desc='bleed total enthalpy')
-            self.add_input(BN_ht_ideal, val=0.0, units='Btu/lbm',
+            self.add_input(BN_ht_ideal, val=0.0, shape=nn, units='Btu/lbm',
                            desc='ideally expanded bleed total enthalpy')
 
             bleed_tup = (BN_W, BN_ht, BN_ht_ideal)
             self._bleed_tups.append(bleed_tup)
 
-            self.declare_partials(['ht_out', 'power', 'trq'], bleed_tup)
+            self.declare_partials(['ht_out', 'power', 'trq'], bleed_tup, rows=ar, cols=ar)
 
-        self.declare_partials('ht_out_b4bld', ['ht_in', 'ht_out_ideal', 'eff'])
-        self.declare_partials('ht_out', ['W_in', 'W_out', 'ht_in', 'ht_out_ideal', 'eff'])
-        self.declare_partials('power', ['W_in', 'ht_in', 'ht_out_ideal', 'eff'])
-        self.declare_partials('trq', ['W_in', 'ht_in', 'ht_out_ideal', 'eff', 'Nmech'])
+        self.declare_partials('ht_out_b4bld', ['ht_in', 'ht_out_ideal', 'eff'], rows=ar, cols=ar)
+        self.declare_partials('ht_out', ['W_in', 'W_out', 'ht_in', 'ht_out_ideal', 'eff'], rows=ar, cols=ar)
+        self.declare_partials('power', ['W_in', 'ht_in', 'ht_out_ideal', 'eff'], rows=ar, cols=ar)
+        self.declare_partials('trq', ['W_in', 'ht_in', 'ht_out_ideal', 'eff', 'Nmech'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         W_out = inputs['W_out']
@@ -414,6 +599,8 @@ class Turbine(Element):
         trq
     """
 
+    _vectorized = True
+
     def initialize(self):
         self.options.declare('map_data', default=LPT2269)
         self.options.declare('statics', default=True,
@@ -424,6 +611,9 @@ class Turbine(Element):
                               desc='Method to use for map interpolation. \
                               Options are `slinear`, `cubic`, `quintic`.')
         self.options.declare('map_extrap', default=False, desc='Switch to allow extrapoloation off map')
+        self.options.declare('fused_thermo', default=True, types=bool,
+                              desc='If True, the TABULAR thermo bleed expansions are computed by a single '
+                                   'BleedExpansion component instead of two Thermo groups per bleed.')
 
         self.default_des_od_conns = [
             # (design src, off-design target)
@@ -441,6 +631,7 @@ class Turbine(Element):
         thermo_method = self.options['thermo_method']
         thermo_data = self.options['thermo_data']
         bleeds = self.options['bleed_names']
+        nn = self.options['num_nodes']
 
         inflow_composition = self.Fl_I_data['Fl_I']
         # thermo add expects a list of bleed_element, one for each bleed
@@ -448,7 +639,7 @@ class Turbine(Element):
         for bleed_name in bleeds: 
             bleed_element_list.append(self.Fl_I_data[bleed_name])
         
-        self.bld_add = ThermoAdd(method=thermo_method, mix_names=bleeds, mix_mode='flow',
+        self.bld_add = ThermoAdd(method=thermo_method, mix_names=bleeds, mix_mode='flow', num_nodes=nn,
                                  thermo_kwargs={'spec':thermo_data, 
                                                 'inflow_composition':inflow_composition, 
                                                 'mix_composition':bleed_element_list})
@@ -466,20 +657,21 @@ class Turbine(Element):
         statics = self.options['statics']
         interp_method = self.options['map_interp_method']
         map_extrap = self.options['map_extrap']
+        nn = self.options['num_nodes']
 
         composition = self.Fl_I_data['Fl_I']
 
         # Create inlet flow station
-        in_flow = FlowIn(fl_name='Fl_I')
+        in_flow = FlowIn(fl_name='Fl_I', num_nodes=nn)
         self.add_subsystem('in_flow', in_flow, promotes_inputs=['Fl_I:*'])
 
-        self.add_subsystem('corrinputs', CorrectedInputsCalc(),
+        self.add_subsystem('corrinputs', CorrectedInputsCalc(num_nodes=nn),
                            promotes_inputs=[
                                'Nmech', ('W_in', 'Fl_I:stat:W'), ('Pt', 'Fl_I:tot:P'), ('Tt', 'Fl_I:tot:T')],
                            promotes_outputs=['Np', 'Wp'])
 
         turb_map = TurbineMap(map_data=map_data, design=designFlag,
-                              interp_method=interp_method, extrap=map_extrap)
+                              interp_method=interp_method, extrap=map_extrap, num_nodes=nn)
         if designFlag:
             self.add_subsystem('map', turb_map, promotes_inputs=['Np', 'Wp', 'PR', 'eff'],
                                promotes_outputs=['s_PR', 's_Wp', 's_eff', 's_Np'])
@@ -490,12 +682,12 @@ class Turbine(Element):
                                promotes_outputs=['PR', 'eff'])
 
         # Calculate pressure drop across turbine
-        self.add_subsystem('press_drop', PressureDrop(), promotes_inputs=[
+        self.add_subsystem('press_drop', PressureDrop(num_nodes=nn), promotes_inputs=[
                            'PR', ('Pt_in', 'Fl_I:tot:P')])
 
         # Calculate ideal flow station properties
         ideal_flow = Thermo(mode='total_SP', 
-                            method=thermo_method, 
+                            method=thermo_method, num_nodes=nn,
                             thermo_kwargs={'composition':composition, 
                                            'spec':thermo_data})
         self.add_subsystem('ideal_flow', ideal_flow,
@@ -508,12 +700,12 @@ class Turbine(Element):
         # self.connect("ideal_flow.h", "enth_drop.ht_out_ideal")
 
         for BN in bleeds:
-            bld_flow = FlowIn(fl_name=BN)
+            bld_flow = FlowIn(fl_name=BN, num_nodes=nn)
             self.add_subsystem(BN, bld_flow, promotes_inputs=[
                                f'{BN}:*'])
 
         # # Calculate bleed parameters
-        blds = BleedPressure(bleed_names=bleeds)
+        blds = BleedPressure(bleed_names=bleeds, num_nodes=nn)
         self.add_subsystem('blds', blds, 
                            promotes_inputs=[('Pt_in', 'Fl_I:tot:P'),] + [f'{BN}:frac_P' for BN in bleeds]
                            )
@@ -527,41 +719,53 @@ class Turbine(Element):
                            )
 
         bleed_names2 = []
-        for BN in bleeds:
-            # Determine bleed inflow properties
-            bleed_names2.append(BN + '_inflow')
-            inflow = Thermo(mode='total_hP', 
-                            method=thermo_method, 
-                            thermo_kwargs={'composition':self.Fl_I_data[BN], 
-                                           'spec':thermo_data})
-            self.add_subsystem(BN + '_inflow', inflow,
-                               promotes_inputs=[('composition', BN + ":tot:composition"), ('h', BN + ':tot:h')])
-            self.connect( f'blds.{BN}:Pt', f'{BN}_inflow.P')
-
-            # Ideally expand bleeds to exit pressure
-            bleed_names2.append(f'{BN}_ideal')
-            ideal = Thermo(mode='total_SP', 
-                           method=thermo_method, 
-                           thermo_kwargs={'composition':self.Fl_I_data[BN], 
-                                          'spec':thermo_data})
-            self.add_subsystem(f'{BN}_ideal', ideal,
-                               promotes_inputs=[('composition', BN + ":tot:composition")])
-            self.connect(f"{BN}_inflow.flow:S", f"{BN}_ideal.S")
-            self.connect("press_drop.Pt_out", f"{BN}_ideal.P")
+        if thermo_method == 'TABULAR' and self.options['fused_thermo'] and bleeds:
+            bld_exp = BleedExpansion(bleed_names=bleeds, bleed_compositions=[self.Fl_I_data[BN] for BN in bleeds],
+                                     spec=thermo_data, num_nodes=nn)
+            self.add_subsystem('bld_expansion', bld_exp,
+                               promotes_inputs=[(f'{BN}:ht', f'{BN}:tot:h') for BN in bleeds] +
+                                               [(f'{BN}:composition', f'{BN}:tot:composition') for BN in bleeds],
+                               promotes_outputs=[f'{BN}:ht_ideal' for BN in bleeds])
+            self.connect('press_drop.Pt_out', 'bld_expansion.Pt_out')
+            for BN in bleeds:
+                self.connect(f'blds.{BN}:Pt', f'bld_expansion.{BN}:Pt')
+            bleed_names2.append('bld_expansion')
+        else:
+            for BN in bleeds:
+                # Determine bleed inflow properties
+                bleed_names2.append(BN + '_inflow')
+                inflow = Thermo(mode='total_hP', 
+                                method=thermo_method, num_nodes=nn,
+                                thermo_kwargs={'composition':self.Fl_I_data[BN], 
+                                               'spec':thermo_data})
+                self.add_subsystem(BN + '_inflow', inflow,
+                                   promotes_inputs=[('composition', BN + ":tot:composition"), ('h', BN + ':tot:h')])
+                self.connect( f'blds.{BN}:Pt', f'{BN}_inflow.P')
+
+                # Ideally expand bleeds to exit pressure
+                bleed_names2.append(f'{BN}_ideal')
+                ideal = Thermo(mode='total_SP', 
+                               method=thermo_method, num_nodes=nn,
+                               thermo_kwargs={'composition':self.Fl_I_data[BN], 
+                                              'spec':thermo_data})
+                self.add_subsystem(f'{BN}_ideal', ideal,
+                                   promotes_inputs=[('composition', BN + ":tot:composition")])
+                self.connect(f"{BN}_inflow.flow:S", f"{BN}_ideal.S")
+                self.connect("press_drop.Pt_out", f"{BN}_ideal.P")
+                self.connect(f"{BN}_ideal.h", f"{BN}:ht_ideal")
 
         # Calculate shaft power and exit enthalpy with cooling flows production
-        self.add_subsystem('pwr_turb', EnthalpyAndPower(bleed_names=bleeds),
+        self.add_subsystem('pwr_turb', EnthalpyAndPower(bleed_names=bleeds, num_nodes=nn),
                            promotes_inputs=['Nmech', 'eff', 'W_out', ('W_in', 'Fl_I:stat:W'), ('ht_in', 'Fl_I:tot:h')] +
                                            [(BN + ':W', BN + ':stat:W') for BN in bleeds] +
                                            [(BN + ':ht', BN + ':tot:h') for BN in bleeds] +
-                                           [(BN + ':ht_ideal', BN + '_ideal.h')
-                                            for BN in bleeds],
+                                           [BN + ':ht_ideal' for BN in bleeds],
                            promotes_outputs=['power', 'trq', 'ht_out_b4bld'])
         self.connect('ideal_flow.h', 'pwr_turb.ht_out_ideal')
 
         # Calculate real flow station properties before bleed air is added
         real_flow_b4bld = Thermo(mode='total_hP', fl_name="Fl_O_b4bld:tot",
-                                 method=thermo_method, 
+                                 method=thermo_method, num_nodes=nn,
                                  thermo_kwargs={'composition':composition, 
                                                 'spec':thermo_data})
         self.add_subsystem('real_flow_b4bld', real_flow_b4bld,
@@ -570,14 +774,14 @@ class Turbine(Element):
         self.connect('press_drop.Pt_out', 'real_flow_b4bld.P')
 
         # Calculate Polytropic efficiency
-        self.add_subsystem('eff_poly_calc',eff_poly_calc(),promotes_inputs=['PR',('S_in','Fl_I:tot:S'),
+        self.add_subsystem('eff_poly_calc',eff_poly_calc(num_nodes=nn),promotes_inputs=['PR',('S_in','Fl_I:tot:S'),
                             ('Rt','Fl_I:tot:R')],
                             promotes_outputs=['eff_poly'])
         self.connect('real_flow_b4bld.Fl_O_b4bld:tot:S','eff_poly_calc.S_out')
 
         # Calculate real flow station properties
         real_flow = Thermo(mode='total_hP', fl_name="Fl_O:tot",
-                                 method=thermo_method, 
+                                 method=thermo_method, num_nodes=nn,
                                  thermo_kwargs={'composition':composition, 
                                                 'spec':thermo_data})
         self.add_subsystem('real_flow', real_flow,
@@ -591,7 +795,7 @@ class Turbine(Element):
             if designFlag:
                 #   SetStaticMN
                 out_stat = Thermo(mode='static_MN', fl_name="Fl_O:stat",
-                                 method=thermo_method, 
+                                 method=thermo_method, num_nodes=nn,
                                  thermo_kwargs={'composition':composition, 
                                                 'spec':thermo_data})
                 self.add_subsystem('out_stat', out_stat,
@@ -607,7 +811,7 @@ class Turbine(Element):
             else:
                 #   SetStaticArea
                 out_stat = Thermo(mode='static_A', fl_name="Fl_O:stat",
-                                 method=thermo_method, 
+                                 method=thermo_method, num_nodes=nn,
                                  thermo_kwargs={'composition':composition, 
                                                 'spec':thermo_data})
                 self.add_subsystem('out_stat', out_stat,
@@ -625,11 +829,11 @@ class Turbine(Element):
 
         else:
             self.add_subsystem('W_passthru', PassThrough(
-                'W_out', 'Fl_O:stat:W', 1.0, units="lbm/s"), promotes=['*'])
+                'W_out', 'Fl_O:stat:W', np.ones(nn), units="lbm/s"), promotes=['*'])
             self.set_order(['in_flow', 'corrinputs', 'map', 'press_drop', 'ideal_flow'] + bleeds + ['bld_add', 'blds'] + bleed_names2 +
                            ['pwr_turb','real_flow_b4bld', 'eff_poly_calc', 'real_flow', 'W_passthru'])
 
-        self.set_input_defaults('eff', val=0.99, units=None)
+        self.set_input_defaults('eff', val=0.99*np.ones(nn), units=None)
         # if not designFlag: 
         #     self.set_input_defaults('area', val=1, units='in**2')
         thermo_method = self.options['thermo_method']
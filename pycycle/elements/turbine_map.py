@@ -1,3 +1,5 @@
+import numpy as np
+
 import openmdao.api as om
 
 from pycycle.maps.lpt2269 import LPT2269
@@ -6,35 +8,41 @@ from pycycle.maps.lpt2269 import LPT2269
 class MapScalars(om.ExplicitComponent):
     """Compute map scalars"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('eff', val=2.0,
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('eff', val=2.0, shape=nn,
                        desc='Design adiabatic efficiency')
-        self.add_input('Np', val=2.0, units='rpm',
+        self.add_input('Np', val=2.0, shape=nn, units='rpm',
                        desc='Computed design referred shaft speed')
-        self.add_input('PR', val=2.0, desc='Design pressure ratio')
-        self.add_input('Wp', val=2.0, units='lbm/s',
+        self.add_input('PR', val=2.0, shape=nn, desc='Design pressure ratio')
+        self.add_input('Wp', val=2.0, shape=nn, units='lbm/s',
                        desc='Computed design referred mass flow rate')
-        self.add_input('effMap', val=2.0,
+        self.add_input('effMap', val=2.0, shape=nn,
                        desc='Design adiabatic efficiency of map')
-        self.add_input('NpMap', val=1.0, units='rpm',
+        self.add_input('NpMap', val=1.0, shape=nn, units='rpm',
                        desc='Design referred shaft speed of map')
-        self.add_input('PRmap', val=1.0, desc='Design pressure ratio of map')
-        self.add_input('WpMap', val=2.0, units='lbm/s',
+        self.add_input('PRmap', val=1.0, shape=nn, desc='Design pressure ratio of map')
+        self.add_input('WpMap', val=2.0, shape=nn, units='lbm/s',
                        desc='Design referred mass flow rate of map')
 
-        self.add_output('s_eff', shape=1,
+        self.add_output('s_eff', shape=nn,
                         desc='Scalar for design adiabatic efficiency')
-        self.add_output('s_Np', shape=1,
+        self.add_output('s_Np', shape=nn,
                         desc='Scalar for design corrected shaft speed')
-        self.add_output('s_PR', shape=1,
+        self.add_output('s_PR', shape=nn,
                         desc='Scalar for design pressure ratio')
-        self.add_output('s_Wp', shape=1,
+        self.add_output('s_Wp', shape=nn,
                         desc='Scalar for design corrected mass flow rate')
 
-        self.declare_partials('s_eff', ['eff', 'effMap'])
-        self.declare_partials('s_Np', ['Np', 'NpMap'])
-        self.declare_partials('s_PR', ['PR', 'PRmap'])
-        self.declare_partials('s_Wp', ['Wp', 'WpMap'])
+        self.declare_partials('s_eff', ['eff', 'effMap'], rows=ar, cols=ar)
+        self.declare_partials('s_Np', ['Np', 'NpMap'], rows=ar, cols=ar)
+        self.declare_partials('s_PR', ['PR', 'PRmap'], rows=ar, cols=ar)
+        self.declare_partials('s_Wp', ['Wp', 'WpMap'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['s_Np'] = inputs['Np'] / inputs['NpMap']
@@ -55,30 +63,36 @@ class MapScalars(om.ExplicitComponent):
 class ScaledMapValues(om.ExplicitComponent):
     """Scale map output"""
 
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
+
     def setup(self):
-        self.add_input('effMap', val=1.0, desc='Efficiency from unscaled map')
-        self.add_input('NpMap', val=1.0, units='rpm',
+        nn = self.options['num_nodes']
+        ar = np.arange(nn)
+
+        self.add_input('effMap', val=1.0, shape=nn, desc='Efficiency from unscaled map')
+        self.add_input('NpMap', val=1.0, shape=nn, units='rpm',
                        desc='Referred shaft speed from unscaled map')
-        self.add_input('PRmap', val=1.0, desc='Pressure ratio from unscaled map')
-        self.add_input('WpMap', val=1.0, units='lbm/s',
+        self.add_input('PRmap', val=1.0, shape=nn, desc='Pressure ratio from unscaled map')
+        self.add_input('WpMap', val=1.0, shape=nn, units='lbm/s',
                        desc='Referred mass flow rate from unscaled map')
-        self.add_input('s_eff', val=1.0,
+        self.add_input('s_eff', val=1.0, shape=nn,
                        desc='Scalar for adiabatic efficiency')
-        self.add_input('s_Np', val=1.0,
+        self.add_input('s_Np', val=1.0, shape=nn,
                        desc='Scalar for referred shaft speed')
-        self.add_input('s_PR', val=1.0, desc='Scalar for pressure ratio')
-        self.add_input('s_Wp', val=1.0,
+        self.add_input('s_PR', val=1.0, shape=nn, desc='Scalar for pressure ratio')
+        self.add_input('s_Wp', val=1.0, shape=nn,
                        desc='Scalar for referred mass flow rate')
 
-        self.add_output('eff', shape=1, desc='Adiabatic efficiency')
-        self.add_output('Np', shape=1, units='rpm', desc='Referred shaft speed')
-        self.add_output('PR', shape=1, desc='Pressure ratio')
-        self.add_output('Wp', shape=1, units='lbm/s', desc='Referred mass flow rate')
+        self.add_output('eff', shape=nn, desc='Adiabatic efficiency')
+        self.add_output('Np', shape=nn, units='rpm', desc='Referred shaft speed')
+        self.add_output('PR', shape=nn, desc='Pressure ratio')
+        self.add_output('Wp', shape=nn, units='lbm/s', desc='Referred mass flow rate')
 
-        self.declare_partials('eff', ['effMap', 's_eff'])
-        self.declare_partials('Np', ['NpMap', 's_Np'])
-        self.declare_partials('PR', ['PRmap', 's_PR'])
-        self.declare_partials('Wp', ['WpMap', 's_Wp'])
+        self.declare_partials('eff', ['effMap', 's_eff'], rows=ar, cols=ar)
+        self.declare_partials('Np', ['NpMap', 's_Np'], rows=ar, cols=ar)
+        self.declare_partials('PR', ['PRmap', 's_PR'], rows=ar, cols=ar)
+        self.declare_partials('Wp', ['WpMap', 's_Wp'], rows=ar, cols=ar)
 
     def compute(self, inputs, outputs):
         outputs['eff'] = inputs['effMap'] * inputs['s_eff']
@@ -105,6 +119,7 @@ class TurbineMap(om.Group):
         self.options.declare('design', default=True)
         self.options.declare('interp_method', default='slinear')
         self.options.declare('extrap', default=False)
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
 
@@ -112,12 +127,13 @@ class TurbineMap(om.Group):
         design = self.options['design']
         method = self.options['interp_method']
         extrap = self.options['extrap']
+        nn = self.options['num_nodes']
 
         params = map_data.param_data
         outputs = map_data.output_data
 
         # Define map which will be used
-        readmap = om.MetaModelStructuredComp(method=method, extrapolate=extrap)
+        readmap = om.MetaModelStructuredComp(method=method, extrapolate=extrap, vec_size=nn)
         for p in params:
             readmap.add_input(p['name'], val=p['default'], units=p['units'],
                         training_data=p['values'])
@@ -127,15 +143,15 @@ class TurbineMap(om.Group):
 
         if design:
             # In design mode, operating point specified by default values for RlineMap, NcMap and alphaMap
-            self.set_input_defaults('NpMap', val=map_data.defaults['NpMap'], units='rpm')
-            self.set_input_defaults('PRmap', val=map_data.defaults['PRmap'], units=None)
+            self.set_input_defaults('NpMap', val=map_data.defaults['NpMap']*np.ones(nn), units='rpm')
+            self.set_input_defaults('PRmap', val=map_data.defaults['PRmap']*np.ones(nn), units=None)
 
             # Evaluate map using design point values
             self.add_subsystem('readMap', readmap, promotes_inputs=['alphaMap', 'NpMap', 'PRmap'],
                                 promotes_outputs=['effMap', 'WpMap'])
 
             # Compute map scalars based on input PR, eff, Np and Wp as well as unscaled map values
-            self.add_subsystem('scalars', MapScalars(),
+            self.add_subsystem('scalars', MapScalars(num_nodes=nn),
                                 promotes_inputs=['PR', 'eff', 'Np', 'Wp', 'NpMap', 'effMap', 'PRmap', 'WpMap'],
                                 promotes_outputs=['s_Np', 's_PR', 's_eff', 's_Wp'])
 
@@ -145,14 +161,14 @@ class TurbineMap(om.Group):
                                 promotes_outputs=['effMap', 'WpMap'])
 
             # Compute scaled map outputs base on input scalars and unscaled map values
-            self.add_subsystem('scaledOutput', ScaledMapValues(),
+            self.add_subsystem('scaledOutput', ScaledMapValues(num_nodes=nn),
                                 promotes_inputs=['s_PR', 's_eff', 's_Wp', 's_Np', 'NpMap', 'effMap', 'PRmap', 'WpMap'],
                                 promotes_outputs=['PR', 'eff'])
 
             # Use balance component to vary NpMap and PRmap to match incoming corrected flow and speed
             map_bal = om.BalanceComp()
-            map_bal.add_balance('NpMap', val=map_data.defaults['NpMap'], units='rpm', eq_units='rpm', lower=.1, upper=200.)
-            map_bal.add_balance('PRmap', val=map_data.defaults['PRmap'], units=None,
+            map_bal.add_balance('NpMap', val=map_data.defaults['NpMap'], shape=nn, units='rpm', eq_units='rpm', lower=.1, upper=200.)
+            map_bal.add_balance('PRmap', val=map_data.defaults['PRmap'], shape=nn, units=None,
                                 eq_units='lbm/s', lower=1.01)
             self.add_subsystem(name='map_bal', subsys=map_bal,
                                 promotes_inputs=[('lhs:NpMap','Np'),('lhs:PRmap','Wp')],
@@ -5,6 +5,66 @@ import numpy as np
 import openmdao.api as om 
 
 
+# the variables of a flow station in a fixed order: (name, default value, units, description)
+TOT_VARS = (
+    ('h', 1.0, 'Btu/lbm', 'total enthalpy'),
+    ('T', 518., 'degR', 'total temperature'),
+    ('P', 1., 'lbf/inch**2', 'total pressure'),
+    ('rho', 1.0, 'lbm/ft**3', 'total density'),
+    ('gamma', 1.4, None, 'total gamma'),
+    ('Cp', 1.0, 'Btu/(lbm*degR)', 'total Specific heat at constant pressure'),
+    ('Cv', 1.0, 'Btu/(lbm*degR)', 'total Specific heat at constant volume'),
+    ('S', 1.0, 'Btu/(lbm*degR)', 'total entropy'),
+    ('R', 1.0, 'Btu/(lbm*degR)', 'total gas constant'),
+)
+
+STAT_VARS = (
+    ('h', 1.0, 'Btu/lbm', 'static enthalpy'),
+    ('T', 518., 'degR', 'static temperature'),
+    ('P', 1.0, 'lbf/inch**2', 'static pressure'),
+    ('rho', 1.0, 'lbm/ft**3', 'static density'),
+    ('gamma', 1.4, None, 'static gamma'),
+    ('Cp', 1.0, 'Btu/(lbm*degR)', 'static Specific heat at constant pressure'),
+    ('Cv', 1.0, 'Btu/(lbm*degR)', 'static Specific heat at constant volume'),
+    ('S', 0.0, 'Btu/(lbm*degR)', 'static entropy'),
+    ('R', 1.0, 'Btu/(lbm*degR)', 'static gas constant'),
+    # TODO takes these out of static (keep them top level)
+    ('V', 1.0, 'ft/s', 'Velocity'),
+    ('Vsonic', 1.0, 'ft/s', 'Speed of sound'),
+    ('MN', 1.0, None, 'Mach number'),
+    ('area', 1.0, 'inch**2', 'flow area'),
+    ('Wc', 1.0, 'lbm/s', 'corrected weight flow'),
+    ('W', 0.0, 'lbm/s', 'weight flow'),
+)
+
+# variables that `Cycle.pyc_connect_flow` connects from an output port to an input port
+CONNECTED_TOT_VARS = ('h', 'T', 'P', 'S', 'rho', 'gamma', 'Cp', 'Cv', 'R')
+CONNECTED_STAT_VARS = ('V', 'Vsonic', 'Cp', 'Cv', 'MN', 'P', 'S', 'T', 'area', 'gamma', 'h', 'rho')
+
+
+def flow_vars(fl_name, tot=True, stat=True, W=True):
+    """
+    Names of the flow variables of port `fl_name` that are connected between two ports
+
+    fl_name: str
+        name of the port, e.g. 'Fl_I' or 'comp.Fl_O'
+    tot: bool
+        include the total properties
+    stat: bool
+        include the static properties (except the weight flow)
+    W: bool
+        include the weight flow
+    """
+    names = []
+    if tot:
+        names.extend(f'{fl_name}:tot:{name}' for name in CONNECTED_TOT_VARS)
+    if stat:
+        names.extend(f'{fl_name}:stat:{name}' for name in CONNECTED_STAT_VARS)
+    if W:
+        names.append(f'{fl_name}:stat:W')
+    return names
+
+
 class FlowIn(om.ExplicitComponent):
     """
     Provides a central place to connect flow information to in a component
@@ -14,43 +74,32 @@ class FlowIn(om.ExplicitComponent):
     def initialize(self):
         self.options.declare('fl_name', default='flow',
                               desc='thermodynamic data set')
+        self.options.declare('num_nodes', default=1, types=int, lower=1,
+                              desc='Number of flow conditions evaluated in a vectorized way')
+        self.options.declare('lean', default=False, types=bool,
+                              desc='If True, only the compositions and the variables that are not connected by '
+                                   '`pyc_connect_flow` are declared. The connected variables then only exist '
+                                   'if something in the element uses them.')
 
     def setup(self):
         fl_name = self.options['fl_name']
+        nn = self.options['num_nodes']
+        lean = self.options['lean']
 
         self.add_output('foo', val=1.,
             desc="dummy output that is NOT used for anything other than to keep the framework happy. ")
 
-        self.add_input('%s:tot:h'%fl_name, val=1.0, desc='total enthalpy', units='Btu/lbm')
-        self.add_input('%s:tot:T'%fl_name, val=518., desc='total temperature', units='degR')
-        self.add_input('%s:tot:P'%fl_name, val=1., desc='total pressure', units='lbf/inch**2')
-        self.add_input('%s:tot:rho'%fl_name, val=1.0, desc='total density', units='lbm/ft**3')
-        self.add_input('%s:tot:gamma'%fl_name, val=1.4, desc='total gamma')
-        self.add_input('%s:tot:Cp'%fl_name, val=1.0, desc='total Specific heat at constant pressure', units='Btu/(lbm*degR)')
-        self.add_input('%s:tot:Cv'%fl_name, val=1.0, desc='total Specific heat at constant volume', units='Btu/(lbm*degR)')
-        self.add_input('%s:tot:S'%fl_name, val=1.0, desc='total entropy', units='Btu/(lbm*degR)')
-        self.add_input('%s:tot:R'%fl_name, val=1.0, desc='total gas constant', units='Btu/(lbm*degR)')
+        for name, val, units, desc in TOT_VARS:
+            if not (lean and name in CONNECTED_TOT_VARS):
+                self.add_input(f'{fl_name}:tot:{name}', val=val, shape=nn, desc=desc, units=units)
         self.add_input('%s:tot:composition'%fl_name, shape_by_conn=True, desc='flow composition vector')
 
-        self.add_input('%s:stat:h'%fl_name, val=1.0, desc='static enthalpy', units='Btu/lbm')
-        self.add_input('%s:stat:T'%fl_name, val=518., desc='static temperature', units='degR')
-        self.add_input('%s:stat:P'%fl_name, val=1.0, desc='static pressure', units='lbf/inch**2')
-        self.add_input('%s:stat:rho'%fl_name, val=1.0, desc='static density', units='lbm/ft**3')
-        self.add_input('%s:stat:gamma'%fl_name, val=1.4, desc='static gamma')
-        self.add_input('%s:stat:Cp'%fl_name, val=1.0, desc='static Specific heat at constant pressure', units='Btu/(lbm*degR)')
-        self.add_input('%s:stat:Cv'%fl_name, val=1.0, desc='static Specific heat at constant volume', units='Btu/(lbm*degR)')
-        self.add_input('%s:stat:S'%fl_name, val= 0.0, desc='static entropy', units='Btu/(lbm*degR)')
-        self.add_input('%s:stat:R'%fl_name, val=1.0, desc='static gas constant', units='Btu/(lbm*degR)')
+        for name, val, units, desc in STAT_VARS:
+            if not (lean and (name in CONNECTED_STAT_VARS or name == 'W')):
+                self.add_input(f'{fl_name}:stat:{name}', val=val, shape=nn, desc=desc, units=units)
         self.add_input('%s:stat:composition'%fl_name, shape_by_conn=True, desc='flow composition vector')
 
-        # TODO takes these out of static (keep them top level)
-        self.add_input('%s:stat:V'%fl_name, val=1.0, desc='Velocity', units='ft/s')
-        self.add_input('%s:stat:Vsonic'%fl_name, val=1.0, desc='Speed of sound', units='ft/s')
-        self.add_input('%s:stat:MN'%fl_name, val=1.0, desc='Mach number')
-        self.add_input('%s:stat:area'%fl_name, val=1.0, desc='flow area', units='inch**2')
-        self.add_input('%s:stat:Wc'%fl_name, val=1.0, desc='corrected weight flow', units='lbm/s')
-        self.add_input('%s:stat:W'%fl_name, val= 0.0, desc='weight flow', units='lbm/s')
-        self.add_input('%s:FAR'%fl_name, val=0.0, desc='fuel to air ratio')
+        self.add_input('%s:FAR'%fl_name, val=0.0, shape=nn, desc='fuel to air ratio')
         # self.add_input('%s:WAR'%fl_name, val  = 0.0, desc='water to air ratio')
         # self.add_input('%s:nu', %nameval=1.0, desc='dynamic viscosity', units='lbm/(s*ft)')
 
@@ -1,13 +1,93 @@
 from collections import namedtuple
 
+import sys
 import warnings
+from fnmatch import fnmatchcase
+
+import numpy as np
 
 import openmdao.api as om 
+from openmdao.utils.units import is_compatible
 import networkx as nx
 
 from pycycle.element_base import Element
+from pycycle.flow_in import flow_vars
+from pycycle.elements.flight_conditions import FlightConditions
+from pycycle.elements.US1976 import usatm1976
 from pycycle.thermo.cea import species_data
 from pycycle.constants import ALLOWED_THERMOS
+from pycycle.snapshot import save_snapshot, load_snapshot
+from pycycle.result_cache import cached_solve_nonlinear
+
+
+# exponents of (theta, delta) used to scale design point states to an off-design flight condition,
+# keyed by a representative unit of each kind of quantity. Anything else is copied unscaled.
+_SIMILARITY_EXPONENTS = (
+    ('degR', (1., 0.)),         # temperature
+    ('psi', (0., 1.)),          # pressure
+    ('lbm/s', (-0.5, 1.)),      # mass flow
+    ('rpm', (0.5, 0.)),         # shaft speed
+    ('ft/s', (0.5, 0.)),        # velocity
+    ('hp', (0.5, 1.)),          # power
+    ('lbf', (0., 1.)),          # force
+    ('ft*lbf', (0., 1.)),       # torque
+    ('lbm/ft**3', (-1., 1.)),   # density
+)
+
+
+def _similarity_exponents(units):
+    if units is None:
+        return None
+    for ref_units, exps in _SIMILARITY_EXPONENTS:
+        if is_compatible(units, ref_units):
+            return exps
+    return None
+
+
+def _reduce_feedback(order, edge_weights, max_passes=20): 
+    """
+    Improve an execution order by moving one node at a time to the position that 
+    minimizes the total weight of its backward edges, until no single move helps. 
+
+    order: list of str
+        the starting order of the nodes
+    edge_weights: dict
+        maps (src, target) node pairs to the weight of that edge
+    """
+    succ = {n: {} for n in order}
+    pred = {n: {} for n in order}
+    for (src, tgt), w in edge_weights.items(): 
+        if src != tgt: 
+            succ[src][tgt] = w
+            pred[tgt][src] = w
+
+    order = list(order)
+    for i in range(max_passes): 
+        moved = False
+        for node in list(order): 
+            old_slot = order.index(node)
+            order.pop(old_slot)
+            pos = {n: i for i, n in enumerate(order)}
+            n_slots = len(order) + 1
+
+            # cost[k] is the backward weight on this node's edges if it is inserted at slot k
+            cost = np.zeros(n_slots)
+            for tgt, w in succ[node].items(): 
+                cost[pos[tgt]+1:] += w
+            for src, w in pred[node].items(): 
+                cost[:pos[src]+1] += w
+
+            best = old_slot
+            for k in np.argsort(np.abs(np.arange(n_slots) - old_slot), kind='stable'): 
+                if cost[k] < cost[best]: 
+                    best = k
+            order.insert(best, node)
+            moved = moved or best != old_slot
+
+        if not moved: 
+            break
+
+    return order
 
 
 class Cycle(om.Group): 
@@ -22,6 +102,27 @@ class Cycle(om.Group):
         self.options.declare('thermo_data', default=species_data.janaf,
                               desc='thermodynamic data set.', 
                               recordable=False)
+        self.options.declare('num_nodes', default=1, types=int, lower=1,
+                              desc='Number of operating points evaluated at once. Every element (and the thermo) '
+                                   'computes all of them with vectorized calculations.')
+        self.options.declare('auto_flow_order', default=False, types=bool, 
+                              desc='If True, the execution order of the subsystems is computed from the flow graph '
+                                   'and the other connections (e.g. shafts and balances) to minimize feedback, '
+                                   'replacing any `set_order` call.')
+        self.options.declare('dedup_thermo', default=False, types=bool,
+                              desc='If True, the elements evaluate identical flow states within the element (e.g. the '
+                                   'two outlets of a Splitter) with a single Thermo and copy the results to the other '
+                                   'flow stations. Identical states of different elements are not merged. Off by default.')
+        self.options.declare('lean_flow_ports', default=False, types=bool,
+                              desc='If True, `pyc_connect_flow` only connects the flow variables that the target '
+                                   'element uses, and the FlowIn components of the elements do not declare the others. '
+                                   'This cuts the number of inputs and connections (and the setup time) of large models, '
+                                   'but the unused flow variables of the input ports can not be read.')
+        self.options.declare('result_cache_size', default=0, types=int, lower=0,
+                              desc='Number of converged solutions of this cycle kept in a LRU cache, keyed by the values '
+                                   'of its inputs connected from outside and of the independent variables that feed its '
+                                   'inputs. When the cycle is solved again with the same values, the solution is restored '
+                                   'instead. Total derivatives are not cached. Zero turns the cache off.')
 
         self._elements = set()
 
@@ -32,6 +133,19 @@ class Cycle(om.Group):
 
         self._children = {}
 
+        # flow variable connections (target: src) made in `configure` when `lean_flow_ports` is on
+        self._pyc_flow_conns = {}
+
+        # port data for elements in this cycle that are fed by flows connected in a parent cycle
+        self._upstream_Fl_I_data = {}
+
+        # design point used to generate the initial guess for an off-design cycle (set by MPCycle)
+        self._des_guess_src = None
+        self._des_guess_skip = None
+        self._des_guess_applied = False
+
+        self._result_cache = None
+
     def _setup_check(self): 
 
         if not self._base_class_super_called: 
@@ -75,83 +189,333 @@ class Cycle(om.Group):
 
         self._base_class_super_called = True
 
-
-        # Code that follows the flow-graph and propagates thermo setup data down the chain
-        node_types = nx.get_node_attributes(self._flow_graph, 'type')
-        node_parents = nx.get_node_attributes(self._flow_graph, 'parent')
-        node_port_names = nx.get_node_attributes(self._flow_graph, 'port_name')
-
-        G = self._flow_graph
-
-        # put all starting nodes into a FIFO queue
-        queue = [node for node in self._flow_graph if G.in_degree(node) == 0]
-        visited = set() # use a set, because checking "in" on a queue is slow
-
-
         # loop over all child subsystems and push down cycle level options 
-        cycle_level_options = ['thermo_method', 'thermo_data', 'design']
+        cycle_level_options = ['thermo_method', 'thermo_data', 'design', 'num_nodes', 'dedup_thermo', 'lean_flow_ports']
         for child_name, child in self._children.items():
             for opt in cycle_level_options: 
                 if opt in child.options: 
                     child.options[opt] = self.options[opt]
 
+        self._pyc_propagate_flow_data()
+
+        if self.options['auto_flow_order']: 
+            self.set_order(self._pyc_auto_order())
+
+    def _configure(self): 
+        super()._configure()
+        # the connections need the inputs of the configured elements. This is done here rather than in 
+        # `configure`, so a subclass that overrides `configure` without calling super does not lose them
+        if self._pyc_flow_conns: 
+            self._pyc_connect_used_flow_vars()
+
+    def _pyc_connect_used_flow_vars(self): 
+        """
+        Make the flow variable connections of `pyc_connect_flow` that have a target in the element, 
+        for the `lean_flow_ports` option
+        """
+        used = {}
+        for tgt, src in self._pyc_flow_conns.items(): 
+            elem_name, _, var_name = tgt.rpartition('.')
+            if elem_name not in used: 
+                elem = self._get_subsystem(elem_name)
+                if elem is None: 
+                    used[elem_name] = None
+                else: 
+                    meta = elem.get_io_metadata(iotypes='input', metadata_keys=())
+                    used[elem_name] = {m['prom_name'] for m in meta.values()}
+
+            if used[elem_name] is None or var_name in used[elem_name]: 
+                self.connect(src, tgt)
+
+    def _pyc_propagate_flow_data(self): 
+        """
+        Follow the flow-graph and propagate the thermo setup data down the chain, 
+        by calling `pyc_setup_output_ports` on each element once all of its upstream ports have been set up
+        """
 
         # note: three kinds of nodes in graph, elements, in_ports, out_ports. 
-        #       The graph is a tree with (potentially) multiple separate root nodes. 
-        #       We will do a breadth first search, starting from all starting nodes at the same time. 
-        #       This makes sure that Elements with multiple inputs will have all
-        #       predecessors set up before we get to them. 
-        while queue:
-            node = queue.pop(0) 
-            node_type = node_types[node]
-
-            # make sure we've already processed all predecessor nodes
-            # if not skip this one, we'll hit it again later
-            ready_for_node = True
-
-            for p in G.predecessors(node): 
-                if p not in visited: 
-                    ready_for_node = False
-                    break
-            if not ready_for_node:
+        #       The graph is a DAG with (potentially) multiple separate root nodes. 
+        #       A single pass in topological order makes sure that Elements with multiple inputs 
+        #       have all predecessors set up before we get to them. 
+        G = self._flow_graph
+        node_types = nx.get_node_attributes(G, 'type')
+        node_parents = nx.get_node_attributes(G, 'parent')
+        node_port_names = nx.get_node_attributes(G, 'port_name')
+
+        # data for ports on our elements that are fed by flows from outside this cycle
+        for (elem_name, in_port), port_data in self._upstream_Fl_I_data.items(): 
+            self._pyc_set_Fl_I_data(elem_name, in_port, port_data)
+
+        try: 
+            order = list(nx.topological_sort(G))
+        except nx.NetworkXUnfeasible: 
+            loop = ' -> '.join(edge[0] for edge in nx.find_cycle(G))
+            raise RuntimeError(f'{self.msginfo}: the flow connections form a loop, so the port data can not be '
+                               f'propagated: {loop}. Flow can not be connected back into an upstream element.')
+
+        for node in order: 
+            node_type = node_types.get(node)
+
+            if node_type == 'element': 
+                self._children[node].pyc_setup_output_ports()
+
+            # connection will be out_port -> in_port
+            elif node_type == 'out_port': 
+                src_element = self._get_subsystem(node_parents[node])
+                if src_element is None: 
+                    raise RuntimeError(f'{self.msginfo}: the source of flow `{node}` could not be found. '
+                                       'Flow can only be connected out of an element that is a direct child of the cycle.')
+
+                out_port = node_port_names[node]
+                if out_port not in src_element.Fl_O_data: 
+                    raise RuntimeError(f'in {self.pathname},{src_element.pathname}.{out_port} has not been properly setup.'
+                                       f'something is wrong with one of your `pyc_setup_output_ports` method in {src_element.pathname}')
+
+                # in almost every case there should only be one link, because otherwise you are creating extra mass flow 
+                # the one exception is for the cooling calcs, which get some "weak" connections from turbine and bleed srcs
+                for _, in_node in G.out_edges(node): 
+                    # this passes whatever configuration data there was from the src element to the target keyed by port names
+                    self._pyc_set_Fl_I_data(node_parents[in_node], node_port_names[in_node], src_element.Fl_O_data[out_port])
+
+    def _pyc_auto_order(self): 
+        """
+        Compute an execution order for the subsystems that minimizes the number of feedback connections, 
+        using the flow graph and all the connections (including shaft and balance connections) issued in this cycle
+        """
+        sub_names = list(self._subsystems_allprocs)
+        sub_set = set(sub_names)
+
+        # names promoted up from each subsystem, so connections to promoted names can be traced
+        prom_inputs = {}
+        prom_outputs = {}
+        for name in sub_names: 
+            subsys = self._get_subsystem(name)
+            promotes = subsys._var_promotes
+            prom_inputs[name] = [p[0] for p in promotes['input'] + promotes['any']]
+            prom_outputs[name] = [p[0] for p in promotes['output'] + promotes['any']]
+
+        def owners(var_name, proms): 
+            sub_name = var_name.split('.')[0]
+            if sub_name in sub_set and '.' in var_name: 
+                return [sub_name]
+            found = []
+            for name in sub_names: 
+                for p in proms[name]: 
+                    if (isinstance(p, tuple) and p[1] == var_name) or (isinstance(p, str) and fnmatchcase(var_name, p)): 
+                        found.append(name)
+                        break
+            return found
+
+        # flow connections carry a whole flow station, so they are weighted by the number of connected variables
+        weights = {}
+        conns = dict(self._static_manual_connections)
+        conns.update(self._manual_connections)
+        conns.update((tgt, (src,)) for tgt, src in self._pyc_flow_conns.items())
+        for tgt, (src, *_) in conns.items(): 
+            for src_sub in owners(src, prom_outputs): 
+                for tgt_sub in owners(tgt, prom_inputs): 
+                    weights[src_sub, tgt_sub] = weights.get((src_sub, tgt_sub), 0) + 1
+
+        # outputs and inputs promoted to the same name are implicitly connected
+        for src_sub in sub_names: 
+            for p in prom_outputs[src_sub]: 
+                out_name = p[1] if isinstance(p, tuple) else p
+                if any(c in out_name for c in '*?['): 
+                    continue
+                for tgt_sub in owners(out_name, prom_inputs): 
+                    weights[src_sub, tgt_sub] = weights.get((src_sub, tgt_sub), 0) + 1
+
+        # start from the flow path (in the order the elements were added when the flow branches), 
+        # with everything else where it was added, then move things around to cut feedback
+        index = {name: i for i, name in enumerate(sub_names)}
+        flow_order = []
+        for node in nx.lexicographical_topological_sort(self._flow_graph, key=lambda n: index.get(n.split('.')[0], -1)): 
+            sub_name = node.split('.')[0]
+            if sub_name in index and sub_name not in flow_order and self._flow_graph.nodes[node].get('type') == 'element': 
+                flow_order.append(sub_name)
+        initial = flow_order + [name for name in sub_names if name not in flow_order]
+
+        return _reduce_feedback(initial, weights)
+
+    def pyc_list_feedback_conns(self, out_stream=sys.stdout): 
+        """
+        List the connections inside this cycle that go from a subsystem to one that runs before it, 
+        given the current execution order. Must be called after `final_setup`. 
+        Returns a list of (src, target) names, relative to the cycle.
+        """
+        if self._outputs is None: 
+            raise RuntimeError(f'{self.msginfo}: feedback connections can only be listed after the model is setup. '
+                               'Call `final_setup` on the problem first.')
+
+        prefix = self.pathname + '.' if self.pathname else ''
+        n_prefix = len(prefix)
+        order = {name: i for i, name in enumerate(self._subsystems_allprocs)}
+
+        feedback = []
+        for tgt, src in self._conn_global_abs_in2out.items(): 
+            if not (tgt.startswith(prefix) and src.startswith(prefix)): 
                 continue
+            src, tgt = src[n_prefix:], tgt[n_prefix:]
+            src_sub, tgt_sub = src.split('.')[0], tgt.split('.')[0]
+            if src_sub in order and tgt_sub in order and order[src_sub] > order[tgt_sub]: 
+                feedback.append((src, tgt))
+        feedback.sort()
+
+        if out_stream is not None: 
+            print(f'{len(feedback)} feedback connection(s) in {self.msginfo}', file=out_stream)
+            for src, tgt in feedback: 
+                print(f'    {src} -> {tgt}', file=out_stream)
 
-            queue.extend(G.successors(node))
+        return feedback
+
+    def _pyc_set_Fl_I_data(self, elem_name, in_port, port_data): 
+        """
+        Set the port data for the given input port. If the element is inside a sub-cycle, 
+        the data is stored on the sub-cycle and passed along when it gets set up.
+        """
+        element = self._get_subsystem(elem_name)
+        if element is not None: 
+            element.Fl_I_data[in_port] = port_data
+            return
+
+        sub_name, _, rel_name = elem_name.partition('.')
+        sub_cycle = self._children.get(sub_name)
+        if not rel_name or not isinstance(sub_cycle, Cycle): 
+            raise RuntimeError(f'{self.msginfo}: could not find the element `{elem_name}` to connect the `{in_port}` '
+                               'flow to. Check the name in your `pyc_connect_flow` call.')
+
+        sub_cycle._upstream_Fl_I_data[rel_name, in_port] = port_data
+
+
+    def pyc_save_snapshot(self, filename): 
+        """
+        Save every solved output in this cycle (including the internal thermo states, but not the 
+        IndepVarComp outputs) to a compressed binary file, so a converged solution can be used as the initial guess later
+        """
+        save_snapshot(self, filename)
+
+    def pyc_load_snapshot(self, filename, strict=False): 
+        """
+        Load a snapshot saved by `pyc_save_snapshot` as the initial guess for this cycle. 
+        Outputs that don't exist in this cycle (or have a different size) are skipped, 
+        unless `strict` is True. Returns the number of outputs that were set.
+        """
+        return load_snapshot(self, filename, strict=strict)
 
-            if node not in visited: 
+    def pyc_clear_result_cache(self): 
+        """
+        Drop all the solutions in the result cache, e.g. after changing something that is not part of its key
+        """
+        if self._result_cache is not None: 
+            self._result_cache.clear()
 
-                if node_type == 'element': 
-                    node_element = self._get_subsystem(node)
-                    node_element.pyc_setup_output_ports()
+    def _solve_nonlinear(self): 
+        cached_solve_nonlinear(self, super()._solve_nonlinear)
 
-                # connection will be out_port -> in_port
-                elif node_type == 'out_port': 
-                    src_element = self._get_subsystem(node_parents[node])
-                    links = G.out_edges(node)
-                    for link in links: 
-                        # in almost every case there should only be one link, because otherwise you are creating extra mass flow 
-                        # the one exception is for the cooling calcs, which get some "weak" connections from turbine and bleed srcs
-                        
-                        target_element = self._get_subsystem(node_parents[link[1]])
+    def _pyc_converged(self):
+        """
+        True if this cycle has been solved in the current run and its residuals meet the tolerances of its nonlinear solver
+        """
+        if self.iter_count == 0: 
+            return False
 
-                        # if target element is None there are two options: 
-                        # 1) there is a sub-cycle that you need to push into 
-                        #        in this case, get the containing sub-cycle and push some starting nodes into its graph based on this linkage
-                        # 2) they made a mistake in the element name, so throw an error
-                        # print(node_parents[link[1]])
+        solver = self.nonlinear_solver
+        if solver is None or 'err_on_non_converge' not in solver.options: 
+            return True
 
-                        out_port = node_port_names[node]
-                        in_port = node_port_names[link[1]]
-                        # this passes whatever configuration data there was from the src element to the target keyed by port names
+        norm = self._residuals.get_norm()
+        return norm <= solver.options['atol'] or norm <= solver.options['rtol'] * solver._norm0
 
-                        if out_port not in src_element.Fl_O_data: 
-                            raise RuntimeError(f'in {self.pathname},{src_element.pathname}.{out_port} has not been properly setup.'
-                                               f'something is wrong with one of your `pyc_setup_output_ports` method in {src_element.pathname}')
+    def _pyc_inlet_totals(self):
+        """
+        Approximate freestream total temperature (degR) and pressure (psi) of each node from the 
+        flight condition inputs of the first FlightConditions element, or None if there isn't one
+        """
+        fc_names = sorted(elem.name for elem in self._elements if isinstance(elem, FlightConditions))
+        if not fc_names: 
+            return None
+        fc = fc_names[0]
+
+        # one value per node
+        alt = self.get_val(f'{fc}.alt', units='ft')
+        MN = self.get_val(f'{fc}.MN')
+        dTs = self.get_val(f'{fc}.dTs', units='degR')
+
+        # ideal gas with gamma=1.4 is plenty good enough for an initial guess
+        Ts, Ps, _ = usatm1976(alt)[:, 0]
+        Ts = Ts + dTs
+        ratio = 1. + 0.2*MN**2
+        return Ts*ratio, Ps*ratio**3.5
+
+    def guess_nonlinear(self, inputs, outputs, residuals): 
+        """
+        If this is an off-design point with `pyc_use_des_od_guess` turned on in the parent MPCycle, 
+        set the initial guess for all states from the converged design point, 
+        scaled to this flight condition with the usual corrected-flow similarity parameters. 
+        This only happens once: for the first solve after the design point has converged.
+        """
+        des = self._des_guess_src
+        if des is None or self._des_guess_applied or not des._pyc_converged(): 
+            return
+        self._des_guess_applied = True
+
+        theta = delta = 1.
+        des_totals = des._pyc_inlet_totals()
+        od_totals = self._pyc_inlet_totals()
+        # out of the atmosphere table the totals are NaN, so the states are not scaled
+        if des_totals is not None and od_totals is not None and np.all(np.isfinite(des_totals + od_totals)): 
+            theta = od_totals[0]/des_totals[0]
+            delta = od_totals[1]/des_totals[1]
+
+        nn_ratio = self.options['num_nodes'] // des.options['num_nodes']
+
+        skip = self._des_guess_skip
+        abs2prom_out = self._var_allprocs_abs2prom['output']
+        abs2prom_in = self._var_allprocs_abs2prom['input']
+        des_prom2abs = des._var_allprocs_prom2abs_list
+        meta = self._var_abs2meta['output']
+
+        out2ins = {}
+        for tgt, src in self._conn_global_abs_in2out.items(): 
+            out2ins.setdefault(src, []).append(tgt)
+
+        for abs_name in self._list_states(): 
+            prom_name = abs2prom_out[abs_name]
+            if skip is not None and prom_name.split('.')[0] in skip: 
+                continue
 
-                        target_element.Fl_I_data[in_port] = src_element.Fl_O_data[out_port]
+            if prom_name in des_prom2abs['output']: 
+                des_name = prom_name
+            else: 
+                # some states are only balanced at off-design (e.g. shaft speeds), so they are inputs at the 
+                # design point. Use the design value of whatever the state is connected to instead
+                des_name = None
+                for tgt in out2ins.get(abs_name, ()): 
+                    tgt_prom = abs2prom_in.get(tgt)
+                    if tgt_prom in des_prom2abs['input']: 
+                        des_name = tgt_prom
+                        break
+                if des_name is None: 
+                    continue
 
-                visited.add(node)
+            units = meta[abs_name]['units']
+            des_val = des.get_val(des_name, units=units).ravel()
+            val = outputs._abs_get_val(abs_name)
+            if des_val.size * nn_ratio == val.size: 
+                # a single node design point guesses all the nodes of a vectorized off-design point
+                des_val = np.tile(des_val, nn_ratio)
+            elif des_val.size != val.size: 
+                continue
 
+            exps = _similarity_exponents(units)
+            if exps is None: 
+                val[:] = des_val
+            else: 
+                # theta and delta have one value per node
+                scale = np.asarray(theta**exps[0] * delta**exps[1])
+                if scale.size not in (1, val.size): 
+                    scale = np.repeat(scale, val.size // scale.size)
+                val[:] = des_val * scale
 
     def pyc_connect_flow(self, fl_src, fl_target, connect_stat=True, connect_tot=True, connect_w=True):
         """ 
@@ -160,27 +524,21 @@ class Cycle(om.Group):
 
         # always connect compositions, because these are shape_by_conn=True
         self.connect(f'{fl_src}:tot:composition', [f'{fl_target}:tot:composition', f'{fl_target}:stat:composition'])
-        # total
-        if connect_tot:
-            for v_name in ('h','T','P','S','rho','gamma','Cp','Cv', 'R'):
-                self.connect('%s:tot:%s'%(fl_src, v_name), '%s:tot:%s'%(fl_target, v_name))
-
-        # static
-        if connect_stat:
-            for v_name in ('V', 'Vsonic'):  # ('Wc', 'W', 'FAR'):
-                self.connect('%s:stat:%s'%(fl_src, v_name), '%s:stat:%s'%(fl_target, v_name))
 
-            for v_name in ('Cp', 'Cv', 'MN', 'P', 'S', 'T', 'area', 'gamma', 'h', 'rho'):
-                self.connect('%s:stat:%s'%(fl_src, v_name), '%s:stat:%s'%(fl_target, v_name))
-
-        if connect_w:
-           self.connect('%s:stat:W'%(fl_src,), '%s:stat:W'%(fl_target,))
+        srcs = flow_vars(fl_src, connect_tot, connect_stat, connect_w)
+        tgts = flow_vars(fl_target, connect_tot, connect_stat, connect_w)
+        if self.options['lean_flow_ports']: 
+            # the variables the target uses are only known once it is set up
+            self._pyc_flow_conns.update(zip(tgts, srcs))
+        else: 
+            for src, tgt in zip(srcs, tgts): 
+                self.connect(src, tgt)
 
         # build the directed graph of flow connections
-        src_element_name = ''.join(fl_src.split('.')[:-1])
+        src_element_name = '.'.join(fl_src.split('.')[:-1])
         src_port_name = fl_src.split('.')[-1]
 
-        target_elment_name = ''.join(fl_target.split('.')[:-1])
+        target_elment_name = '.'.join(fl_target.split('.')[:-1])
         target_port_name = fl_target.split('.')[-1]
 
         # element nodes are needed so we can map from flow ports through elements
@@ -200,10 +558,35 @@ class MPCycle(om.Group):
         self._cycle_params = {}
         self._des_pnt = None
         self._od_pnts= []
+        self._od_group = None
         self._des_od_connections = []
         self._use_default_des_od_conns = False
+        self._use_des_od_guess = False
+        self._result_cache = None
         super(MPCycle, self).__init__(**kwargs)
 
+    def initialize(self): 
+        self.options.declare('parallel_od', default=False, types=bool,
+                              desc='If True, the off-design points are added to a ParallelGroup named `od_pnts`, '
+                                   'so they run concurrently under MPI. Promoted variable names are unchanged, '
+                                   'but the subsystem paths of the off-design points gain the `od_pnts.` prefix.')
+        self.options.declare('result_cache_size', default=0, types=int, lower=0,
+                              desc='Number of converged solutions of all the points kept in a LRU cache, keyed by the '
+                                   'values of the design variables, cycle parameters and other independent variables. '
+                                   'When the model is solved again with the same values (e.g. when an optimizer revisits '
+                                   'a design), the solution is restored instead. Total derivatives are not cached. '
+                                   'Zero turns the cache off.')
+
+
+    def pyc_clear_result_cache(self): 
+        """
+        Drop all the solutions in the result cache, e.g. after changing something that is not part of its key
+        """
+        if self._result_cache is not None: 
+            self._result_cache.clear()
+
+    def _solve_nonlinear(self): 
+        cached_solve_nonlinear(self, super()._solve_nonlinear)
 
     def pyc_add_cycle_param(self, name, val, units=None): 
 
@@ -214,6 +597,22 @@ class MPCycle(om.Group):
 
         self._cycle_params[name] = (val, units)
 
+    def pyc_save_snapshot(self, filename): 
+        """
+        Save every solved output for all points (including the internal thermo states, but not the 
+        IndepVarComp outputs) to a compressed binary file, so a converged solution can be used as the initial guess later. 
+        Snapshots saved with and without `parallel_od` are interchangeable.
+        """
+        save_snapshot(self, filename)
+
+    def pyc_load_snapshot(self, filename, strict=False): 
+        """
+        Load a snapshot saved by `pyc_save_snapshot` as the initial guess for all points. 
+        Outputs that don't exist in this model (or have a different size) are skipped, 
+        unless `strict` is True. Returns the number of outputs that were set.
+        """
+        return load_snapshot(self, filename, strict=strict)
+
     def pyc_connect_des_od(self, src, target): 
         if self._des_pnt is None:
             raise ValueError('Cannot connect between design and off design because no design point has been created. Use pyc_add_pnt to add a design point.')
@@ -233,6 +632,23 @@ class MPCycle(om.Group):
         self._default_des_od_cons_skip = skip
         self._use_default_des_od_conns = True
 
+    def pyc_use_des_od_guess(self, skip=None): 
+        """
+        Generate the initial guess for every off-design point from the converged design point. 
+        The first time each off-design point is solved after the design point has converged, 
+        all of its states (balances and element internal states) are set from the design point values, 
+        scaled by the theta and delta of its flight condition relative to the design flight condition. 
+        Any elements named in `skip` keep their own guesses.
+        """
+        if self._des_pnt is None:
+            raise ValueError('Cannot generate off design guesses because no design point has been created. Use pyc_add_pnt to add a design point.')
+
+        elif self._od_pnts == []:
+            raise ValueError('Cannot generate off design guesses because no off design point has been created. Use pyc_add_pnt to add an off design point.')
+
+        self._des_od_guess_skip = skip
+        self._use_des_od_guess = True
+
     def pyc_add_pnt(self, name, pnt, **kwargs):
         if pnt.options['design'] is True:
             if self._des_pnt is not None:
@@ -241,12 +657,34 @@ class MPCycle(om.Group):
             self.add_subsystem(name, pnt, **kwargs)
             self._des_pnt = pnt
         elif pnt.options['design'] is False:
-            self.add_subsystem(name, pnt, **kwargs)
+            if self.options['parallel_od']: 
+                if self._od_group is None: 
+                    # the off-design points only depend on each other through the design point, 
+                    # so they can be converged independently. Each point should carry its own solver. 
+                    # Everything is promoted so the variable names match the serial layout. 
+                    self._od_group = self.add_subsystem('od_pnts', om.ParallelGroup(), promotes=['*'])
+                self._od_group.add_subsystem(name, pnt, **kwargs)
+            else: 
+                self.add_subsystem(name, pnt, **kwargs)
             self._od_pnts.append(pnt)
             
         return pnt
 
 
+    def _pyc_connect_des_od_pnt(self, src, od_pnt, target): 
+        """
+        Connect a design point variable to an off-design point. The design values (sized, 
+        e.g., area or map scalars) are the same for every node, so a single node design point 
+        is broadcast to all the nodes of a vectorized off-design point.
+        """
+        des_nn = self._des_pnt.options['num_nodes'] if 'num_nodes' in self._des_pnt.options else 1
+        od_nn = od_pnt.options['num_nodes'] if 'num_nodes' in od_pnt.options else 1
+        if des_nn == 1 and od_nn > 1: 
+            self.connect(f'{self._des_pnt.name}.{src}', f'{od_pnt.name}.{target}', 
+                         src_indices=np.zeros(od_nn, dtype=int))
+        else: 
+            self.connect(f'{self._des_pnt.name}.{src}', f'{od_pnt.name}.{target}')
+
     def configure(self): 
         # after all child pts have been set up, 
         # promote any cycle parameters to this level and set their default values
@@ -257,12 +695,15 @@ class MPCycle(om.Group):
         
             self.promotes(self._des_pnt.name, inputs=[param])
             for pnt in self._od_pnts: 
-                self.promotes(pnt.name, inputs=[param])
+                if self._od_group is not None: 
+                    self._od_group.promotes(pnt.name, inputs=[param])
+                else: 
+                    self.promotes(pnt.name, inputs=[param])
 
 
         for src, target in self._des_od_connections: 
             for od_pnt in self._od_pnts: 
-                self.connect(f'{self._des_pnt.name}.{src}', f'{od_pnt.name}.{target}')
+                self._pyc_connect_des_od_pnt(src, od_pnt, target)
         
         if self._use_default_des_od_conns: 
             skip = self._default_des_od_cons_skip
@@ -272,8 +713,12 @@ class MPCycle(om.Group):
                 try: 
                     for src, target in elem.default_des_od_conns: 
                         for od_pnt in self._od_pnts: 
-                            self.connect( f'{self._des_pnt.name}.{elem.name}.{src}', f'{od_pnt.name}.{elem.name}.{target}')
+                            self._pyc_connect_des_od_pnt(f'{elem.name}.{src}', od_pnt, f'{elem.name}.{target}')
                 except AttributeError: 
                     pass # no des-to-od conns defined
 
-
+        if self._use_des_od_guess: 
+            for od_pnt in self._od_pnts: 
+                od_pnt._des_guess_src = self._des_pnt
+                od_pnt._des_guess_skip = self._des_od_guess_skip
+                od_pnt._des_guess_applied = False
@@ -0,0 +1,208 @@
+import sys
+import time
+from collections import defaultdict
+
+import openmdao.api as om
+from openmdao.core.component import Component
+
+from pycycle.element_base import Element
+from pycycle.thermo.thermo import Thermo, ThermoAdd
+
+
+_COMP_METHODS = ('compute', 'compute_partials', 'apply_nonlinear', 'linearize', 'solve_nonlinear')
+
+# roll-up -> index in the component labels
+_ROLLUPS = {'element': 0, 'element_class': 1, 'thermo_mode': 2, 'component_class': 3}
+
+
+class ElementProfiler(object):
+    """
+    Accumulates the wall time and call counts of compute, compute_partials, apply_nonlinear, linearize and
+    solve_nonlinear of every component in a model, so they can be rolled up by element class, element
+    instance, thermo mode or component class.
+
+    The component times are exclusive, so they add up to the time spent in the model's own calculations.
+    The solve_nonlinear time of each element (a Group) is also recorded, but as an inclusive time it is
+    reported in its own column and not added to the totals.
+
+    The components are instrumented in place while the profiler is attached, so there is no overhead at all
+    when it isn't.
+
+    Usage::
+
+        prob.final_setup()
+        with ElementProfiler(prob.model) as profiler:
+            prob.run_model()
+        profiler.report(by='element_class')
+
+    Parameters
+    ----------
+    system : System
+        The system whose components (including all the nested ones) are profiled.
+    """
+
+    def __init__(self, system):
+        self._system = system
+        self._attached = []
+
+        # component path -> {method: [calls, time]}
+        self.data = {}
+        # element path -> [calls, time] of its solve_nonlinear
+        self.element_solves = {}
+        # component path -> (element path, element class, thermo mode, component class)
+        self._labels = {}
+        self._element_classes = {}
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+    def attach(self):
+        """
+        Instrument all the components and elements of the system
+        """
+        if self._attached:
+            return
+
+        if self._system._problem_meta is None:
+            raise RuntimeError(f'{self._system.msginfo}: the element profiler can only be attached after setup.')
+
+        elements = {}
+        thermo_modes = {}
+        for system in self._system.system_iter(include_self=True, recurse=True):
+            if isinstance(system, Element):
+                elements[system.pathname] = self._element_classes[system.pathname] = type(system).__name__
+                self._instrument_element(system)
+            elif isinstance(system, Thermo):
+                thermo_modes[system.pathname] = system.options['mode']
+            elif isinstance(system, ThermoAdd):
+                thermo_modes[system.pathname] = 'add_' + system.options['mix_mode']
+
+        for comp in self._system.system_iter(include_self=True, recurse=True, typ=Component):
+            element = element_class = thermo_mode = '-'
+            # the innermost element and thermo group that contain the component
+            parts = comp.pathname.split('.')
+            for i in range(len(parts) - 1, 0, -1):
+                path = '.'.join(parts[:i])
+                if thermo_mode == '-' and path in thermo_modes:
+                    thermo_mode = thermo_modes[path]
+                if path in elements:
+                    element, element_class = path, elements[path]
+                    break
+
+            self._labels[comp.pathname] = (element, element_class, thermo_mode, type(comp).__name__)
+            self._instrument_comp(comp)
+
+    def detach(self):
+        """
+        Remove the instrumentation, keeping the recorded data
+        """
+        for obj, names in self._attached:
+            for name in names:
+                del obj.__dict__[name]
+        self._attached = []
+
+    def reset(self):
+        """
+        Clear the recorded data
+        """
+        self.data = {}
+        self.element_solves = {}
+
+    def _instrument_comp(self, comp):
+        record = self.data.setdefault(comp.pathname, {})
+        wrapped = []
+        for name in _COMP_METHODS:
+            method = getattr(type(comp), name, None)
+            # skip the empty methods of the base classes
+            if method is None or method is getattr(om.ExplicitComponent, name, None) or \
+                    method is getattr(om.ImplicitComponent, name, None):
+                continue
+            setattr(comp, name, _timed(getattr(comp, name), record.setdefault(name, [0, 0.])))
+            wrapped.append(name)
+
+        self._attached.append((comp, wrapped))
+
+    def _instrument_element(self, element):
+        stats = self.element_solves.setdefault(element.pathname, [0, 0.])
+        element._solve_nonlinear = _timed(element._solve_nonlinear, stats)
+        self._attached.append((element, ('_solve_nonlinear',)))
+
+    def totals(self, by='element_class'):
+        """
+        Roll up the recorded data.
+
+        Parameters
+        ----------
+        by : str
+            'element_class', 'element', 'thermo_mode' or 'component_class'.
+
+        Returns
+        -------
+        dict
+            For each key, {method: [calls, time]} plus the total 'time' over all the methods and, for the
+            element roll-ups, the inclusive 'element_solve' [calls, time] of the elements' solve_nonlinear.
+        """
+        if by not in _ROLLUPS:
+            raise ValueError(f"Unknown roll-up '{by}'. Must be one of {list(_ROLLUPS)}.")
+        idx = _ROLLUPS[by]
+
+        totals = defaultdict(lambda: {'time': 0.})
+        for path, record in self.data.items():
+            entry = totals[self._labels[path][idx]]
+            for name, (calls, t) in record.items():
+                stats = entry.setdefault(name, [0, 0.])
+                stats[0] += calls
+                stats[1] += t
+                entry['time'] += t
+
+        if by in ('element', 'element_class'):
+            for path, (calls, t) in self.element_solves.items():
+                key = path if by == 'element' else self._element_classes[path]
+                stats = totals[key].setdefault('element_solve', [0, 0.])
+                stats[0] += calls
+                stats[1] += t
+
+        return dict(totals)
+
+    def report(self, by='element_class', n=20, out_stream=sys.stdout):
+        """
+        Print the n most expensive entries of a roll-up (see `totals`), and return them
+        """
+        totals = sorted(self.totals(by).items(), key=lambda item: item[1]['time'], reverse=True)[:n]
+
+        if out_stream is not None:
+            grand_total = sum(rec['time'] for rec in self.totals(by).values())
+            print(f'{"":<40} {"total":>9}', end='', file=out_stream)
+            for name in _COMP_METHODS:
+                print(f' {name:>22}', end='', file=out_stream)
+            print(f' {"element solve":>22}', file=out_stream)
+            print(f'{by:<40} {"(s)":>9}' + ' '.join([''] + [f'{"calls":>10} {"time (s)":>11}'] *
+                                                   (len(_COMP_METHODS) + 1)), file=out_stream)
+            for key, entry in totals:
+                print(f'{key:<40} {entry["time"]:>9.3f}', end='', file=out_stream)
+                for name in _COMP_METHODS + ('element_solve',):
+                    calls, t = entry.get(name, (0, 0.))
+                    print(f' {calls:>10} {t:>11.3f}', end='', file=out_stream)
+                print(file=out_stream)
+            print(f'{"total":<40} {grand_total:>9.3f}', file=out_stream)
+
+        return totals
+
+
+def _timed(method, stats):
+    """
+    Wrap a method so its calls and wall time accumulate in stats = [calls, time]
+    """
+    def wrapper(*args, **kwargs):
+        st = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats[0] += 1
+            stats[1] += time.perf_counter() - st
+
+    return wrapper
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+
+import numpy as np
+
+import openmdao.api as om
+
+
+class ResultCache(object):
+    """
+    Bounded LRU cache of the converged solutions of a Cycle or MPCycle.
+
+    A solution is keyed by the values the system gets from outside: its inputs that are connected to
+    something outside of it, and the independent variables inside it (including the automatic ones)
+    that feed its inputs, e.g. the design variables and the flight conditions. A hit restores the whole
+    input, output and residual vectors of the system, instead of solving it again.
+
+    Only the nonlinear solution is cached. The total derivatives are computed again after a hit, at the
+    restored point.
+
+    system: <Group>
+        the system whose solutions are cached
+    size: int
+        maximum number of solutions kept. The least recently used one is dropped first.
+    """
+
+    def __init__(self, system, size):
+        self.system = system
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._vectors = None
+        self._key_idxs = None
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def _setup_keys(self):
+        """
+        Indices of the key values in the input and output vectors of the system
+        """
+        system = self.system
+        # the connections in the system, so the inputs that are not in there have a source outside of it
+        conns = system._conn_global_abs_in2out
+
+        ivc_outs = set()
+        for comp in system.system_iter(recurse=True, typ=om.IndepVarComp):
+            ivc_outs.update(comp._var_abs2meta['output'])
+
+        in_slices = system._inputs.get_slice_dict()
+        out_slices = system._outputs.get_slice_dict()
+        in_idxs = []
+        out_idxs = {}
+        for abs_in in system._var_abs2meta['input']:
+            src = conns.get(abs_in)
+            if src is None:
+                in_idxs.append(np.arange(in_slices[abs_in].start, in_slices[abs_in].stop))
+            elif src in ivc_outs and src not in out_idxs:
+                # not transferred to the input yet when the key is computed, so use the source value
+                out_idxs[src] = np.arange(out_slices[src].start, out_slices[src].stop)
+
+        def _concat(idxs):
+            return np.concatenate(idxs) if idxs else np.zeros(0, dtype=int)
+
+        self._key_idxs = (_concat(in_idxs), _concat(list(out_idxs.values())))
+
+    def key(self):
+        """
+        Current key of the system, or None if the solutions can't be cached right now
+        """
+        system = self.system
+        if system.under_complex_step:
+            return None
+
+        # a new setup means new vectors, so nothing cached before applies
+        vectors = (system._inputs, system._outputs)
+        if self._vectors is None or any(a is not b for a, b in zip(vectors, self._vectors)):
+            self._vectors = vectors
+            self._setup_keys()
+            self._data.clear()
+
+        in_idxs, out_idxs = self._key_idxs
+        return (system._inputs.asarray()[in_idxs].tobytes() +
+                system._outputs.asarray()[out_idxs].tobytes())
+
+    def restore(self, key):
+        """
+        Restore the solution stored for `key`. Returns False if there is none.
+        """
+        solution = self._data.get(key)
+        if solution is None:
+            self.misses += 1
+            return False
+
+        self._data.move_to_end(key)
+        self.hits += 1
+
+        system = self.system
+        inputs, outputs, residuals = solution
+        system._inputs.set_val(inputs)
+        system._outputs.set_val(outputs)
+        system._residuals.set_val(residuals)
+        return True
+
+    def store(self, key):
+        """
+        Store the current solution of the system for `key`, if its top-level solvers converged
+        """
+        system = self.system
+        # the system itself may just run once (e.g. an MPCycle), then the solvers of its points are checked.
+        # The nested solvers (e.g. of the Thermo groups) can stop on maxiter in a converged solution.
+        systems = [system]
+        while systems:
+            subsys = systems.pop(0)
+            solver = subsys.nonlinear_solver
+            if solver is not None and 'maxiter' in solver.options:
+                if solver._iter_count >= solver.options['maxiter']:
+                    return
+            else:
+                systems.extend(subsys._subsystems_myproc)
+
+        outputs = system._outputs.asarray()
+        if not np.all(np.isfinite(outputs)):
+            return
+
+        self._data[key] = (system._inputs.asarray(copy=True), outputs.copy(), system._residuals.asarray(copy=True))
+        self._data.move_to_end(key)
+        while len(self._data) > self.size:
+            self._data.popitem(last=False)
+
+
+def cached_solve_nonlinear(system, solve):
+    """
+    Call `solve` to solve the system, unless its result cache has the solution for the current key.
+    The cache is only used if the `result_cache_size` option of the system is more than 0.
+    """
+    size = system.options['result_cache_size']
+    if size == 0:
+        return solve()
+
+    cache = system._result_cache
+    if cache is None or cache.size != size:
+        cache = system._result_cache = ResultCache(system, size)
+
+    key = cache.key()
+    if key is not None and cache.restore(key):
+        return
+
+    solve()
+    if key is not None:
+        cache.store(key)
@@ -0,0 +1,101 @@
+import hashlib
+
+import numpy as np
+
+import openmdao.api as om
+
+
+def _rel_output_names(system):
+    """
+    absolute and system-relative promoted names of the local outputs that are solved for
+    """
+    if system._outputs is None:
+        raise RuntimeError(f'{system.msginfo}: snapshots can only be used after the vectors are allocated. '
+                           'Call `final_setup` on the problem first.')
+
+    # IndepVarComp outputs (including the auto_ivc) are set by the user (design variables, flight conditions, ...),
+    # so they are not part of the solution and loading a snapshot must not overwrite them
+    ivc_prefixes = tuple(ivc.pathname + '.' for ivc in system.system_iter(recurse=True, typ=om.IndepVarComp))
+    abs_names = [abs_name for abs_name in system._var_abs2meta['output'] if not abs_name.startswith(ivc_prefixes)]
+
+    # promoted names drop the prefix of groups that promote everything (e.g. the `od_pnts` ParallelGroup),
+    # so a snapshot does not depend on the parallel_od layout of an MPCycle
+    abs2prom = system._var_allprocs_abs2prom['output']
+    rel_names = [abs2prom[abs_name] for abs_name in abs_names]
+
+    return abs_names, rel_names
+
+
+def structural_hash(system):
+    """
+    Hash of the names and sizes of every solved output in the system.
+    Two models with the same structure give the same hash, regardless of where they sit in the model tree.
+    """
+    abs_names, rel_names = _rel_output_names(system)
+    outputs = system._outputs
+
+    h = hashlib.sha256()
+    for abs_name, rel_name in zip(abs_names, rel_names):
+        h.update(f'{rel_name}:{outputs._abs_get_val(abs_name).size};'.encode())
+
+    return h.hexdigest()
+
+
+def save_snapshot(system, filename):
+    """
+    Save the current value of every solved output of the system to a compressed binary (.npz) file.
+    IndepVarComp outputs are not saved.
+    """
+    abs_names, rel_names = _rel_output_names(system)
+    outputs = system._outputs
+
+    vals = [outputs._abs_get_val(abs_name) for abs_name in abs_names]
+    sizes = np.array([v.size for v in vals], dtype=int)
+    if vals:
+        data = np.concatenate(vals).astype(float)
+    else:
+        data = np.zeros(0)
+
+    np.savez_compressed(filename, hash=np.array(structural_hash(system)),
+                        names=np.array(rel_names, dtype=str), sizes=sizes, data=data)
+
+
+def load_snapshot(system, filename, strict=False):
+    """
+    Load a snapshot written by `save_snapshot` into the outputs of the system.
+
+    If the structural hash matches, all values are restored. Otherwise only the outputs
+    with matching names and sizes are restored, unless `strict` is True in which case an error is raised.
+    IndepVarComp outputs keep the values they have, so the snapshot is only used as the initial guess.
+
+    Returns the number of outputs that were set.
+    """
+    with np.load(filename) as snap:
+        snap_hash = str(snap['hash'])
+        names = snap['names']
+        sizes = snap['sizes']
+        data = snap['data']
+
+    if strict and snap_hash != structural_hash(system):
+        raise ValueError(f'{system.msginfo}: the snapshot in `{filename}` was saved from a model with a different '
+                         'structure.')
+
+    abs_names, rel_names = _rel_output_names(system)
+    rel2abs = dict(zip(rel_names, abs_names))
+    outputs = system._outputs
+
+    offsets = np.zeros(len(sizes) + 1, dtype=int)
+    np.cumsum(sizes, out=offsets[1:])
+
+    count = 0
+    for i, name in enumerate(names):
+        abs_name = rel2abs.get(str(name))
+        if abs_name is None:
+            continue
+        val = outputs._abs_get_val(abs_name)
+        if val.size != sizes[i]:
+            continue
+        val[:] = data[offsets[i]:offsets[i+1]]
+        count += 1
+
+    return count
@@ -0,0 +1,137 @@
+import numpy as np
+
+import openmdao.api as om
+from openmdao.recorders.recording_iteration_stack import Recording
+
+
+class LaggedNewtonSolver(om.NewtonSolver):
+    """
+    Newton solver that reuses the Jacobian (and the factorization held by its linear solver) for several iterations,
+    and only re-linearizes when the convergence rate degrades.
+
+    Optionally, the reused Jacobian is corrected with Broyden rank-one updates (Broyden's second method,
+    applied on top of the stored factorization) so the lagged iterations still converge super-linearly.
+
+    The factorization is kept between solves by default, so consecutive operating points in a sweep
+    start from the Jacobian of the previous point.
+    """
+
+    SOLVER = 'NL: LagNewton'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self._jac_age = None
+        self._updates = []
+        self._prev_state = None
+        self._prev_norm = None
+
+    def _declare_options(self):
+        super()._declare_options()
+
+        self.options.declare('max_jac_age', types=int, default=5, lower=0,
+                             desc='Maximum number of iterations to reuse a Jacobian before re-linearizing.')
+        self.options.declare('relin_rate', types=float, default=0.5, lower=0.,
+                             desc='Re-linearize when the ratio of the residual norm to the norm of the previous '
+                                  'iteration is above this value.')
+        self.options.declare('broyden', types=bool, default=False,
+                             desc='If True, apply Broyden rank-one updates to the reused Jacobian.')
+        self.options.declare('reuse_between_solves', types=bool, default=True,
+                             desc='If True, the Jacobian from the previous solve is used to start the next one.')
+
+    def _setup_solvers(self, system, depth):
+        super()._setup_solvers(system, depth)
+
+        # the vectors may have changed, so whatever was factored before is no longer valid
+        self._jac_age = None
+        self._updates = []
+
+    def _iter_initialize(self):
+        norm0, norm = super()._iter_initialize()
+
+        if not self.options['reuse_between_solves']:
+            self._jac_age = None
+        # the Broyden updates are only valid around the point they were built at
+        self._updates = []
+        self._prev_state = None
+        self._prev_norm = None
+
+        return norm0, norm
+
+    def _apply_inv_jac(self, rhs):
+        """
+        Apply the (updated) inverse Jacobian to rhs, using the stored factorization
+        """
+        system = self._system()
+        system._dresiduals.set_val(rhs)
+        self.linear_solver.solve('fwd')
+        d = system._doutputs.asarray(copy=True)
+
+        for a, y in self._updates:
+            d += a * y.dot(rhs)
+
+        return d
+
+    def _single_iteration(self):
+        system = self._system()
+        outputs = system._outputs
+        residuals = system._residuals
+
+        if system.under_complex_step:
+            super()._single_iteration()
+            return
+
+        x = outputs.asarray(copy=True)
+        r = residuals.asarray(copy=True)
+        norm = residuals.get_norm()
+
+        relin = (self._jac_age is None or self._jac_age >= self.options['max_jac_age'] or
+                 (self._prev_norm is not None and self._prev_norm > 0. and
+                  norm/self._prev_norm > self.options['relin_rate']))
+
+        if relin:
+            super()._single_iteration()
+            self._jac_age = 0
+            self._updates = []
+
+        else:
+            if self.options['broyden'] and self._prev_state is not None:
+                # Broyden's second method: H+ = H + (s - H y) y^T / (y^T y)
+                x_prev, r_prev = self._prev_state
+                s = x - x_prev
+                y = r - r_prev
+                yy = y.dot(y)
+                if yy > 0.:
+                    a = (s - self._apply_inv_jac(y))/yy
+                    self._updates.append((a, y))
+
+            self._lagged_step(-r)
+            self._jac_age += 1
+
+        self._prev_state = (x, r)
+        self._prev_norm = norm
+
+    def _lagged_step(self, rhs):
+        """
+        Take a Newton step with the stored factorization, skipping the linearization
+        """
+        system = self._system()
+        self._solver_info.append_subsolver()
+        do_subsolve = self.options['solve_subsystems'] and \
+            (self._iter_count < self.options['max_sub_solves'])
+
+        system._doutputs.set_val(self._apply_inv_jac(rhs))
+
+        if self.linesearch:
+            self.linesearch._do_subsolve = do_subsolve
+            self.linesearch.solve()
+        else:
+            system._outputs += system._doutputs
+
+        self._solver_info.pop()
+
+        if do_subsolve:
+            with Recording('Newton_subsolve', 0, self):
+                self._solver_info.append_solver()
+                self._gs_iter()
+                self._solver_info.pop()
@@ -0,0 +1,227 @@
+import csv
+import itertools
+
+import numpy as np
+
+import openmdao.api as om
+
+
+def full_factorial(**conditions):
+    """
+    Build a list of operating conditions from every combination of the given values
+
+    conditions: dict of iterables
+        keyed by the name of the input to set (e.g. `fc.alt=[0, 10000, 20000]`)
+    """
+    names = list(conditions.keys())
+    return [dict(zip(names, vals)) for vals in itertools.product(*conditions.values())]
+
+
+class EnvelopeSweep(object):
+    """
+    Runs a cycle over a list of operating conditions (e.g. to generate an engine deck).
+
+    The conditions are ordered along a nearest-neighbor path so consecutive points are close together.
+    Each point is warm started from the full output vector of its closest converged neighbor,
+    and if the solve fails it is retried from the next closest converged neighbors.
+
+    prob: <Problem>
+        a Problem that has already been setup
+    point: str or None
+        path of the point to sweep (e.g. 'OD'). A condition is converged if the top-level nonlinear solver
+        of this system (or of each point below it, for an MPCycle) converges, and its outputs are stored as
+        the warm start state. If None, the whole model is used.
+    conditions: list of dict
+        each dict maps input names (relative to `point`) to values. See `full_factorial`.
+    outputs: list of str
+        names (relative to `point`) of the values to record for each converged condition.
+        In the results file, an output with more than one element gets one column per element (e.g. `x[0]`, `x[1]`).
+    units: dict
+        optional units for the condition and output names
+    max_retries: int
+        maximum number of additional neighbors to restart from when a point fails to converge
+    results_file: str
+        if given, a csv row is written (and flushed) as soon as each condition is finished
+    """
+
+    def __init__(self, prob, point, conditions, outputs=(), units=None, max_retries=3, results_file=None):
+
+        self.prob = prob
+        self.point = point
+        self.conditions = list(conditions)
+        self.outputs = list(outputs)
+        self.units = {} if units is None else units
+        self.max_retries = max_retries
+        self.results_file = results_file
+
+        if len(self.conditions) == 0:
+            raise ValueError('EnvelopeSweep requires at least one operating condition.')
+
+        self.cond_names = list(self.conditions[0].keys())
+        for cond in self.conditions:
+            if set(cond.keys()) != set(self.cond_names):
+                raise ValueError(f'All operating conditions must set the same inputs. Expected {self.cond_names}, '
+                                 f'but got {list(cond.keys())}.')
+
+        cond_array = np.array([[cond[name] for name in self.cond_names] for cond in self.conditions], dtype=float)
+
+        # normalize each condition by its range so altitude does not swamp Mach number
+        span = cond_array.max(axis=0) - cond_array.min(axis=0)
+        span[span == 0.] = 1.
+        self._normed = cond_array/span
+
+        self.order = self._path_order()
+        self.results = []
+
+    def _path_order(self):
+        """
+        Greedy nearest-neighbor path through the normalized conditions, starting from the first one
+        """
+        normed = self._normed
+        n = normed.shape[0]
+
+        remaining = np.ones(n, dtype=bool)
+        order = [0]
+        remaining[0] = False
+        for i in range(1, n):
+            dist = np.linalg.norm(normed - normed[order[-1]], axis=1)
+            dist[~remaining] = np.inf
+            nxt = int(np.argmin(dist))
+            order.append(nxt)
+            remaining[nxt] = False
+
+        return order
+
+    def _path(self, name):
+        if self.point is None:
+            return name
+        return f'{self.point}.{name}'
+
+    def _system(self):
+        if self.point is None:
+            return self.prob.model
+        return self.prob.model._get_subsystem(self.point)
+
+    def _iter_solvers(self):
+        """
+        Top-level nonlinear solver of each point in the swept system. The nested solvers
+        (e.g. the Thermo and Nozzle Newtons) routinely hit their maxiter while the point is still
+        converging, so only the outermost solver that can report a failure to converge is checked.
+        """
+        systems = [self._system()]
+        while systems:
+            subsys = systems.pop(0)
+            solver = subsys.nonlinear_solver
+            # NonlinearRunOnce (e.g. on an MPCycle) has no convergence to check, so look at its children
+            if solver is not None and 'err_on_non_converge' in solver.options:
+                yield solver
+            else:
+                systems.extend(subsys._subsystems_myproc)
+
+    def _columns(self, sizes):
+        """
+        Header of the results file
+        """
+        cols = list(self.cond_names)
+        for name in self.outputs:
+            if sizes[name] == 1:
+                cols.append(name)
+            else:
+                cols.extend(f'{name}[{i}]' for i in range(sizes[name]))
+        return cols + ['converged']
+
+    def _solve(self, idx, state):
+        """
+        Try to converge condition `idx` starting from `state`. Returns True if the solve converged.
+        """
+        prob = self.prob
+        system = self._system()
+
+        if state is not None:
+            system._outputs.set_val(state)
+
+        for name, val in self.conditions[idx].items():
+            prob.set_val(self._path(name), val, units=self.units.get(name))
+
+        try:
+            prob.run_model()
+        except om.AnalysisError:
+            return False
+
+        return True
+
+    def run(self):
+        """
+        Run every operating condition, returns a list of dicts with the condition, the requested
+        outputs and a `converged` flag for each point, in the original order of `conditions`
+        """
+        system = self._system()
+
+        # a non-converged point must raise so we know to try another neighbor
+        old_errs = []
+        for solver in self._iter_solvers():
+            old_errs.append((solver, solver.options['err_on_non_converge']))
+            solver.options['err_on_non_converge'] = True
+
+        shapes = {name: self.prob.get_val(self._path(name)).shape for name in self.outputs}
+        sizes = {name: int(np.prod(shape)) for name, shape in shapes.items()}
+
+        states = {}
+        records = [None]*len(self.conditions)
+
+        f = None
+        writer = None
+        if self.results_file is not None:
+            f = open(self.results_file, 'w', newline='')
+            writer = csv.writer(f)
+            writer.writerow(self._columns(sizes))
+
+        try:
+            for idx in self.order:
+
+                # converged neighbors, closest first
+                done = np.array(list(states.keys()), dtype=int)
+                if done.size:
+                    dist = np.linalg.norm(self._normed[done] - self._normed[idx], axis=1)
+                    neighbors = done[np.argsort(dist, kind='stable')][:self.max_retries+1]
+                    starts = [states[n] for n in neighbors]
+                else:
+                    # nothing converged yet, so start from whatever is currently in the model
+                    starts = [None]
+
+                converged = False
+                for state in starts:
+                    if self._solve(idx, state):
+                        converged = True
+                        break
+
+                record = dict(self.conditions[idx])
+                for name in self.outputs:
+                    if converged:
+                        record[name] = self.prob.get_val(self._path(name), units=self.units.get(name)).copy()
+                    elif sizes[name] == 1:
+                        record[name] = np.nan
+                    else:
+                        record[name] = np.full(shapes[name], np.nan)
+                record['converged'] = converged
+                records[idx] = record
+
+                if converged:
+                    states[idx] = system._outputs.asarray(copy=True)
+
+                if writer is not None:
+                    row = [record[name] for name in self.cond_names]
+                    for name in self.outputs:
+                        row.extend(np.asarray(record[name]).ravel())
+                    row.append(converged)
+                    writer.writerow(row)
+                    f.flush()
+
+        finally:
+            for solver, old_err in old_errs:
+                solver.options['err_on_non_converge'] = old_err
+            if f is not None:
+                f.close()
+
+        self.results = records
+        return records
@@ -0,0 +1,182 @@
+import sys
+import json
+import time
+
+import openmdao.api as om
+
+
+class SolverTelemetry(object):
+    """
+    Records the convergence of every iterative nonlinear solver in a model: iteration count, residual norm
+    history, linesearch backtracks, wall time and whether the solve stopped on `maxiter`.
+
+    The solvers are instrumented in place (no global patching), so only the model that is being watched
+    pays for it, and nothing is left behind after `detach`.
+
+    Usage::
+
+        prob.final_setup()
+        with SolverTelemetry(prob.model) as telemetry:
+            prob.run_model()
+        telemetry.summary()
+        telemetry.save_json('telemetry.json')
+
+    Parameters
+    ----------
+    system : System
+        The system whose solvers (including all the nested ones) are recorded.
+    history : bool
+        If True, the data of every single solve is kept, otherwise only the totals per solver.
+    """
+
+    def __init__(self, system, history=True):
+        self._system = system
+        self._history = history
+        self._attached = []
+        self.data = {}
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+    def attach(self):
+        """
+        Instrument all the iterative nonlinear solvers of the system
+        """
+        if self._attached:
+            return
+
+        if self._system._problem_meta is None:
+            raise RuntimeError(f'{self._system.msginfo}: solver telemetry can only be attached after setup.')
+
+        for system in self._system.system_iter(include_self=True, recurse=True):
+            solver = system.nonlinear_solver
+            if solver is None or isinstance(solver, om.NonlinearRunOnce):
+                continue
+            self._instrument(system.pathname or '<model>', solver)
+
+    def detach(self):
+        """
+        Remove the instrumentation, keeping the recorded data
+        """
+        for obj, names in self._attached:
+            for name in names:
+                del obj.__dict__[name]
+        self._attached = []
+
+    def reset(self):
+        """
+        Clear the recorded data
+        """
+        self.data = {}
+
+    def _instrument(self, path, solver):
+        record = self.data.setdefault(path, _new_record(solver))
+        current = []
+
+        solve = solver.solve
+        iter_get_norm = solver._iter_get_norm
+
+        def _iter_get_norm():
+            norm = iter_get_norm()
+            if current:
+                current[-1]['norms'].append(float(norm))
+            return norm
+
+        def _solve():
+            run = {'iters': 0, 'norms': [], 'backtracks': 0, 'time': 0., 'maxiter': False}
+            current.append(run)
+            st = time.perf_counter()
+            try:
+                solve()
+            finally:
+                run['time'] = time.perf_counter() - st
+                run['iters'] = solver._iter_count
+                run['maxiter'] = _hit_maxiter(solver, run)
+                current.pop()
+                _add_run(record, run, self._history)
+
+        solver.solve = _solve
+        solver._iter_get_norm = _iter_get_norm
+        self._attached.append((solver, ('solve', '_iter_get_norm')))
+
+        linesearch = getattr(solver, 'linesearch', None)
+        if linesearch is not None:
+            ls_solve = linesearch.solve
+
+            def _ls_solve():
+                try:
+                    ls_solve()
+                finally:
+                    if current:
+                        current[-1]['backtracks'] += linesearch._iter_count
+
+            linesearch.solve = _ls_solve
+            self._attached.append((linesearch, ('solve',)))
+
+    def worst(self, n=10, sort_by='iters'):
+        """
+        Return the (path, record) pairs of the n solvers with the largest total for `sort_by`
+        ('iters', 'time', 'backtracks', 'n_maxiter' or 'n_solves')
+        """
+        return sorted(self.data.items(), key=lambda item: item[1][sort_by], reverse=True)[:n]
+
+    def summary(self, n=10, sort_by='iters', out_stream=sys.stdout):
+        """
+        Print the solvers with the largest total for `sort_by`, and return them
+        """
+        worst = self.worst(n, sort_by)
+
+        if out_stream is not None:
+            n_solves = sum(rec['n_solves'] for rec in self.data.values())
+            n_iters = sum(rec['iters'] for rec in self.data.values())
+            print(f'{len(self.data)} solvers, {n_solves} solves, {n_iters} iterations', file=out_stream)
+            print(f'{"path":<50} {"solver":<14} {"solves":>8} {"iters":>8} {"max":>5} {"maxiter":>8} '
+                  f'{"bktrck":>8} {"time (s)":>9}', file=out_stream)
+            for path, rec in worst:
+                print(f'{path:<50} {rec["solver"]:<14} {rec["n_solves"]:>8} {rec["iters"]:>8} '
+                      f'{rec["max_iters"]:>5} {rec["n_maxiter"]:>8} {rec["backtracks"]:>8} '
+                      f'{rec["time"]:>9.3f}', file=out_stream)
+
+        return worst
+
+    def save_json(self, filename):
+        """
+        Write the recorded data to a JSON file
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.data, f)
+
+
+def _new_record(solver):
+    return {'solver': solver.SOLVER, 'n_solves': 0, 'iters': 0, 'max_iters': 0, 'n_maxiter': 0,
+            'backtracks': 0, 'time': 0., 'runs': []}
+
+
+def _hit_maxiter(solver, run):
+    """
+    True if the solver stopped on its iteration limit without meeting its tolerances
+    """
+    if 'maxiter' not in solver.options or run['iters'] < solver.options['maxiter']:
+        return False
+
+    norms = run['norms']
+    if not norms:
+        return True
+    # the first norm is the one before the first iteration
+    norm0 = norms[0] if norms[0] != 0. else 1.
+    return norms[-1] > solver.options['atol'] and norms[-1]/norm0 > solver.options['rtol']
+
+
+def _add_run(record, run, history):
+    record['n_solves'] += 1
+    record['iters'] += run['iters']
+    record['max_iters'] = max(record['max_iters'], run['iters'])
+    record['n_maxiter'] += run['maxiter']
+    record['backtracks'] += run['backtracks']
+    record['time'] += run['time']
+    if history:
+        record['runs'].append(run)
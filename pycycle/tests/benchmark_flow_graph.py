@@ -0,0 +1,53 @@
+"""
+Setup benchmark for the flow-graph propagation in `Cycle.setup`.
+
+Builds synthetic chains of pass-through elements (100 to 2000 elements) and times the propagation
+of the port data down the chain. The time per element should stay roughly constant as the chain grows.
+
+usage: python benchmark_flow_graph.py
+"""
+import time
+
+from pycycle.mp_cycle import Cycle
+from pycycle.element_base import Element
+
+
+class PassThroughElement(Element):
+
+    def pyc_setup_output_ports(self):
+        if 'Fl_I' in self.Fl_I_data:
+            self.copy_flow('Fl_I', 'Fl_O')
+        else:
+            self.init_output_flow('Fl_O', self.name)
+
+
+def build_chain(n_elements):
+    cycle = Cycle()
+
+    names = [f'e{i}' for i in range(n_elements)]
+    for name in names:
+        cycle.add_subsystem(name, PassThroughElement())
+    for src, target in zip(names[:-1], names[1:]):
+        cycle.pyc_connect_flow(f'{src}.Fl_O', f'{target}.Fl_I')
+
+    return cycle
+
+
+def time_propagation(n_elements, n_repeat=5):
+    cycle = build_chain(n_elements)
+
+    best = float('inf')
+    for i in range(n_repeat):
+        st = time.perf_counter()
+        cycle._pyc_propagate_flow_data()
+        best = min(best, time.perf_counter() - st)
+
+    return best
+
+
+if __name__ == "__main__":
+
+    print(f'{"elements":>10} {"nodes":>8} {"time (ms)":>10} {"us/element":>11}')
+    for n in (100, 250, 500, 1000, 2000):
+        t = time_propagation(n)
+        print(f'{n:>10} {3*n-2:>8} {t*1e3:>10.2f} {t/n*1e6:>11.2f}')
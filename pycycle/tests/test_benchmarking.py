@@ -0,0 +1,80 @@
+import unittest
+
+import openmdao.api as om
+from openmdao.utils.testing_utils import use_tempdirs
+
+from pycycle.benchmarking import PhaseTimer, PHASES, COUNTERS, append_history, load_history, compare
+
+
+def build_problem():
+    """
+    x**2 = a, solved by a newton
+    """
+    prob = om.Problem()
+    model = prob.model
+    model.add_subsystem('f', om.ExecComp('y = x**2'), promotes=['*'])
+    balance = model.add_subsystem('balance', om.BalanceComp(), promotes=['*'])
+    balance.add_balance('x', val=1.0, lhs_name='y', rhs_name='a')
+
+    model.nonlinear_solver = om.NewtonSolver(solve_subsystems=False, iprint=-1, maxiter=20)
+    model.linear_solver = om.DirectSolver()
+    return prob
+
+
+@use_tempdirs
+class PhaseTimerTestCase(unittest.TestCase):
+
+    def test_phases_and_counts(self):
+        orig_run_model = om.Problem.run_model
+
+        with PhaseTimer() as timer:
+            prob = build_problem()
+            prob.setup()
+            prob.set_val('a', 9.)
+            prob.run_model()
+            prob.compute_totals(of=['x'], wrt=['a'])
+
+        # the Problem methods are restored
+        self.assertIs(om.Problem.run_model, orig_run_model)
+        self.assertEqual(timer.problems, [prob])
+        self.assertAlmostEqual(prob.get_val('x')[0], 3., 6)
+
+        results = timer.results()
+        self.assertEqual(set(results), set(PHASES + COUNTERS))
+        for phase in ('setup', 'final_setup', 'run_model', 'compute_totals'):
+            self.assertGreater(results[phase], 0.)
+        self.assertEqual(results['run_driver'], 0.)
+
+        self.assertEqual(results['solves'], 1)
+        self.assertEqual(results['newton_iters'], prob.model.nonlinear_solver._iter_count)
+        self.assertEqual(results['solver_iters'], results['newton_iters'])
+        self.assertGreater(results['comp_evals'], results['newton_iters'])
+        self.assertGreater(results['linearizations'], 0)
+
+        # nothing is counted once the timer is done
+        prob.run_model()
+        self.assertEqual(timer.results()['solves'], 1)
+
+    def test_history_and_compare(self):
+        baseline = {'env': {'commit': 'a'},
+                    'cases': {'cycle': {'setup': 0.1, 'run_model': 10., 'max_rss_mb': 100., 'newton_iters': 20},
+                              'other': {'setup': 1.}}}
+        current = {'env': {'commit': 'b'},
+                   'cases': {'cycle': {'setup': 0.2, 'run_model': 12., 'max_rss_mb': 110., 'newton_iters': 21},
+                             'new': {'setup': 1.}}}
+
+        append_history('history.jsonl', baseline)
+        append_history('history.jsonl', current)
+        self.assertEqual(load_history('history.jsonl'), [baseline, current])
+
+        # setup doubled, but by less than min_delta
+        self.assertEqual(compare(baseline, current), [('cycle', 'run_model', 10., 12.),
+                                                      ('cycle', 'newton_iters', 20, 21)])
+        self.assertEqual(compare(baseline, current, threshold=0.25), [('cycle', 'newton_iters', 20, 21)])
+        self.assertEqual(compare(baseline, current, threshold=0.05, min_delta=0.),
+                         [('cycle', 'setup', 0.1, 0.2), ('cycle', 'run_model', 10., 12.),
+                          ('cycle', 'max_rss_mb', 100., 110.), ('cycle', 'newton_iters', 20, 21)])
+
+
+if __name__ == '__main__':
+    unittest.main()
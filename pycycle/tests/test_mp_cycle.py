@@ -0,0 +1,523 @@
+import unittest
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.testing_utils import use_tempdirs
+
+from pycycle.mp_cycle import Cycle, MPCycle
+from pycycle.element_base import Element
+from pycycle.constants import AIR_JETA_TAB_SPEC
+from pycycle.elements.flow_start import FlowStart
+from pycycle.elements.duct import Duct
+from pycycle.elements.nozzle import Nozzle
+from pycycle.snapshot import save_snapshot, load_snapshot
+
+
+class SimpleCycle(Cycle):
+    """
+    Tiny implicit "cycle": finds x such that c*x**2 = a*scale,
+    where scale is a design quantity carried to the off-design points
+    """
+
+    def setup(self):
+        design = self.options['design']
+
+        self.add_subsystem('comp', om.ExecComp('y = c * x**2 / scale', scale={'val': 1.0}, c={'val': 1.0}),
+                           promotes_inputs=['x', 'scale'])
+
+        balance = self.add_subsystem('balance', om.BalanceComp())
+        balance.add_balance('x', val=1.0, lower=1e-3)
+        self.connect('balance.x', 'x')
+        self.connect('comp.y', 'balance.lhs:x')
+        self.promotes('balance', inputs=[('rhs:x', 'a')])
+
+        if design:
+            self.add_subsystem('scale_calc', om.ExecComp('s_out = 2*a'), promotes_inputs=['a'])
+
+        self.set_input_defaults('a', 1.0)
+
+        newton = self.nonlinear_solver = om.NewtonSolver()
+        newton.options['solve_subsystems'] = False
+        newton.options['atol'] = 1e-12
+        newton.options['rtol'] = 1e-12
+        newton.options['maxiter'] = 30
+        newton.options['iprint'] = -1
+        self.linear_solver = om.DirectSolver()
+
+        super().setup()
+
+
+class SimpleMPCycle(MPCycle):
+
+    def initialize(self):
+        self.options.declare('n_od', default=3)
+        self.options.declare('des_od_guess', default=False)
+        self.options.declare('guess_skip', default=None)
+        self.options.declare('od_cache_size', default=0)
+        super().initialize()
+
+    def setup(self):
+        self.pyc_add_pnt('DESIGN', SimpleCycle())
+        for i in range(self.options['n_od']):
+            self.pyc_add_pnt(f'OD{i}', SimpleCycle(design=False, result_cache_size=self.options['od_cache_size']))
+            self.set_input_defaults(f'OD{i}.a', float(i+1))
+
+        self.pyc_add_cycle_param('comp.c', 1.0)
+        self.pyc_connect_des_od('scale_calc.s_out', 'scale')
+
+        if self.options['des_od_guess']:
+            self.pyc_use_des_od_guess(skip=self.options['guess_skip'])
+
+        super().setup()
+
+
+class MPCycleTestCase(unittest.TestCase):
+
+    def _run(self, parallel_od):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(parallel_od=parallel_od)
+        prob.setup()
+        prob.set_val('DESIGN.a', 2.0)
+        prob.run_model()
+        return prob
+
+    def test_parallel_od(self):
+
+        serial = self._run(False)
+        par = self._run(True)
+
+        self.assertIsInstance(par.model.od_pnts, om.ParallelGroup)
+        self.assertFalse(hasattr(serial.model, 'od_pnts'))
+
+        for i in range(3):
+            # scale=4 from the design point, so x = sqrt(4*a)
+            assert_near_equal(par.get_val(f'OD{i}.balance.x'), np.sqrt(4.*(i+1)), 1e-10)
+            assert_near_equal(par.get_val(f'OD{i}.balance.x'), serial.get_val(f'OD{i}.balance.x'), 1e-12)
+
+    def test_parallel_od_promoted_param(self):
+        prob = self._run(True)
+
+        # cycle params are promoted up through the parallel group
+        prob.set_val('comp.c', 4.0)
+        prob.run_model()
+        assert_near_equal(prob.get_val('OD1.balance.x'), np.sqrt(4.*2/4.), 1e-10)
+
+
+class ResultCacheTestCase(unittest.TestCase):
+
+    def test_mp_cycle_cache(self):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(result_cache_size=2)
+        prob.setup()
+
+        results = {}
+        for a in (2., 3., 2., 4., 2., 3.):
+            prob.set_val('DESIGN.a', a)
+            prob.run_model()
+            x = prob.get_val('OD1.balance.x').copy()
+            if a in results:
+                assert_near_equal(x, results[a], 1e-15)
+            results[a] = x
+
+        assert_near_equal(results[3.], np.sqrt(2.*6.), 1e-10)
+        cache = prob.model._result_cache
+        # the second and third 2 are hits, the last 3 is a miss because it was dropped when 4 was added
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        prob.model.pyc_clear_result_cache()
+        prob.run_model()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_mp_cycle_cache_not_converged(self):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(result_cache_size=2)
+        prob.setup()
+        prob.set_val('DESIGN.a', 2.)
+
+        # the MPCycle just runs once, but one of its points doesn't converge
+        newton = prob.model.OD1.nonlinear_solver
+        newton.options['maxiter'] = 1
+        prob.run_model()
+        cache = prob.model._result_cache
+        self.assertEqual(len(cache._data), 0)
+
+        newton.options['maxiter'] = 30
+        prob.run_model()
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        assert_near_equal(prob.get_val('OD1.balance.x'), np.sqrt(2.*4.), 1e-10)
+        self.assertEqual(len(cache._data), 1)
+
+    def test_mp_cycle_cache_key(self):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(result_cache_size=2)
+        prob.model.add_subsystem('extra', om.IndepVarComp('b', 1.0))
+        prob.setup()
+        prob.run_model()
+
+        # only the independent variables that feed the points are in the key: the a of the 4 points, comp.c
+        # and the unconnected scale of the design point
+        cache = prob.model._result_cache
+        self.assertEqual(len(cache.key()), 6*8)
+
+        prob.set_val('extra.b', 2.0)
+        prob.run_model()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cycle_cache(self):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(n_od=1, od_cache_size=3)
+        prob.setup()
+        od = prob.model.OD0
+
+        prob.set_val('OD0.a', 2.)
+        prob.run_model()
+        assert_near_equal(prob.get_val('OD0.balance.x'), np.sqrt(2.*2.), 1e-10)
+
+        # a design change changes the scale of the off-design point, so it isn't a hit
+        prob.set_val('DESIGN.a', 3.)
+        prob.run_model()
+        self.assertEqual(od._result_cache.hits, 0)
+        assert_near_equal(prob.get_val('OD0.balance.x'), np.sqrt(2.*6.), 1e-10)
+
+        prob.set_val('DESIGN.a', 1.)
+        prob.run_model()
+        self.assertEqual(od._result_cache.hits, 1)
+        assert_near_equal(prob.get_val('OD0.balance.x'), np.sqrt(2.*2.), 1e-10)
+        # the hit restores the solution without solving the point
+        self.assertEqual(od.iter_count, 0)
+
+
+class DesODGuessTestCase(unittest.TestCase):
+
+    def _run(self, **kwargs):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(n_od=2, **kwargs)
+        prob.setup()
+        # far from the default guess of x=1, but close to the design point
+        prob.set_val('DESIGN.a', 1e4)
+        prob.set_val('OD0.a', 2e4)
+        prob.set_val('OD1.a', 2.1e4)
+        prob.run_model()
+        return prob
+
+    def test_des_od_guess(self):
+        base = self._run()
+        guess = self._run(des_od_guess=True)
+
+        for i in range(2):
+            assert_near_equal(guess.get_val(f'OD{i}.balance.x'), base.get_val(f'OD{i}.balance.x'), 1e-10)
+            self.assertLess(guess.model._get_subsystem(f'OD{i}').nonlinear_solver._iter_count,
+                            base.model._get_subsystem(f'OD{i}').nonlinear_solver._iter_count)
+
+        # the guess is only generated once, later runs start from the previous solution
+        self.assertTrue(guess.model.OD0._des_guess_applied)
+        guess.set_val('OD0.balance.x', 1.0)
+        guess.run_model()
+        self.assertEqual(guess.model.OD0.nonlinear_solver._iter_count,
+                         base.model.OD0.nonlinear_solver._iter_count)
+
+    def test_des_od_guess_not_converged(self):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(n_od=2, des_od_guess=True)
+        prob.setup()
+        prob.set_val('DESIGN.a', 1e4)
+        prob.set_val('OD0.a', 2e4)
+        prob.set_val('OD1.a', 2.1e4)
+
+        # the design point has been solved, but not converged yet, so it is no good as a guess
+        newton = prob.model.DESIGN.nonlinear_solver
+        newton.options['maxiter'] = 2
+        prob.run_model()
+        self.assertFalse(prob.model.OD0._des_guess_applied)
+
+        newton.options['maxiter'] = 30
+        prob.run_model()
+        self.assertTrue(prob.model.OD0._des_guess_applied)
+
+    def test_des_od_guess_skip(self):
+        base = self._run()
+        guess = self._run(des_od_guess=True, guess_skip=['balance'])
+
+        self.assertEqual(guess.model.OD1.nonlinear_solver._iter_count,
+                         base.model.OD1.nonlinear_solver._iter_count)
+
+    def test_des_od_guess_errors(self):
+        mp = MPCycle()
+        with self.assertRaises(ValueError):
+            mp.pyc_use_des_od_guess()
+
+
+class PassThroughElement(Element):
+
+    def pyc_setup_output_ports(self):
+        if 'Fl_I' in self.Fl_I_data:
+            self.copy_flow('Fl_I', 'Fl_O')
+        else:
+            self.init_output_flow('Fl_O', self.name)
+
+
+class FlowGraphTestCase(unittest.TestCase):
+
+    def test_propagation_order(self):
+        cycle = Cycle()
+        # add the elements in reverse order, so the port data has to follow the flow graph
+        names = [f'e{i}' for i in range(5)]
+        for name in reversed(names):
+            cycle.add_subsystem(name, PassThroughElement())
+        for src, target in zip(names[:-1], names[1:]):
+            cycle.pyc_connect_flow(f'{src}.Fl_O', f'{target}.Fl_I')
+
+        cycle._pyc_propagate_flow_data()
+        self.assertEqual(cycle.e4.Fl_O_data['Fl_O'], 'e0')
+
+    def test_flow_loop(self):
+        cycle = Cycle()
+        for name in ('a', 'b'):
+            cycle.add_subsystem(name, PassThroughElement())
+        cycle.pyc_connect_flow('a.Fl_O', 'b.Fl_I')
+        cycle.pyc_connect_flow('b.Fl_O', 'a.Fl_I')
+
+        with self.assertRaises(RuntimeError) as cm:
+            cycle._pyc_propagate_flow_data()
+        self.assertIn('the flow connections form a loop', str(cm.exception))
+
+    def test_sub_cycle(self):
+        cycle = Cycle()
+        cycle.add_subsystem('start', PassThroughElement())
+        sub = cycle.add_subsystem('sub', Cycle())
+        cycle.pyc_connect_flow('start.Fl_O', 'sub.duct.Fl_I')
+
+        # elements of the sub-cycle don't exist until it is set up, so the data waits on the sub-cycle
+        cycle._pyc_propagate_flow_data()
+        self.assertEqual(sub._upstream_Fl_I_data, {('duct', 'Fl_I'): 'start'})
+
+        sub.add_subsystem('duct', PassThroughElement())
+        sub._pyc_propagate_flow_data()
+        self.assertEqual(sub.duct.Fl_O_data['Fl_O'], 'start')
+
+    def test_bad_target(self):
+        cycle = Cycle()
+        cycle.add_subsystem('start', PassThroughElement())
+        cycle.pyc_connect_flow('start.Fl_O', 'nope.Fl_I')
+
+        with self.assertRaises(RuntimeError) as cm:
+            cycle._pyc_propagate_flow_data()
+        self.assertIn('could not find the element `nope`', str(cm.exception))
+
+
+class OrderedCycle(Cycle):
+    """
+    Chain of components added out of order, closed by a balance
+    """
+
+    def setup(self):
+        self.add_subsystem('c3', om.ExecComp('y = x - 4.'))
+        self.add_subsystem('c1', om.ExecComp('y = 2*x'))
+        self.add_subsystem('c2', om.ExecComp('y = x + 1.'), promotes_inputs=[('x', 'X2')])
+
+        balance = self.add_subsystem('balance', om.BalanceComp())
+        balance.add_balance('x', val=1.0)
+
+        self.connect('c3.y', 'balance.lhs:x')
+        self.connect('balance.x', 'c1.x')
+        self.connect('c2.y', 'c3.x')
+        self.connect('c1.y', 'X2')
+
+        self.nonlinear_solver = om.NewtonSolver(solve_subsystems=False, iprint=-1)
+        self.linear_solver = om.DirectSolver()
+
+        super().setup()
+
+
+class AutoOrderTestCase(unittest.TestCase):
+
+    def _setup(self, auto_flow_order):
+        prob = om.Problem()
+        prob.model = OrderedCycle(auto_flow_order=auto_flow_order)
+        prob.setup()
+        prob.final_setup()
+        return prob
+
+    def test_auto_order(self):
+        prob = self._setup(True)
+
+        order = list(prob.model._subsystems_allprocs)
+        self.assertLess(order.index('c1'), order.index('c2'))
+        self.assertLess(order.index('c2'), order.index('c3'))
+
+        # the balance closes the loop, so one connection has to stay as feedback
+        feedback = prob.model.pyc_list_feedback_conns(out_stream=None)
+        self.assertEqual(len(feedback), 1)
+
+        prob.run_model()
+        assert_near_equal(prob.get_val('balance.x'), 1.5, 1e-10)
+
+    def test_feedback_manual_order(self):
+        prob = self._setup(False)
+
+        self.assertEqual(list(prob.model._subsystems_allprocs), ['_auto_ivc', 'c3', 'c1', 'c2', 'balance'])
+        feedback = prob.model.pyc_list_feedback_conns(out_stream=None)
+        self.assertEqual(feedback, [('balance.x', 'c1.x'), ('c2.y', 'c3.x')])
+
+
+class FlowChain(Cycle):
+
+    def setup(self):
+        self.options['thermo_method'] = 'TABULAR'
+        self.options['thermo_data'] = AIR_JETA_TAB_SPEC
+
+        self.add_subsystem('start', FlowStart())
+        self.add_subsystem('duct', Duct())
+        self.add_subsystem('nozz', Nozzle(nozzType='CV', lossCoef='Cv'))
+
+        self.pyc_connect_flow('start.Fl_O', 'duct.Fl_I')
+        self.pyc_connect_flow('duct.Fl_O', 'nozz.Fl_I')
+
+        super().setup()
+
+
+class ConfiguredFlowChain(FlowChain):
+
+    def configure(self):
+        # does not call super
+        self.set_input_defaults('duct.dPqP', 0.02)
+
+
+class LeanFlowPortsTestCase(unittest.TestCase):
+
+    def _run(self, lean_flow_ports, cycle_class=FlowChain):
+        prob = om.Problem()
+        prob.model = cycle_class(lean_flow_ports=lean_flow_ports)
+        prob.setup()
+        prob.set_val('start.P', 30., units='psi')
+        prob.set_val('start.T', 800., units='degR')
+        prob.set_val('start.W', 50., units='lbm/s')
+        prob.set_val('start.MN', 0.3)
+        prob.set_val('duct.MN', 0.3)
+        prob.set_val('duct.dPqP', 0.02)
+        prob.set_val('nozz.Ps_exhaust', 14.7, units='psi')
+        prob.run_model()
+        return prob
+
+    def test_lean_flow_ports(self):
+        lean = self._run(True)
+        full = self._run(False)
+
+        for name in ('duct.Fl_O:tot:P', 'duct.Fl_O:stat:area', 'nozz.Fg', 'nozz.Fl_O:stat:V'):
+            assert_near_equal(lean.get_val(name), full.get_val(name), 1e-12)
+
+        # the flow variables the elements don't use are neither declared nor connected
+        n_lean = len(lean.model._conn_global_abs_in2out)
+        n_full = len(full.model._conn_global_abs_in2out)
+        self.assertLess(n_lean, n_full)
+        self.assertNotIn('duct.flow_in.Fl_I:tot:T', lean.model._conn_global_abs_in2out)
+        self.assertIn('duct.flow_in.Fl_I:tot:T', full.model._conn_global_abs_in2out)
+        self.assertIn('duct.Fl_I:tot:P', lean.model._var_allprocs_prom2abs_list['input'])
+
+    def test_configure_override(self):
+        # the flow connections are still made when a subclass overrides configure
+        lean = self._run(True, ConfiguredFlowChain)
+        full = self._run(False)
+
+        self.assertEqual(lean.model._conn_global_abs_in2out['duct.p_loss.Pt_in'], 'start.totals.flow.Fl_O:tot:P')
+        for name in ('duct.Fl_O:tot:P', 'nozz.Fg'):
+            assert_near_equal(lean.get_val(name), full.get_val(name), 1e-10)
+
+
+@use_tempdirs
+class SnapshotTestCase(unittest.TestCase):
+
+    def _setup(self, n_od=3, parallel_od=False):
+        prob = om.Problem()
+        prob.model = SimpleMPCycle(n_od=n_od, parallel_od=parallel_od)
+        prob.setup()
+        prob.set_val('DESIGN.a', 2.0)
+        prob.final_setup()
+        return prob
+
+    def test_mp_cycle_snapshot(self):
+        prob = self._setup()
+        prob.run_model()
+        prob.model.pyc_save_snapshot('converged.npz')
+
+        new_prob = self._setup()
+        n_states = len([n for n in new_prob.model._var_abs2meta['output'] if not n.startswith('_auto_ivc.')])
+        n_set = new_prob.model.pyc_load_snapshot('converged.npz', strict=True)
+        self.assertEqual(n_set, n_states)
+
+        for i in range(3):
+            assert_near_equal(new_prob.get_val(f'OD{i}.balance.x'), prob.get_val(f'OD{i}.balance.x'), 1e-14)
+
+        # restarting from the converged state needs no newton iterations
+        new_prob.run_model()
+        self.assertEqual(new_prob.model.OD2.nonlinear_solver._iter_count, 0)
+
+    def test_partial_match(self):
+        prob = self._setup(n_od=3)
+        prob.run_model()
+        prob.model.pyc_save_snapshot('converged.npz')
+
+        new_prob = self._setup(n_od=2)
+        n_states = len([n for n in new_prob.model._var_abs2meta['output'] if not n.startswith('_auto_ivc.')])
+        with self.assertRaises(ValueError):
+            new_prob.model.pyc_load_snapshot('converged.npz', strict=True)
+
+        n_set = new_prob.model.pyc_load_snapshot('converged.npz')
+        self.assertEqual(n_set, n_states)
+        assert_near_equal(new_prob.get_val('OD1.balance.x'), prob.get_val('OD1.balance.x'), 1e-14)
+
+    def test_cycle_snapshot(self):
+        prob = om.Problem()
+        prob.model.add_subsystem('pnt', SimpleCycle())
+        prob.setup()
+        prob.set_val('pnt.a', 9.)
+        prob.run_model()
+        prob.model.pnt.pyc_save_snapshot('pnt')
+
+        # a cycle snapshot is independent of where the cycle sits in the model
+        new_prob = om.Problem()
+        new_prob.model = SimpleCycle()
+        new_prob.setup()
+        new_prob.final_setup()
+        new_prob.model.pyc_load_snapshot('pnt.npz', strict=True)
+        assert_near_equal(new_prob.get_val('balance.x'), 3., 1e-10)
+
+    def test_indep_var_comp(self):
+        def setup():
+            prob = om.Problem()
+            prob.model.add_subsystem('ivc', om.IndepVarComp('a', 9.))
+            prob.model.add_subsystem('pnt', SimpleCycle())
+            prob.model.connect('ivc.a', 'pnt.a')
+            prob.setup()
+            prob.final_setup()
+            return prob
+
+        prob = setup()
+        prob.run_model()
+        save_snapshot(prob.model, 'model')
+
+        # the value the user set is kept, only the solution is used as the initial guess
+        new_prob = setup()
+        new_prob.set_val('ivc.a', 16.)
+        load_snapshot(new_prob.model, 'model.npz', strict=True)
+        assert_near_equal(new_prob.get_val('ivc.a'), 16., 1e-14)
+        assert_near_equal(new_prob.get_val('pnt.balance.x'), 3., 1e-10)
+
+        new_prob.run_model()
+        assert_near_equal(new_prob.get_val('pnt.balance.x'), 4., 1e-10)
+
+    def test_parallel_od_layout(self):
+        prob = self._setup(parallel_od=True)
+        prob.run_model()
+        prob.model.pyc_save_snapshot('parallel.npz')
+
+        new_prob = self._setup()
+        new_prob.model.pyc_load_snapshot('parallel.npz', strict=True)
+        for i in range(3):
+            assert_near_equal(new_prob.get_val(f'OD{i}.balance.x'), prob.get_val(f'OD{i}.balance.x'), 1e-14)
+
+
+if __name__ == "__main__":
+    unittest.main()
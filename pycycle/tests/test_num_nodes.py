@@ -0,0 +1,144 @@
+import unittest
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.testing_utils import use_tempdirs
+
+import pycycle.api as pyc
+
+
+class Turbojet(pyc.Cycle):
+
+    def setup(self):
+        nn = self.options['num_nodes']
+
+        self.options['thermo_method'] = 'TABULAR'
+        self.options['thermo_data'] = pyc.AIR_JETA_TAB_SPEC
+
+        self.add_subsystem('fc', pyc.FlightConditions())
+        self.add_subsystem('inlet', pyc.Inlet())
+        self.add_subsystem('comp', pyc.Compressor(map_data=pyc.AXI5, map_extrap=True),
+                           promotes_inputs=['Nmech'])
+        self.add_subsystem('burner', pyc.Combustor(fuel_type='FAR'))
+        self.add_subsystem('turb', pyc.Turbine(map_data=pyc.LPT2269), promotes_inputs=['Nmech'])
+        self.add_subsystem('nozz', pyc.Nozzle(nozzType='CD', lossCoef='Cv'))
+        self.add_subsystem('shaft', pyc.Shaft(num_ports=2), promotes_inputs=['Nmech'])
+        self.add_subsystem('perf', pyc.Performance(num_nozzles=1, num_burners=1))
+
+        self.pyc_connect_flow('fc.Fl_O', 'inlet.Fl_I', connect_w=False)
+        self.pyc_connect_flow('inlet.Fl_O', 'comp.Fl_I')
+        self.pyc_connect_flow('comp.Fl_O', 'burner.Fl_I')
+        self.pyc_connect_flow('burner.Fl_O', 'turb.Fl_I')
+        self.pyc_connect_flow('turb.Fl_O', 'nozz.Fl_I')
+
+        self.connect('comp.trq', 'shaft.trq_0')
+        self.connect('turb.trq', 'shaft.trq_1')
+        self.connect('fc.Fl_O:stat:P', 'nozz.Ps_exhaust')
+
+        self.connect('inlet.Fl_O:tot:P', 'perf.Pt2')
+        self.connect('comp.Fl_O:tot:P', 'perf.Pt3')
+        self.connect('burner.Wfuel', 'perf.Wfuel_0')
+        self.connect('inlet.F_ram', 'perf.ram_drag')
+        self.connect('nozz.Fg', 'perf.Fg_0')
+
+        balance = self.add_subsystem('balance', om.BalanceComp())
+        balance.add_balance('W', units='lbm/s', eq_units='lbf', rhs_name='Fn_target', shape=nn)
+        self.connect('balance.W', 'inlet.Fl_I:stat:W')
+        self.connect('perf.Fn', 'balance.lhs:W')
+
+        balance.add_balance('FAR', eq_units='degR', lower=1e-4, val=.017, rhs_name='T4_target', shape=nn)
+        self.connect('balance.FAR', 'burner.Fl_I:FAR')
+        self.connect('burner.Fl_O:tot:T', 'balance.lhs:FAR')
+
+        balance.add_balance('turb_PR', val=1.5, lower=1.001, upper=8, eq_units='hp', rhs_val=0., shape=nn)
+        self.connect('balance.turb_PR', 'turb.PR')
+        self.connect('shaft.pwr_net', 'balance.lhs:turb_PR')
+
+        newton = self.nonlinear_solver = om.NewtonSolver()
+        newton.options['atol'] = 1e-8
+        newton.options['rtol'] = 1e-8
+        newton.options['iprint'] = -1
+        newton.options['maxiter'] = 20
+        newton.options['solve_subsystems'] = True
+        newton.options['max_sub_solves'] = 100
+        newton.options['reraise_child_analysiserror'] = False
+        self.linear_solver = om.DirectSolver()
+
+        super().setup()
+
+
+def run_turbojet(alt, MN, Fn, T4):
+    prob = om.Problem()
+    prob.model.add_subsystem('DESIGN', Turbojet(num_nodes=len(alt)))
+    prob.setup(check=False)
+
+    prob.set_val('DESIGN.fc.alt', alt, units='ft')
+    prob.set_val('DESIGN.fc.MN', MN)
+    prob.set_val('DESIGN.balance.Fn_target', Fn, units='lbf')
+    prob.set_val('DESIGN.balance.T4_target', T4, units='degR')
+    prob.set_val('DESIGN.comp.PR', 13.5)
+    prob.set_val('DESIGN.comp.eff', 0.83)
+    prob.set_val('DESIGN.turb.eff', 0.86)
+    prob.set_val('DESIGN.Nmech', 8070.0, units='rpm')
+    prob.set_val('DESIGN.inlet.MN', 0.60)
+    prob.set_val('DESIGN.comp.MN', 0.20)
+    prob.set_val('DESIGN.burner.MN', 0.20)
+    prob.set_val('DESIGN.turb.MN', 0.4)
+
+    prob.set_val('DESIGN.balance.FAR', 0.0175506829934)
+    prob.set_val('DESIGN.balance.W', 168.453135137)
+    prob.set_val('DESIGN.balance.turb_PR', 4.46138725662)
+    prob.set_val('DESIGN.fc.balance.Pt', 14.6955113159)
+    prob.set_val('DESIGN.fc.balance.Tt', 518.665288153)
+
+    prob.set_solver_print(level=-1)
+    prob.run_model()
+    return prob
+
+
+@use_tempdirs
+class NumNodesTestCase(unittest.TestCase):
+
+    def test_vectorized_cycle(self):
+        alt = [0., 5000.]
+        MN = [0.000001, 0.2]
+        Fn = [11800., 11000.]
+        T4 = [2370., 2300.]
+
+        prob = run_turbojet(alt, MN, Fn, T4)
+
+        for i in range(len(alt)):
+            single = run_turbojet(alt[i:i+1], MN[i:i+1], Fn[i:i+1], T4[i:i+1])
+            for name in ('balance.W', 'balance.FAR', 'balance.turb_PR', 'perf.TSFC', 'perf.OPR',
+                         'nozz.Fl_O:stat:V', 'comp.Fl_O:tot:T', 'turb.Fl_O:tot:P'):
+                assert_near_equal(prob.get_val(f'DESIGN.{name}')[i], single.get_val(f'DESIGN.{name}')[0], 1e-6)
+
+        # the points are independent, so the jacobian of the cycle is block diagonal
+        W = prob.get_val('DESIGN.balance.W')
+        self.assertNotAlmostEqual(W[0], W[1], places=2)
+        J = prob.compute_totals(of=['DESIGN.perf.TSFC'], wrt=['DESIGN.comp.PR'], return_format='array')
+        self.assertEqual(J.shape, (2, 2))
+        assert_near_equal(J[0, 1], 0., 1e-12)
+        assert_near_equal(J[1, 0], 0., 1e-12)
+
+    def test_cea_error(self):
+        prob = om.Problem()
+        prob.model.add_subsystem('fc', pyc.FlightConditions(thermo_method='CEA',
+                                                            thermo_data=pyc.species_data.janaf,
+                                                            num_nodes=3))
+        with self.assertRaises(ValueError) as cm:
+            prob.setup()
+
+        self.assertIn('num_nodes > 1 is only supported by the TABULAR thermo method', str(cm.exception))
+
+    def test_unsupported_element(self):
+        with self.assertRaises(ValueError) as cm:
+            pyc.Mixer(num_nodes=2)
+
+        self.assertEqual(str(cm.exception), 'Mixer does not support num_nodes > 1.')
+
+
+if __name__ == "__main__":
+    unittest.main()
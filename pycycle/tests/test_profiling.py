@@ -0,0 +1,80 @@
+import unittest
+import io
+
+import openmdao.api as om
+
+from pycycle.mp_cycle import Cycle
+from pycycle.elements.duct import Duct
+from pycycle.elements.flow_start import FlowStart
+from pycycle.profiling import ElementProfiler
+
+
+class ElementProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        prob = self.prob = om.Problem()
+        cycle = prob.model = Cycle()
+
+        cycle.add_subsystem('flow_start', FlowStart(), promotes=['MN', 'P', 'T'])
+        cycle.add_subsystem('duct', Duct(), promotes=['MN'])
+        cycle.pyc_connect_flow('flow_start.Fl_O', 'duct.Fl_I')
+
+        cycle.set_input_defaults('MN', 0.5)
+        cycle.set_input_defaults('duct.dPqP', 0.01)
+        cycle.set_input_defaults('P', 17., units='psi')
+        cycle.set_input_defaults('T', 500., units='degR')
+        cycle.set_input_defaults('flow_start.W', 100., units='lbm/s')
+
+        prob.setup()
+        prob.set_solver_print(level=-1)
+        prob.final_setup()
+
+    def test_rollups(self):
+        with ElementProfiler(self.prob.model) as profiler:
+            self.prob.run_model()
+            self.prob.compute_totals(of=['duct.Fl_O:stat:P'], wrt=['P'])
+
+        by_class = profiler.totals('element_class')
+        # the auto_ivc is not part of any element
+        self.assertEqual(set(by_class), {'FlowStart', 'Duct', '-'})
+        self.assertGreater(by_class['Duct']['element_solve'][0], 0)
+
+        by_element = profiler.totals('element')
+        self.assertEqual(set(by_element), {'flow_start', 'duct', '-'})
+
+        # the component times roll up to the same total whichever way they are grouped
+        total = sum(entry['time'] for entry in by_class.values())
+        for by in ('element', 'thermo_mode', 'component_class'):
+            self.assertAlmostEqual(sum(entry['time'] for entry in profiler.totals(by).values()), total)
+
+        by_mode = profiler.totals('thermo_mode')
+        self.assertIn('total_TP', by_mode)
+        self.assertIn('static_MN', by_mode)
+
+        chem_eq = profiler.totals('component_class')['ChemEq']
+        self.assertGreater(chem_eq['apply_nonlinear'][0], 0)
+        self.assertGreater(chem_eq['linearize'][0], 0)
+
+        stream = io.StringIO()
+        profiler.report(by='thermo_mode', out_stream=stream)
+        self.assertIn('total_TP', stream.getvalue())
+
+        with self.assertRaises(ValueError):
+            profiler.totals('nope')
+
+    def test_detach(self):
+        profiler = ElementProfiler(self.prob.model)
+        profiler.attach()
+        self.prob.run_model()
+        profiler.detach()
+
+        n_calls = profiler.totals('element_class')['Duct']['element_solve'][0]
+        self.assertNotIn('_solve_nonlinear', self.prob.model.duct.__dict__)
+
+        # nothing is recorded once detached
+        self.prob.run_model()
+        self.assertEqual(profiler.totals('element_class')['Duct']['element_solve'][0], n_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
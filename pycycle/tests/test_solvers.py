@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+
+from pycycle.solvers import LaggedNewtonSolver
+
+
+class CountingDirectSolver(om.DirectSolver):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.n_factor = 0
+
+    def _linearize(self):
+        self.n_factor += 1
+        super()._linearize()
+
+
+class CoupledBalances(om.Group):
+    """
+    Two coupled nonlinear balances:
+        x**3 + y = a
+        y**2 + x = b
+    """
+
+    def setup(self):
+        self.add_subsystem('f', om.ExecComp(['f1 = x**3 + y', 'f2 = y**2 + x']), promotes=['*'])
+
+        balance = self.add_subsystem('balance', om.BalanceComp(), promotes=['*'])
+        balance.add_balance('x', val=1.0, rhs_name='a', lhs_name='f1')
+        balance.add_balance('y', val=1.0, rhs_name='b', lhs_name='f2')
+
+
+class LaggedNewtonTestCase(unittest.TestCase):
+
+    def _run(self, newton, a=10., b=6.):
+        prob = om.Problem()
+        prob.model.add_subsystem('pnt', CoupledBalances(), promotes=['*'])
+        prob.model.nonlinear_solver = newton
+        newton.options['atol'] = 1e-10
+        newton.options['rtol'] = 1e-10
+        newton.options['maxiter'] = 50
+        newton.options['iprint'] = -1
+        newton.options['solve_subsystems'] = False
+        prob.model.linear_solver = CountingDirectSolver()
+        prob.setup()
+        prob.set_val('a', a)
+        prob.set_val('b', b)
+        prob.run_model()
+        return prob
+
+    def test_lagged(self):
+        ref = self._run(om.NewtonSolver())
+        lagged = self._run(LaggedNewtonSolver(max_jac_age=10, relin_rate=0.5))
+
+        # x=2, y=2 is a solution
+        assert_near_equal(ref.get_val('x'), 2., 1e-8)
+        assert_near_equal(lagged.get_val('x'), ref.get_val('x'), 1e-8)
+        assert_near_equal(lagged.get_val('y'), ref.get_val('y'), 1e-8)
+
+        self.assertLess(lagged.model.linear_solver.n_factor, ref.model.linear_solver.n_factor)
+
+    def test_broyden(self):
+        lagged = self._run(LaggedNewtonSolver(max_jac_age=10, relin_rate=0.9))
+        broyden = self._run(LaggedNewtonSolver(max_jac_age=10, relin_rate=0.9, broyden=True))
+
+        assert_near_equal(broyden.get_val('x'), 2., 1e-8)
+        assert_near_equal(broyden.get_val('y'), 2., 1e-8)
+
+        # the rank-one updates recover most of the Newton convergence rate without re-linearizing
+        self.assertLess(broyden.model.nonlinear_solver._iter_count, lagged.model.nonlinear_solver._iter_count)
+
+    def test_reuse_between_solves(self):
+        for reuse, n_expected in ((True, 0), (False, 1)):
+            prob = self._run(LaggedNewtonSolver(max_jac_age=10, reuse_between_solves=reuse))
+            n_factor = prob.model.linear_solver.n_factor
+
+            # a nearby operating point
+            prob.set_val('a', 10.1)
+            prob.run_model()
+            assert_near_equal(prob.get_val('f1'), 10.1, 1e-8)
+            self.assertEqual(prob.model.linear_solver.n_factor - n_factor, n_expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
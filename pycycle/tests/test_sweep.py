@@ -0,0 +1,191 @@
+import os
+import csv
+import unittest
+
+import numpy as np
+
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.testing_utils import use_tempdirs
+
+import pycycle.api as pyc
+from pycycle.sweep import EnvelopeSweep, full_factorial
+
+
+class SqrtPoint(om.Group):
+    """finds x such that x**2 = a + b"""
+
+    def setup(self):
+        self.add_subsystem('comp', om.ExecComp('y = x**2'), promotes=['*'])
+        self.add_subsystem('sum', om.ExecComp('c = a + b'), promotes=['*'])
+
+        balance = self.add_subsystem('balance', om.BalanceComp(), promotes_outputs=['x'])
+        balance.add_balance('x', val=1.0)
+        self.connect('y', 'balance.lhs:x')
+        self.connect('c', 'balance.rhs:x')
+
+        newton = self.nonlinear_solver = om.NewtonSolver()
+        newton.options['solve_subsystems'] = False
+        newton.options['atol'] = 1e-10
+        newton.options['rtol'] = 1e-10
+        newton.options['maxiter'] = 10
+        newton.options['iprint'] = -1
+        self.linear_solver = om.DirectSolver()
+
+
+class InletNozzle(pyc.Cycle):
+    """finds the airflow that gives the target gross thrust"""
+
+    def setup(self):
+        self.options['thermo_method'] = 'TABULAR'
+        self.options['thermo_data'] = pyc.AIR_JETA_TAB_SPEC
+
+        # the Thermo based flight conditions have their own Newton inside the cycle Newton
+        self.add_subsystem('fc', pyc.FlightConditions(fused_thermo=False))
+        self.add_subsystem('inlet', pyc.Inlet())
+        self.add_subsystem('nozz', pyc.Nozzle(nozzType='CV', lossCoef='Cv'))
+
+        self.pyc_connect_flow('fc.Fl_O', 'inlet.Fl_I', connect_w=False)
+        self.pyc_connect_flow('inlet.Fl_O', 'nozz.Fl_I')
+        self.connect('fc.Fl_O:stat:P', 'nozz.Ps_exhaust')
+
+        balance = self.add_subsystem('balance', om.BalanceComp())
+        balance.add_balance('W', val=50., units='lbm/s', eq_units='lbf', rhs_name='Fg_target', lower=1.)
+        self.connect('balance.W', 'inlet.Fl_I:stat:W')
+        self.connect('nozz.Fg', 'balance.lhs:W')
+
+        newton = self.nonlinear_solver = om.NewtonSolver()
+        newton.options['atol'] = 1e-8
+        newton.options['rtol'] = 1e-8
+        newton.options['iprint'] = -1
+        newton.options['maxiter'] = 20
+        newton.options['solve_subsystems'] = True
+        newton.options['max_sub_solves'] = 10
+        newton.options['reraise_child_analysiserror'] = False
+        self.linear_solver = om.DirectSolver()
+
+        super().setup()
+
+
+@use_tempdirs
+class EnvelopeSweepTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prob = om.Problem()
+        self.prob.model.add_subsystem('pnt', SqrtPoint())
+        self.prob.setup()
+
+    def test_full_factorial(self):
+        conds = full_factorial(a=[1., 2.], b=[0., 10., 20.])
+        self.assertEqual(len(conds), 6)
+        self.assertEqual(conds[0], {'a': 1., 'b': 0.})
+        self.assertEqual(conds[-1], {'a': 2., 'b': 20.})
+
+    def test_path_order(self):
+        conds = [{'a': a} for a in [0., 5., 1., 4., 2., 3.]]
+        sweep = EnvelopeSweep(self.prob, 'pnt', conds)
+
+        self.assertEqual(sweep.order, [0, 2, 4, 5, 3, 1])
+
+    def test_sweep(self):
+        conds = full_factorial(a=np.linspace(1., 1000., 10), b=[0., 100.])
+        # no real solution for this one, so it should fail but not stop the sweep
+        conds.append({'a': -500., 'b': 0.})
+
+        sweep = EnvelopeSweep(self.prob, 'pnt', conds, outputs=['x'], results_file='sweep.csv')
+        results = sweep.run()
+
+        self.assertEqual(len(results), len(conds))
+        for cond, res in zip(conds[:-1], results[:-1]):
+            self.assertTrue(res['converged'])
+            assert_near_equal(res['x'], np.sqrt(cond['a'] + cond['b']), 1e-8)
+
+        self.assertFalse(results[-1]['converged'])
+        self.assertTrue(np.isnan(results[-1]['x']))
+
+        # the solver setting is restored after the sweep
+        self.assertFalse(self.prob.model.pnt.nonlinear_solver.options['err_on_non_converge'])
+
+        with open('sweep.csv') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['a', 'b', 'x', 'converged'])
+        self.assertEqual(len(rows), len(conds) + 1)
+
+    def test_sweep_model(self):
+        # sweep the whole model, which just runs once, with a vector output
+        prob = om.Problem()
+        prob.model.add_subsystem('pnt', SqrtPoint())
+        prob.model.add_subsystem('vec', om.ExecComp('v = x*w', v=np.ones(2), w=np.array([1., 2.])))
+        prob.model.connect('pnt.x', 'vec.x')
+        prob.setup()
+
+        conds = [{'pnt.a': a, 'pnt.b': 0.} for a in [1., 4., -4.]]
+        sweep = EnvelopeSweep(prob, None, conds, outputs=['vec.v'], results_file='sweep.csv')
+        results = sweep.run()
+
+        assert_near_equal(results[1]['vec.v'], [2., 4.], 1e-8)
+        # the newton inside the point still detects the failure
+        self.assertFalse(results[2]['converged'])
+        self.assertTrue(np.all(np.isnan(results[2]['vec.v'])))
+        self.assertFalse(prob.model.pnt.nonlinear_solver.options['err_on_non_converge'])
+
+        with open('sweep.csv') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['pnt.a', 'pnt.b', 'vec.v[0]', 'vec.v[1]', 'converged'])
+        assert_near_equal([float(val) for val in rows[2][2:4]], [2., 4.], 1e-8)
+
+    def test_sweep_cycle(self):
+        prob = om.Problem()
+        prob.model.add_subsystem('pnt', InletNozzle())
+        prob.setup(check=False)
+        prob.set_val('pnt.balance.Fg_target', 2000., units='lbf')
+        prob.set_val('pnt.inlet.ram_recovery', 0.995)
+        prob.set_val('pnt.nozz.Cv', 0.99)
+        prob.set_solver_print(level=-1)
+
+        conds = full_factorial(**{'fc.alt': [0., 10000., 20000.], 'fc.MN': [0.2, 0.5, 0.8]})
+        units = {'fc.alt': 'ft', 'balance.W': 'lbm/s', 'nozz.Fg': 'lbf'}
+
+        # the flight conditions Newton stops short of convergence on every pass of the cycle Newton,
+        # which would pass on any error from it, but the cycle still converges
+        fc_newton = prob.model.pnt.fc.conv.nonlinear_solver
+        fc_newton.options['maxiter'] = 1
+        prob.model.pnt.nonlinear_solver.options['reraise_child_analysiserror'] = True
+
+        sweep = EnvelopeSweep(prob, 'pnt', conds, outputs=['balance.W', 'nozz.Fg'], units=units)
+        results = sweep.run()
+
+        self.assertTrue(all(res['converged'] for res in results))
+        for res in results:
+            assert_near_equal(res['nozz.Fg'], 2000., 1e-6)
+
+        # the nested flight conditions Newton is left alone
+        self.assertFalse(fc_newton.options['err_on_non_converge'])
+
+        # each point matches a cold start at the same condition
+        for cond, res in zip(conds[::4], results[::4]):
+            for name, val in cond.items():
+                prob.set_val(f'pnt.{name}', val, units=units.get(name))
+            prob.set_val('pnt.balance.W', 50., units='lbm/s')
+            prob.run_model()
+            assert_near_equal(res['balance.W'], prob.get_val('pnt.balance.W', units='lbm/s'), 1e-6)
+
+    def test_warm_start(self):
+        # a far away cold start does not converge in 10 newton iterations,
+        # but walking along the path from a nearby point does
+        conds = [{'a': a, 'b': 0.} for a in np.linspace(1., 1e6, 200)]
+
+        sweep = EnvelopeSweep(self.prob, 'pnt', conds, outputs=['x'])
+        results = sweep.run()
+
+        self.assertTrue(all(res['converged'] for res in results))
+
+        self.prob.set_val('pnt.x', 1.)
+        self.prob.set_val('pnt.a', 1e6)
+        self.prob.model.pnt.nonlinear_solver.options['err_on_non_converge'] = True
+        with self.assertRaises(om.AnalysisError):
+            self.prob.run_model()
+
+
+if __name__ == "__main__":
+    unittest.main()
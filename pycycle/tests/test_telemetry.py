@@ -0,0 +1,107 @@
+import unittest
+import json
+
+import openmdao.api as om
+from openmdao.utils.testing_utils import use_tempdirs
+
+from pycycle.telemetry import SolverTelemetry
+
+
+class Inner(om.Group):
+    """
+    x**2 = a, solved by its own newton
+    """
+
+    def setup(self):
+        self.add_subsystem('f', om.ExecComp('y = x**2'), promotes=['*'])
+        balance = self.add_subsystem('balance', om.BalanceComp(), promotes=['*'])
+        balance.add_balance('x', val=1.0, lhs_name='y', rhs_name='a')
+
+        newton = self.nonlinear_solver = om.NewtonSolver(solve_subsystems=False, iprint=-1, maxiter=20)
+        newton.linesearch = om.ArmijoGoldsteinLS(iprint=-1)
+        self.linear_solver = om.DirectSolver()
+
+
+class Outer(om.Group):
+    """
+    a = 2*b - x, solved around the inner group
+    """
+
+    def setup(self):
+        self.add_subsystem('inner', Inner(), promotes=['*'])
+        self.add_subsystem('g', om.ExecComp('a = 2*b - x'), promotes=['*'])
+
+        self.nonlinear_solver = om.NewtonSolver(solve_subsystems=True, iprint=-1, maxiter=20)
+        self.linear_solver = om.DirectSolver()
+
+
+@use_tempdirs
+class SolverTelemetryTestCase(unittest.TestCase):
+
+    def _setup(self):
+        prob = om.Problem()
+        prob.model = Outer()
+        prob.setup()
+        prob.set_val('b', 10.)
+        prob.set_val('x', 1.)
+        prob.final_setup()
+        return prob
+
+    def test_record(self):
+        prob = self._setup()
+
+        with SolverTelemetry(prob.model) as telemetry:
+            prob.run_model()
+
+        self.assertEqual(set(telemetry.data), {'<model>', 'inner'})
+
+        outer = telemetry.data['<model>']
+        self.assertEqual(outer['n_solves'], 1)
+        self.assertEqual(outer['iters'], prob.model.nonlinear_solver._iter_count)
+        run = outer['runs'][0]
+        # initial norm plus one per iteration
+        self.assertEqual(len(run['norms']), run['iters'] + 1)
+        self.assertLess(run['norms'][-1], 1e-10)
+        self.assertFalse(run['maxiter'])
+
+        # the inner newton is called once per outer iteration
+        inner = telemetry.data['inner']
+        self.assertGreater(inner['n_solves'], 1)
+        self.assertEqual(inner['iters'], sum(r['iters'] for r in inner['runs']))
+        self.assertGreaterEqual(outer['time'], inner['time'])
+
+        # the instrumentation is removed, the data is kept
+        self.assertNotIn('solve', prob.model.nonlinear_solver.__dict__)
+        prob.run_model()
+        self.assertEqual(telemetry.data['<model>']['n_solves'], 1)
+
+        telemetry.save_json('telemetry.json')
+        with open('telemetry.json') as f:
+            self.assertEqual(json.load(f)['inner']['iters'], inner['iters'])
+
+        worst = telemetry.summary(n=1, out_stream=None)
+        self.assertEqual(len(worst), 1)
+
+    def test_maxiter(self):
+        prob = self._setup()
+        prob.model.inner.nonlinear_solver.options['maxiter'] = 1
+
+        telemetry = SolverTelemetry(prob.model, history=False)
+        telemetry.attach()
+        prob.run_model()
+        telemetry.detach()
+
+        inner = telemetry.data['inner']
+        self.assertEqual(inner['runs'], [])
+        self.assertEqual(inner['max_iters'], 1)
+        self.assertGreater(inner['n_maxiter'], 0)
+
+    def test_not_setup(self):
+        prob = om.Problem()
+        prob.model = Outer()
+        with self.assertRaises(RuntimeError):
+            SolverTelemetry(prob.model).attach()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -133,9 +133,15 @@ class ChemEq(om.ImplicitComponent):
         # self.deriv_options['type'] = 'fd'
         # self.deriv_options['step_size'] = 1e-5
 
-        self.declare_partials('n', ['n', 'pi', 'P', 'T'])
-        self.declare_partials('pi', ['n', 'composition'])
-        self.declare_partials('n_moles', 'n')
+        # the element/species coupling only exists where a species contains a given element
+        aij_rows, aij_cols = np.nonzero(thermo.aij)
+        self._aij_rows, self._aij_cols = aij_rows, aij_cols
+
+        self.declare_partials('n', ['n', 'P', 'T'])
+        self.declare_partials('n', 'pi', rows=aij_cols, cols=aij_rows)
+        self.declare_partials('pi', 'n', rows=aij_rows, cols=aij_cols, val=thermo.aij[aij_rows, aij_cols])
+        self.declare_partials('pi', 'composition', rows=np.arange(num_element), cols=np.arange(num_element), val=-1.)
+        self.declare_partials('n_moles', 'n', val=1.)
         self.declare_partials('n_moles', 'n_moles', val=-1)
 
     def apply_nonlinear(self, inputs, outputs, resids):
@@ -240,10 +246,7 @@ class ChemEq(om.ImplicitComponent):
         else:
             J_n_T = ((dH0_dT - dS0_dT)).reshape((num_prod, 1))
 
-        J['pi', 'n'] = dRdy[num_prod:end_element, :num_prod]
-        J['pi', 'composition'] = -np.eye(num_element)
-
-        J['n_moles', 'n'] = np.ones((1, num_prod))
+        # derivs of pi and n_moles are constants, specified in setup
 
         if self.remove_trace_species:
             # non-vectorized loop; left here for code clarity
@@ -274,7 +277,7 @@ class ChemEq(om.ImplicitComponent):
         J['n', 'n'] = J_n_n
         J['n', 'P'] = J_n_P
         J['n', 'T'] = J_n_T
-        J['n', 'pi'] = J_n_pi
+        J['n', 'pi'] = J_n_pi[self._aij_cols, self._aij_rows]
 
     def _calc_dRdy(self, inputs, outputs):
         """ Computes the Jacobian for the newton solver. This Jacobian
@@ -44,11 +44,11 @@ class PropsRHS(ExplicitComponent):
         drhsP_dnmoles[-1] = 1.
         # self.declare_partials('rhs_P', 'n_moles',
         #                       val=1, rows=(num_element,), cols=(0,))
-        self.declare_partials('rhs_P', 'n_moles', val=drhsP_dnmoles)
+        self._declare_constant_partials('rhs_P', 'n_moles', drhsP_dnmoles.reshape((-1, 1)))
 
         drhsP_db0 = np.zeros((num_element+1, num_element))
         np.fill_diagonal(drhsP_db0[:num_element, :num_element], 1)
-        self.declare_partials('rhs_P', 'composition', val=drhsP_db0)
+        self._declare_constant_partials('rhs_P', 'composition', drhsP_db0)
 
         # JSG: The for loops are slow, but its ok because we only do them one time
         ne1 = num_element+1
@@ -61,19 +61,30 @@ class PropsRHS(ExplicitComponent):
                     # val.append(thermo.aij_prod[i][j, k])
                     # idx_row.append(3*i+j)
                     # idx_col.append(k)
-        self.declare_partials('lhs_TP', 'n', val=dlhs_dn)
+        self._declare_constant_partials('lhs_TP', 'n', dlhs_dn)
 
         dlhs_db0 = np.zeros((ne1**2, num_element))
         for i in range(num_element):
             for j in range(num_element):
                     dlhs_db0[ne1*num_element+j, j] = 1
                     dlhs_db0[ne1*j+num_element, j] = 1
-        self.declare_partials('lhs_TP', 'composition', val=dlhs_db0)
+        self._declare_constant_partials('lhs_TP', 'composition', dlhs_db0)
 
         self.declare_partials('rhs_T', 'T')
-        self.declare_partials('rhs_T', 'n')
+
+        # the element rows only depend on the species that contain that element, the last row depends on all of them
+        pattern = np.vstack((thermo.aij, np.ones((1, num_prod))))
+        self._drhsT_dn_rows, self._drhsT_dn_cols = np.nonzero(pattern)
+        self.declare_partials('rhs_T', 'n', rows=self._drhsT_dn_rows, cols=self._drhsT_dn_cols)
         # self.approx_partials('*', '*')
 
+    def _declare_constant_partials(self, of, wrt, val):
+        """
+        Declare a constant partial derivative with only its nonzero entries
+        """
+        rows, cols = np.nonzero(val)
+        self.declare_partials(of, wrt, rows=rows, cols=cols, val=val[rows, cols])
+
     def compute(self, inputs, outputs):
 
         thermo = self.thermo
@@ -130,7 +141,7 @@ class PropsRHS(ExplicitComponent):
         self.drhsT_dn[num_element] = H0_T
 
         J['rhs_T', 'T'] = self.drhsT_dT.reshape((-1, 1))
-        J['rhs_T', 'n'] = self.drhsT_dn
+        J['rhs_T', 'n'] = self.drhsT_dn[self._drhsT_dn_rows, self._drhsT_dn_cols]
 
         # derivs of rhsP are constants, specified in setup
 
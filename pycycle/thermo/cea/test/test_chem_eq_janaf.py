@@ -3,9 +3,10 @@ import numpy as np
 
 from openmdao.api import Problem, Group
 
-from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
 
 from pycycle.thermo.cea.chem_eq import ChemEq
+from pycycle.thermo.cea.props_rhs import PropsRHS
 from pycycle.thermo.cea import species_data
 from pycycle import constants
 
@@ -35,6 +36,32 @@ class ChemEqTestCase(unittest.TestCase):
         print(check_val)
         assert_near_equal(p['n'], check_val, tol)
 
+    def test_partials(self):
+        # the sparse partials of ChemEq and PropsRHS against complex step, at converged states with and without
+        # trace species
+        p = self.p
+        p.model.add_subsystem('ceq', ChemEq(thermo=self.thermo), promotes=["*"])
+        p.model.add_subsystem('props_rhs', PropsRHS(thermo=self.thermo), promotes=["*"])
+        p.model.set_input_defaults('T', 1500., units='degK')
+        p.setup(check=False, force_alloc_complex=True)
+
+        for T, P in ((500., 1.034210), (1500., 1.034210), (2500., 20.), (4000., 1.034210)):
+            with self.subTest(T=T, P=P):
+                p.set_val('T', T, units='degK')
+                p.set_val('P', P, units='bar')
+                p.run_model()
+                # n wrt n leaves out the derivative of the trace damping weights (a Newton approximation),
+                # so it is checked with the damping turned off
+                data = p.check_partials(out_stream=None, method='cs')
+                del data['ceq']['n', 'n']
+                assert_check_partials(data, atol=1e-8, rtol=1e-8)
+
+                p.model.ceq.use_trace_damping = False
+                data = p.check_partials(out_stream=None, method='cs', includes=['ceq'])
+                p.model.ceq.use_trace_damping = True
+                # the 1/n terms of the trace species are ~1e10, so only the relative error is tight
+                assert_check_partials({'ceq': {('n', 'n'): data['ceq']['n', 'n']}}, atol=1e-4, rtol=1e-8)
+
 
 if __name__ == "__main__":
 
@@ -4,7 +4,7 @@ import numpy as np
 
 from openmdao.api import Problem, Group
 
-from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.assert_utils import assert_near_equal, assert_check_partials
 
 from pycycle.thermo.cea.props_rhs import PropsRHS
 from pycycle.thermo.cea.props_calcs import PropsCalcs
@@ -33,7 +33,7 @@ class PropsRHSTestCase(unittest.TestCase):
         p.model.set_input_defaults('composition', b)
         p.model.set_input_defaults('n_moles', 0.03292581)
 
-        p.setup(check=False)
+        p.setup(check=False, force_alloc_complex=True)
         p['n_moles'] = 0.03292581
 
     def test_total_rhs(self):
@@ -52,6 +52,19 @@ class PropsRHSTestCase(unittest.TestCase):
         assert_near_equal(p['rhs_P'], goal_rhs_P, tol)
         assert_near_equal(p['lhs_TP'], goal_lhs_TP, tol)
 
+    def test_partials(self):
+        # the sparse partials against complex step, at the CEA states of the PropsCalcs test
+        p = self.prob
+        for T, n, n_moles in ((4000., [0.02040741, 0.0023147, 0.0102037], 0.03292581),
+                              (1500., [8.15344274e-06, 2.27139552e-02, 4.07672137e-06], 0.022726185333)):
+            with self.subTest(T=T):
+                p.set_val('T', T, units='degK')
+                p['n'] = n
+                p['n_moles'] = n_moles
+                p.run_model()
+                data = p.check_partials(out_stream=None, method='cs')
+                assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 class PropsCalcsTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -46,9 +46,8 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['fuel:W'], p['Fl_I:stat:W']*p['fuel:ratio'], tolerance=tol)
         assert_near_equal(p['composition_out'], np.array([0.0003149, 0.00186566, 0.00371394, 0.05251212, 0.01410888]), tolerance=tol)
 
-        # data = p.check_partials(out_stream=None, method='cs')
-        data = p.check_partials(method='fd')
-        assert_check_partials(data, atol=2.e-4, rtol=2.e-4) # can't get very accurate checks with FD
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
 
     def test_mix_2fuel(self):
 
@@ -87,9 +86,8 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['fuel2:W'], p['Fl_I:stat:W']*ratio, tolerance=tol)
         assert_near_equal(p['composition_out'], np.array([0.0003149, 0.00186566, 0.00371394, 0.05251212, 0.01410888]), tolerance=tol)
 
-        data = p.check_partials(out_stream=None, method='fd')
-        # data = p.check_partials(method='cs')
-        assert_check_partials(data, atol=2.e-4, rtol=2.e-4) # can't get very accurate checks with FD
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
 
     def test_mix_1flow(self):
 
@@ -119,6 +117,9 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['composition_out'], np.array([0.00031442, 0.00197246, 0.00392781, 0.05243129, 0.01408717]), tolerance=tol)
         assert_near_equal(p['mass_avg_h'], (62.15*10+4.44635*5)/(62.15+4.44635), tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
+
     def test_mix_2flow(self):
 
         thermo_spec = species_data.janaf
@@ -150,6 +151,36 @@ class ThermoAddTestCase(unittest.TestCase):
         # assert_near_equal(p['composition_out'], np.array([0.0003149, 0.00186566, 0.00371394, 0.05251212, 0.01410888]), tolerance=tol)
         assert_near_equal(p['composition_out'], np.array([0.00031442, 0.00197246, 0.00392781, 0.05243129, 0.01408717]), tolerance=tol)
 
+        p['mix2:h'] = 3.
+        p['mix2:composition'] = [3.1e-04, 1.2e-05, 5.4e-02, 1.4e-02]
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
+
+    def test_mix_0flow(self):
+        # e.g. a turbine without any bleeds
+
+        p = om.Problem()
+
+        p.model.add_subsystem('thermo_add',
+                              ThermoAdd(spec=species_data.janaf,
+                                        inflow_composition=CEA_AIR_FUEL_COMPOSITION, mix_mode='flow',
+                                        mix_composition=[], mix_names=[]),
+                              promotes=['*'])
+
+        p.setup(force_alloc_complex=True)
+
+        p['Fl_I:stat:W'] = 62.15
+        p['Fl_I:tot:composition'] = [0.000313780313538, 0.0021127831122, 0.004208814234964, 0.052325087161902, 0.014058631311261]
+        p['Fl_I:tot:h'] = 10.
+        p.run_model()
+
+        assert_near_equal(p['Wout'], 62.15, tolerance=1e-12)
+        assert_near_equal(p['mass_avg_h'], 10., tolerance=1e-12)
+        assert_near_equal(p['composition_out'], p['Fl_I:tot:composition'], tolerance=1e-12)
+
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
+
     def test_war_vals(self):
         """
         verifies that the ThermoAdd component gives the right answers when adding water to dry air
@@ -183,6 +214,9 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(prob['composition_out'][3], 5.39103820e-02, tol)
         assert_near_equal(prob['composition_out'][4], 1.44901169e-02, tol)
 
+        data = prob.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1.e-10, rtol=1.e-10)
+
 
 if __name__ == "__main__":
 
@@ -139,9 +139,25 @@ class ThermoAdd(om.ExplicitComponent):
             j = self.mixed_elements.index(e)
             self.in_out_flow_idx_map[j,i] = 1.
 
-        self.declare_partials('*', '*', method='cs')
-        # NOTE: Due to some complexity from python vectorization, 
-        # computing partials manually is tricky and will not be much faster than pure CS
+        self.declare_partials('composition_out', 'Fl_I:tot:composition')
+        self.declare_partials('mass_avg_h', ['Fl_I:stat:W', 'Fl_I:tot:h'])
+        if mix_mode == 'reactant': 
+            self.declare_partials('Wout', 'Fl_I:stat:W')
+        else: 
+            self.declare_partials('Wout', 'Fl_I:stat:W', val=1.)
+            self.declare_partials('composition_out', 'Fl_I:stat:W')
+
+        for name in mix_names: 
+            self.declare_partials('mass_avg_h', f'{name}:h')
+            if mix_mode == 'reactant': 
+                # the reactant flow is proportional to the inflow, so the composition doesn't depend on it
+                self.declare_partials('composition_out', f'{name}:ratio')
+                self.declare_partials(f'{name}:W', ['Fl_I:stat:W', f'{name}:ratio'])
+                self.declare_partials(['Wout', 'mass_avg_h'], f'{name}:ratio')
+            else: 
+                self.declare_partials('composition_out', [f'{name}:W', f'{name}:composition'])
+                self.declare_partials('Wout', f'{name}:W', val=1.)
+                self.declare_partials('mass_avg_h', f'{name}:W')
 
     def compute(self, inputs, outputs):
         W = inputs['Fl_I:stat:W']
@@ -190,3 +206,85 @@ class ThermoAdd(om.ExplicitComponent):
         outputs['mass_avg_h'] = mass_avg_h
         outputs['Wout'] = W_out
 
+
+    def compute_partials(self, inputs, J):
+        W = inputs['Fl_I:stat:W']
+        mixed_wt_mole = self.mixed_wt_mole
+        n_out = self.num_mixed_elements
+
+        # mass of each element of the inflow, normalized to 1 kg
+        b0_in = self.in_out_flow_idx_map.dot(inputs['Fl_I:tot:composition']) * mixed_wt_mole
+        sum_b0_in = np.sum(b0_in)
+        b0_in /= sum_b0_in
+        db0_in = (np.eye(n_out) - np.outer(b0_in, np.ones(n_out))) / sum_b0_in * mixed_wt_mole
+        db0_in = db0_in.dot(self.in_out_flow_idx_map)
+
+        # mass flow of each element out, and its derivatives
+        b0_out = b0_in * W
+        d_b0_out = {'Fl_I:tot:composition': W * db0_in}
+        if self.options['mix_mode'] == 'flow': 
+            d_b0_out['Fl_I:stat:W'] = b0_in
+
+        H = inputs['Fl_I:tot:h'] * W
+        W_out = W.copy()
+        dH = {'Fl_I:stat:W': inputs['Fl_I:tot:h'].copy(), 'Fl_I:tot:h': W}
+        dW_out = {'Fl_I:stat:W': 1.}
+
+        if self.options['mix_mode'] == 'reactant': 
+            for name, reactant in zip(self.mix_names, self.mix_composition): 
+                ratio = inputs[f'{name}:ratio']
+                h = inputs[f'{name}:h']
+                fuel_amounts = self.init_fuel_amounts_1kg[reactant]
+                W_mix = W*ratio
+
+                J[f'{name}:W', 'Fl_I:stat:W'] = ratio
+                J[f'{name}:W', f'{name}:ratio'] = W
+
+                # W scales all of b0_out, so it doesn't change the composition
+                b0_out += fuel_amounts*W_mix
+                d_b0_out[f'{name}:ratio'] = fuel_amounts*W
+
+                H += h * W_mix
+                W_out += W_mix
+                dH['Fl_I:stat:W'] += h * ratio
+                dH[f'{name}:ratio'] = h * W
+                dH[f'{name}:h'] = W_mix
+                dW_out['Fl_I:stat:W'] += ratio
+                dW_out[f'{name}:ratio'] = J['Wout', f'{name}:ratio'] = W
+
+        else: # inflow mixing
+            for name in self.mix_names: 
+                W_mix = inputs[f'{name}:W']
+                h = inputs[f'{name}:h']
+                mix_map = self.mix_out_flow_idx_maps[name]
+                mix_wt_mole = self.mix_wt_mole[name]
+                n_mix = mix_wt_mole.size
+
+                mix_stuff = inputs[f'{name}:composition'] * mix_wt_mole
+                sum_mix_stuff = np.sum(mix_stuff)
+                mix_stuff /= sum_mix_stuff
+                dmix_stuff = (np.eye(n_mix) - np.outer(mix_stuff, np.ones(n_mix))) / sum_mix_stuff * mix_wt_mole
+
+                b0_out += mix_map.dot(mix_stuff) * W_mix
+                d_b0_out[f'{name}:W'] = mix_map.dot(mix_stuff)
+                d_b0_out[f'{name}:composition'] = W_mix * mix_map.dot(dmix_stuff)
+
+                H += h * W_mix
+                W_out += W_mix
+                dH[f'{name}:W'] = h
+                dH[f'{name}:h'] = W_mix
+                dW_out[f'{name}:W'] = 1.
+
+        # composition_out = b0_out/sum(b0_out)/mixed_wt_mole
+        sum_b0_out = np.sum(b0_out)
+        dcompo = (np.eye(n_out) - np.outer(b0_out/sum_b0_out, np.ones(n_out)))/sum_b0_out/mixed_wt_mole[:, np.newaxis]
+        for wrt, d in d_b0_out.items(): 
+            J['composition_out', wrt] = dcompo.dot(d.reshape(n_out, -1))
+
+        if self.options['mix_mode'] == 'reactant': 
+            J['Wout', 'Fl_I:stat:W'] = dW_out['Fl_I:stat:W']
+
+        # mass_avg_h = H/W_out
+        mass_avg_h = H/W_out
+        for wrt, d in dH.items(): 
+            J['mass_avg_h', wrt] = (d - mass_avg_h*dW_out.get(wrt, 0.))/W_out
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.optimize import fsolve
 
 import openmdao.api as om
 
@@ -10,52 +9,55 @@ class PsResid(om.ImplicitComponent):
 
     def initialize(self):
         self.options.declare('mode', values=['MN', 'area'])
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
+        nn = self.options['num_nodes']
 
-
-        self.add_input('Ts', val=518., units="degK", desc="Static temp")
-        self.add_input('ht', val=1., units="J/kg", desc="Total enthalpy reference condition")
-        self.add_input('hs', val=1., units="J/kg", desc="Static enthalpy")
+        self.add_input('Ts', val=518., shape=nn, units="degK", desc="Static temp")
+        self.add_input('ht', val=1., shape=nn, units="J/kg", desc="Total enthalpy reference condition")
+        self.add_input('hs', val=1., shape=nn, units="J/kg", desc="Static enthalpy")
         # self.add_input('n_moles', shape=1)
-        self.add_input('R', val=0.0, units='J/kg/degK')
-        self.add_input('gamma', val=1.4)
-        self.add_input('W', val=1., desc="mass flow rate", units="kg/s")
-        self.add_input('rho', val=1., desc="density", units="kg/m**3")
+        self.add_input('R', val=0.0, shape=nn, units='J/kg/degK')
+        self.add_input('gamma', val=1.4, shape=nn)
+        self.add_input('W', val=1., shape=nn, desc="mass flow rate", units="kg/s")
+        self.add_input('rho', val=1., shape=nn, desc="density", units="kg/m**3")
 
         # used for computing initial guess
-        self.add_input('guess:gamt', val=1.4, desc="gamma computed from set total")
-        self.add_input('guess:Pt', val=1.0, units="bar", desc="total pressure")
+        self.add_input('guess:gamt', val=1.4, shape=nn, desc="gamma computed from set total")
+        self.add_input('guess:Pt', val=1.0, shape=nn, units="bar", desc="total pressure")
 
-        self.add_output('Ps', lower=1e-4, upper=5e4, val=.001, units="bar",
+        self.add_output('Ps', val=.001, shape=nn, lower=1e-4, upper=5e4, units="bar",
                         desc="static pressure state variable",
                         ref0=1e-3)
-        self.add_output('V', val=100.0, shape=1, desc="velocity", units="m/s",
+        self.add_output('V', val=100.0, shape=nn, desc="velocity", units="m/s",
                         res_ref=1e3)
-        self.add_output('Vsonic', val=330.0, shape=1, desc="computed speed of sound", units="m/s",
+        self.add_output('Vsonic', val=330.0, shape=nn, desc="computed speed of sound", units="m/s",
                         res_ref=1e3)
 
-        self.declare_partials('Ps', ['ht', 'hs'])
-        self.declare_partials('Vsonic', ['gamma', 'R', 'Ts', 'Vsonic'])
-        self.declare_partials('V', 'V', val=-1.0)
+        # every node is independent, so all the jacobians are diagonal
+        ar = np.arange(nn)
+        self.declare_partials('Ps', ['ht', 'hs'], rows=ar, cols=ar)
+        self.declare_partials('Vsonic', ['gamma', 'R', 'Ts', 'Vsonic'], rows=ar, cols=ar)
+        self.declare_partials('V', 'V', val=-1.0, rows=ar, cols=ar)
 
         mode = self.options['mode']
         if mode == "MN":
-            self.add_input('MN', val=.5, desc="target mach number")
-            self.add_output('area', shape=1, desc="flow area", units="m**2", lower=1e-5)
+            self.add_input('MN', val=.5, shape=nn, desc="target mach number")
+            self.add_output('area', shape=nn, desc="flow area", units="m**2", lower=1e-5)
 
-            self.declare_partials('area', ['area', 'W', 'rho', 'gamma', 'R', 'Ts', 'MN'])
-            self.declare_partials('Ps', ['MN', 'R', 'gamma', 'Ts'])
-            self.declare_partials('V', ['MN', 'R', 'gamma', 'Ts'])
+            self.declare_partials('area', ['area', 'W', 'rho', 'gamma', 'R', 'Ts', 'MN'], rows=ar, cols=ar)
+            self.declare_partials('Ps', ['MN', 'R', 'gamma', 'Ts'], rows=ar, cols=ar)
+            self.declare_partials('V', ['MN', 'R', 'gamma', 'Ts'], rows=ar, cols=ar)
 
         elif mode == "area":
-            self.add_output('MN', val=.5, desc="target mach number", lower=1e-3)
-            self.add_input('guess:MN', val=0.5, desc="Guess for Mach number.")
-            self.add_input('area', val=np.inf, desc="flow area", units="m**2")
+            self.add_output('MN', val=.5, shape=nn, desc="target mach number", lower=1e-3)
+            self.add_input('guess:MN', val=0.5, shape=nn, desc="Guess for Mach number.")
+            self.add_input('area', val=np.inf, shape=nn, desc="flow area", units="m**2")
 
-            self.declare_partials('MN', ['MN', 'area', 'Ts', 'R', 'W', 'gamma', 'rho'])
-            self.declare_partials('Ps', ['area', 'Ts', 'R', 'W', 'gamma', 'rho'])
-            self.declare_partials('V', ['area', 'Ts', 'R', 'W', 'gamma', 'rho'])
+            self.declare_partials('MN', ['MN', 'area', 'Ts', 'R', 'W', 'gamma', 'rho'], rows=ar, cols=ar)
+            self.declare_partials('Ps', ['area', 'Ts', 'R', 'W', 'gamma', 'rho'], rows=ar, cols=ar)
+            self.declare_partials('V', ['area', 'Ts', 'R', 'W', 'gamma', 'rho'], rows=ar, cols=ar)
 
         else:
             raise ValueError('mode must be either "MN" or "area", but "%s" was given' % mode)
@@ -81,27 +83,22 @@ class PsResid(om.ImplicitComponent):
         gamt = inputs['guess:gamt']
         if self.options['mode'] == "MN":
             ps_guess = inputs['guess:Pt'] * (1 + (gamt-1)/2 * inputs['MN']**2)**(-gamt/(gamt-1))
-            if np.abs(ps_guess - self._ps_guess_cache) > 1e-10:
-                if self._ps_guess_cache == -1:
-                    outputs['Ps'] = ps_guess
-                    self._ps_guess_cache = ps_guess
+            # only the first guess is applied
+            new_guess = np.abs(ps_guess - self._ps_guess_cache) > 1e-10
+            new_guess &= self._ps_guess_cache == -1
+            if np.any(new_guess): 
+                outputs['Ps'] = np.where(new_guess, ps_guess, outputs['Ps'])
+                self._ps_guess_cache = np.where(new_guess, ps_guess, self._ps_guess_cache)
 
         else:
-
-            def equations(params):
-                ps, MN = params
-                f1 = ps - inputs['guess:Pt'] * (1 + (gamt-1)/2 * M_guess**2)**(-gamt/(gamt-1))
-                f2 = MN - inputs['W']*(R_UNIVERSAL_SI*inputs['Ts'])**0.5/(ps_guess*1.0e6*inputs['area']*gamt**0.5)
-                return (f1[0], f2[0])
-
             M_guess = inputs['guess:MN']
             ps_guess = inputs['guess:Pt'] * (1 + (gamt-1)/2 * M_guess**2)**(-gamt/(gamt-1))
-            ps_guess, M_guess = fsolve(equations, (ps_guess, M_guess))
 
             # print('foobar', self.pathname, np.abs(ps_guess - self._ps_guess_cache), inputs['W'], inputs['area'], inputs['Ts'])
-            if np.abs(ps_guess - self._ps_guess_cache) > 1e-10:
-                outputs['Ps'] = ps_guess
-                self._ps_guess_cache = ps_guess
+            new_guess = np.abs(ps_guess - self._ps_guess_cache) > 1e-10
+            if np.any(new_guess): 
+                outputs['Ps'] = np.where(new_guess, ps_guess, outputs['Ps'])
+                self._ps_guess_cache = np.where(new_guess, ps_guess, self._ps_guess_cache)
 
     def _compute_outputs_MN(self, i):
 
@@ -115,10 +112,8 @@ class PsResid(om.ImplicitComponent):
             np.seterr(**old)
 
         MN = i['MN']
-        if MN < 1e-16:
-            area = np.inf
-        else:
-            area = i['W']/(i['rho']*Vsonic*MN)
+        no_flow = MN < 1e-16
+        area = np.where(no_flow, np.inf, i['W']/(i['rho']*Vsonic*np.where(no_flow, 1., MN)))
 
         V = MN*Vsonic
         return Vsonic, V, area
@@ -127,20 +122,16 @@ class PsResid(om.ImplicitComponent):
         # print('foo', i['gamma'], i['R'], i['Ts'])
         Vsonic = (i['gamma']*i['R']*i['Ts'])**0.5
         area = i['area']
-        if area == np.inf:
-            MN = 0.
-        else:
-            #MN = i['W']/(i['rho']*Vsonic*i['area'])
-            #print("MN_calc", self.pathname, i['W'], i['rho'], Vsonic, i['area'])
+        no_area = area == np.inf
 
-            old = np.seterr(all='raise')
-            try:
-                MN = i['W']/(i['rho']*Vsonic*i['area'])
-            except:
-                print("MN_calc", self.pathname, i['W'], i['rho'], Vsonic, i['area'])
-                MN = 5.
-            finally:
-                np.seterr(**old)
+        #MN = i['W']/(i['rho']*Vsonic*i['area'])
+        #print("MN_calc", self.pathname, i['W'], i['rho'], Vsonic, i['area'])
+        with np.errstate(all='ignore'): 
+            MN = i['W']/(i['rho']*Vsonic*area)
+        bad = ~np.isfinite(MN) & ~no_area
+        if np.any(bad): 
+            print("MN_calc", self.pathname, i['W'], i['rho'], Vsonic, i['area'])
+        MN = np.where(no_area, 0., np.where(bad, 5., MN))
 
         V = MN*Vsonic
 
@@ -165,10 +156,7 @@ class PsResid(om.ImplicitComponent):
         # explicit vars
         if self.options['mode'] == "MN":
             Vsonic, V, area = self._compute_outputs_MN(inputs)
-            if area != np.inf:
-                resids['area'] = area - outputs['area']
-            else:
-                resids['area'] = 0.
+            resids['area'] = np.where(area == np.inf, 0., area - outputs['area'])
             MN = inputs['MN']
         else:
             MN, Vsonic, V = self._compute_outputs_area(inputs)
@@ -225,8 +213,8 @@ class PsResid(om.ImplicitComponent):
         # Derivatives of outputs
         part = .5*(gamma*R*Ts)**-.5
         J['Vsonic', 'gamma'] = dVs_dgamma = part*R*Ts
-        J['Vsonic', 'R'] = part*gamma*Ts
-        J['Vsonic', 'Ts'] = part*gamma*R
+        J['Vsonic', 'R'] = dVs_dR = part*gamma*Ts
+        J['Vsonic', 'Ts'] = dVs_dTs = part*gamma*R
         J['Vsonic', 'Vsonic'] = -1.
         # J['V', 'V'] = -1.
 
@@ -242,20 +230,22 @@ class PsResid(om.ImplicitComponent):
             J['Ps', 'gamma'] = RT_q_MW*MN_squared_q2/ht
             J['Ps', 'Ts'] = MN_squared_q2*gamma*R/ht
 
-            if MN >= 1e-16:
-                J['area', 'W'] = 1.0/(rho*Vsonic*MN)
-                J['area', 'rho'] = -W/(Vsonic*MN*rho**2)
-
-                part = -W/(rho*Vsonic**2*MN) * 0.5*(R*gamma*Ts)**-.5
-                J['area', 'gamma'] = part*R*Ts
-                J['area', 'R'] = part*gamma*Ts
-                J['area', 'Ts'] = part*gamma*R
-                J['area', 'MN'] = -W/rho/Vsonic/MN**2
-
-                J['V', 'MN'] = Vsonic
-                J['V', 'Ts'] = MN * J['Vsonic', 'Ts']
-                J['V', 'R'] = MN * J['Vsonic', 'R']
-                J['V', 'gamma'] = MN * J['Vsonic', 'gamma']
+            # the area is infinite (and not a function of anything) when there is no flow
+            flow = MN >= 1e-16
+            MN_safe = np.where(flow, MN, 1.)
+            J['area', 'W'] = np.where(flow, 1.0/(rho*Vsonic*MN_safe), 0.)
+            J['area', 'rho'] = np.where(flow, -W/(Vsonic*MN_safe*rho**2), 0.)
+
+            part = np.where(flow, -W/(rho*Vsonic**2*MN_safe) * 0.5*(R*gamma*Ts)**-.5, 0.)
+            J['area', 'gamma'] = part*R*Ts
+            J['area', 'R'] = part*gamma*Ts
+            J['area', 'Ts'] = part*gamma*R
+            J['area', 'MN'] = np.where(flow, -W/rho/Vsonic/MN_safe**2, 0.)
+
+            J['V', 'MN'] = Vsonic
+            J['V', 'Ts'] = MN * dVs_dTs
+            J['V', 'R'] = MN * dVs_dR
+            J['V', 'gamma'] = MN * dVs_dgamma
 
         else:
             MN, Vsonic, V = self._compute_outputs_area(inputs)
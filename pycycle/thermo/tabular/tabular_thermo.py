@@ -1,7 +1,9 @@
 import numpy as np
 import openmdao.api as om
+from openmdao.components.interp_util.interp import InterpND
 
 from pycycle.constants import TAB_AIR_FUEL_COMPOSITION, AIR_JETA_TAB_SPEC
+from pycycle.flow_in import TOT_VARS, STAT_VARS
 
 
 class SetTotalTP(om.Group):
@@ -10,25 +12,31 @@ class SetTotalTP(om.Group):
         self.options.declare('interp_method', default='slinear')
         self.options.declare('spec', recordable=False)
         self.options.declare('composition')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup(self):
         interp_method = self.options['interp_method']
         spec = self.options['spec']
         composition = self.options['composition']
+        nn = self.options['num_nodes']
 
         if composition is None:
             composition = TAB_AIR_FUEL_COMPOSITION
 
         sorted_compo = sorted(composition.keys())
 
-        interp = om.MetaModelStructuredComp(method=interp_method, extrapolate=True)
+        interp = om.MetaModelStructuredComp(method=interp_method, extrapolate=True, vec_size=nn)
         self.add_subsystem('tab', interp, promotes_inputs=['P', 'T'],
                                           promotes_outputs=['h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R'])
 
+        # with more than one node, the composition is a (num_nodes, n_species) array
         for i, param in enumerate(sorted_compo):
             interp.add_input(param, composition[param], training_data=spec[param])
-            self.promotes('tab', inputs=[(param, 'composition')], src_indices=[i,])
-        self.set_input_defaults('composition', src_shape=len(composition))
+            if nn == 1: 
+                self.promotes('tab', inputs=[(param, 'composition')], src_indices=[i,])
+            else: 
+                self.promotes('tab', inputs=[(param, 'composition')], src_indices=om.slicer[:, i])
+        self.set_input_defaults('composition', src_shape=len(composition) if nn == 1 else (nn, len(composition)))
 
         interp.add_input('P', 101325.0, units='Pa', training_data=spec['P'])
         interp.add_input('T', 273.0, units='degK', training_data=spec['T'])
@@ -48,3 +56,144 @@ class SetTotalTP(om.Group):
         # use a sorted list of keys, so dictionary hash ordering doesn't bite us
         # loop over keys and create a vector of mass fractions
         self.composition = [composition[k] for k in sorted_compo]
+        if nn > 1: 
+            self.composition = np.tile(self.composition, (nn, 1))
+
+
+# units of the flow station variables computed from the tables
+TABULAR_UNITS = {'h': 'J/kg', 'T': 'degK', 'P': 'Pa', 'rho': 'kg/m**3', 'gamma': None, 'Cp': 'J/kg/degK',
+                 'Cv': 'J/kg/degK', 'S': 'J/kg/degK', 'R': 'J/kg/degK', 'V': 'm/s', 'Vsonic': 'm/s', 'MN': None,
+                 'area': 'm**2', 'Wc': 'kg/s', 'W': 'kg/s'}
+
+
+def tabular_flow_vars(stat, names):
+    """
+    Flow station variables of the components that evaluate the tables directly: a dict that maps each
+    of `names` to (units of the value computed from the table, output units, description).
+
+    stat: bool
+        if True, the static variables (STAT_VARS of the flow station), otherwise the total ones (TOT_VARS)
+    names: iterable of str
+        names of the variables, in the order of the outputs
+    """
+    meta = {name: (TABULAR_UNITS[name], units, desc) for name, _, units, desc in (STAT_VARS if stat else TOT_VARS)}
+    return {name: meta[name] for name in names}
+
+
+def lin_derivs(*terms):
+    """
+    Derivatives of sum(coef * x) over the (coef, derivatives of x) terms. Derivatives are dicts that map
+    a variable name to its per node values, (n_species, num_nodes) for the composition.
+    """
+    derivs = {}
+    for coef, d in terms:
+        for name, val in d.items():
+            derivs[name] = derivs.get(name, 0.) + coef * val
+    return derivs
+
+
+class TabularProps(object):
+    """
+    Evaluates the tabular thermo properties, and their derivatives, directly from the table.
+
+    This is for components that converge their own flow states instead of using SetTotalTP groups
+    with Newton solvers. Everything is in the units of the table: T in degK, P in Pa, h in J/kg,
+    S, Cp, Cv and R in J/kg/degK and rho in kg/m**3.
+    """
+
+    names = ('h', 'S', 'gamma', 'Cp', 'Cv', 'rho', 'R')
+
+    def __init__(self, spec, composition=None, interp_method='slinear'):
+        if composition is None:
+            composition = TAB_AIR_FUEL_COMPOSITION
+
+        self.species = sorted(composition.keys())
+        self.T_bounds = (spec['T'][0], spec['T'][-1])
+
+        if len(self.species) == 1 and interp_method == 'slinear':
+            interp_method = '3D-slinear'
+
+        self._spec = spec
+        self._method = interp_method
+        self._points = [spec[name] for name in self.species] + [spec['P'], spec['T']]
+        self._interps = {}
+
+    def __call__(self, T, P, composition, names=None):
+        """
+        Properties at the (num_nodes,) temperatures and pressures.
+
+        Parameters
+        ----------
+        composition : ndarray
+            (n_species,) or (num_nodes, n_species) mass fractions, in the order of the sorted species.
+        names : iterable of str or None
+            Properties to evaluate (default: all of them).
+
+        Returns
+        -------
+        dict
+            (value, d_dT, d_dP, d_dcomposition) for each property. d_dcomposition is (num_nodes, n_species).
+        """
+        nn = T.size
+        ns = len(self.species)
+        x = np.empty((nn, ns + 2), dtype=np.result_type(T, P, composition))
+        x[:, :ns] = np.reshape(composition, (-1, ns))
+        x[:, ns] = P
+        x[:, ns + 1] = T
+
+        props = {}
+        for name in self.names if names is None else names:
+            # the fixed dimension tables cache their coefficients differently for a single point,
+            # so single and multiple point evaluations can't share an interpolant
+            key = (name, nn > 1)
+            if key not in self._interps:
+                self._interps[key] = InterpND(method=self._method, points=self._points,
+                                              values=self._spec[name], extrapolate=True)
+            val, deriv = self._interps[key].interpolate(x, compute_derivative=True)
+            props[name] = (val, deriv[:, ns + 1], deriv[:, ns], deriv[:, :ns])
+        return props
+
+    def solve_T(self, name, target, T, P, composition, scale=1., tol=1e-10, maxiter=50):
+        """
+        Temperatures at which the property `name` matches `target`, found by a vectorized Newton
+        from the initial temperatures T. The iterations stop when all the residuals, multiplied
+        by `scale`, are below `tol`. Temperatures are kept inside the table. Raises an AnalysisError
+        if they are not converged in `maxiter` iterations.
+        """
+        T_min, T_max = self.T_bounds
+        T = np.clip(T, T_min, T_max)
+        for i in range(maxiter):
+            val, d_dT = self(T, P, composition, names=(name,))[name][:2]
+            resid = val - target
+            if np.all(np.abs(scale * resid) < tol):
+                break
+            T = np.clip(T - resid / d_dT, T_min, T_max)
+        else:
+            raise om.AnalysisError(f'Tabular thermo failed to find the temperature for {name}={target} '
+                                   f'in {maxiter} iterations, T={T}.')
+        return T
+
+    def solve_TP(self, names, targets, T, P, composition, scales=(1., 1.), tol=1e-10, maxiter=50):
+        """
+        Temperatures and pressures at which the two properties `names` match `targets` (e.g. the total
+        state with a given enthalpy and entropy), found by a vectorized Newton from T and P. The iterations
+        stop when all the residuals, multiplied by `scales`, are below `tol`. Raises an AnalysisError
+        if they are not converged in `maxiter` iterations.
+        """
+        T_min, T_max = self.T_bounds
+        T = np.clip(T, T_min, T_max)
+        for i in range(maxiter):
+            props = self(T, P, composition, names=names)
+            (r1, a, b, _), (r2, c, d, _) = (props[name] for name in names)
+            r1 = r1 - targets[0]
+            r2 = r2 - targets[1]
+            if np.all(np.abs(scales[0] * r1) < tol) and np.all(np.abs(scales[1] * r2) < tol):
+                break
+            det = a * d - b * c
+            T = np.clip(T - (r1 * d - b * r2) / det, T_min, T_max)
+            P = np.maximum(P - (a * r2 - c * r1) / det, 0.1 * P)
+        else:
+            raise om.AnalysisError(f'Tabular thermo failed to find the temperature and pressure for '
+                                   f'{names[0]}={targets[0]} and {names[1]}={targets[1]} in {maxiter} iterations, '
+                                   f'T={T}, P={P}.')
+        return T, P
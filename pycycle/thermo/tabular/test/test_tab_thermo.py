@@ -6,7 +6,7 @@ import openmdao.api as om
 from openmdao.utils.assert_utils import assert_near_equal
 
 from pycycle.constants import AIR_JETA_TAB_SPEC, TAB_AIR_FUEL_COMPOSITION
-from pycycle.thermo.tabular.tabular_thermo import SetTotalTP
+from pycycle.thermo.tabular.tabular_thermo import SetTotalTP, TabularProps
 
 class TabThermoUnitTest(unittest.TestCase): 
 
@@ -34,6 +34,34 @@ class TabThermoUnitTest(unittest.TestCase):
         assert_near_equal(p.get_val('R'),  286.9948147750743, tolerance=TOL)
 
 
+class TabularPropsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.props = TabularProps(AIR_JETA_TAB_SPEC)
+        self.composition = np.array([0.04])
+        props = self.props(np.array([1000.]), np.array([101325*3.]), self.composition, names=('h', 'S'))
+        self.h = props['h'][0]
+        self.S = props['S'][0]
+
+    def test_solve_T(self):
+        T = self.props.solve_T('h', self.h, np.array([500.]), np.array([101325*3.]), self.composition, 1e-6)
+        assert_near_equal(T, [1000.], 1e-8)
+
+        with self.assertRaises(om.AnalysisError):
+            self.props.solve_T('h', self.h, np.array([500.]), np.array([101325*3.]), self.composition, 1e-6,
+                               maxiter=1)
+
+    def test_solve_TP(self):
+        T, P = self.props.solve_TP(('h', 'S'), (self.h, self.S), np.array([800.]), np.array([2e5]),
+                                   self.composition, (1e-6, 1e-3))
+        assert_near_equal(T, [1000.], 1e-8)
+        assert_near_equal(P, [101325*3.], 1e-8)
+
+        with self.assertRaises(om.AnalysisError):
+            self.props.solve_TP(('h', 'S'), (self.h, self.S), np.array([800.]), np.array([2e5]),
+                                self.composition, (1e-6, 1e-3), maxiter=1)
+
+
 if __name__ == "__main__": 
 
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -43,6 +43,10 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['fuel:W'], W_fuel_mix, tolerance=tol)
         assert_near_equal(p['composition_out'], (W_fuel_in+W_fuel_mix)/W_air_in, tolerance=tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
+
     def test_mix_2fuel(self):
 
         p = om.Problem()
@@ -76,6 +80,9 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['fuel1:W'], p['Fl_I:stat:W']*ratio, tolerance=tol)
         assert_near_equal(p['fuel1:W'], p['Fl_I:stat:W']*ratio, tolerance=tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 
     def test_mix_1flow(self):
 
@@ -114,6 +121,9 @@ class ThermoAddTestCase(unittest.TestCase):
         mass_avg_h = (1+2*10)/3.0
         assert_near_equal(p['mass_avg_h'], mass_avg_h, tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 
     def test_mix_2flow(self):
 
@@ -160,6 +170,9 @@ class ThermoAddTestCase(unittest.TestCase):
         mass_avg_h = (10*2.+1*10.+2*20.)/13
         assert_near_equal(p['mass_avg_h'], mass_avg_h, tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 
     def test_mix_1flow2compo(self):
 
@@ -187,6 +200,9 @@ class ThermoAddTestCase(unittest.TestCase):
 
         assert_near_equal(p['mass_avg_h'], 2., tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 
     def test_mix_1fuel2compo(self):
 
@@ -223,6 +239,9 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['composition_out'][0], (W_fuel_in+W_fuel_mix)/W_air_in, tolerance=tol)
         assert_near_equal(p['composition_out'][1], 0, tolerance=tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
 
     def test_mix_1water2compo(self):
 
@@ -241,7 +260,6 @@ class ThermoAddTestCase(unittest.TestCase):
         p['water1:ratio'] = .01
         p['water1:h'] = 2.
 
-        p.setup(force_alloc_complex=True)
         p.run_model()
 
         W_air_in = p['Fl_I:stat:W']/(1+np.sum(p['Fl_I:tot:composition']))
@@ -261,6 +279,41 @@ class ThermoAddTestCase(unittest.TestCase):
         assert_near_equal(p['composition_out'][0], W_fuel_in/W_air_in, tolerance=tol)
         assert_near_equal(p['composition_out'][1], (W_water_in+W_water_mix)/W_air_in, tolerance=tol)
 
+        data = p.check_partials(out_stream=None, method='cs')
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
+
+    def test_num_nodes(self):
+
+        for mix_mode in ('reactant', 'flow'):
+            p = om.Problem()
+            p.model.add_subsystem('thermo_add',
+                                  ThermoAdd(mix_mode=mix_mode, inflow_composition={'FAR':0., 'WAR':0.}, 
+                                            mix_composition='WAR', mix_names=['mix1', 'mix2'], num_nodes=3),
+                                  promotes=['*'])
+
+            p.setup(force_alloc_complex=True)
+
+            p['Fl_I:stat:W'] = [1., 2., 3.]
+            p['Fl_I:tot:composition'] = [[.01, .02], [.03, 0.], [0., .01]]
+            p['Fl_I:tot:h'] = [2., 3., 4.]
+            p['mix1:h'] = [5., 6., 7.]
+            p['mix2:h'] = [-1., -2., -3.]
+            if mix_mode == 'reactant': 
+                p['mix1:ratio'] = [.01, .02, .03]
+                p['mix2:ratio'] = [.03, .02, .01]
+            else: 
+                p['mix1:W'] = [.5, .6, .7]
+                p['mix2:W'] = [.1, .2, .3]
+                p['mix1:composition'] = [[.02, .01], [0., .03], [.01, 0.]]
+                p['mix2:composition'] = [[.0, .03], [.01, .01], [.02, 0.]]
+
+            p.run_model()
+
+            data = p.check_partials(out_stream=None, method='cs')
+            assert_check_partials(data, atol=1e-10, rtol=1e-10)
+
+
 if __name__ == "__main__":
 
     unittest.main()
@@ -26,6 +26,7 @@ class ThermoAdd(om.ExplicitComponent):
                              desc='name of the mixing reactant; must match one of the keys from the inflow composition dictionary', 
                              types=(dict, str, list, tuple), allow_none=True)
         self.options.declare('mix_names', default='mix', types=(str, list, tuple))
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def output_port_data(self):
 
@@ -57,47 +58,85 @@ class ThermoAdd(om.ExplicitComponent):
         if inflow_composition is None: 
             inflow_composition = TAB_AIR_FUEL_COMPOSITION
 
+        nn = self.options['num_nodes']
         inflow_composition_vec = list(inflow_composition.values())
+        if nn > 1: 
+            # one composition per node
+            inflow_composition_vec = np.tile(inflow_composition_vec, (nn, 1))
 
         self.output_port_data()
 
         # inputs
-        self.add_input('Fl_I:stat:W', val=0.0, desc='weight flow', units='lbm/s')
-        self.add_input('Fl_I:tot:h', val=0.0, desc='total enthalpy', units='Btu/lbm')
+        self.add_input('Fl_I:stat:W', val=0.0, shape=nn, desc='weight flow', units='lbm/s')
+        self.add_input('Fl_I:tot:h', val=0.0, shape=nn, desc='total enthalpy', units='Btu/lbm')
         self.add_input('Fl_I:tot:composition', val=inflow_composition_vec, 
                        desc='incoming flow composition')
         
         for name in mix_names: 
-            self.add_input(f'{name}:h', val=0.0, units='Btu/lbm', desc="reactant enthalpy")
+            self.add_input(f'{name}:h', val=0.0, shape=nn, units='Btu/lbm', desc="reactant enthalpy")
 
             if mix_mode == 'reactant': 
-                self.add_input(f'{name}:ratio', val=0.0, desc='reactant to air mass ratio')
-                self.add_output(f'{name}:W', shape=1, units="lbm/s", desc="mix input massflow")
+                self.add_input(f'{name}:ratio', val=0.0, shape=nn, desc='reactant to air mass ratio')
+                self.add_output(f'{name}:W', shape=nn, units="lbm/s", desc="mix input massflow")
 
             else: 
                 self.add_input(f'{name}:composition', val=inflow_composition_vec, desc='mix flow composition' )
-                self.add_input(f'{name}:W', shape=1, units="lbm/s", desc="mix input massflow")
+                self.add_input(f'{name}:W', shape=nn, units="lbm/s", desc="mix input massflow")
 
         # outputs
-        self.add_output('mass_avg_h', shape=1, units='Btu/lbm',
+        self.add_output('mass_avg_h', shape=nn, units='Btu/lbm',
                         desc="mass flow rate averaged specific enthalpy")
-        self.add_output('Wout', shape=1, units="lbm/s", desc="total massflow out")
+        self.add_output('Wout', shape=nn, units="lbm/s", desc="total massflow out")
         self.add_output('composition_out', val=inflow_composition_vec)
 
 
-        self.declare_partials('*', '*', method='cs')
+        # the nodes are independent, so every partial is block diagonal over the nodes
+        nc = len(inflow_composition)
+        ar = np.arange(nn)
+        # (node, species) wrt (node), (node) wrt (node, species) and (node, species) wrt (node, species)
+        compo_rows = np.arange(nn*nc)
+        compo_node = np.repeat(ar, nc)
+        block_rows = np.repeat(compo_rows, nc)
+        block_cols = np.tile(np.arange(nc), nn*nc) + np.repeat(ar, nc*nc)*nc
+
+        self.declare_partials('mass_avg_h', ['Fl_I:stat:W', 'Fl_I:tot:h'], rows=ar, cols=ar)
+
+        if mix_mode == 'reactant': 
+            # composition_out = composition + sum(ratio) of the reactant, independent of the flows
+            self.declare_partials('composition_out', 'Fl_I:tot:composition', rows=compo_rows, cols=compo_rows, val=1.)
+            self.declare_partials('Wout', 'Fl_I:stat:W', rows=ar, cols=ar)
+            self.declare_partials(['Wout', 'mass_avg_h'], 'Fl_I:tot:composition', rows=compo_node, cols=compo_rows)
+        else: 
+            self.declare_partials('composition_out', 'Fl_I:stat:W', rows=compo_rows, cols=compo_node)
+            self.declare_partials('composition_out', 'Fl_I:tot:composition', rows=block_rows, cols=block_cols)
+            self.declare_partials('Wout', 'Fl_I:stat:W', rows=ar, cols=ar, val=1.)
+
+        for name in mix_names: 
+            self.declare_partials('mass_avg_h', f'{name}:h', rows=ar, cols=ar)
+
+            if mix_mode == 'reactant': 
+                self.declare_partials('composition_out', f'{name}:ratio', rows=ar*nc + self.idx_compo, cols=ar, val=1.)
+                self.declare_partials(f'{name}:W', ['Fl_I:stat:W', f'{name}:ratio'], rows=ar, cols=ar)
+                self.declare_partials(f'{name}:W', 'Fl_I:tot:composition', rows=compo_node, cols=compo_rows)
+                self.declare_partials(['Wout', 'mass_avg_h'], f'{name}:ratio', rows=ar, cols=ar)
+            else: 
+                self.declare_partials('composition_out', f'{name}:W', rows=compo_rows, cols=compo_node)
+                self.declare_partials('composition_out', f'{name}:composition', rows=block_rows, cols=block_cols)
+                self.declare_partials('Wout', f'{name}:W', rows=ar, cols=ar, val=1.)
+                self.declare_partials('mass_avg_h', f'{name}:W', rows=ar, cols=ar)
 
     def compute(self, inputs, outputs): 
 
         mix_mode = self.options['mix_mode']
+        nn = self.options['num_nodes']
 
-        compo_in = inputs['Fl_I:tot:composition']
-        n_compo = len(compo_in)
-
+        # work with (num_nodes, n_compo) compositions and (num_nodes, 1) flows, so the nodes broadcast
+        compo_shape = inputs['Fl_I:tot:composition'].shape
+        compo_in = inputs['Fl_I:tot:composition'].reshape(nn, -1)
 
-        W_in = inputs['Fl_I:stat:W']
+        W_in = inputs['Fl_I:stat:W'][:, np.newaxis]
         # composition vector is always given as vector of <something>-to-air ratios
-        W_air_in = W_in/(1+np.sum(compo_in))
+        W_air_in = W_in/(1+np.sum(compo_in, axis=1, keepdims=True))
         W_other_in = W_air_in * compo_in
 
         W_out = 0 
@@ -108,41 +147,130 @@ class ThermoAdd(om.ExplicitComponent):
 
         W_air_out = W_air_in
 
-        W_times_h = W_in*inputs['Fl_I:tot:h']
+        W_times_h = W_in*inputs['Fl_I:tot:h'][:, np.newaxis]
 
         if mix_mode == "reactant": 
 
+            compo_out = compo_in.copy()
             for mix_name in self.mix_names:  
-                ratio = inputs[f'{mix_name}:ratio'] # scalar for reactant mode
+                ratio = inputs[f'{mix_name}:ratio'][:, np.newaxis] # one per node for reactant mode
 
                 W_air_mix = W_air_in # for reactant mode, we reference from the incoming air
                 W_other_mix = W_air_mix * ratio 
-                outputs[f'{mix_name}:W'] = W_other_mix
-                W_other_out[self.idx_compo] += W_other_mix
-                W_out += W_other_mix
-                W_times_h += W_other_mix*inputs[f'{mix_name}:h']
+                outputs[f'{mix_name}:W'] = W_other_mix[:, 0]
+                W_out = W_out + W_other_mix
+                W_times_h = W_times_h + W_other_mix*inputs[f'{mix_name}:h'][:, np.newaxis]
+
+                # the composition is relative to the air flow, which the reactant doesn't change
+                compo_out[:, self.idx_compo] += ratio[:, 0]
 
-            outputs['composition_out'] = W_other_out/W_air_in
-            outputs['Wout'] = W_out
-            outputs['mass_avg_h'] = W_times_h/W_out
+            outputs['composition_out'] = compo_out.reshape(compo_shape)
+            outputs['Wout'] = W_out[:, 0]
+            outputs['mass_avg_h'] = (W_times_h/W_out)[:, 0]
 
         else: 
 
             for mix_name in self.mix_names: 
-                compo_mix = inputs[f'{mix_name}:composition'] # potentially a vector
+                compo_mix = inputs[f'{mix_name}:composition'].reshape(nn, -1) # potentially a vector
 
-                W_mix = inputs[f'{mix_name}:W']
-                W_air_mix = W_mix/(1+np.sum(compo_mix))
+                W_mix = inputs[f'{mix_name}:W'][:, np.newaxis]
+                W_air_mix = W_mix/(1+np.sum(compo_mix, axis=1, keepdims=True))
                 W_other_out += W_air_mix*compo_mix
-                W_out += W_mix
-                W_air_out += W_air_mix
-                W_times_h += W_mix*inputs[f'{mix_name}:h']
+                W_out = W_out + W_mix
+                W_air_out = W_air_out + W_air_mix
+                W_times_h = W_times_h + W_mix*inputs[f'{mix_name}:h'][:, np.newaxis]
+
 
+            outputs['composition_out'] = (W_other_out/W_air_out).reshape(compo_shape)
+            outputs['Wout'] = W_out[:, 0]
+            outputs['mass_avg_h'] = (W_times_h/W_out)[:, 0]
 
-            outputs['composition_out'] = W_other_out/W_air_out
-            outputs['Wout'] = W_out
-            outputs['mass_avg_h'] = W_times_h/W_out
+    def compute_partials(self, inputs, J): 
 
+        mix_mode = self.options['mix_mode']
+        nn = self.options['num_nodes']
 
+        compo_in = inputs['Fl_I:tot:composition'].reshape(nn, -1)
+        nc = compo_in.shape[1]
 
-        
+        W_in = inputs['Fl_I:stat:W']
+        h_in = inputs['Fl_I:tot:h']
+        S_in = 1+np.sum(compo_in, axis=1)
+        W_air_in = W_in/S_in
+
+        if mix_mode == "reactant": 
+            # W_air_in derivatives with respect to W_in and to each species of the composition
+            dW_air_dW = 1/S_in
+            dW_air_dcompo = -W_air_in/S_in
+
+            W_out = W_in.copy()
+            W_times_h = W_in*h_in
+            dW_out_dW = np.ones(nn)
+            dW_out_dcompo = np.zeros(nn)
+            dWh_dW = h_in.copy()
+            dWh_dcompo = np.zeros(nn)
+
+            for mix_name in self.mix_names: 
+                ratio = inputs[f'{mix_name}:ratio']
+                h_mix = inputs[f'{mix_name}:h']
+                W_mix = W_air_in*ratio
+
+                J[f'{mix_name}:W', 'Fl_I:stat:W'] = dW_air_dW*ratio
+                J[f'{mix_name}:W', f'{mix_name}:ratio'] = W_air_in
+                J[f'{mix_name}:W', 'Fl_I:tot:composition'] = np.repeat(dW_air_dcompo*ratio, nc)
+
+                W_out = W_out + W_mix
+                W_times_h = W_times_h + W_mix*h_mix
+                dW_out_dW = dW_out_dW + dW_air_dW*ratio
+                dW_out_dcompo = dW_out_dcompo + dW_air_dcompo*ratio
+                dWh_dW = dWh_dW + dW_air_dW*ratio*h_mix
+                dWh_dcompo = dWh_dcompo + dW_air_dcompo*ratio*h_mix
+
+            mass_avg_h = W_times_h/W_out
+
+            J['Wout', 'Fl_I:stat:W'] = dW_out_dW
+            J['Wout', 'Fl_I:tot:composition'] = np.repeat(dW_out_dcompo, nc)
+            J['mass_avg_h', 'Fl_I:stat:W'] = (dWh_dW - mass_avg_h*dW_out_dW)/W_out
+            J['mass_avg_h', 'Fl_I:tot:composition'] = np.repeat((dWh_dcompo - mass_avg_h*dW_out_dcompo)/W_out, nc)
+
+            for mix_name in self.mix_names: 
+                J['Wout', f'{mix_name}:ratio'] = W_air_in
+                J['mass_avg_h', f'{mix_name}:ratio'] = W_air_in*(inputs[f'{mix_name}:h'] - mass_avg_h)/W_out
+                J['mass_avg_h', f'{mix_name}:h'] = W_air_in*inputs[f'{mix_name}:ratio']/W_out
+
+        else: 
+            streams = [('Fl_I:stat:W', 'Fl_I:tot:composition', W_in, compo_in, S_in)]
+            W_out = W_in.copy()
+            W_times_h = W_in*h_in
+            W_air_out = W_air_in.copy()
+            W_other_out = W_air_in[:, np.newaxis]*compo_in
+
+            for mix_name in self.mix_names: 
+                compo_mix = inputs[f'{mix_name}:composition'].reshape(nn, -1)
+                W_mix = inputs[f'{mix_name}:W']
+                S_mix = 1+np.sum(compo_mix, axis=1)
+                streams.append((f'{mix_name}:W', f'{mix_name}:composition', W_mix, compo_mix, S_mix))
+
+                W_out = W_out + W_mix
+                W_times_h = W_times_h + W_mix*inputs[f'{mix_name}:h']
+                W_air_out = W_air_out + W_mix/S_mix
+                W_other_out = W_other_out + (W_mix/S_mix)[:, np.newaxis]*compo_mix
+
+            compo_out = W_other_out/W_air_out[:, np.newaxis]
+            mass_avg_h = W_times_h/W_out
+
+            eye = np.eye(nc)
+            for W_name, compo_name, W, compo, S in streams: 
+                # composition_out = W_other_out/W_air_out, with W_air = W/S and W_other = W_air*composition of each stream
+                J['composition_out', W_name] = ((compo - compo_out)/(S*W_air_out)[:, np.newaxis]).ravel()
+                W_air = (W/S)[:, np.newaxis, np.newaxis]
+                dW_air = -W_air/S[:, np.newaxis, np.newaxis]
+                J['composition_out', compo_name] = ((W_air*eye + dW_air*(compo - compo_out)[:, :, np.newaxis]) /
+                                                    W_air_out[:, np.newaxis, np.newaxis]).ravel()
+
+            J['mass_avg_h', 'Fl_I:stat:W'] = (h_in - mass_avg_h)/W_out
+            for mix_name in self.mix_names: 
+                J['mass_avg_h', f'{mix_name}:W'] = (inputs[f'{mix_name}:h'] - mass_avg_h)/W_out
+                J['mass_avg_h', f'{mix_name}:h'] = inputs[f'{mix_name}:W']/W_out
+
+        J['mass_avg_h', 'Fl_I:tot:h'] = W_in/W_out
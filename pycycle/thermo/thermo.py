@@ -1,3 +1,4 @@
+import numpy as np
 import openmdao.api as om
 
 from pycycle.thermo.static_ps_calc import PsCalc
@@ -33,14 +34,21 @@ class Thermo(om.Group):
         # then pass them into the individual componenents
         self.options.declare('thermo_kwargs', default={},
                              desc='Defines the thermodynamic data to be used in computations', recordable=False)
+        self.options.declare('num_nodes', default=1, types=int, lower=1,
+                             desc='Number of flow conditions evaluated in a vectorized way')
 
     def setup(self):
 
         method = self.options['method']
         mode = self.options['mode']
+        nn = self.options['num_nodes']
 
         thermo_kwargs = self.options['thermo_kwargs']
 
+        if nn > 1 and method != 'TABULAR': 
+            raise ValueError(f'{self.msginfo}: num_nodes > 1 is only supported by the TABULAR thermo method, '
+                             f'but method is "{method}".')
+
 
         # Instantiate components based on method for calculating the thermo properties.
         # All these components should compute the properties in a TP mode.
@@ -51,7 +59,7 @@ class Thermo(om.Group):
         #     # base_thermo = IdealThermo(thermo_data=xx)
         #     pass
         elif method == 'TABULAR':
-              base_thermo = tab_thermo.SetTotalTP(**thermo_kwargs)
+              base_thermo = tab_thermo.SetTotalTP(num_nodes=nn, **thermo_kwargs)
 
         in_vars = ('T', 'composition')
         # TODO: remove 'n', 'n_moles' variable from flow station
@@ -87,14 +95,15 @@ class Thermo(om.Group):
             if method=="TABULAR": 
                 upper = 2500.
                 lower=150.
+            self._T_bounds = (lower, upper)
 
             # all static calcs seek to match a given entropy, similar to a total_PS
             if ('SP' in mode) or ('static' in mode):
-                bal.add_balance('T', val=500., units='degK', eq_units='cal/(g*degK)', lower=lower, upper=upper)
+                bal.add_balance('T', val=500., shape=nn, units='degK', eq_units='cal/(g*degK)', lower=lower, upper=upper)
                 self.promotes('balance', inputs=[('rhs:T','S')])
                 self.connect('base_thermo.S', 'balance.lhs:T')
             elif 'hP' in mode: 
-                bal.add_balance('T', val=500., units='degK', eq_units='cal/g', lower=lower, upper=upper)
+                bal.add_balance('T', val=500., shape=nn, units='degK', eq_units='cal/g', lower=lower, upper=upper)
                 self.promotes('balance', inputs=[('rhs:T','h')])
                 self.connect('base_thermo.h', 'balance.lhs:T')
 
@@ -102,19 +111,19 @@ class Thermo(om.Group):
             #extra stuff for statics beyond the S balance
             ##############################################
             if 'Ps' in mode: 
-                self.add_subsystem('ps_calc', PsCalc(),
+                self.add_subsystem('ps_calc', PsCalc(num_nodes=nn),
                                    promotes_inputs=['gamma', 'R', 'ht', 'W', 'rho',
                                                     ('Ts', 'T'), ('hs', 'h')],
                                    promotes_outputs=['MN', 'V', 'Vsonic', 'area']
                                    )
             elif 'A' in mode: 
-                self.add_subsystem('ps_resid', PsResid(mode='area'),
+                self.add_subsystem('ps_resid', PsResid(mode='area', num_nodes=nn),
                                    promotes_inputs=['ht', 'R', 'gamma', 'W',
                                                     'rho', 'area', 'guess:*', ('Ts', 'T'), ('hs', 'h')],
                                    promotes_outputs=['V', 'Vsonic', 'MN', 'Ps']) 
 
             elif 'MN' in mode: 
-                self.add_subsystem('ps_resid', PsResid(mode='MN'),
+                self.add_subsystem('ps_resid', PsResid(mode='MN', num_nodes=nn),
                                    promotes_inputs=['ht', 'R', 'gamma', 'W',
                                                     'rho', 'MN', 'guess:*', ('Ts', 'T'), ('hs', 'h')],
                                    promotes_outputs=['V', 'Vsonic', 'area', 'Ps']) 
@@ -130,34 +139,34 @@ class Thermo(om.Group):
 
         fl_name = self.options['fl_name']
         # TODO: remove need for thermo specific data in the flow components
-        self.add_subsystem('flow', EngUnitProps(fl_name=fl_name),
+        self.add_subsystem('flow', EngUnitProps(fl_name=fl_name, num_nodes=nn),
                            promotes_inputs=in_vars,
                            promotes_outputs=(f'{fl_name}:*',))
 
         if 'static' in mode:
             in_vars = ('area', 'W', 'V', 'Vsonic', 'MN')
             # TODO: remove need for thermo specific data in the flow components
-            eng_units_statics = EngUnitStaticProps(fl_name=fl_name)
+            eng_units_statics = EngUnitStaticProps(fl_name=fl_name, num_nodes=nn)
             self.add_subsystem('flow_static', eng_units_statics,
                                promotes_inputs=in_vars,
                                promotes_outputs=(f'{fl_name}:*',))
 
-            self.set_input_defaults('W', val=1., units='kg/s')
-            self.set_input_defaults('Ps', 1, units='bar')
+            self.set_input_defaults('W', val=np.ones(nn), units='kg/s')
+            self.set_input_defaults('Ps', np.ones(nn), units='bar')
 
             if 'A' in mode: 
-                self.set_input_defaults('area', 1., units='m**2')
+                self.set_input_defaults('area', np.ones(nn), units='m**2')
 
         else: 
-            self.set_input_defaults('P', 1, units='bar')
+            self.set_input_defaults('P', np.ones(nn), units='bar')
 
         if 'TP' in mode: 
-            self.set_input_defaults('T', 273, units='degK')
+            self.set_input_defaults('T', 273*np.ones(nn), units='degK')
         else: 
             if 'hP' in mode: 
-                self.set_input_defaults('h', 1., units='cal/g')
+                self.set_input_defaults('h', np.ones(nn), units='cal/g')
             if 'SP' in mode or 'static' in mode: 
-                self.set_input_defaults('S', 1., units='cal/(g*degK)')
+                self.set_input_defaults('S', np.ones(nn), units='cal/(g*degK)')
 
 
         newton = self.nonlinear_solver = om.NewtonSolver()
@@ -171,8 +180,7 @@ class Thermo(om.Group):
 
         newton.options['iprint'] = -1
 
-        self.options['assembled_jac_type'] = 'dense'
-        self.linear_solver = om.DirectSolver()
+        self.linear_solver = om.DirectSolver(assemble_jac=True)
 
         # ln_bt = newton.linesearch = om.BoundsEnforceLS()
         ln_bt = newton.linesearch = om.ArmijoGoldsteinLS()
@@ -203,6 +211,9 @@ class ThermoAdd(om.Group):
 
         self.options.declare('mix_names', default='mix', types=(str, list, tuple))
 
+        self.options.declare('num_nodes', default=1, types=int, lower=1,
+                             desc='Number of flow conditions evaluated in a vectorized way')
+
         self.thermo_adder = None
 
     def setup(self): 
@@ -212,6 +223,10 @@ class ThermoAdd(om.Group):
         mix_names = self.options['mix_names']
         thermo_kwargs = self.options['thermo_kwargs']
 
+        if self.options['num_nodes'] > 1 and method != 'TABULAR': 
+            raise ValueError(f'{self.msginfo}: num_nodes > 1 is only supported by the TABULAR thermo method, '
+                             f'but method is "{method}".')
+
         if self.thermo_adder is None: # just in case output_port_data is not called
             if method == 'CEA': 
                 self.thermo_adder = cea_thermo_add.ThermoAdd(mix_mode=mix_mode, 
@@ -221,6 +236,7 @@ class ThermoAdd(om.Group):
             if method == 'TABULAR': 
                 self.thermo_adder = tab_thermo_add.ThermoAdd(mix_mode=mix_mode, 
                                                              mix_names=mix_names, 
+                                                             num_nodes=self.options['num_nodes'],
                                                              **thermo_kwargs)
 
         self.add_subsystem('thermo_add', self.thermo_adder, promotes=['*'])
@@ -243,6 +259,7 @@ class ThermoAdd(om.Group):
             if method == 'TABULAR': 
                 self.thermo_adder = tab_thermo_add.ThermoAdd(mix_mode=mix_mode, 
                                                              mix_names=mix_names, 
+                                                             num_nodes=self.options['num_nodes'],
                                                              **thermo_kwargs)
         
         return self.thermo_adder.output_port_data()
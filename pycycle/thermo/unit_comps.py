@@ -11,6 +11,7 @@ class UnitCompBase(ExplicitComponent):
 
     def initialize(self): 
         self.options.declare('fl_name')
+        self.options.declare('num_nodes', default=1, types=int, lower=1)
 
     def setup_io(self):
         rel2meta = self._var_rel2meta
@@ -51,30 +52,44 @@ class EngUnitProps(UnitCompBase):
     """only job is to provide flow in english units"""
 
     def setup_io(self, composition):
-
-        self.add_input('T', val=284., units="degR", desc="Temperature")
-        self.add_input('P', val=1., units='lbf/inch**2', desc="Pressure")
-        self.add_input('h', val=1., units="Btu/lbm", desc="enthalpy")
-        self.add_input('S', val=1., units="Btu/(lbm*degR)", desc="entropy")
-        self.add_input('gamma', val=1.4, desc="ratio of specific heats")
-        self.add_input('Cp', val=1., units="Btu/(lbm*degR)", desc="Specific heat at constant pressure")
-        self.add_input('Cv', val=1., units="Btu/(lbm*degR)", desc="Specific heat at constant volume")
-        self.add_input('rho', val=1., units="lbm/ft**3", desc="density")
-        self.add_input('R', val=1.0, units="Btu/(lbm*degR)", desc='Total specific gas constant')
+        nn = self.options['num_nodes']
+
+        self.add_input('T', val=284., shape=nn, units="degR", desc="Temperature")
+        self.add_input('P', val=1., shape=nn, units='lbf/inch**2', desc="Pressure")
+        self.add_input('h', val=1., shape=nn, units="Btu/lbm", desc="enthalpy")
+        self.add_input('S', val=1., shape=nn, units="Btu/(lbm*degR)", desc="entropy")
+        self.add_input('gamma', val=1.4, shape=nn, desc="ratio of specific heats")
+        self.add_input('Cp', val=1., shape=nn, units="Btu/(lbm*degR)", desc="Specific heat at constant pressure")
+        self.add_input('Cv', val=1., shape=nn, units="Btu/(lbm*degR)", desc="Specific heat at constant volume")
+        self.add_input('rho', val=1., shape=nn, units="lbm/ft**3", desc="density")
+        self.add_input('R', val=1.0, shape=nn, units="Btu/(lbm*degR)", desc='Total specific gas constant')
         self.add_input('composition', val=composition, desc='moles of atoms present for each element')
 
         super().setup_io()
 
 
+class FlowCopy(EngUnitProps):
+    """gives a flow station the total properties computed by another Thermo, in place of a duplicate one"""
+
+    def initialize(self):
+        super().initialize()
+        self.options.declare('thermo', recordable=False,
+                             desc='Thermo group (set up before this component) whose flow station is copied')
+
+    def setup(self):
+        self.setup_io(self.options['thermo'].base_thermo.composition)
+
+
 class EngUnitStaticProps(UnitCompBase):
 
     def setup_io(self):
+        nn = self.options['num_nodes']
 
-        self.add_input('area', val=1.0, units="inch**2")
-        self.add_input('W', val=1.0, units="lbm/s")
-        self.add_input('V', val=1.0, units="ft/s")
-        self.add_input('Vsonic', val=1.0, units="ft/s")
-        self.add_input('MN', val=0.5)
+        self.add_input('area', val=1.0, shape=nn, units="inch**2")
+        self.add_input('W', val=1.0, shape=nn, units="lbm/s")
+        self.add_input('V', val=1.0, shape=nn, units="ft/s")
+        self.add_input('Vsonic', val=1.0, shape=nn, units="ft/s")
+        self.add_input('MN', val=0.5, shape=nn)
 
         super().setup_io()
 
@@ -46,7 +46,7 @@ setup(name='om-pycycle',
           'pycycle.tests',
       ],
       install_requires=[
-        'openmdao>=3.10.0',
+        'openmdao>=3.30.0',
       ],
     package_data={
         'pycycle.elements.test': ['reg_data/*.csv'],